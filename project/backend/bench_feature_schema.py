@@ -0,0 +1,101 @@
+"""
+Per-request feature-mapping overhead: legacy dict scan + single-row DataFrame
+vs the precompiled FeatureSchema filling a NumPy row.
+
+Usage (from the project/ directory):
+    python -m backend.bench_feature_schema [--iterations 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from backend.feature_schema import FeatureSchema
+from backend.routes.predict import DIABETES_FEATURES, LUNG_CANCER_FEATURES
+
+
+def _legacy_lung_frame(features, expected_features):
+    """The pre-schema lung cancer mapping: per-column key scan, then a DataFrame."""
+    processed = {}
+    for expected_feat in expected_features:
+        if expected_feat in features:
+            val = features[expected_feat]
+        else:
+            found = False
+            for k, v in features.items():
+                if k.strip().lower() == expected_feat.strip().lower():
+                    val = v
+                    found = True
+                    break
+            if not found:
+                continue
+        if isinstance(val, str):
+            s = val.strip()
+            if s != '':
+                try:
+                    processed[expected_feat] = float(s)
+                except Exception:
+                    processed[expected_feat] = val
+        else:
+            processed[expected_feat] = val
+    input_df = pd.DataFrame([processed])
+    return input_df[expected_features]
+
+
+def _legacy_brfss_frame(features, expected_features):
+    """The pre-schema diabetes mapping (heart disease used the same scan without pandas)."""
+    processed = {}
+    mapping = {'Yes': 1.0, 'No': 0.0, 'Male': 1.0, 'Female': 0.0}
+    for feat in expected_features:
+        val = features.get(feat)
+        if val is None:
+            for k, v in features.items():
+                if k.strip().lower() == feat.lower():
+                    val = v
+                    break
+        if val is not None:
+            try:
+                processed[feat] = float(val)
+            except (ValueError, TypeError):
+                processed[feat] = mapping.get(val, 0.0)
+        else:
+            processed[feat] = 0.0
+    input_df = pd.DataFrame([processed])
+    return input_df[expected_features]
+
+
+def run(iterations: int) -> list:
+    # Lower-cased keys force the legacy code onto its slow case-insensitive path,
+    # which is what the frontend forms actually send for several fields.
+    lung_input = {f.lower(): '2' for f in LUNG_CANCER_FEATURES}
+    brfss_input = {f: ('Yes' if i % 3 == 0 else i) for i, f in enumerate(DIABETES_FEATURES)}
+
+    cases = [
+        ('lung_cancer', LUNG_CANCER_FEATURES, lung_input, _legacy_lung_frame,
+         FeatureSchema(LUNG_CANCER_FEATURES, required=True)),
+        ('diabetes', DIABETES_FEATURES, brfss_input, _legacy_brfss_frame,
+         FeatureSchema(DIABETES_FEATURES)),
+    ]
+    report = []
+    for name, columns, features, legacy, schema in cases:
+        legacy_s = timeit.timeit(lambda: legacy(features, columns), number=iterations)
+        schema_s = timeit.timeit(lambda: schema.row(features), number=iterations)
+        report.append({
+            'type': name,
+            'legacy_us_per_request': round(legacy_s / iterations * 1e6, 2),
+            'schema_us_per_request': round(schema_s / iterations * 1e6, 2),
+            'speedup': round(legacy_s / schema_s, 1),
+        })
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    for line in run(args.iterations):
+        print(line)
@@ -0,0 +1,70 @@
+"""
+Fallback diet engine food scoring over the full knowledge base: per-food
+score_food_hierarchical() against one FoodScoreMatrix pass, for every food
+in dietary_knowledge.json plus every food in the local USDA index (when the
+Foundation JSON is present). Checks that both give the same scores.
+
+Usage (from the project/ directory):
+    python -m backend.bench_food_scoring [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.fallback_diet_engine import expert_kb, score_food_hierarchical
+from backend.food_score_matrix import FoodScoreMatrix
+from backend.usda_loader import usda_loader
+from backend.usda_manager import usda_manager
+
+# A representative multi-condition request (anemia + prediabetes + hypertension)
+CONDITIONS = ['iron_deficiency_anemia', 'prediabetes', 'hypertension']
+CONTEXT = {
+    'boost': ['spinach', 'dal', 'beetroot'],
+    'avoid': ['fried', 'pickle'],
+    'goals': {'iron': 'high', 'sugar': 'low', 'sodium': 'low'},
+    'derived_ingredients': ['moong', 'ragi', 'amla'],
+}
+
+
+def _best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    usda_foods = usda_loader.foundation_index().names.tolist()
+    foods = sorted({name.title() for name in expert_kb.data.get('food_details', {})} | set(usda_foods))
+    targets = expert_kb.get_nutrients_for_conditions(CONDITIONS) + ['hypertension', 'prediabetes']
+    avoid_map = expert_kb.get_avoid_data(CONDITIONS)
+
+    per_food = lambda: [score_food_hierarchical(f, targets, avoid_map, context=CONTEXT) for f in foods]
+    matrix = FoodScoreMatrix(expert_kb, usda_manager.get_food_nutrients_local)
+    t0 = time.perf_counter()
+    matrix.warm(foods)
+    build_ms = (time.perf_counter() - t0) * 1000
+    vectorized = lambda: matrix.score(foods, targets, avoid_map, CONTEXT)
+
+    scores, reasons = vectorized()
+    assert list(zip(scores.tolist(), reasons)) == per_food(), 'matrix scores differ from score_food_hierarchical'
+
+    t_loop = _best_time(per_food, args.repeat)
+    t_matrix = _best_time(vectorized, args.repeat)
+    print(f"foods: {len(foods)} ({len(usda_foods)} from the USDA index), targets: {len(targets)}")
+    print(f"matrix build (lookups + arrays): {build_ms:9.2f} ms")
+    print(f"score_food_hierarchical loop:    {t_loop * 1000:9.2f} ms  ({len(foods) / t_loop:,.0f} foods/s)")
+    print(f"FoodScoreMatrix.score:           {t_matrix * 1000:9.2f} ms  ({len(foods) / t_matrix:,.0f} foods/s)")
+    print(f"speedup: {t_loop / t_matrix:.1f}x (identical scores and block reasons)")
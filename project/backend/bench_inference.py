@@ -0,0 +1,195 @@
+"""
+Reproducible inference benchmark for all three predictors.
+
+For every model type a fresh spawned worker (so cold start and peak memory
+are not shared between models) measures:
+  - import_ms:            importing backend.routes.predict
+  - cold_load_ms:         first load_model_for_type() through the registry
+  - single_*:             warm predict_with_type latency (p50/p95/p99, µs)
+  - batch_rows_per_s:     predict_batch_with_type throughput on full batches
+  - peak_rss_mb:          ru_maxrss of the worker at the end
+
+The prediction cache is disabled in the workers so repeated rows measure the
+model, not the cache. Feature rows are synthetic but derived from the CSVs
+shipped with the repo: lung cancer rows are resampled from
+`cancer patient data sets.csv` (same columns as the model) with +-1 jitter;
+the BRFSS-style diabetes / heart disease rows take Age, Sex, BMI (from
+Obesity) and diabetes status from `diabetes_data_upload.csv` and draw the
+remaining indicators from a fixed-seed RNG.
+
+The report is JSON with sorted keys so two runs can be diffed directly.
+
+Usage (from the project/ directory):
+    python -m backend.bench_inference [--out report.json] [--requests 500] [--batch-rows 1000]
+"""
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+LUNG_CSV = os.path.join(BASE_DIR, 'cancer patient data sets.csv')
+DIABETES_CSV = os.path.join(BASE_DIR, 'diabetes_data_upload.csv')
+
+MODEL_TYPES = ('lung_cancer', 'diabetes', 'heart_disease')
+
+# BRFSS _AGEG5YR buckets: 1 = 18-24, then 5-year bands up to 13 = 80+
+_AGE_BUCKET_EDGES = (25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80)
+
+
+def _read_csv(path: str) -> list:
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _age_bucket(age: float) -> int:
+    return 1 + sum(age >= edge for edge in _AGE_BUCKET_EDGES)
+
+
+def synthetic_rows(prediction_type: str, columns: list, n: int, seed: int = 42) -> list:
+    """n feature dicts for prediction_type, keyed by the model's own column names."""
+    import numpy as np
+
+    rng = np.random.RandomState(seed)
+    if prediction_type == 'lung_cancer':
+        source = _read_csv(LUNG_CSV)
+        rows = []
+        for i in rng.randint(0, len(source), size=n):
+            rec = source[i]
+            row = {}
+            for col in columns:
+                value = float(rec[col]) if col in rec else 1.0
+                if col != 'Gender':
+                    value = max(1.0, value + rng.randint(-1, 2))
+                row[col] = value
+            rows.append(row)
+        return rows
+
+    source = _read_csv(DIABETES_CSV)
+    rows = []
+    for i in rng.randint(0, len(source), size=n):
+        rec = source[i]
+        derived = {
+            'Age': _age_bucket(float(rec['Age'])),
+            'Sex': 'Male' if rec['Gender'] == 'Male' else 'Female',
+            'BMI': round(float(rng.normal(33.0 if rec['Obesity'] == 'Yes' else 25.5, 3.0)), 1),
+            'Diabetes': 1 if rec['class'] == 'Positive' else 0,
+            'DiffWalk': 1 if rec['partial paresis'] == 'Yes' else 0,
+            'GenHlth': int(rng.randint(1, 6)),
+            'MentHlth': int(rng.randint(0, 31)),
+            'PhysHlth': int(rng.randint(0, 31)),
+        }
+        rows.append({col: derived[col] if col in derived else int(rng.rand() < 0.4) for col in columns})
+    return rows
+
+
+def _percentiles_us(samples) -> dict:
+    import numpy as np
+
+    arr = np.asarray(samples) * 1e6
+    return {f'single_p{p}_us': round(float(np.percentile(arr, p)), 1) for p in (50, 95, 99)}
+
+
+def _measure(predict, prediction_type: str, bundle, n_requests: int, batch_rows: int) -> dict:
+    report = {}
+    rows = synthetic_rows(prediction_type, bundle['schema'].columns, max(n_requests, batch_rows))
+    resp, status = predict.predict_with_type(prediction_type, rows[0])
+    if status != 200:
+        raise RuntimeError(f'Warm-up prediction failed: {resp}')
+
+    latencies = []
+    for row in rows[:n_requests]:
+        t0 = time.perf_counter()
+        predict.predict_with_type(prediction_type, row)
+        latencies.append(time.perf_counter() - t0)
+    report.update(_percentiles_us(latencies))
+
+    batch = rows[:batch_rows]
+    repeats = 5
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        resp, status = predict.predict_batch_with_type(prediction_type, batch)
+        if status != 200 or resp['failed']:
+            raise RuntimeError(f'Batch prediction failed: {resp.get("error", resp.get("failed"))}')
+    report['batch_rows'] = len(batch)
+    report['batch_rows_per_s'] = round(repeats * len(batch) / (time.perf_counter() - t0), 1)
+    report['artifact'] = 'flat' if type(bundle['model']).__module__ == 'backend.model_artifacts' else 'native'
+    return report
+
+
+def _worker(prediction_type: str, n_requests: int, batch_rows: int, results):
+    os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    sys.path.insert(0, BASE_DIR)
+    import contextlib
+    import io
+    import resource
+    import warnings
+    warnings.filterwarnings('ignore')
+
+    report = {'type': prediction_type}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            from backend.routes import predict
+            report['import_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+
+            t0 = time.perf_counter()
+            bundle = predict.load_model_for_type(prediction_type)
+            report['cold_load_ms'] = round((time.perf_counter() - t0) * 1000, 1)
+            report['available'] = bundle is not None
+            if bundle is not None:
+                report.update(_measure(predict, prediction_type, bundle, n_requests, batch_rows))
+    except Exception as e:
+        report['error'] = f'{type(e).__name__}: {e}'
+    report['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    results.put(report)
+
+
+def _environment() -> dict:
+    env = {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count(),
+           'model_artifact_mode': os.environ.get('MODEL_ARTIFACT_MODE', 'auto')}
+    for name in ('numpy', 'sklearn', 'xgboost'):
+        try:
+            env[name] = __import__(name).__version__
+        except ImportError:
+            env[name] = None
+    try:
+        env['git_commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                                           capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        env['git_commit'] = None
+    return env
+
+
+def run(types, n_requests: int, batch_rows: int) -> dict:
+    ctx = mp.get_context('spawn')
+    models = {}
+    for prediction_type in types:
+        results = ctx.Queue()
+        proc = ctx.Process(target=_worker, args=(prediction_type, n_requests, batch_rows, results))
+        proc.start()
+        models[prediction_type] = results.get(timeout=600)
+        proc.join()
+    return {'environment': _environment(), 'requests': n_requests, 'models': models}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--type', dest='types', action='append', choices=MODEL_TYPES)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--batch-rows', type=int, default=1000)
+    parser.add_argument('--out', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.types or MODEL_TYPES, args.requests, args.batch_rows), indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(report + '\n')
+        print(f"[OK] Benchmark report written to {args.out}")
+    else:
+        print(report)
@@ -0,0 +1,81 @@
+"""
+Single-row prediction latency and throughput with and without micro-batching.
+
+`concurrency` greenlets each send single-row predict_proba calls for the
+heart disease model back to back. "direct" is one tpool.execute per request
+(the previous behaviour); "batched" goes through MicroBatcher. Reports p50 /
+p99 request latency and requests per second at every concurrency level.
+
+Usage (from the project/ directory):
+    python -m backend.bench_inference_batcher [--requests 2000] [--concurrency 1 8 32 128]
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+warnings.filterwarnings('ignore')
+
+import eventlet
+import numpy as np
+
+from backend.inference_batcher import MicroBatcher
+from backend.routes import predict
+
+
+def run(requests: int, concurrency: int, batcher: MicroBatcher, bundle, rows: np.ndarray) -> dict:
+    fn = functools.partial(predict._probability_matrix, 'heart_disease', bundle)
+    per_worker = max(1, requests // concurrency)
+    latencies = []
+
+    def worker(w):
+        for i in range(per_worker):
+            X = rows[(w * per_worker + i) % len(rows)][np.newaxis]
+            t0 = time.perf_counter()
+            batcher.submit(('heart_disease', id(bundle)), fn, X)
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    pool = eventlet.GreenPool(concurrency)
+    t0 = time.perf_counter()
+    for w in range(concurrency):
+        pool.spawn(worker, w)
+    pool.waitall()
+    elapsed = time.perf_counter() - t0
+
+    lat = np.asarray(latencies)
+    return {
+        'concurrency': concurrency,
+        'requests': len(lat),
+        'p50_ms': round(float(np.percentile(lat, 50)), 3),
+        'p99_ms': round(float(np.percentile(lat, 99)), 3),
+        'requests_per_s': round(len(lat) / elapsed, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch-rows', type=int, default=64)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bundle = predict.load_model_for_type('heart_disease')
+    if bundle is None:
+        raise SystemExit("Heart disease model not available")
+    rows = np.random.RandomState(0).rand(4096, bundle['schema'].n_features).astype(np.float32) * 5
+
+    for concurrency in args.concurrency:
+        for mode in ('direct', 'batched'):
+            batcher = MicroBatcher(window_ms=args.window_ms, max_batch_rows=args.max_batch_rows,
+                                   enabled=(mode == 'batched'))
+            result = run(args.requests, concurrency, batcher, bundle, rows)
+            result['mode'] = mode
+            print(json.dumps(result))
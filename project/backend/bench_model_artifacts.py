@@ -0,0 +1,102 @@
+"""
+Cold-start time and per-worker memory: native XGBoost/joblib loading vs the
+memory-mapped flat artifact, with several worker processes alive at once.
+
+Each worker is a fresh spawned interpreter (like a gunicorn worker), loads the
+heart disease model through one path, runs a prediction so every page it needs
+is touched, then reports RSS and PSS (proportional set size: shared pages are
+split between the processes mapping them) from /proc/self/smaps_rollup.
+
+Usage (from the project/ directory, after `python -m backend.model_artifacts export`):
+    python -m backend.bench_model_artifacts [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _memory_kb() -> dict:
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        import resource
+        fields['Rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return fields
+
+
+def _worker(path: str, barrier, results):
+    sys.path.insert(0, BASE_DIR)
+    import warnings
+    warnings.filterwarnings('ignore')
+    import numpy as np
+
+    t0 = time.perf_counter()
+    if path == 'flat':
+        from backend.model_artifacts import load_heart_disease
+        bundle = load_heart_disease()
+        if bundle is None:
+            raise SystemExit("No flat artifact: run `python -m backend.model_artifacts export` first")
+        model, scaler = bundle['model'], bundle['scaler']
+    else:
+        import joblib
+        import xgboost as xgb
+        from backend.model_artifacts import HEART_SCALER_PATH, HEART_XGB_PATH
+        model = xgb.XGBClassifier()
+        model.load_model(HEART_XGB_PATH)
+        scaler = joblib.load(HEART_SCALER_PATH)
+    X = np.random.RandomState(os.getpid() % 1000).rand(256, 18).astype(np.float32)
+    model.predict_proba(scaler.transform(X))
+    cold_start_ms = (time.perf_counter() - t0) * 1000
+
+    # Measure while every worker is alive so shared pages are split in PSS
+    barrier.wait()
+    mem = _memory_kb()
+    barrier.wait()
+    results.put({
+        'cold_start_ms': cold_start_ms,
+        'rss_mb': mem.get('Rss', 0) / 1024,
+        'pss_mb': mem.get('Pss', 0) / 1024,
+        'private_mb': (mem.get('Private_Clean', 0) + mem.get('Private_Dirty', 0)) / 1024,
+    })
+
+
+def run(path: str, workers: int) -> dict:
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(path, barrier, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get(timeout=300) for _ in procs]
+    for p in procs:
+        p.join()
+
+    def _avg(key):
+        return round(sum(r[key] for r in rows) / len(rows), 1)
+
+    return {
+        'path': path,
+        'workers': workers,
+        'cold_start_ms': _avg('cold_start_ms'),
+        'rss_mb_per_worker': _avg('rss_mb'),
+        'pss_mb_per_worker': _avg('pss_mb'),
+        'private_mb_per_worker': _avg('private_mb'),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    for path in ('native', 'flat'):
+        print(json.dumps(run(path, args.workers)))
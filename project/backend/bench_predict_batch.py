@@ -0,0 +1,69 @@
+"""
+Throughput check: N sequential predict_with_type calls vs one predict_batch_with_type call.
+
+Usage (from the project/ directory):
+    python -m backend.bench_predict_batch [--rows 500] [--type lung_cancer]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+warnings.filterwarnings('ignore')
+
+from backend.routes import predict as predict_module
+
+
+def _synthetic_rows(prediction_type: str, n: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    if prediction_type == 'lung_cancer':
+        return [{f: rng.randint(1, 8) for f in predict_module.LUNG_CANCER_FEATURES} for _ in range(n)]
+    if prediction_type == 'heart_disease':
+        features = predict_module.load_model_for_type('heart_disease')['features']
+    else:
+        features = predict_module.DIABETES_FEATURES
+    return [{f: rng.choice([0, 1]) if f not in ('BMI', 'Age', 'GenHlth') else rng.randint(1, 40) for f in features}
+            for _ in range(n)]
+
+
+def run(prediction_type: str, n_rows: int) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = _synthetic_rows(prediction_type, n_rows)
+        # Warm both paths once so neither pays first-call costs
+        predict_module.predict_with_type(prediction_type, rows[0])
+        predict_module.predict_batch_with_type(prediction_type, rows[:2])
+
+        t0 = time.perf_counter()
+        for row in rows:
+            predict_module.predict_with_type(prediction_type, row)
+        sequential_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        resp, status = predict_module.predict_batch_with_type(prediction_type, rows)
+        batch_s = time.perf_counter() - t0
+
+    if status != 200:
+        raise RuntimeError(f"Batch prediction failed: {resp}")
+    return {
+        'type': prediction_type,
+        'rows': n_rows,
+        'sequential_rows_per_s': round(n_rows / sequential_s, 1),
+        'batch_rows_per_s': round(n_rows / batch_s, 1),
+        'speedup': round(sequential_s / batch_s, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--type', dest='types', action='append',
+                        choices=['lung_cancer', 'diabetes', 'heart_disease'])
+    args = parser.parse_args()
+
+    for t in args.types or ['lung_cancer', 'heart_disease']:
+        print(run(t, args.rows))
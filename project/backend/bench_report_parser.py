@@ -0,0 +1,72 @@
+"""
+Report parser throughput on the synthetic corpus (backend.report_corpus):
+lines/sec and params/sec for extract_parameters, parse_reference_ranges and
+parse_report (both in one pass), over the regression cases and over long
+multi-page reports.
+
+Usage (from the project/ directory):
+    python -m backend.bench_report_parser [--pages 10 40] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.report_corpus import corpus, multipage_report
+from backend.report_parser import extract_parameters, parse_reference_ranges, parse_report
+
+
+def _best_time(fn, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(texts, repeat):
+    """Lines/s and params/s for each parser entry point over texts."""
+    lines = sum(text.count('\n') + 1 for text in texts)
+    params = sum(len(extract_parameters(text)) for text in texts)
+    ranges = sum(len(parse_reference_ranges(text)) for text in texts)
+    t_extract = _best_time(extract_parameters, texts, repeat)
+    t_ranges = _best_time(parse_reference_ranges, texts, repeat)
+    t_both = _best_time(parse_report, texts, repeat)
+    return {
+        'lines': lines,
+        'extract_lines_per_s': lines / t_extract,
+        'extract_params_per_s': params / t_extract,
+        'ranges_lines_per_s': lines / t_ranges,
+        'ranges_params_per_s': ranges / t_ranges,
+        'both_lines_per_s': lines / t_both,
+        'both_ms': t_both * 1000,
+        'separate_ms': (t_extract + t_ranges) * 1000,
+    }
+
+
+def _print_row(label, m):
+    print(f"{label:<22} {m['lines']:>7} {m['extract_lines_per_s']:>12,.0f} {m['extract_params_per_s']:>11,.0f} "
+          f"{m['ranges_lines_per_s']:>12,.0f} {m['ranges_params_per_s']:>11,.0f} {m['both_lines_per_s']:>12,.0f} "
+          f"{m['both_ms']:>8.2f} {m['separate_ms']:>8.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 40])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    workloads = [('corpus (%d cases)' % len(corpus()), list(corpus().values()))]
+    workloads += [(f'multipage_{pages}', [multipage_report(pages)]) for pages in args.pages]
+
+    print(f"{'workload':<22} {'lines':>7} {'extract l/s':>12} {'extract p/s':>11} "
+          f"{'ranges l/s':>12} {'ranges p/s':>11} {'report l/s':>12} {'both ms':>8} {'sep. ms':>8}")
+    for label, texts in workloads:
+        _print_row(label, measure(texts, args.repeat))
@@ -0,0 +1,100 @@
+"""
+USDA Foundation Foods index startup: parsing the FoundationFoods JSON
+(USDALoader's old path) against mapping the prebuilt columnar snapshot
+(backend.usda_snapshot). Each variant runs in a fresh interpreter and
+reports the import time of backend.usda_loader, the time of the first
+lookup (which loads the index) and the process RSS after it.
+
+The Foundation JSON is not checked in, so by default the benchmark writes a
+synthetic file with the same structure; pass --json to use the real one.
+
+Usage (from the project/ directory):
+    python -m backend.bench_usda_index [--foods 400] [--nutrients 150] [--json PATH]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.usda_snapshot import NUTRIENT_NAMES, build_snapshot
+
+_PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_PROBE = r"""
+import json, os, sys, time
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+t0 = time.perf_counter()
+from backend.usda_loader import usda_loader
+t1 = time.perf_counter()
+rss_before = rss_mb()
+usda_loader.json_path, usda_loader.snapshot_dir = sys.argv[1], sys.argv[2]
+top = usda_loader.get_top_foods('iron', 10)
+t2 = time.perf_counter()
+hit = usda_loader.fetch_from_local_json('food 7')
+print(json.dumps({'import_ms': (t1 - t0) * 1000, 'first_lookup_ms': (t2 - t1) * 1000,
+                  'rss_mb': rss_mb(), 'index_rss_mb': rss_mb() - rss_before,
+                  'source': usda_loader.foundation_index().source, 'top': len(top), 'hit': hit is not None}))
+"""
+
+
+def synthetic_foundation_json(foods: int = 400, nutrients: int = 150, seed: int = 0) -> dict:
+    """FoundationFoods-shaped data: every food has the mapped nutrients plus filler entries."""
+    rng = random.Random(seed)
+    names = list(NUTRIENT_NAMES) + ['Energy'] + [f'Nutrient {i}' for i in range(max(0, nutrients - len(NUTRIENT_NAMES) - 1))]
+    out = []
+    for i in range(foods):
+        entries = []
+        for n_id, name in enumerate(names):
+            entries.append({
+                'type': 'FoodNutrient', 'id': i * 1000 + n_id,
+                'nutrient': {'id': 1000 + n_id, 'number': str(200 + n_id), 'name': name,
+                             'rank': n_id * 100, 'unitName': 'kcal' if name == 'Energy' else 'mg'},
+                'foodNutrientDerivation': {'code': 'A', 'description': 'Analytical',
+                                           'foodNutrientSource': {'id': 1, 'code': '1', 'description': 'Analytical'}},
+                'amount': round(rng.uniform(0, 50), 3) if rng.random() > 0.1 else 0.0,
+                'dataPoints': rng.randint(1, 12), 'min': 0.0, 'max': 60.0, 'median': 20.0,
+            })
+        out.append({'fdcId': 300000 + i, 'description': f'Food {i}, raw', 'dataType': 'Foundation',
+                    'foodClass': 'FinalFood', 'foodNutrients': entries})
+    return {'FoundationFoods': out}
+
+
+def _probe(json_path: str, snapshot_dir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=_PROJECT_DIR)
+    out = subprocess.run([sys.executable, '-c', _PROBE, json_path, snapshot_dir], cwd=_PROJECT_DIR, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--foods', type=int, default=400)
+    parser.add_argument('--nutrients', type=int, default=150)
+    parser.add_argument('--json', help='Real FoundationFoods JSON (default: synthetic)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = args.json
+        if not json_path:
+            json_path = os.path.join(tmp, 'foundation.json')
+            with open(json_path, 'w') as f:
+                json.dump(synthetic_foundation_json(args.foods, args.nutrients), f)
+        snapshot_dir = os.path.join(tmp, 'snapshot')
+        build_snapshot(json_path, snapshot_dir)
+        snapshot_kb = sum(os.path.getsize(os.path.join(snapshot_dir, n)) for n in os.listdir(snapshot_dir)) / 1024
+        print(f"source JSON: {os.path.getsize(json_path) / 2**20:.1f} MB, snapshot: {snapshot_kb:.0f} KB")
+        print(f"{'variant':<10} {'import ms':>10} {'1st lookup ms':>14} {'RSS MB':>8} {'index RSS MB':>13}")
+        for label, snap in (('json', os.path.join(tmp, 'no-snapshot')), ('snapshot', snapshot_dir)):
+            runs = [_probe(json_path, snap) for _ in range(args.repeat)]
+            assert all(r['source'] == label and r['top'] == 10 and r['hit'] for r in runs), runs
+            best = min(runs, key=lambda r: r['first_lookup_ms'])
+            print(f"{label:<10} {min(r['import_ms'] for r in runs):>10.1f} {best['first_lookup_ms']:>14.1f} "
+                  f"{best['rss_mb']:>8.1f} {best['index_rss_mb']:>13.1f}")
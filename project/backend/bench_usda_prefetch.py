@@ -0,0 +1,58 @@
+"""
+USDA live-API misses in one diet plan: the old per-food loop
+(get_food_nutrients_with_meta one ingredient after another) against
+USDAManager.get_many_with_meta (misses fetched concurrently through the
+pooled usda_client). Both run against backend.usda_stub with a fixed
+per-request latency and an empty cache, so only the API wait differs.
+
+Usage (from the project/ directory):
+    python -m backend.bench_usda_prefetch [--foods 24] [--latency-ms 150] [--duplicates 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.nutrient_cache import NutrientCache
+from backend.usda_client import usda_client
+from backend.usda_loader import usda_loader
+from backend.usda_manager import USDAManager
+from backend.usda_stub import USDAStubServer
+
+
+def _run(label, names, latency_ms, fn):
+    with USDAStubServer(latency_ms=latency_ms) as stub, tempfile.TemporaryDirectory() as tmp:
+        manager = USDAManager()
+        manager.api_cache = NutrientCache(os.path.join(tmp, 'nutrients.sqlite3')).namespace('usda_manager')
+        usda_client.base_url = stub.url
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = fn(manager, names)
+        elapsed = (time.perf_counter() - t0) * 1000
+    assert len(results) == len(names) and all(meta['source'] in ('usda_api', 'usda_cache') for _, meta in results)
+    print(f"{label:<20} {elapsed:>10.1f} {sum(stub.hits.values()):>9} {stub.max_concurrent:>15}")
+    return elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--foods', type=int, default=24)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--duplicates', type=int, default=4, help='Foods repeated later in the list')
+    args = parser.parse_args()
+
+    names = [f'ingredient {i}' for i in range(args.foods)]
+    names += names[:args.duplicates]
+    usda_loader.enabled, usda_loader.api_key = True, 'bench'
+    print(f"{len(names)} lookups ({args.foods} distinct), {args.latency_ms:.0f} ms per request, "
+          f"{usda_client.max_workers} workers")
+    print(f"{'variant':<20} {'total ms':>10} {'requests':>9} {'max concurrent':>15}")
+    serial = _run('serial loop', names, args.latency_ms,
+                  lambda m, n: [m.get_food_nutrients_with_meta(name) for name in n])
+    batched = _run('get_many_with_meta', names, args.latency_ms, lambda m, n: m.get_many_with_meta(n))
+    print(f"speedup: {serial / batched:.1f}x")
@@ -0,0 +1,193 @@
+"""
+Compiled index over backend/data/dietary_knowledge.json.
+
+DietKnowledgeManager used to keep the parsed JSON as plain dicts and walk
+them again on every plan (lowercasing every avoid list, re-merging nutrient
+food lists). KnowledgeIndex compiles the file once:
+
+    condition -> nutrients       tuple per condition
+    nutrient  -> foods           sorted, de-duplicated posting list
+    condition -> {food: reason}  avoid map with lowercased food names
+    food      -> details         the food_details entries
+
+and saves the tables, with the raw data, as a versioned binary snapshot
+next to the other backend caches. The snapshot holds only plain dicts,
+tuples and strings (pickled, and read back with an unpickler that refuses
+to load any class or function) and is turned back into a KnowledgeIndex
+with from_tables. Startup loads it instead of re-parsing the JSON as long
+as the header still matches: the JSON's stat signature (inode, size, mtime)
+and a hash of this module, so a change to the tables' layout invalidates
+old snapshots without a manual FORMAT_VERSION bump. Otherwise the index is
+rebuilt from the JSON and the snapshot rewritten.
+
+The snapshot lives at DIET_KNOWLEDGE_INDEX_PATH (default
+backend/cache/dietary_knowledge.idx) and is safe to delete.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+_MAGIC = b"DKIDX\n"
+# KnowledgeIndex attributes stored in the snapshot, besides the raw data
+_TABLES = ("condition_nutrients", "nutrient_foods", "condition_avoid", "food_details")
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SNAPSHOT_PATH = os.environ.get("DIET_KNOWLEDGE_INDEX_PATH") or os.path.join(
+    _BACKEND_DIR, "cache", "dietary_knowledge.idx")
+
+Signature = Tuple[int, int, int]
+DEFAULT_AVOID_REASON = "Aggravates detected metabolic markers."
+
+
+def source_signature(path: str) -> Optional[Signature]:
+    """(inode, size, mtime_ns) of *path*, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class KnowledgeIndex:
+    """Lookup tables compiled from the dietary knowledge JSON."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.condition_nutrients: Dict[str, Tuple[str, ...]] = {
+            cond: tuple(nutrients) for cond, nutrients in data.get("condition_nutrients", {}).items()
+        }
+        self.nutrient_foods: Dict[str, Tuple[str, ...]] = {
+            nut: tuple(sorted(set(foods))) for nut, foods in data.get("nutrient_foods", {}).items()
+        }
+        self.condition_avoid: Dict[str, Dict[str, str]] = {
+            cond: {food.lower(): entry.get("reason", DEFAULT_AVOID_REASON) for food in entry.get("foods", [])}
+            for cond, entry in data.get("condition_avoid", {}).items()
+        }
+        self.food_details: Dict[str, Dict[str, Any]] = data.get("food_details", {})
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, Any]) -> "KnowledgeIndex":
+        """Index from the tables() of an earlier one, without recompiling."""
+        index = cls.__new__(cls)
+        index.data = tables["data"]
+        for name in _TABLES:
+            setattr(index, name, tables[name])
+        return index
+
+    def tables(self) -> Dict[str, Any]:
+        return {"data": self.data, **{name: getattr(self, name) for name in _TABLES}}
+
+    def nutrients_for(self, conditions: Iterable[str]) -> List[str]:
+        nutrients = set()
+        for cond in conditions:
+            nutrients.update(self.condition_nutrients.get(cond, ()))
+        return list(nutrients)
+
+    def foods_for(self, nutrients: Iterable[str]) -> List[str]:
+        """Union of the nutrients' posting lists, sorted."""
+        postings = [self.nutrient_foods[nut] for nut in nutrients if nut in self.nutrient_foods]
+        if len(postings) == 1:
+            return list(postings[0])
+        # Posting lists are a few dozen foods; a set union beats a k-way merge here
+        return sorted(set().union(*postings))
+
+    def avoid_for(self, conditions: Iterable[str]) -> Dict[str, str]:
+        avoid_map: Dict[str, str] = {}
+        for cond in conditions:
+            avoid_map.update(self.condition_avoid.get(cond, {}))
+        return avoid_map
+
+    def details(self, food_name: str) -> Dict[str, Any]:
+        return self.food_details.get(food_name.lower(), {})
+
+
+_code_hash: Optional[str] = None
+
+
+def _module_hash() -> str:
+    """sha256 of this file: snapshots written by other code are not reused."""
+    global _code_hash
+    if _code_hash is None:
+        with open(os.path.abspath(__file__), "rb") as f:
+            _code_hash = hashlib.sha256(f.read()).hexdigest()
+    return _code_hash
+
+
+def _header(json_path: str, signature: Signature) -> Dict[str, Any]:
+    return {"format_version": FORMAT_VERSION, "code": _module_hash(), "source": os.path.abspath(json_path),
+            "signature": signature}
+
+
+class _DataUnpickler(pickle.Unpickler):
+    """Plain containers and scalars only: the cache directory is writable."""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"{module}.{name} is not allowed in an index snapshot")
+
+
+def _read_snapshot(snapshot_path: str, json_path: str, signature: Signature) -> Optional[KnowledgeIndex]:
+    try:
+        with open(snapshot_path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                return None
+            if _DataUnpickler(f).load() != _header(json_path, signature):
+                return None
+            tables = _DataUnpickler(f).load()
+        return KnowledgeIndex.from_tables(tables)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:
+        logger.warning("DIET_KB | ignoring unreadable index snapshot %s: %s", snapshot_path, exc)
+        return None
+
+
+def _write_snapshot(snapshot_path: str, json_path: str, signature: Signature, index: KnowledgeIndex):
+    header = _header(json_path, signature)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(index.tables(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except OSError as exc:
+        logger.warning("DIET_KB | could not write index snapshot %s: %s", snapshot_path, exc)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_index(json_path: str, snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH
+               ) -> Tuple[KnowledgeIndex, Optional[Signature], str]:
+    """
+    Index for *json_path*: from the snapshot when it is current, else
+    compiled from the JSON (and the snapshot rewritten). Returns
+    (index, source signature, "snapshot" | "json" | "empty").
+    A missing or unreadable JSON gives an empty index, as before.
+    """
+    signature = source_signature(json_path)
+    if signature is None:
+        logger.error("Knowledge base file not found: %s", json_path)
+        return KnowledgeIndex({}), None, "empty"
+    if snapshot_path:
+        index = _read_snapshot(snapshot_path, json_path, signature)
+        if index is not None:
+            return index, signature, "snapshot"
+    try:
+        with open(json_path, "r") as f:
+            data = json.load(f)
+    except Exception as e:
+        logger.error("Failed to load dietary knowledge: %s", e)
+        return KnowledgeIndex({}), signature, "empty"
+    index = KnowledgeIndex(data)
+    if snapshot_path:
+        _write_snapshot(snapshot_path, json_path, signature, index)
+    return index, signature, "json"
@@ -0,0 +1,479 @@
+"""
+Parallel evaluation of the prediction model artifacts.
+
+For every model type with a dataset available:
+  - holdout: the shipped artifact on the same stratified 80/20 split the
+    training notebooks use (train/test accuracy, classification report,
+    confusion matrix, per-class accuracy, overfitting gap)
+  - k-fold cross-validation: an unfitted clone of the artifact's estimator
+    (same hyperparameters) refit on each training fold; out-of-fold
+    probabilities give the CV accuracy, confusion matrix and calibration
+    (expected calibration error, Brier score and a reliability table)
+
+Each CSV is parsed once in the parent with the serving FeatureSchema, and
+the resulting float matrix and labels are placed in shared memory; pool
+workers attach to them instead of receiving pickled copies. Fold
+assignments are cached on disk (EVAL_CACHE_DIR, default models/eval_cache)
+keyed by the dataset content, k and seed, so repeated runs reuse the same
+splits. The report is JSON.
+
+Only the lung cancer dataset ships with the repo; diabetes and heart disease
+(BRFSS indicator files) can be passed with --data TYPE=path.csv and are
+reported as skipped otherwise.
+
+Usage (from the project/ directory):
+    python -m backend.evaluate_models [--folds 5] [--jobs N] [--out report.json] [--data heart_disease=brfss.csv]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from backend.feature_schema import FeatureSchema
+from backend.model_artifacts import (
+    DIABETES_LABEL_ENCODER_PATH, DIABETES_MODEL_PATH, HEART_CONFIG_PATH, HEART_SCALER_PATH,
+    HEART_XGB_PATH, LUNG_CANCER_LABEL_ENCODER_PATH, LUNG_CANCER_MODEL_PATH,
+)
+
+EVAL_CACHE_DIR = os.environ.get('EVAL_CACHE_DIR', os.path.join(BASE_DIR, 'models', 'eval_cache'))
+CALIBRATION_BINS = 10
+
+# Mirrors backend.routes.predict (not imported here: it pulls in Flask)
+LUNG_CANCER_FEATURES = [
+    'Gender', 'Age', 'Smoking', 'Yellow fingers', 'Anxiety',
+    'Peer_pressure', 'Chronic Disease', 'Fatigue', 'Allergy',
+    'Wheezing', 'Alcohol', 'Coughing', 'Shortness of Breath',
+    'Swallowing Difficulty', 'Chest Pain'
+]
+DIABETES_FEATURES = [
+    'HighBP', 'HighChol', 'CholCheck', 'BMI', 'Smoker', 'Stroke',
+    'HeartDiseaseorAttack', 'PhysActivity', 'Fruits', 'Veggies',
+    'HvyAlcoholConsump', 'AnyHealthcare', 'GenHlth', 'MentHlth',
+    'PhysHlth', 'DiffWalk', 'Sex', 'Age'
+]
+
+
+def _heart_config() -> Dict[str, Any]:
+    try:
+        with open(HEART_CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def default_targets() -> Dict[str, Dict[str, Any]]:
+    heart = _heart_config()
+    return {
+        'lung_cancer': {
+            'data': os.path.join(BASE_DIR, 'cancer patient data sets.csv'),
+            'features': LUNG_CANCER_FEATURES,
+            'required': True,
+            'target': ['Level'],
+            'label_encoder': LUNG_CANCER_LABEL_ENCODER_PATH,
+            'sources': [LUNG_CANCER_MODEL_PATH],
+        },
+        'diabetes': {
+            'data': None,
+            'features': DIABETES_FEATURES,
+            'required': False,
+            'target': ['Diabetes_binary', 'Diabetes_012', 'Diabetes'],
+            'label_encoder': DIABETES_LABEL_ENCODER_PATH,
+            'sources': [DIABETES_MODEL_PATH],
+        },
+        'heart_disease': {
+            'data': None,
+            'features': heart.get('features', []),
+            'required': False,
+            'target': [heart.get('target', 'HeartDiseaseorAttack')],
+            'label_encoder': None,
+            'sources': [HEART_XGB_PATH, HEART_SCALER_PATH],
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Dataset parsing, shared memory and cached folds
+# ---------------------------------------------------------------------------
+
+def load_dataset(spec: Dict[str, Any]):
+    """Parse spec['data'] once into (X float64, y int64, class_names, sha256)."""
+    with open(spec['data'], 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    records = list(csv.DictReader(raw.decode('utf-8-sig').splitlines()))
+    if not records:
+        raise ValueError(f"{spec['data']} has no rows")
+
+    target = next((t for t in spec['target'] if t in records[0]), None)
+    if target is None:
+        raise ValueError(f"None of the target columns {spec['target']} found in {spec['data']}")
+
+    schema = FeatureSchema(spec['features'], required=spec['required'])
+    X, valid, errors = schema.matrix([{k: v for k, v in r.items() if k != target} for r in records])
+    if errors:
+        first = next(iter(errors.values()))
+        raise ValueError(f"{len(errors)} rows could not be mapped to features (first: {first})")
+
+    labels = [records[i][target].strip() for i in valid]
+    class_names = None
+    if spec.get('label_encoder') and os.path.exists(spec['label_encoder']):
+        from backend.routes.predict import _safe_joblib_load
+        class_names = [str(c) for c in _safe_joblib_load(spec['label_encoder']).classes_]
+    if class_names and set(labels) <= set(class_names):
+        lookup = {c: i for i, c in enumerate(class_names)}
+        y = np.array([lookup[v] for v in labels], dtype=np.int64)
+    else:
+        y = np.array([int(float(v)) for v in labels], dtype=np.int64)
+        class_names = [str(c) for c in np.unique(y)]
+    return X, y, class_names, digest
+
+
+def _share(arr: np.ndarray):
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, {'name': shm.name, 'shape': arr.shape, 'dtype': arr.dtype.str}
+
+
+def _attach(spec: Dict[str, Any]):
+    try:
+        shm = shared_memory.SharedMemory(name=spec['name'], track=False)
+    except TypeError:  # Python < 3.13 has no track flag
+        shm = shared_memory.SharedMemory(name=spec['name'])
+    return shm, np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+
+
+def fold_assignments(y: np.ndarray, digest: str, k: int, seed: int, cache_dir: str = EVAL_CACHE_DIR):
+    """
+    Fold id per row for stratified k-fold, plus the stratified 80/20 holdout
+    test mask. Cached as .npz keyed by dataset hash, k and seed.
+    """
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+
+    path = os.path.join(cache_dir, f'folds_{digest[:16]}_k{k}_s{seed}.npz')
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            if len(cached['fold']) == len(y):
+                return cached['fold'], cached['holdout_test'], True
+
+    fold = np.empty(len(y), dtype=np.int16)
+    for i, (_, test) in enumerate(StratifiedKFold(n_splits=k, shuffle=True, random_state=seed).split(np.zeros(len(y)), y)):
+        fold[test] = i
+    _, test_idx = train_test_split(np.arange(len(y)), test_size=0.2, random_state=seed, stratify=y)
+    holdout_test = np.zeros(len(y), dtype=bool)
+    holdout_test[test_idx] = True
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, fold=fold, holdout_test=holdout_test)
+    os.replace(tmp, path)
+    return fold, holdout_test, False
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+_WORKER_MODELS: Dict[str, Any] = {}
+
+
+def _load_artifact(name: str):
+    """The shipped estimator for name (cached per worker process)."""
+    if name in _WORKER_MODELS:
+        return _WORKER_MODELS[name]
+    if name == 'heart_disease':
+        import xgboost as xgb
+        from sklearn.pipeline import make_pipeline
+        from backend.routes.predict import _safe_joblib_load
+
+        model = xgb.XGBClassifier()
+        model.load_model(HEART_XGB_PATH)
+        model = make_pipeline(_safe_joblib_load(HEART_SCALER_PATH), model)
+    else:
+        from backend.routes.predict import _safe_joblib_load
+        model = _safe_joblib_load(LUNG_CANCER_MODEL_PATH if name == 'lung_cancer' else DIABETES_MODEL_PATH)
+        if hasattr(model, 'feature_names_in_'):
+            del model.feature_names_in_  # rows are positional ndarrays
+    _WORKER_MODELS[name] = model
+    return model
+
+
+def _unfitted_estimator(name: str):
+    from sklearn.base import clone
+
+    model = _load_artifact(name)
+    if name != 'heart_disease':
+        return clone(model)
+
+    # A JSON-loaded booster forgets its sklearn hyperparameters; rebuild the
+    # ones that matter from the saved training config.
+    import xgboost as xgb
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    booster = model[-1].get_booster()
+    config = json.loads(booster.save_config())
+    train = config['learner']['gradient_booster']['tree_train_param']
+    params = {
+        'n_estimators': int(booster.attr('best_iteration') or booster.num_boosted_rounds() - 1) + 1,
+        'max_depth': int(train.get('max_depth', 6)),
+        'learning_rate': float(train.get('eta', 0.3)),
+        'subsample': float(train.get('subsample', 1.0)),
+        'colsample_bytree': float(train.get('colsample_bytree', 1.0)),
+        'min_child_weight': float(train.get('min_child_weight', 1.0)),
+        'reg_lambda': float(train.get('lambda', 1.0)),
+        'reg_alpha': float(train.get('alpha', 0.0)),
+        'gamma': float(train.get('gamma', 0.0)),
+    }
+    return make_pipeline(StandardScaler(), xgb.XGBClassifier(objective='binary:logistic', **params))
+
+
+def _dense_proba(est, X: np.ndarray, n_classes: int) -> np.ndarray:
+    """predict_proba widened to every class (a fold may miss a rare class)."""
+    proba = est.predict_proba(X)
+    classes = np.asarray(getattr(est, 'classes_', np.arange(proba.shape[1])), dtype=np.int64)
+    out = np.zeros((len(X), n_classes))
+    out[:, classes] = proba
+    return out
+
+
+def _run_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    warnings.filterwarnings('ignore')
+    import contextlib
+    import io
+
+    x_shm, X = _attach(task['X'])
+    y_shm, y = _attach(task['y'])
+    try:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if task['kind'] == 'holdout':
+                est = _load_artifact(task['name'])
+                test = task['holdout_test']
+                result = {
+                    'train_pred': est.predict(X[~test]).astype(np.int64),
+                    'test_proba': _dense_proba(est, X[test], task['n_classes']),
+                }
+            else:
+                est = _unfitted_estimator(task['name'])
+                test = task['fold'] == task['fold_id']
+                est.fit(X[~test], y[~test])
+                result = {'test_proba': _dense_proba(est, X[test], task['n_classes'])}
+        result.update(name=task['name'], kind=task['kind'], fold_id=task.get('fold_id'),
+                      seconds=round(time.perf_counter() - t0, 3))
+        return result
+    finally:
+        del X, y
+        x_shm.close()
+        y_shm.close()
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+def confusion(y_true: np.ndarray, y_pred: np.ndarray, n_classes: int) -> List[List[int]]:
+    cm = np.zeros((n_classes, n_classes), dtype=np.int64)
+    np.add.at(cm, (y_true, y_pred), 1)
+    return cm.tolist()
+
+
+def calibration(y_true: np.ndarray, proba: np.ndarray, bins: int = CALIBRATION_BINS) -> Dict[str, Any]:
+    """Top-label reliability table, expected calibration error and multi-class Brier score."""
+    confidence = proba.max(axis=1)
+    correct = proba.argmax(axis=1) == y_true
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(confidence, edges[1:-1]), 0, bins - 1)
+    table, ece = [], 0.0
+    for b in range(bins):
+        mask = which == b
+        if not mask.any():
+            continue
+        conf, acc = float(confidence[mask].mean()), float(correct[mask].mean())
+        ece += mask.mean() * abs(acc - conf)
+        table.append({'bin': [round(edges[b], 2), round(edges[b + 1], 2)], 'count': int(mask.sum()),
+                      'mean_confidence': round(conf, 4), 'accuracy': round(acc, 4)})
+    onehot = np.zeros_like(proba)
+    onehot[np.arange(len(y_true)), y_true] = 1.0
+    return {
+        'ece': round(float(ece), 4),
+        'brier': round(float(np.mean(np.sum((proba - onehot) ** 2, axis=1))), 4),
+        'reliability': table,
+    }
+
+
+def _holdout_report(result, y, holdout_test, class_names) -> Dict[str, Any]:
+    from sklearn.metrics import classification_report
+
+    n = len(class_names)
+    y_train, y_test = y[~holdout_test], y[holdout_test]
+    test_pred = result['test_proba'].argmax(axis=1)
+    train_acc = float(np.mean(result['train_pred'] == y_train))
+    test_acc = float(np.mean(test_pred == y_test))
+    per_class = {}
+    for i, cls in enumerate(class_names):
+        mask = y_test == i
+        if mask.any():
+            per_class[cls] = round(float(np.mean(test_pred[mask] == i)), 4)
+    return {
+        'train_rows': int(len(y_train)),
+        'test_rows': int(len(y_test)),
+        'train_accuracy': round(train_acc, 4),
+        'test_accuracy': round(test_acc, 4),
+        'overfitting_gap': round(train_acc - test_acc, 4),
+        'average_confidence': round(float(result['test_proba'].max(axis=1).mean()), 4),
+        'confusion_matrix': confusion(y_test, test_pred, n),
+        'per_class_accuracy': per_class,
+        'classification_report': classification_report(
+            y_test, test_pred, labels=list(range(n)), target_names=class_names, output_dict=True, zero_division=0),
+        'seconds': result['seconds'],
+    }
+
+
+def _cv_report(results, y, fold, class_names) -> Dict[str, Any]:
+    n = len(class_names)
+    oof = np.zeros((len(y), n))
+    folds = []
+    for r in sorted(results, key=lambda r: r['fold_id']):
+        test = fold == r['fold_id']
+        oof[test] = r['test_proba']
+        folds.append({'fold': r['fold_id'], 'rows': int(test.sum()), 'seconds': r['seconds'],
+                      'accuracy': round(float(np.mean(r['test_proba'].argmax(axis=1) == y[test])), 4)})
+    accs = np.array([f['accuracy'] for f in folds])
+    pred = oof.argmax(axis=1)
+    return {
+        'folds': folds,
+        'accuracy_mean': round(float(accs.mean()), 4),
+        'accuracy_std': round(float(accs.std()), 4),
+        'out_of_fold_accuracy': round(float(np.mean(pred == y)), 4),
+        'confusion_matrix': confusion(y, pred, n),
+        'calibration': calibration(y, oof),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def evaluate(targets: Dict[str, Dict[str, Any]], k: int = 5, seed: int = 42,
+             jobs: Optional[int] = None, cache_dir: str = EVAL_CACHE_DIR) -> Dict[str, Any]:
+    t_start = time.perf_counter()
+    report: Dict[str, Any] = {'folds': k, 'seed': seed, 'targets': {}}
+    prepared, tasks, shms = {}, [], []
+    try:
+        for name, spec in targets.items():
+            entry = report['targets'][name] = {}
+            if not spec.get('data') or not os.path.exists(spec['data']):
+                entry.update(status='skipped', reason='no dataset (pass --data %s=path.csv)' % name)
+                continue
+            missing = [p for p in spec['sources'] if not os.path.exists(p)]
+            if missing:
+                entry.update(status='skipped', reason=f'model artifact not found: {missing}')
+                continue
+            try:
+                X, y, class_names, digest = load_dataset(spec)
+                fold, holdout_test, cached = fold_assignments(y, digest, k, seed, cache_dir)
+            except Exception as e:
+                entry.update(status='error', reason=f'{type(e).__name__}: {e}')
+                continue
+
+            x_shm, x_spec = _share(X)
+            y_shm, y_spec = _share(y)
+            shms += [x_shm, y_shm]
+            entry['dataset'] = {'path': os.path.relpath(spec['data'], BASE_DIR), 'rows': int(len(y)),
+                                'features': int(X.shape[1]), 'sha256': digest, 'classes': class_names,
+                                'folds_cached': cached}
+            prepared[name] = (y, fold, holdout_test, class_names)
+            common = {'name': name, 'X': x_spec, 'y': y_spec, 'n_classes': len(class_names)}
+            tasks.append(dict(common, kind='holdout', holdout_test=holdout_test))
+            tasks += [dict(common, kind='cv', fold=fold, fold_id=i) for i in range(k)]
+
+        results: Dict[str, List[Dict[str, Any]]] = {name: [] for name in prepared}
+        errors: Dict[str, str] = {}
+        if tasks:
+            with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+                futures = [(t['name'], pool.submit(_run_task, t)) for t in tasks]
+                for name, future in futures:
+                    try:
+                        results[name].append(future.result())
+                    except Exception as e:
+                        errors.setdefault(name, f'{type(e).__name__}: {e}')
+
+        for name, (y, fold, holdout_test, class_names) in prepared.items():
+            entry = report['targets'][name]
+            if name in errors:
+                entry.update(status='error', reason=errors[name])
+                continue
+            holdout = next(r for r in results[name] if r['kind'] == 'holdout')
+            entry['status'] = 'ok'
+            entry['artifact'] = _holdout_report(holdout, y, holdout_test, class_names)
+            entry['cross_validation'] = _cv_report([r for r in results[name] if r['kind'] == 'cv'],
+                                                   y, fold, class_names)
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+    report['elapsed_s'] = round(time.perf_counter() - t_start, 2)
+    return report
+
+
+def print_summary(report: Dict[str, Any]):
+    print("=" * 70)
+    print(f"MODEL EVALUATION ({report['folds']}-fold CV, {report['elapsed_s']}s)")
+    print("=" * 70)
+    for name, entry in report['targets'].items():
+        if entry.get('status') != 'ok':
+            print(f"[WARN] {name}: {entry.get('status')} - {entry.get('reason')}")
+            continue
+        art, cv = entry['artifact'], entry['cross_validation']
+        print(f"[OK] {name}: artifact test accuracy {art['test_accuracy']:.4f} "
+              f"(train {art['train_accuracy']:.4f}, gap {art['overfitting_gap']:+.4f}); "
+              f"CV accuracy {cv['accuracy_mean']:.4f} +- {cv['accuracy_std']:.4f}, "
+              f"ECE {cv['calibration']['ece']:.4f}, Brier {cv['calibration']['brier']:.4f}")
+        print(f"     confusion (rows = actual {entry['dataset']['classes']}): {art['confusion_matrix']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--type', dest='types', action='append', choices=sorted(default_targets()))
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--data', action='append', default=[], metavar='TYPE=CSV',
+                        help='Dataset for a model type, e.g. heart_disease=brfss_2015.csv')
+    parser.add_argument('--out', help='Write the JSON report here')
+    args = parser.parse_args(argv)
+
+    targets = default_targets()
+    for item in args.data:
+        name, _, path = item.partition('=')
+        if name not in targets or not path:
+            parser.error(f'--data expects TYPE=CSV with TYPE in {sorted(targets)}')
+        targets[name]['data'] = os.path.abspath(path)
+    if args.types:
+        targets = {name: targets[name] for name in args.types}
+
+    report = evaluate(targets, k=args.folds, seed=args.seed, jobs=args.jobs)
+    print_summary(report)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"[OK] Evaluation report written to {args.out}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,8 @@
 import os
 import re
-import json
 import logging
 import random
+import time
 import requests
 from typing import Dict, List, Any, Optional, Tuple
 
@@ -13,6 +13,8 @@ from backend.clinical_validator import clinical_validator
 from backend.services.variation_engine import variation_engine
 from backend.nutrient_pipeline import get_enriched_food_profile, filter_unsafe_foods as pipeline_filter
 from backend.report_diet_engine import derive_base_ingredients, expand_ingredients_with_mapper
+from backend.food_score_matrix import FoodScoreMatrix
+from backend.diet_knowledge_index import DEFAULT_SNAPSHOT_PATH, KnowledgeIndex, load_index, source_signature
 
 logger = logging.getLogger(__name__)
 
@@ -28,57 +30,62 @@ class DietKnowledgeManager:
     """
     Expert system for nutritional counseling.
     Architecture: Condition -> Nutrient -> Food -> Scoring.
+
+    Lookups go through a compiled KnowledgeIndex (backend.diet_knowledge_index),
+    loaded from its snapshot when current. The JSON's stat signature is
+    re-checked at most every RELOAD_CHECK_S seconds and the index rebuilt
+    when the file changed.
     """
-    def __init__(self, json_path: str):
+    RELOAD_CHECK_S = 1.0
+
+    def __init__(self, json_path: str, snapshot_path: Optional[str] = DEFAULT_SNAPSHOT_PATH):
         self.path = json_path
-        self.data = self._load_data()
-        
-    def _load_data(self) -> Dict[str, Any]:
-        try:
-            if not os.path.exists(self.path):
-                logger.error("Knowledge base file not found: %s", self.path)
-                return {}
-            with open(self.path, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error("Failed to load dietary knowledge: %s", e)
-            return {}
+        self.snapshot_path = snapshot_path
+        self._load()
+
+    def _load(self):
+        self._index, self._signature, self.loaded_from = load_index(self.path, self.snapshot_path)
+        self._checked_at = time.monotonic()
+
+    @property
+    def index(self) -> KnowledgeIndex:
+        now = time.monotonic()
+        if now - self._checked_at >= self.RELOAD_CHECK_S:
+            self._checked_at = now
+            if source_signature(self.path) != self._signature:
+                logger.info("DIET_KB | %s changed, rebuilding index", self.path)
+                self._load()
+        return self._index
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self.index.data
+
+    @property
+    def version(self) -> Optional[Tuple[int, int, int]]:
+        """Stat signature of the JSON the current index was built from."""
+        self.index
+        return self._signature
 
     def get_nutrients_for_conditions(self, conditions: List[str]) -> List[str]:
-        nutrients = set()
-        cmap = self.data.get("condition_nutrients", {})
-        for cond in conditions:
-            if cond in cmap:
-                nutrients.update(cmap[cond])
-        return list(nutrients)
+        return self.index.nutrients_for(conditions)
 
     def get_foods_for_nutrients(self, nutrients: List[str]) -> List[str]:
-        foods = set()
-        nmap = self.data.get("nutrient_foods", {})
-        for nut in nutrients:
-            if nut in nmap:
-                foods.update(nmap[nut])
-        return list(foods)
+        return self.index.foods_for(nutrients)
 
     def get_avoid_data(self, conditions: List[str]) -> Dict[str, str]:
         """Returns map of food -> reason for avoidance"""
-        avoid_map = {}
-        amap = self.data.get("condition_avoid", {})
-        for cond in conditions:
-            if cond in amap:
-                data = amap[cond]
-                reason = data.get("reason", "Aggravates detected metabolic markers.")
-                for food in data.get("foods", []):
-                    avoid_map[food.lower()] = reason
-        return avoid_map
+        return self.index.avoid_for(conditions)
 
     def get_food_details(self, food_name: str) -> Dict[str, Any]:
-        return self.data.get("food_details", {}).get(food_name.lower(), {})
+        return self.index.details(food_name)
 
 # Initialize the manager
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 KNOWLEDGE_PATH = os.path.join(BASE_DIR, "data", "dietary_knowledge.json")
 expert_kb = DietKnowledgeManager(KNOWLEDGE_PATH)
+# Vectorized form of score_food_hierarchical over whole candidate sets
+food_matrix = FoodScoreMatrix(expert_kb, usda_manager.get_food_nutrients_local)
 
 # Scoring Weight Constants
 CUISINE_BIAS = 5.0
@@ -591,8 +598,9 @@ def fallback_diet_engine(input_data: Dict[str, Any], raw_text: Optional[str] = N
     for food, reason in avoid_map.items():
         safety_registry[food.title()] = reason
 
-    for food in list(candidate_foods):
-        score, block_reason = score_food_hierarchical(food, target_nutrients, avoid_map, input_data, context=context)
+    candidate_list = list(candidate_foods)
+    scores, block_reasons = food_matrix.score(candidate_list, target_nutrients, avoid_map, context=context)
+    for food, score, block_reason in zip(candidate_list, scores.tolist(), block_reasons):
         if score > 0:
             scored_candidates.append((food, score))
         elif block_reason:
@@ -0,0 +1,133 @@
+"""
+Precompiled feature schemas for the prediction models.
+
+A FeatureSchema is compiled once per model when it is loaded: it fixes the
+column order, builds exact and normalized (strip + lower-case) key lookups
+and the categorical value map. At request time a feature dict is mapped onto
+a preallocated NumPy row in a single pass over the input keys, replacing the
+per-column case-insensitive scan and the single-row pandas DataFrame.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Categorical strings accepted by the BRFSS-style models (diabetes, heart disease)
+DEFAULT_VALUE_MAP = {'Yes': 1.0, 'No': 0.0, 'Male': 1.0, 'Female': 0.0}
+
+
+class FeatureValidationError(ValueError):
+    """Raised when a feature dict cannot be turned into a model input row."""
+
+
+@lru_cache(maxsize=4096)
+def _normalize_key(key: str) -> str:
+    return key.strip().lower()
+
+
+class FeatureSchema:
+    """
+    Column layout and input mapping rules for one model.
+
+    required=True (lung cancer): every column must be present and non-empty,
+    otherwise FeatureValidationError('Missing required features: [...]') is
+    raised; values must be numeric, else ValueError('could not convert string
+    to float: ...') with the value as sent (the predict route answers that
+    with a 500 "Prediction error", as it did when pandas raised it).
+    required=False (diabetes / heart disease): absent columns default to
+    `default`, and non-numeric values go through `value_map` (unknown -> default).
+    """
+
+    def __init__(self, columns: Sequence[str], required: bool = False,
+                 value_map: Optional[Dict[Any, float]] = None, default: float = 0.0):
+        self.columns: List[str] = list(columns)
+        self.n_features = len(self.columns)
+        self.required = required
+        self.value_map = dict(DEFAULT_VALUE_MAP if value_map is None else value_map)
+        self.default = float(default)
+
+        self._exact: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self._normalized: Dict[str, Tuple[int, ...]] = {}
+        for i, c in enumerate(self.columns):
+            key = _normalize_key(c)
+            self._normalized[key] = self._normalized.get(key, ()) + (i,)
+
+    def _match(self, features: Dict[str, Any]):
+        """One pass over the input: exact hits and first normalized hit per column."""
+        exact, normalized = {}, {}
+        for k, v in features.items():
+            i = self._exact.get(k)
+            if i is not None:
+                exact[i] = v
+            if isinstance(k, str):
+                for j in self._normalized.get(_normalize_key(k), ()):
+                    if j not in normalized:
+                        normalized[j] = v
+        return exact, normalized
+
+    def fill(self, features: Dict[str, Any], out: np.ndarray) -> np.ndarray:
+        """Write one feature dict into `out` (a 1-D row of length n_features)."""
+        if not isinstance(features, dict):
+            raise FeatureValidationError('Features must be an object')
+        exact, normalized = self._match(features)
+
+        if self.required:
+            missing, values = [], []
+            for i, col in enumerate(self.columns):
+                if i in exact:
+                    val = exact[i]
+                elif i in normalized:
+                    val = normalized[i]
+                else:
+                    missing.append(col)
+                    continue
+                if isinstance(val, str) and val.strip() == '':
+                    missing.append(col)
+                    continue
+                values.append(val)
+            if missing:
+                raise FeatureValidationError(f'Missing required features: {missing}')
+            for i, val in enumerate(values):
+                try:
+                    out[i] = float(val.strip() if isinstance(val, str) else val)
+                except (ValueError, TypeError):
+                    kind = 'string' if isinstance(val, str) else type(val).__name__
+                    raise ValueError(f'could not convert {kind} to float: {val!r}') from None
+            return out
+
+        value_map, default = self.value_map, self.default
+        for i in range(self.n_features):
+            val = exact.get(i)
+            if val is None:
+                val = normalized.get(i)
+            if val is None:
+                out[i] = default
+                continue
+            try:
+                out[i] = float(val)
+            except (ValueError, TypeError):
+                out[i] = value_map.get(val, default)
+        return out
+
+    def row(self, features: Dict[str, Any], dtype=np.float64) -> np.ndarray:
+        """Map a single feature dict to a (1, n_features) matrix."""
+        out = np.empty((1, self.n_features), dtype=dtype)
+        self.fill(features, out[0])
+        return out
+
+    def matrix(self, rows: Sequence[Dict[str, Any]], dtype=np.float64):
+        """
+        Map many feature dicts into one preallocated matrix.
+
+        Returns (X, valid_indices, errors) where X only holds the rows that
+        validated and errors maps input index -> exception.
+        """
+        out = np.empty((len(rows), self.n_features), dtype=dtype)
+        valid, errors = [], {}
+        for i, features in enumerate(rows):
+            try:
+                self.fill(features, out[len(valid)])
+                valid.append(i)
+            except Exception as e:
+                errors[i] = e
+        return out[:len(valid)], valid, errors
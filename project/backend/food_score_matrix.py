@@ -0,0 +1,194 @@
+"""
+Vectorized food scoring for the fallback diet engine.
+
+score_food_hierarchical() scores one food at a time: a knowledge-base lookup,
+a USDA lookup (a linear scan of the Foundation index for anything that is
+not an Indian override) and nested loops over the target nutrients and the
+context keywords. FoodScoreMatrix keeps, per food, its knowledge-base tags
+as a packed bitmask and its USDA nutrients as one row of a food x nutrient
+float matrix, so a whole candidate set is scored and safety-gated in one
+NumPy pass:
+
+    scores, reasons = food_matrix.score(foods, target_nutrients, avoid_map, context)
+
+The result is identical to calling score_food_hierarchical() per food: the
+terms are added in the same order, so even the float sums match bit for bit.
+Rows are built once per food name (lowercased) the first time it is scored,
+or up front with warm(). They are dropped when the knowledge base's version
+changes (DietKnowledgeManager rebuilds its index when the JSON is edited);
+the USDA index is static for the life of the process.
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Same constants as the per-food scorer (backend.fallback_diet_engine)
+TAG_MATCH = 2.0
+DENSITY_CAP = 5.0
+BULK_NUTRIENTS = ("fiber", "protein")  # weighted 0.5 per g, the rest 2.0 per mg
+BOOST_BONUS = 4.0
+DERIVED_BONUS = 6.0
+CUISINE_BIAS = 5.0
+BLOCKED = -100.0
+
+_CONTEXT_REASON = "Contraindicated by clinical report findings."
+
+
+class FoodScoreMatrix:
+    """
+    Food x nutrient matrix and tag bitmasks over every food scored so far.
+
+    *kb* is the DietKnowledgeManager (tags come from get_food_details) and
+    *nutrients_lookup* the USDA lookup (usda_manager.get_food_nutrients_local).
+    """
+
+    def __init__(self, kb, nutrients_lookup: Callable[[str], Optional[dict]]):
+        self._kb = kb
+        self._lookup = nutrients_lookup
+        self.build_s = 0.0
+        self._reset()
+
+    def _reset(self):
+        self._kb_version = getattr(self._kb, "version", None)
+        self._rows: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._tags: List[Sequence[str]] = []
+        self._biochem: List[Dict[str, Any]] = []
+        self._tag_ids: Dict[str, int] = {}
+        self._nutrient_ids: Dict[str, int] = {}
+        self._arrays = None  # (names, tag bitmasks, nutrients, has_biochem), rebuilt when rows are added
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _add(self, name: str):
+        details = self._kb.get_food_details(name)
+        biochem_data = self._lookup(name)
+        biochem = biochem_data.get("nutrients", {}) if biochem_data else {}
+        tags = details.get("tags", [])
+        for tag in tags:
+            self._tag_ids.setdefault(tag, len(self._tag_ids))
+        for nutrient in biochem:
+            self._nutrient_ids.setdefault(nutrient, len(self._nutrient_ids))
+        self._rows[name] = len(self._names)
+        self._names.append(name)
+        self._tags.append(tags)
+        self._biochem.append(biochem)
+        self._arrays = None
+
+    def warm(self, foods: Iterable[str]) -> int:
+        """Build rows for *foods* ahead of scoring; returns the number of rows."""
+        self.rows([food.lower() for food in foods])
+        return len(self)
+
+    def rows(self, names: Sequence[str]) -> np.ndarray:
+        """Row index of each (lowercased) food name, adding rows for new ones."""
+        if getattr(self._kb, "version", None) != self._kb_version:
+            self._reset()
+        for name in names:
+            if name not in self._rows:
+                self._add(name)
+        if self._arrays is None:
+            self._build()
+        return np.fromiter((self._rows[name] for name in names), dtype=np.intp, count=len(names))
+
+    def _build(self):
+        t0 = time.perf_counter()
+        n = len(self._names)
+        words = max(1, (len(self._tag_ids) + 63) // 64)
+        masks = np.zeros((n, words), dtype=np.uint64)
+        nutrients = np.zeros((n, max(1, len(self._nutrient_ids))), dtype=np.float64)
+        for row, (tags, biochem) in enumerate(zip(self._tags, self._biochem)):
+            for tag in tags:
+                bit = self._tag_ids[tag]
+                masks[row, bit >> 6] |= np.uint64(1 << (bit & 63))
+            for nutrient, amount in biochem.items():
+                nutrients[row, self._nutrient_ids[nutrient]] = amount
+        has_biochem = np.fromiter((bool(b) for b in self._biochem), dtype=bool, count=n)
+        self._arrays = (np.array(self._names, dtype=str), masks, nutrients, has_biochem)
+        self.build_s += time.perf_counter() - t0
+
+    def _has_tag(self, masks: np.ndarray, tag: str) -> np.ndarray:
+        bit = self._tag_ids.get(tag)
+        if bit is None:
+            return np.zeros(len(masks), dtype=bool)
+        return ((masks[:, bit >> 6] >> np.uint64(bit & 63)) & np.uint64(1)) == 1
+
+    def _nutrient(self, nutrients: np.ndarray, nutrient: str) -> np.ndarray:
+        col = self._nutrient_ids.get(nutrient)
+        return nutrients[:, col] if col is not None else np.zeros(len(nutrients))
+
+    @staticmethod
+    def _contains_any(names: np.ndarray, keywords) -> np.ndarray:
+        hit = np.zeros(len(names), dtype=bool)
+        for keyword in keywords:
+            hit |= np.char.find(names, keyword) >= 0
+        return hit
+
+    def score(self, foods: Sequence[str], target_nutrients: List[str], avoid_map: Dict[str, str],
+              context: Optional[Dict[str, Any]] = None) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Scores and block reasons for *foods*, as score_food_hierarchical()
+        returns them one food at a time (blocked foods score -100).
+        """
+        keys = [food.lower() for food in foods]
+        idx = self.rows(keys)
+        all_names, all_masks, all_nutrients, all_has_biochem = self._arrays
+        names, masks, nutrients, has_biochem = all_names[idx], all_masks[idx], all_nutrients[idx], all_has_biochem[idx]
+        n = len(keys)
+        score = np.zeros(n)
+        reasons: List[Optional[str]] = [None] * n
+        blocked = np.zeros(n, dtype=bool)
+
+        def block(mask, reason):
+            for row in np.flatnonzero(mask & ~blocked):
+                reasons[row] = reason(row) if callable(reason) else reason
+            blocked[mask] = True
+
+        # 1. Expert nutrient match, 2. USDA density bonus (one column per target, in order)
+        for nut in target_nutrients:
+            score += np.where(self._has_tag(masks, nut), TAG_MATCH, 0.0)
+        weights = {nut: 0.5 if nut in BULK_NUTRIENTS else 2.0 for nut in target_nutrients}
+        for nut in target_nutrients:
+            amount = self._nutrient(nutrients, nut)
+            score += np.where(has_biochem & (amount > 0), np.minimum(amount * weights[nut], DENSITY_CAP), 0.0)
+
+        # 3. Clinical context: boost, avoid (blocks), nutritional goals
+        if context:
+            score += np.where(self._contains_any(names, context.get("boost", [])), BOOST_BONUS, 0.0)
+            block(self._contains_any(names, context.get("avoid", [])), _CONTEXT_REASON)
+            goals = context.get("goals", {})
+            if has_biochem.any():
+                if goals.get("iron") == "high":
+                    score += np.where(has_biochem & (self._nutrient(nutrients, "iron") > 2.0), 2.0, 0.0)
+                if goals.get("sugar") == "low":
+                    score -= np.where(has_biochem & (self._nutrient(nutrients, "sugar") > 10), 3.0, 0.0)
+                if goals.get("sodium") == "low":
+                    score -= np.where(has_biochem & (self._nutrient(nutrients, "sodium") > 200), 3.0, 0.0)
+
+        # 4. Clinical safety gate
+        if "hypertension" in target_nutrients or "kidney_strain" in target_nutrients:
+            block(has_biochem & (self._nutrient(nutrients, "sodium") > 350),
+                  lambda i: f"High sodium ({self._biochem[idx[i]].get('sodium', 0.0)}mg) is contraindicated "
+                            f"for renal/vascular stress markers.")
+        if "prediabetes" in target_nutrients:
+            block(has_biochem & (self._nutrient(nutrients, "sugar") > 12),
+                  lambda i: f"High glycemic load ({self._biochem[idx[i]].get('sugar', 0.0)}g sugar) "
+                            f"aggravates detected insulin resistance.")
+
+        # 5. Expert conflict check
+        if avoid_map:
+            block(np.fromiter((key in avoid_map for key in keys), dtype=bool, count=n),
+                  lambda i: avoid_map[keys[i]])
+
+        # 6. Ingredient-first bonus, cuisine preference
+        if context and "derived_ingredients" in context:
+            score += np.where(self._contains_any(names, context["derived_ingredients"]), DERIVED_BONUS, 0.0)
+        score += np.where(self._has_tag(masks, "indian_staple"), CUISINE_BIAS, 0.0)
+
+        score[blocked] = BLOCKED
+        return score, reasons
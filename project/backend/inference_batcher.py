@@ -0,0 +1,204 @@
+"""
+Micro-batching inference dispatcher.
+
+Under the eventlet server every single-row prediction used to make its own
+tpool.execute() round trip (greenlet -> OS thread -> hub). The dispatcher
+instead parks concurrent requests for the same model for a short window
+(INFERENCE_BATCH_WINDOW_MS, default 2) or until INFERENCE_MAX_BATCH_ROWS
+rows (default 64) are waiting, runs ONE vectorized call in the thread pool
+and hands every waiting greenlet its slice of the result. The window is only
+held open while another batch for the same model is still computing; an
+idle model dispatches after a single hub turn, so a lone request does not
+pay the window as extra latency.
+
+Batching is only active when eventlet has monkey-patched the process (the
+socketio server). Scripts, tests and plain threaded servers keep calling the
+model directly, so nothing blocks on a hub that is not running.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+
+DEFAULT_WINDOW_MS = float(os.environ.get('INFERENCE_BATCH_WINDOW_MS', '2'))
+DEFAULT_MAX_BATCH_ROWS = int(os.environ.get('INFERENCE_MAX_BATCH_ROWS', '64'))
+# Latency samples kept per key for the p50/p99 figures in stats()
+LATENCY_WINDOW = 2048
+
+
+def _eventlet_server_running() -> bool:
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('socket')
+
+
+def run_in_threadpool(fn: Callable, *args, **kwargs):
+    """Run fn in eventlet's OS thread pool when available, else inline."""
+    if threading.current_thread() is not threading.main_thread():
+        # Already off the hub (e.g. a report job thread); tpool only serves the hub thread
+        return fn(*args, **kwargs)
+    try:
+        from eventlet import tpool
+    except ImportError:
+        return fn(*args, **kwargs)
+    return tpool.execute(fn, *args, **kwargs)
+
+
+class _Batch:
+    __slots__ = ('fn', 'offload', 'parts', 'waiters', 'rows', 'full', 'opened_at')
+
+    def __init__(self, fn: Callable, full, offload: bool):
+        self.fn = fn
+        self.offload = offload
+        self.parts: List[np.ndarray] = []
+        self.waiters: list = []
+        self.rows = 0
+        self.full = full
+        self.opened_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent predict calls per key into one thread-pool call.
+
+    submit(key, fn, X) blocks the calling greenlet and returns fn(X) row for
+    row; fn must be a row-wise function (output row i depends only on input
+    row i), which holds for predict_proba. Requests under one key must use
+    the same fn: the first request of a batch provides it. offload=False
+    runs fn on the calling greenlet instead of the thread pool (for fns that
+    only do green I/O, such as model server round trips).
+
+    enabled=None means "batch only under the eventlet server"; tests pass
+    True and drive it from a GreenPool.
+    """
+
+    def __init__(self, window_ms: float = DEFAULT_WINDOW_MS, max_batch_rows: int = DEFAULT_MAX_BATCH_ROWS,
+                 enabled: Optional[bool] = None):
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch_rows = int(max_batch_rows)
+        self._enabled = enabled
+        self._pending: Dict[Hashable, _Batch] = {}
+        self._inflight: Dict[Hashable, int] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        if self.max_batch_rows <= 1:
+            return False
+        if self._enabled is None:
+            self._enabled = _eventlet_server_running()
+        return self._enabled
+
+    def submit(self, key: Hashable, fn: Callable[[np.ndarray], Any], X: np.ndarray, offload: bool = True):
+        if not self.enabled or len(X) >= self.max_batch_rows:
+            t0 = time.perf_counter()
+            out = run_in_threadpool(fn, X) if offload else fn(X)
+            self._record(key, [(time.perf_counter() - t0) * 1000], len(X), 0.0, None)
+            return out
+
+        from eventlet import event, spawn_n
+
+        batch = self._pending.get(key)
+        if batch is not None and batch.rows + len(X) > self.max_batch_rows:
+            self._close(key, batch)
+            batch = None
+        if batch is None:
+            batch = _Batch(fn, event.Event(), offload)
+            self._pending[key] = batch
+            spawn_n(self._dispatch, key, batch)
+
+        waiter = event.Event()
+        batch.parts.append(X)
+        batch.waiters.append((waiter, time.perf_counter()))
+        batch.rows += len(X)
+        if batch.rows >= self.max_batch_rows:
+            self._close(key, batch)
+        return waiter.wait()
+
+    def _close(self, key: Hashable, batch: _Batch):
+        """Stop accepting rows into batch and wake its dispatcher now."""
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+        if not batch.full.ready():
+            batch.full.send(True)
+
+    def _dispatch(self, key: Hashable, batch: _Batch):
+        # Busy model: collect for the window. Idle model: one hub turn, so
+        # requests that arrived in the same tick still share the call.
+        batch.full.wait(self.window_s if self._inflight.get(key) else 0)
+        self._close(key, batch)
+        queued_ms = (time.perf_counter() - batch.opened_at) * 1000
+
+        X = batch.parts[0] if len(batch.parts) == 1 else np.concatenate(batch.parts)
+        self._inflight[key] = self._inflight.get(key, 0) + 1
+        t0 = time.perf_counter()
+        try:
+            out = run_in_threadpool(batch.fn, X) if batch.offload else batch.fn(X)
+        except Exception as e:
+            for waiter, _ in batch.waiters:
+                waiter.send_exception(e)
+            return
+        finally:
+            self._inflight[key] -= 1
+            if not self._inflight[key]:
+                del self._inflight[key]
+        compute_ms = (time.perf_counter() - t0) * 1000
+
+        done = time.perf_counter()
+        start = 0
+        for part, (waiter, _) in zip(batch.parts, batch.waiters):
+            waiter.send(out[start:start + len(part)])
+            start += len(part)
+        self._record(key, [(done - submitted) * 1000 for _, submitted in batch.waiters],
+                     batch.rows, queued_ms, compute_ms)
+
+    def _record(self, key: Hashable, latencies_ms: List[float], rows: int,
+                queued_ms: float, compute_ms: Optional[float]):
+        name = str(key[0] if isinstance(key, tuple) else key)
+        m = self._metrics.get(name)
+        if m is None:
+            m = self._metrics[name] = {
+                'requests': 0, 'rows': 0, 'batches': 0, 'max_batch_rows_seen': 0,
+                'total_queued_ms': 0.0, 'total_compute_ms': 0.0,
+                'first_at': time.perf_counter(), 'latencies_ms': deque(maxlen=LATENCY_WINDOW),
+            }
+        m['requests'] += len(latencies_ms)
+        m['rows'] += rows
+        m['batches'] += 1
+        m['max_batch_rows_seen'] = max(m['max_batch_rows_seen'], rows)
+        m['total_queued_ms'] += queued_ms
+        m['total_compute_ms'] += compute_ms if compute_ms is not None else latencies_ms[0]
+        m['latencies_ms'].extend(latencies_ms)
+        m['last_at'] = time.perf_counter()
+
+    def stats(self) -> Dict[str, Any]:
+        models = {}
+        for name, m in self._metrics.items():
+            lat = np.fromiter(m['latencies_ms'], dtype=np.float64)
+            elapsed = m['last_at'] - m['first_at']
+            models[name] = {
+                'requests': m['requests'],
+                'rows': m['rows'],
+                'batches': m['batches'],
+                'avg_batch_rows': round(m['rows'] / m['batches'], 2),
+                'max_batch_rows_seen': m['max_batch_rows_seen'],
+                'avg_queued_ms': round(m['total_queued_ms'] / m['batches'], 3),
+                'avg_compute_ms': round(m['total_compute_ms'] / m['batches'], 3),
+                'p50_ms': round(float(np.percentile(lat, 50)), 3),
+                'p99_ms': round(float(np.percentile(lat, 99)), 3),
+                'requests_per_s': round(m['requests'] / elapsed, 1) if elapsed > 0 else None,
+            }
+        return {
+            'enabled': self.enabled,
+            'window_ms': self.window_s * 1000,
+            'max_batch_rows': self.max_batch_rows,
+            'models': models,
+        }
+
+    def reset_stats(self):
+        self._metrics.clear()
@@ -0,0 +1,522 @@
+"""
+Flat, memory-mappable model artifacts.
+
+The pickled/JSON models under models/ are parsed into private heap memory by
+every worker process (and the sklearn pickles need sklearn, sometimes the
+TensorFlow '_loss' shim, just to unpickle). This module exports them once into a directory of plain
+.npy arrays (tree nodes, thresholds, children, leaf values, scaler vectors)
+plus a manifest.json, and loads them back with np.load(mmap_mode='r'). Since
+the arrays are read-only file mappings, several gunicorn/eventlet workers on
+the same box share the same physical pages via the OS page cache.
+
+Layout:
+    models/flat/<model_name>/manifest.json
+    models/flat/<model_name>/<array>.npy
+
+Build (run from project/ at deploy time, see build.sh):
+    python -m backend.model_artifacts export
+"""
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FLAT_ARTIFACT_DIR = os.environ.get('FLAT_MODEL_DIR', os.path.join(BASE_DIR, 'models', 'flat'))
+
+LUNG_CANCER_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'lung_cancer_model.pkl')
+LUNG_CANCER_LABEL_ENCODER_PATH = os.path.join(BASE_DIR, 'models', 'lung_cancer_label_encoder.pkl')
+DIABETES_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'diabetes_model.pkl')
+DIABETES_LABEL_ENCODER_PATH = os.path.join(BASE_DIR, 'models', 'diabetes_label_encoder.pkl')
+
+HEART_XGB_PATH = os.path.join(BASE_DIR, 'models', 'saved_models', 'xgb_heart.json')
+HEART_SCALER_PATH = os.path.join(BASE_DIR, 'models', 'saved_models', 'scaler.pkl')
+HEART_CONFIG_PATH = os.path.join(BASE_DIR, 'models', 'saved_models', 'feature_columns.json')
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Generic artifact read/write
+# ---------------------------------------------------------------------------
+
+def write_artifact(out_dir: str, manifest: Dict[str, Any], arrays: Dict[str, np.ndarray],
+                   sources: Tuple[str, ...] = ()):
+    """
+    Write arrays as individual uncompressed .npy files (required for mmap)
+    and a manifest recording the format version and the source file hashes.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(out_dir, f'{name}.npy'), np.ascontiguousarray(arr), allow_pickle=False)
+
+    manifest = dict(manifest)
+    manifest['format_version'] = FORMAT_VERSION
+    manifest['arrays'] = sorted(arrays.keys())
+    manifest['sources'] = {os.path.relpath(p, BASE_DIR): file_sha256(p) for p in sources}
+
+    tmp_path = os.path.join(out_dir, 'manifest.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(out_dir, 'manifest.json'))
+
+
+def read_artifact(artifact_dir: str, mmap: bool = True, verify_sources: bool = True):
+    """
+    Load a flat artifact. Returns (manifest, arrays) or None if the artifact
+    is missing, from another format version, or stale w.r.t. its sources.
+    """
+    manifest_path = os.path.join(artifact_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != FORMAT_VERSION:
+        print(f"  [WARN] Flat artifact {artifact_dir} has format {manifest.get('format_version')}, "
+              f"expected {FORMAT_VERSION}; ignoring")
+        return None
+
+    if verify_sources:
+        for rel_path, digest in manifest.get('sources', {}).items():
+            src = os.path.join(BASE_DIR, rel_path)
+            if os.path.exists(src) and file_sha256(src) != digest:
+                print(f"  [WARN] Flat artifact {artifact_dir} is stale ({rel_path} changed); ignoring")
+                return None
+
+    mmap_mode = 'r' if mmap else None
+    arrays = {
+        name: np.load(os.path.join(artifact_dir, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+        for name in manifest['arrays']
+    }
+    return manifest, arrays
+
+
+# ---------------------------------------------------------------------------
+# Runtime objects backed by the (mapped) arrays
+# ---------------------------------------------------------------------------
+
+class FlatTreeEnsemble:
+    """
+    Tree ensemble stored as concatenated node arrays.
+
+    All trees are evaluated together, one depth level per step: every
+    (row, tree) pair holds a current node index and the whole batch moves one
+    level down with a few vectorized gathers until every pair sits on a leaf.
+
+    Arrays: feature (int64), threshold, left (int64 absolute index of the
+    left child; the right child is always left + 1), default_left
+    (missing-value direction), value (n_nodes, n_values) and roots (int64,
+    first node of each tree). Index arrays are stored as intp so NumPy can
+    gather with them without converting on every level. Leaves are self-loops: left points at the leaf itself, threshold
+    is NaN and default_left is set, so no comparison moves a pair off a leaf
+    and every pair can simply be stepped max_depth times.
+    """
+
+    def __init__(self, manifest: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        self.kind = manifest['kind']
+        self.n_features_in_ = int(manifest['n_features'])
+        self.max_depth = int(manifest['max_depth'])
+        self.classes_ = np.asarray(manifest['classes'])
+        self.params = manifest.get('params', {})
+        self.allow_missing = bool(self.params.get('allow_missing', False))
+        # >1 when consecutive trees feed different outputs (one tree per class per stage)
+        self.tree_outputs = int(self.params.get('tree_outputs', 1))
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.default_left = arrays['default_left']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        # xgboost sends x < threshold left, sklearn sends x <= threshold left
+        self._strict = self.kind.startswith('xgboost')
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node index reached by every (row, tree) pair, shape (n_rows, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[-1]} features, but model is expecting {self.n_features_in_} features as input.")
+        if not self.allow_missing and not np.isfinite(X).all():
+            # Same contract as the sklearn estimators these were exported from
+            raise ValueError("Input X contains NaN, infinity or a value too large for dtype('float32').")
+
+        n_rows = X.shape[0]
+        flat_x = np.ascontiguousarray(X).ravel()
+        row_offset = (np.arange(n_rows) * self.n_features_in_)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        has_missing = bool(np.isnan(flat_x).any())
+        for _ in range(self.max_depth):
+            x = flat_x[row_offset + self.feature[nodes]]
+            thr = self.threshold[nodes]
+            go_right = x >= thr if self._strict else x > thr
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~self.default_left[nodes], go_right)
+            nodes = self.left[nodes] + go_right
+        return nodes
+
+    def _accumulate(self, leaves: np.ndarray, init) -> np.ndarray:
+        """
+        Sum leaf values over trees in tree order, starting from `init`.
+        cumsum adds sequentially (np.sum would use pairwise summation), which
+        reproduces the source libraries' accumulation order and rounding.
+        """
+        n_rows, n_trees = leaves.shape
+        vals = self.value[leaves]
+        if self.tree_outputs > 1:
+            # Stage-major trees: (rows, stages, outputs), one scalar per tree
+            vals = vals.reshape(n_rows, n_trees // self.tree_outputs, self.tree_outputs)
+        # Trees on the leading axis so each step adds contiguous rows
+        terms = np.empty((vals.shape[1] + 1, n_rows, vals.shape[2]), dtype=self.value.dtype)
+        terms[0] = init
+        terms[1:] = vals.transpose(1, 0, 2)
+        return np.cumsum(terms, axis=0, dtype=self.value.dtype)[-1]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+
+        if self.kind == 'xgboost_binary_logistic':
+            margin = self._accumulate(leaves, self.params['base_margin'])[:, 0]
+            one = np.float32(1.0)
+            p = one / (one + np.exp(-margin))
+            return np.column_stack([one - p, p])
+
+        if self.kind == 'sklearn_gradient_boosting':
+            # Leaf values were pre-multiplied by learning_rate at export
+            raw = self._accumulate(leaves, np.asarray(self.params['init_raw']))
+            if raw.shape[1] == 1:
+                p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+                return np.column_stack([1.0 - p, p])
+            raw = raw - raw.max(axis=1, keepdims=True)
+            exp = np.exp(raw)
+            return exp / exp.sum(axis=1, keepdims=True)
+
+        if self.kind == 'sklearn_random_forest':
+            # Leaf values are per-tree class probabilities; average over trees
+            return self._accumulate(leaves, 0.0) / leaves.shape[1]
+
+        raise ValueError(f"Unsupported flat model kind: {self.kind}")
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class FlatLabelEncoder:
+    """LabelEncoder.inverse_transform over the exported class labels."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def inverse_transform(self, y) -> np.ndarray:
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+
+class FlatStandardScaler:
+    """StandardScaler.transform over mapped mean/scale vectors (same in-place dtype rules)."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float32 if np.asarray(X).dtype == np.float32 else np.float64)
+        if self.mean_ is not None:
+            X -= self.mean_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+def _breadth_first_order(left: np.ndarray, right: np.ndarray):
+    """
+    Renumber a tree breadth-first with siblings stored next to each other.
+    Returns (order, new_left, depth): order[new_id] = old_id and new_left is
+    the new index of each node's left child (-1 for leaves).
+    """
+    order, new_left, depth = [0], [], 0
+    frontier = [0]
+    while frontier:
+        nxt = []
+        for old in frontier:
+            if left[old] < 0:
+                new_left.append(-1)
+                continue
+            new_left.append(len(order))
+            order.extend((left[old], right[old]))
+            nxt.extend((left[old], right[old]))
+        if nxt:
+            depth += 1
+        frontier = nxt
+    # new_left was appended in BFS visiting order, which is exactly `order`
+    return np.asarray(order), np.asarray(new_left, dtype=np.int64), depth
+
+
+def _concat_trees(trees):
+    """trees: iterable of (feature, threshold, left, right, default_left, value) with local indices."""
+    parts = {k: [] for k in ('feature', 'threshold', 'left', 'default_left', 'value')}
+    roots, offset, max_depth = [], 0, 0
+    for feature, threshold, left, right, default_left, value in trees:
+        order, new_left, depth = _breadth_first_order(left, right)
+        is_leaf = new_left < 0
+        roots.append(offset)
+        parts['feature'].append(np.where(is_leaf, 0, feature[order]).astype(np.intp))
+        parts['threshold'].append(np.where(is_leaf, np.nan, threshold[order]).astype(threshold.dtype))
+        parts['left'].append((np.where(is_leaf, np.arange(len(order)), new_left) + offset).astype(np.intp))
+        parts['default_left'].append(is_leaf | default_left[order].astype(bool))
+        parts['value'].append(value[order])
+        max_depth = max(max_depth, depth)
+        offset += len(order)
+    arrays = {k: np.concatenate(v) for k, v in parts.items()}
+    arrays['roots'] = np.asarray(roots, dtype=np.intp)
+    return arrays, max_depth
+
+
+def export_xgboost_binary(model_json_path: str) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Flatten a binary:logistic XGBoost JSON model, keeping only the trees predict_proba uses."""
+    with open(model_json_path, 'r') as f:
+        learner = json.load(f)['learner']
+
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Unsupported XGBoost objective for flat export: {objective}")
+
+    model = learner['gradient_booster']['model']
+    trees = model['trees']
+    # XGBClassifier.predict_proba honours best_iteration after load_model
+    best_iteration = learner.get('attributes', {}).get('best_iteration')
+    if best_iteration is not None and model.get('iteration_indptr'):
+        trees = trees[:model['iteration_indptr'][int(best_iteration) + 1]]
+
+    base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+    base_margin = float(np.log(base_score / (1.0 - base_score)))
+
+    def _tree_arrays(tree):
+        left = np.asarray(tree['left_children'], dtype=np.int64)
+        right = np.asarray(tree['right_children'], dtype=np.int64)
+        cond = np.asarray(tree['split_conditions'], dtype=np.float32)
+        return (
+            np.asarray(tree['split_indices'], dtype=np.int64),
+            cond,
+            left,
+            right,
+            np.asarray(tree['default_left'], dtype=bool),
+            # Leaves store their weight in split_conditions
+            np.where(left < 0, cond, 0.0).astype(np.float32)[:, None],
+        )
+
+    arrays, max_depth = _concat_trees(_tree_arrays(t) for t in trees)
+    manifest = {
+        'kind': 'xgboost_binary_logistic',
+        'n_features': int(learner['learner_model_param']['num_feature']),
+        'n_trees': len(trees),
+        'max_depth': max_depth,
+        'classes': [0, 1],
+        'params': {'base_margin': base_margin, 'allow_missing': True},
+    }
+    return manifest, arrays
+
+
+def _sklearn_tree_arrays(tree, value: np.ndarray):
+    """Node arrays of a fitted sklearn Tree (tree_), with the given per-node leaf values."""
+    missing_left = getattr(tree, 'missing_go_to_left', None)
+    if missing_left is None:
+        missing_left = np.zeros(tree.node_count, dtype=bool)
+    return (
+        tree.feature.astype(np.int64),
+        tree.threshold.astype(np.float64),
+        tree.children_left.astype(np.int64),
+        tree.children_right.astype(np.int64),
+        np.asarray(missing_left, dtype=bool),
+        value,
+    )
+
+
+def export_sklearn_ensemble(model) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Flatten a fitted RandomForestClassifier/ExtraTreesClassifier or
+    GradientBoostingClassifier into node arrays.
+
+    Random forest leaves hold the normalized class distribution of each tree
+    (what DecisionTreeClassifier.predict_proba returns). Gradient boosting
+    trees are stored stage-major (one per class per stage), their leaves hold
+    learning_rate * value, and the constant init estimator becomes init_raw.
+    """
+    from sklearn.ensemble import GradientBoostingClassifier
+    from sklearn.ensemble._forest import ForestClassifier
+
+    n_features = int(model.n_features_in_)
+    params: Dict[str, Any] = {}
+
+    if isinstance(model, GradientBoostingClassifier):
+        init = model.init_
+        if not (init == 'zero' or type(init).__name__ == 'DummyClassifier'):
+            raise ValueError(f"Only constant init estimators can be flattened, got {type(init).__name__}")
+        params['init_raw'] = model._raw_predict_init(np.zeros((1, n_features), dtype=np.float32))[0].tolist()
+        params['tree_outputs'] = int(model.estimators_.shape[1])
+
+        def _trees():
+            for stage in model.estimators_:
+                for reg in stage:
+                    tree = reg.tree_
+                    yield _sklearn_tree_arrays(tree, (model.learning_rate * tree.value[:, 0, 0])[:, np.newaxis])
+
+        kind, n_trees = 'sklearn_gradient_boosting', model.estimators_.size
+    elif isinstance(model, ForestClassifier):
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Multi-output forests are not supported")
+        n_classes = len(model.classes_)
+
+        def _trees():
+            for est in model.estimators_:
+                tree = est.tree_
+                proba = tree.value[:, 0, :n_classes].astype(np.float64)
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                yield _sklearn_tree_arrays(tree, proba / normalizer)
+
+        kind, n_trees = 'sklearn_random_forest', len(model.estimators_)
+    else:
+        raise ValueError(f"Unsupported model type for flat export: {type(model).__name__}")
+
+    arrays, max_depth = _concat_trees(_trees())
+    manifest = {
+        'kind': kind,
+        'n_features': n_features,
+        'n_trees': int(n_trees),
+        'max_depth': max_depth,
+        'classes': model.classes_.tolist(),
+        'params': params,
+    }
+    if hasattr(model, 'feature_names_in_'):
+        manifest['feature_names'] = [str(f) for f in model.feature_names_in_]
+    return manifest, arrays
+
+
+def _export_pickled_ensemble(name: str, model_path: str, label_encoder_path: Optional[str],
+                             out_root: str) -> str:
+    # Reuse the route's loader so the offline export tolerates the same
+    # missing-module pickles (e.g. '_loss') the server does
+    from backend.routes.predict import _safe_joblib_load
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(model_path)
+    manifest, arrays = export_sklearn_ensemble(_safe_joblib_load(model_path))
+    sources = [model_path]
+    if label_encoder_path and os.path.exists(label_encoder_path):
+        encoder = _safe_joblib_load(label_encoder_path)
+        if hasattr(encoder, 'classes_'):
+            manifest['label_classes'] = encoder.classes_.tolist()
+            sources.append(label_encoder_path)
+
+    out_dir = os.path.join(out_root, name)
+    write_artifact(out_dir, manifest, arrays, sources=tuple(sources))
+    return out_dir
+
+
+def export_lung_cancer(out_root: str = FLAT_ARTIFACT_DIR) -> str:
+    return _export_pickled_ensemble('lung_cancer', LUNG_CANCER_MODEL_PATH, LUNG_CANCER_LABEL_ENCODER_PATH, out_root)
+
+
+def export_diabetes(out_root: str = FLAT_ARTIFACT_DIR) -> str:
+    return _export_pickled_ensemble('diabetes', DIABETES_MODEL_PATH, DIABETES_LABEL_ENCODER_PATH, out_root)
+
+
+def _load_pickled_ensemble(name: str, out_root: str, mmap: bool) -> Optional[Dict[str, Any]]:
+    loaded = read_artifact(os.path.join(out_root, name), mmap=mmap)
+    if loaded is None:
+        return None
+    manifest, arrays = loaded
+    label_classes = manifest.get('label_classes')
+    return {
+        'model': FlatTreeEnsemble(manifest, arrays),
+        'label_encoder': FlatLabelEncoder(label_classes) if label_classes is not None else None,
+        'feature_names': manifest.get('feature_names'),
+    }
+
+
+def load_lung_cancer(out_root: str = FLAT_ARTIFACT_DIR, mmap: bool = True) -> Optional[Dict[str, Any]]:
+    """Return a lung cancer bundle backed by mapped arrays, or None if unavailable."""
+    return _load_pickled_ensemble('lung_cancer', out_root, mmap)
+
+
+def load_diabetes(out_root: str = FLAT_ARTIFACT_DIR, mmap: bool = True) -> Optional[Dict[str, Any]]:
+    """Return a diabetes bundle backed by mapped arrays, or None if unavailable."""
+    return _load_pickled_ensemble('diabetes', out_root, mmap)
+
+
+def export_heart_disease(out_root: str = FLAT_ARTIFACT_DIR) -> str:
+    """Export the heart disease XGBoost model, its scaler and its config."""
+    import joblib
+
+    manifest, arrays = export_xgboost_binary(HEART_XGB_PATH)
+    scaler = joblib.load(HEART_SCALER_PATH)
+    if getattr(scaler, 'mean_', None) is not None:
+        arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    if getattr(scaler, 'scale_', None) is not None:
+        arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    with open(HEART_CONFIG_PATH, 'r') as f:
+        config = json.load(f)
+    manifest['threshold'] = config.get('threshold', 0.5)
+    manifest['features'] = config.get('features', [])
+
+    out_dir = os.path.join(out_root, 'heart_disease')
+    write_artifact(out_dir, manifest, arrays,
+                   sources=(HEART_XGB_PATH, HEART_SCALER_PATH, HEART_CONFIG_PATH))
+    return out_dir
+
+
+def load_heart_disease(out_root: str = FLAT_ARTIFACT_DIR, mmap: bool = True) -> Optional[Dict[str, Any]]:
+    """Return a heart disease bundle backed by mapped arrays, or None if unavailable."""
+    loaded = read_artifact(os.path.join(out_root, 'heart_disease'), mmap=mmap)
+    if loaded is None:
+        return None
+    manifest, arrays = loaded
+    return {
+        'model': FlatTreeEnsemble(manifest, arrays),
+        'scaler': FlatStandardScaler(arrays.get('scaler_mean'), arrays.get('scaler_scale')),
+        'threshold': manifest.get('threshold', 0.5),
+        'features': manifest.get('features', []),
+    }
+
+
+EXPORTERS = {
+    'lung_cancer': export_lung_cancer,
+    'diabetes': export_diabetes,
+    'heart_disease': export_heart_disease,
+}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export models into flat memory-mappable artifacts.')
+    parser.add_argument('command', choices=['export'])
+    parser.add_argument('--out', default=FLAT_ARTIFACT_DIR)
+    parser.add_argument('--model', action='append', choices=sorted(EXPORTERS))
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.model or sorted(EXPORTERS):
+        try:
+            print(f"[OK] Exported {name} -> {EXPORTERS[name](args.out)}")
+        except FileNotFoundError as e:
+            print(f"[WARN] Skipping {name}: source model not found ({e})")
+        except Exception as e:
+            failed = True
+            print(f"[FAIL] Could not export {name}: {e}")
+    sys.exit(1 if failed else 0)
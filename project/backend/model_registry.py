@@ -0,0 +1,254 @@
+"""
+Memory-budgeted model registry.
+
+Keeps recently used ML models resident in an LRU order and only evicts the
+least recently used ones once the summed size of resident models exceeds the
+configured RAM budget (MODEL_RAM_BUDGET_MB, default 300). Sizes are measured
+from the loaded objects themselves (NumPy buffers, Python containers, and the
+serialized booster size for XGBoost), not from the pickle size on disk.
+Memory-mapped artifact arrays are shared page cache and are not counted.
+
+Loads are single-flight per model: the first caller loads outside the lock
+and concurrent callers for the same model wait for its result, while other
+models stay servable. Under the eventlet server the waiters are greenlets on
+one OS thread (a lock held across the load would let them all in), so they
+wait on a real Event through eventlet's thread pool.
+"""
+import gc
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_BUDGET_MB = float(os.environ.get('MODEL_RAM_BUDGET_MB', '300'))
+
+
+class _Load:
+    __slots__ = ('done', 'bundle', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.bundle = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self):
+        from backend.inference_batcher import _eventlet_server_running, run_in_threadpool
+        if _eventlet_server_running():
+            run_in_threadpool(self.done.wait)  # yields the greenlet instead of the hub
+        else:
+            self.done.wait()
+
+
+def estimate_object_size(obj: Any) -> int:
+    """
+    Approximate the resident size of a loaded model object in bytes.
+
+    Walks instance dicts, containers and extension-type state (sklearn's
+    Cython Tree exposes its node arrays through __getstate__), counting every
+    object once. NumPy arrays contribute their data buffer, XGBoost boosters
+    the size of their raw serialized model.
+    """
+    seen = set()
+    keepalive = []  # __getstate__ returns fresh objects; keep them alive so ids stay unique
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if o is None or id(o) in seen:
+            continue
+        seen.add(id(o))
+
+        if np is not None and isinstance(o, np.memmap):
+            # File-backed, shared between workers and reclaimable by the OS:
+            # not part of this process's private model memory
+            total += sys.getsizeof(o)
+            continue
+
+        if np is not None and isinstance(o, np.ndarray):
+            total += sys.getsizeof(o) if o.base is None else o.nbytes
+            if o.dtype == object:
+                items = o.ravel().tolist()
+                keepalive.append(items)
+                stack.extend(items)
+            continue
+
+        if isinstance(o, (str, bytes, bytearray, int, float, bool, complex)):
+            total += sys.getsizeof(o)
+            continue
+
+        if hasattr(o, 'save_raw') and callable(o.save_raw):
+            # xgboost.Booster keeps its trees in native memory
+            try:
+                total += len(o.save_raw())
+            except Exception:
+                total += sys.getsizeof(o)
+            continue
+
+        total += sys.getsizeof(o)
+
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif isinstance(o, type) or callable(o) and not hasattr(o, '__dict__'):
+            continue
+        else:
+            state = getattr(o, '__dict__', None)
+            if state is None and hasattr(o, '__getstate__'):
+                try:
+                    state = o.__getstate__()
+                except Exception:
+                    state = None
+            if isinstance(state, dict):
+                keepalive.append(state)
+                stack.append(state)
+            booster = getattr(o, '_Booster', None)
+            if booster is not None:
+                stack.append(booster)
+    return total
+
+
+class ModelRegistry:
+    """
+    LRU cache of loaded models under a byte budget.
+
+    Loaders are registered per model name and return a bundle (any object,
+    usually a dict holding the model and its encoders/scalers) or None when
+    the artifact is unavailable. None results are not cached so a later
+    request retries the load.
+    """
+
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._resident: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._loading: Dict[str, _Load] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+        self._stats.setdefault(name, {
+            'loads': 0,
+            'hits': 0,
+            'evictions': 0,
+            'failed_loads': 0,
+            'last_cold_load_ms': None,
+            'max_cold_load_ms': None,
+            'total_cold_load_ms': 0.0,
+        })
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return the resident bundle for name, loading (and evicting) if needed."""
+        if name not in self._loaders:
+            raise KeyError(f'No loader registered for model: {name}')
+
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is not None:
+                self._resident.move_to_end(name)
+                self._stats[name]['hits'] += 1
+                return entry['bundle']
+            load = self._loading.get(name)
+            leader = load is None
+            if leader:
+                load = self._loading[name] = _Load()
+
+        if not leader:
+            load.wait()
+            if load.error is not None:
+                raise load.error
+            if load.bundle is not None:
+                with self._lock:
+                    self._stats[name]['hits'] += 1
+            return load.bundle
+
+        try:
+            t0 = time.perf_counter()
+            bundle = self._loaders[name]()
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            size = estimate_object_size(bundle) if bundle is not None else 0
+        except BaseException as e:
+            load.error = e
+            with self._lock:
+                del self._loading[name]
+            load.done.set()
+            raise
+
+        with self._lock:
+            del self._loading[name]
+            stats = self._stats[name]
+            if bundle is None:
+                stats['failed_loads'] += 1
+            else:
+                self._resident[name] = {'bundle': bundle, 'size_bytes': size, 'loaded_at': time.time()}
+                stats['loads'] += 1
+                stats['last_cold_load_ms'] = round(elapsed_ms, 2)
+                stats['max_cold_load_ms'] = round(max(elapsed_ms, stats['max_cold_load_ms'] or 0.0), 2)
+                stats['total_cold_load_ms'] += elapsed_ms
+                print(f"[REGISTRY] Loaded '{name}' in {elapsed_ms:.1f} ms ({size / 1024 / 1024:.2f} MB)")
+                self._enforce_budget(keep=name)
+        load.bundle = bundle
+        load.done.set()
+        return bundle
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Return the bundle only if it is already resident (no load, no LRU bump)."""
+        entry = self._resident.get(name)
+        return entry['bundle'] if entry is not None else None
+
+    def is_resident(self, name: str) -> bool:
+        return name in self._resident
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            entry = self._resident.pop(name, None)
+            if entry is None:
+                return False
+            self._stats[name]['evictions'] += 1
+            print(f"[REGISTRY] Evicted '{name}' ({entry['size_bytes'] / 1024 / 1024:.2f} MB)")
+        gc.collect()
+        return True
+
+    def resident_bytes(self) -> int:
+        return sum(e['size_bytes'] for e in self._resident.values())
+
+    def _enforce_budget(self, keep: str):
+        # Evict least recently used models until we fit, never the one just loaded
+        while self.resident_bytes() > self.budget_bytes:
+            victim = next((n for n in self._resident if n != keep), None)
+            if victim is None:
+                break
+            self.evict(victim)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {}
+            for name, s in self._stats.items():
+                entry = self._resident.get(name)
+                avg = s['total_cold_load_ms'] / s['loads'] if s['loads'] else None
+                models[name] = {
+                    'resident': entry is not None,
+                    'size_bytes': entry['size_bytes'] if entry else None,
+                    'loads': s['loads'],
+                    'hits': s['hits'],
+                    'evictions': s['evictions'],
+                    'failed_loads': s['failed_loads'],
+                    'last_cold_load_ms': s['last_cold_load_ms'],
+                    'max_cold_load_ms': s['max_cold_load_ms'],
+                    'avg_cold_load_ms': round(avg, 2) if avg is not None else None,
+                }
+            return {
+                'budget_bytes': self.budget_bytes,
+                'resident_bytes': self.resident_bytes(),
+                'lru_order': list(self._resident.keys()),
+                'models': models,
+            }
@@ -0,0 +1,398 @@
+"""
+Out-of-process model server.
+
+Runs the prediction models in their own process so CPU-bound predict_proba
+calls do not compete with socket.io traffic and gesture frames inside the
+eventlet-patched Flask process. The web process talks to it over a Unix
+socket (MODEL_SERVER_SOCKET) through a pooled ModelServerClient; when the
+server is unreachable predictions fall back to in-process inference.
+
+Wire format: every message is a 16-byte little-endian header
+
+    op/status (u8), model type id (u8), dtype code (u8), flags (u8),
+    n_rows (u32), n_cols (u32), payload length (u32)
+
+followed by the payload. PREDICT requests carry the feature matrix as raw
+row-major float32/float64; responses carry the probability matrix the same
+way. DESCRIBE responses and errors carry UTF-8 JSON / text.
+
+Usage (from the project/ directory):
+    python -m backend.model_server --socket /tmp/healthapp-models.sock [--preload]
+or set MODEL_SERVER_SOCKET and MODEL_SERVER_SPAWN=1 and let server.py start it.
+"""
+import atexit
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import sys
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from backend.feature_schema import FeatureSchema
+from backend.model_artifacts import FlatLabelEncoder
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+MODEL_TYPES = ('lung_cancer', 'diabetes', 'heart_disease')
+
+OP_PING = 1
+OP_DESCRIBE = 2
+OP_PREDICT = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_HEADER = struct.Struct('<BBBBIII')
+_DTYPES = {1: np.dtype(np.float32), 2: np.dtype(np.float64)}
+_DTYPE_CODES = {dt: code for code, dt in _DTYPES.items()}
+
+
+class ModelServerUnavailable(ConnectionError):
+    """The model server could not be reached; callers fall back to in-process inference."""
+
+
+class ModelServerError(RuntimeError):
+    """The model server was reached but reported an error for the request."""
+
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytearray]:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if k == 0:
+            if got == 0:
+                return None
+            raise ConnectionError('Connection closed mid-message')
+        got += k
+    return buf
+
+
+def _send_message(sock: socket.socket, op: int, type_id: int = 0, payload: bytes = b'',
+                  matrix: Optional[np.ndarray] = None, flags: int = 0):
+    dtype_code, n_rows, n_cols = 0, 0, 0
+    if matrix is not None:
+        matrix = np.ascontiguousarray(matrix)
+        if matrix.dtype not in _DTYPE_CODES:
+            matrix = matrix.astype(np.float64)
+        dtype_code = _DTYPE_CODES[matrix.dtype]
+        n_rows, n_cols = matrix.shape
+        payload = matrix.tobytes()
+    sock.sendall(_HEADER.pack(op, type_id, dtype_code, flags, n_rows, n_cols, len(payload)) + payload)
+
+
+def _recv_message(sock: socket.socket):
+    """Return (op, type_id, flags, matrix_or_None, payload) or None on clean EOF."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    op, type_id, dtype_code, flags, n_rows, n_cols, length = _HEADER.unpack(header)
+    payload = _recv_exact(sock, length) if length else bytearray()
+    if payload is None:
+        raise ConnectionError('Connection closed mid-message')
+    matrix = None
+    if dtype_code:
+        matrix = np.frombuffer(payload, dtype=_DTYPES[dtype_code]).reshape(n_rows, n_cols)
+    return op, type_id, flags, matrix, payload
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+def describe_bundle(bundle: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-safe metadata a client needs to validate rows and format results."""
+    schema = bundle['schema']
+    model = bundle['model']
+    encoder = bundle.get('label_encoder')
+    classes = getattr(model, 'classes_', None)
+    return {
+        'columns': schema.columns,
+        'required': schema.required,
+        'value_map': schema.value_map,
+        'default': schema.default,
+        'classes': np.asarray(classes).tolist() if classes is not None else None,
+        'label_classes': np.asarray(encoder.classes_).tolist() if getattr(encoder, 'classes_', None) is not None else None,
+        'threshold': bundle.get('threshold'),
+        'features': bundle.get('features'),
+        'feature_names': bundle.get('feature_names'),
+    }
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.server.connections.add(self.request)
+
+    def finish(self):
+        self.server.connections.discard(self.request)
+
+    def handle(self):
+        # Imported here so the client side never pulls in the route module twice
+        from backend.routes import predict
+
+        sock = self.request
+        while True:
+            try:
+                message = _recv_message(sock)
+            except (ConnectionError, OSError):
+                return
+            except (KeyError, ValueError) as e:
+                # Unknown dtype code or a payload that does not fit its shape:
+                # report it and drop the connection rather than guess at framing
+                try:
+                    _send_message(sock, STATUS_ERROR, 0, f'Malformed message: {e!r}'.encode('utf-8'))
+                except OSError:
+                    pass
+                return
+            if message is None:
+                return
+            op, type_id, _, X, _ = message
+            try:
+                if op == OP_PING:
+                    _send_message(sock, STATUS_OK)
+                    continue
+                if type_id >= len(MODEL_TYPES):
+                    raise ValueError(f'Unknown model type id: {type_id}')
+                model_type = MODEL_TYPES[type_id]
+                # Hashing first drops a resident model whose files changed
+                bundle = predict._load_for_prediction(model_type, predict._artifact_hash(model_type), local=True)
+                if bundle is None:
+                    raise ModelServerError(predict._UNAVAILABLE_ERRORS[model_type])
+                if op == OP_DESCRIBE:
+                    meta = describe_bundle(bundle)
+                    meta['has_proba'] = predict._has_proba(model_type, bundle)
+                    _send_message(sock, STATUS_OK, type_id, json.dumps(meta).encode('utf-8'))
+                elif op == OP_PREDICT:
+                    probs = predict._probability_matrix(model_type, bundle, X)
+                    _send_message(sock, STATUS_OK, type_id, matrix=probs)
+                else:
+                    raise ValueError(f'Unknown op: {op}')
+            except Exception as e:
+                try:
+                    _send_message(sock, STATUS_ERROR, type_id, str(e).encode('utf-8'))
+                except OSError:
+                    return
+
+
+class ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        if os.path.lexists(socket_path):
+            # Only replace a stale socket, never a file that happens to be there
+            if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+                raise FileExistsError(f'{socket_path} exists and is not a socket')
+            os.unlink(socket_path)
+        # Owner-only from bind() on: no window where other users can connect
+        umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+        self.connections = set()
+
+    def server_close(self):
+        # Persistent client connections would otherwise keep being served
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def spawn_model_server(socket_path: str, wait_s: float = 30.0) -> Optional[subprocess.Popen]:
+    """Start `python -m backend.model_server` as a child process and wait for its socket."""
+    proc = subprocess.Popen([sys.executable, '-m', 'backend.model_server', '--socket', socket_path], cwd=BASE_DIR)
+    atexit.register(proc.terminate)
+    deadline = time.monotonic() + wait_s
+    client = ModelServerClient(socket_path, retry_after=0)
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            print(f"[FAIL] Model server exited with code {proc.returncode}")
+            return None
+        if client.ping():
+            print(f"[OK] Model server listening on {socket_path} (pid {proc.pid})")
+            client.close()
+            return proc
+        time.sleep(0.1)
+    print(f"[WARN] Model server did not come up on {socket_path}; predictions stay in-process")
+    return proc
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class RemoteModel:
+    """Stands in for bundle['model']: predict_proba is a round trip to the server."""
+
+    def __init__(self, client: 'ModelServerClient', model_type: str, classes):
+        self._client = client
+        self.model_type = model_type
+        if classes is not None:
+            self.classes_ = np.asarray(classes)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._client.predict_proba(self.model_type, X)
+
+
+class ModelServerClient:
+    """
+    Pooled connections to a model server.
+
+    Idle connections are reused LIFO (at most pool_size are kept). Any socket
+    error marks the server down for retry_after seconds so requests go
+    straight to in-process inference instead of paying a connect timeout.
+    """
+
+    def __init__(self, socket_path: str, pool_size: int = 8, timeout: float = 30.0, retry_after: float = 5.0):
+        self.socket_path = socket_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._idle: deque = deque()
+        self._down_until = 0.0
+        self._bundles: Dict[str, Dict[str, Any]] = {}
+        self._stats = {'requests': 0, 'connects': 0, 'failures': 0, 'errors': 0}
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._stats['connects'] += 1
+        return sock
+
+    def _request(self, op: int, type_id: int = 0, matrix: Optional[np.ndarray] = None):
+        self._stats['requests'] += 1
+        # A pooled connection may have been closed by a server restart: retry
+        # once on a fresh one. A timeout is not retried (the server is slow, not gone)
+        for attempt in range(2):
+            pooled = bool(self._idle) and attempt == 0
+            try:
+                sock = self._idle.pop() if pooled else self._connect()
+            except OSError as e:
+                return self._fail(e)
+            try:
+                _send_message(sock, op, type_id, matrix=matrix)
+                message = _recv_message(sock)
+                if message is None:
+                    raise ConnectionError('Model server closed the connection')
+            except (OSError, struct.error, KeyError, ValueError) as e:
+                sock.close()
+                if pooled and isinstance(e, ConnectionError):  # BrokenPipeError, reset or EOF
+                    continue
+                return self._fail(e)
+            if len(self._idle) < self.pool_size:
+                self._idle.append(sock)
+            else:
+                sock.close()
+            status, _, flags, result, payload = message
+            if status != STATUS_OK:
+                self._stats['errors'] += 1
+                raise ModelServerError(bytes(payload).decode('utf-8', 'replace'))
+            return flags, result, payload
+        return self._fail(ConnectionError('Model server unreachable'))
+
+    def _fail(self, error: Exception):
+        self._stats['failures'] += 1
+        self._down_until = time.monotonic() + self.retry_after
+        self.close()
+        raise ModelServerUnavailable(f'{self.socket_path}: {error}') from error
+
+    def ping(self) -> bool:
+        try:
+            self._request(OP_PING)
+            return True
+        except (ModelServerUnavailable, ModelServerError):
+            return False
+
+    def predict_proba(self, model_type: str, X: np.ndarray) -> np.ndarray:
+        return self._request(OP_PREDICT, MODEL_TYPES.index(model_type), matrix=X)[1]
+
+    def bundle(self, model_type: str) -> Optional[Dict[str, Any]]:
+        """Remote bundle for model_type (cached), or None if the server cannot provide it."""
+        cached = self._bundles.get(model_type)
+        if cached is not None:
+            return cached
+        try:
+            _, _, payload = self._request(OP_DESCRIBE, MODEL_TYPES.index(model_type))
+        except ModelServerUnavailable as e:
+            print(f"[WARN] Model server unavailable ({e}); using in-process models")
+            return None
+        except ModelServerError as e:
+            print(f"[WARN] Model server cannot serve {model_type}: {e}")
+            return None
+        meta = json.loads(bytes(payload).decode('utf-8'))
+        label_classes = meta.get('label_classes')
+        bundle = {
+            'model': RemoteModel(self, model_type, meta.get('classes')),
+            'scaler': None,  # applied server-side
+            'label_encoder': FlatLabelEncoder(label_classes) if label_classes is not None else None,
+            'threshold': meta.get('threshold'),
+            'features': meta.get('features'),
+            'feature_names': meta.get('feature_names'),
+            'schema': FeatureSchema(meta['columns'], required=meta['required'],
+                                    value_map=meta['value_map'], default=meta['default']),
+            'has_proba': meta['has_proba'],
+            'remote': True,
+        }
+        self._bundles[model_type] = bundle
+        return bundle
+
+    def forget(self, model_type: str):
+        self._bundles.pop(model_type, None)
+
+    def close(self):
+        while self._idle:
+            try:
+                self._idle.pop().close()
+            except (IndexError, OSError):
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats, socket=self.socket_path, available=self.available(),
+                    idle_connections=len(self._idle), remote_models=sorted(self._bundles))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    sys.path.insert(0, BASE_DIR)
+    parser = argparse.ArgumentParser(description='Serve the prediction models over a Unix socket.')
+    parser.add_argument('--socket', default=os.environ.get('MODEL_SERVER_SOCKET', '/tmp/healthapp-models.sock'))
+    parser.add_argument('--preload', action='store_true', help='Load every model before accepting connections')
+    args = parser.parse_args()
+
+    from backend.routes import predict
+    predict.model_server_client = None  # this process IS the model server
+    if args.preload:
+        for name in MODEL_TYPES:
+            predict.model_registry.get(name)
+
+    server = ModelServer(args.socket)
+    print(f"[OK] Model server listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
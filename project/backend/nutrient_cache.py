@@ -0,0 +1,301 @@
+"""
+Shared persistent nutrient cache.
+
+USDAManager, USDAApiService, USDAService and the dish mapper used to keep
+one JSON file each under backend/cache/ and rewrote the whole file on every
+new entry (157 KB for usda_manager_cache.json), with concurrent writers in
+different processes overwriting each other. They now share one SQLite
+(WAL) store, one namespace each:
+
+    cache = nutrient_cache.namespace("usda_api", legacy_json=path)
+    cache.get("lemon")                   # None on a miss or an expired entry
+    cache.put("lemon", data, ttl_s=3600)
+
+Every entry can carry its own expiry (ttl_s, else the namespace default;
+None never expires). Least recently used entries are evicted once a
+namespace passes its max_entries or the whole store passes
+NUTRIENT_CACHE_MAX_MB (default 64). SQLite errors are logged and treated
+as misses, so a broken cache file never fails a lookup.
+
+The old JSON files are imported into their namespace the first time it is
+opened, and again if the file changes (INSERT OR IGNORE, so entries already
+in the store win). They are no longer written. The store lives at
+NUTRIENT_CACHE_PATH (default backend/cache/nutrient_cache.sqlite3).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(_BACKEND_DIR, "cache")
+DEFAULT_PATH = os.environ.get("NUTRIENT_CACHE_PATH") or os.path.join(CACHE_DIR, "nutrient_cache.sqlite3")
+DEFAULT_MAX_BYTES = int(float(os.environ.get("NUTRIENT_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+"""
+
+# Legacy entry -> (value, stored_at) or None to skip it
+LegacyConverter = Callable[[str, Any], Optional[Tuple[Any, Optional[float]]]]
+
+
+class CacheNamespace:
+    """One caller's view of the store: get / put / delete under a namespace."""
+
+    def __init__(self, store: "NutrientCache", name: str, ttl_s: Optional[float], max_entries: Optional[int]):
+        self.store = store
+        self.name = name
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.store.get(self.name, key)
+
+    def put(self, key: str, value: Any, ttl_s: Optional[float] = None):
+        self.store.put(self.name, key, value, ttl_s=self.ttl_s if ttl_s is None else ttl_s,
+                       max_entries=self.max_entries)
+
+    def delete(self, key: str):
+        self.store.delete(self.name, key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self.store.count(self.name)
+
+
+class NutrientCache:
+    """
+    SQLite-backed key/value store shared by processes, with per-entry
+    expiry and LRU eviction. max_bytes <= 0 disables it (every lookup
+    misses, puts are dropped).
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self._clock = clock
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _count(self, namespace: str, field: str, n: int = 1):
+        counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "expired": 0, "puts": 0, "evictions": 0})
+        counters[field] += n
+
+    def namespace(self, name: str, *, ttl_s: Optional[float] = None, max_entries: Optional[int] = None,
+                  legacy_json: Optional[str] = None, convert: Optional[LegacyConverter] = None) -> CacheNamespace:
+        """
+        Handle for *name*. *ttl_s* and *max_entries* are the namespace
+        defaults; *legacy_json* is a {key: value} file to import (each item
+        passed through *convert* if given).
+        """
+        ns = CacheNamespace(self, name, ttl_s, max_entries)
+        if legacy_json and self.enabled:
+            self.import_json(ns, legacy_json, convert)
+        return ns
+
+    def import_json(self, ns: CacheNamespace, path: str, convert: Optional[LegacyConverter] = None) -> int:
+        """Import a legacy JSON cache once per file version; returns the entries added."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        signature = f"{ns.name}:{st.st_size}:{st.st_mtime_ns}"
+        path = os.path.abspath(path)
+        with self._lock:
+            try:
+                row = self._connect().execute("SELECT signature FROM imports WHERE path = ?", (path,)).fetchone()
+            except sqlite3.Error as exc:
+                self._errors += 1
+                logger.warning("NUTRIENT_CACHE | import check failed: %s", exc)
+                return 0
+        if row is not None and row[0] == signature:
+            return 0
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except Exception as exc:
+            logger.warning("NUTRIENT_CACHE | could not read %s: %s", path, exc)
+            data = {}
+        now = self._clock()
+        rows = []
+        for key, value in (data.items() if isinstance(data, dict) else ()):
+            try:
+                stored_at = None
+                if convert is not None:
+                    converted = convert(key, value)
+                    if converted is None:
+                        continue
+                    value, stored_at = converted
+                stored_at = now if stored_at is None else float(stored_at)
+                expires_at = stored_at + ns.ttl_s if ns.ttl_s is not None else None
+                encoded = json.dumps(value)
+            except Exception as exc:
+                logger.warning("NUTRIENT_CACHE | skipping bad entry %r in %s: %s", key, os.path.basename(path), exc)
+                continue
+            if expires_at is not None and expires_at <= now:
+                continue
+            rows.append((ns.name, key, encoded, len(key) + len(encoded), stored_at, expires_at, stored_at))
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    before = conn.total_changes
+                    conn.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                    added = conn.total_changes - before
+                    conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?)", (path, signature))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                self._evict(conn, ns.name, ns.max_entries)
+            except sqlite3.Error as exc:
+                self._errors += 1
+                logger.warning("NUTRIENT_CACHE | import of %s failed: %s", path, exc)
+                return 0
+        if added:
+            logger.info("NUTRIENT_CACHE | imported %d entries from %s into '%s'", added, os.path.basename(path), ns.name)
+        return added
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        now = self._clock()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                                   (namespace, key)).fetchone()
+                if row is None:
+                    self._count(namespace, "misses")
+                    return None
+                if row[1] is not None and row[1] <= now:
+                    conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+                    self._count(namespace, "expired")
+                    self._count(namespace, "misses")
+                    return None
+                conn.execute("UPDATE entries SET last_used = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+            except sqlite3.Error as exc:
+                self._errors += 1
+                logger.warning("NUTRIENT_CACHE | lookup failed: %s", exc)
+                return None
+            self._count(namespace, "hits")
+        return json.loads(row[0])
+
+    def put(self, namespace: str, key: str, value: Any, ttl_s: Optional[float] = None,
+            max_entries: Optional[int] = None):
+        if not self.enabled:
+            return
+        now = self._clock()
+        encoded = json.dumps(value)
+        expires_at = now + ttl_s if ttl_s is not None else None
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (namespace, key, encoded, len(key) + len(encoded), now, expires_at, now))
+                self._count(namespace, "puts")
+                self._evict(conn, namespace, max_entries)
+            except sqlite3.Error as exc:
+                self._errors += 1
+                logger.warning("NUTRIENT_CACHE | store failed: %s", exc)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            try:
+                self._connect().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            except sqlite3.Error as exc:
+                self._errors += 1
+                logger.warning("NUTRIENT_CACHE | delete failed: %s", exc)
+
+    def _evict(self, conn: sqlite3.Connection, namespace: str, max_entries: Optional[int]):
+        if max_entries is not None:
+            stale = conn.execute(
+                "SELECT key FROM entries WHERE namespace = ? ORDER BY last_used DESC LIMIT -1 OFFSET ?",
+                (namespace, max_entries)).fetchall()
+            if stale:
+                conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?",
+                                 [(namespace, key) for key, in stale])
+                self._count(namespace, "evictions", len(stale))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for ns, key, size in conn.execute("SELECT namespace, key, size FROM entries ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((ns, key))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", stale)
+        for ns, _ in stale:
+            self._count(ns, "evictions")
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            try:
+                return self._connect().execute(
+                    "SELECT COUNT(*) FROM entries WHERE namespace = ?", (namespace,)).fetchone()[0]
+            except sqlite3.Error as exc:
+                logger.warning("NUTRIENT_CACHE | count failed: %s", exc)
+                return 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_namespace = {name: dict(counters) for name, counters in self._stats.items()}
+            size = None
+            if self.enabled:
+                try:
+                    conn = self._connect()
+                    for name, entries in conn.execute("SELECT namespace, COUNT(*) FROM entries GROUP BY namespace"):
+                        per_namespace.setdefault(name, {})["entries"] = entries
+                    size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+                except sqlite3.Error as exc:
+                    logger.warning("NUTRIENT_CACHE | stats failed: %s", exc)
+            return {
+                "enabled": self.enabled,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "errors": self._errors,
+                "namespaces": per_namespace,
+            }
+
+
+nutrient_cache = NutrientCache()
@@ -130,12 +130,11 @@ def get_enriched_food_profile(food_name: str) -> dict:
     ingredients, source = result["ingredients"], result["meta"]["source"]
     dish_meta = result["meta"]
 
-    # Step 2: Fetch USDA data + Meta per ingredient
+    # Step 2: Fetch USDA data + Meta per ingredient (live API misses fetched concurrently)
     nutrient_data = []
     ingredient_meta = []
     
-    for ingredient in ingredients:
-        data, meta = usda_manager.get_food_nutrients_with_meta(ingredient)
+    for data, meta in usda_manager.get_many_with_meta(ingredients):
         nutrient_data.append(data)
         ingredient_meta.append(meta)
 
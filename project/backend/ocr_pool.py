@@ -0,0 +1,268 @@
+"""
+OCR Worker Pool
+===============
+
+Runs ``backend.ocr_scanner.extract_text`` (OpenCV preprocessing plus a
+blocking Tesseract subprocess) in a bounded process pool, so a report upload
+no longer stalls the eventlet hub that serves every other client of the
+server, and concurrent uploads are scanned on separate cores.
+
+    from backend.ocr_pool import ocr_pool
+
+    text = ocr_pool.extract_text(path, medical_report_mode=True)
+    text = ocr_pool.extract_text(upload_bytes, filename="scan.pdf", medical_report_mode=True)
+
+``extract_text`` blocks the calling thread until the scan is done. Request
+handlers call it through ``run_in_threadpool`` so the greenlet yields while
+an OS thread waits on the job.
+
+Limits (environment):
+  - ``OCR_WORKERS``: worker processes (default min(4, CPU count)).
+  - ``OCR_MAX_PENDING``: jobs queued or running at once (default 4 per
+    worker). Beyond that ``OCRQueueFull`` is raised immediately and the
+    route answers 503, instead of letting uploads pile up behind each other.
+  - ``OCR_JOB_TIMEOUT_S``: seconds a job may take from submission (default
+    60). The caller gets ``OCRTimeout``; the worker gets the same absolute
+    deadline, so a job that waited in the queue past it is dropped without
+    being scanned, and one that started late only gets the time left for the
+    scan (heavier-preprocessing retries included). Tesseract is killed when
+    it is spent, so a stuck scan frees its worker.
+  - ``PDF_OCR_WORKERS``: page threads per scanned PDF; inside a worker
+    capped to CPU count / ``OCR_WORKERS``, and each Tesseract run is limited
+    to one OpenMP thread (``OMP_THREAD_LIMIT``), so the pool does not start
+    more Tesseract threads than there are cores.
+  - ``OCR_MIN_PARAMETERS``: a medical report image whose text yields fewer
+    parameters than this (default 3) is OCR'd again with heavier
+    preprocessing (see ``ocr_scanner.choose_profile``).
+
+Workers are forked, so ``server.py`` calls ``ocr_pool.start()`` at startup,
+from the main thread before the scheduler, tpool and model-server threads
+exist. A pool replaced after a worker crash is forked from the request
+thread that noticed it; that restart path keeps the usual risk of forking a
+multi-threaded process, and only follows a crash.
+
+``stats()`` reports the queue depth, in-flight jobs, totals and p50/p99 of
+queue wait and scan time.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.environ.get("OCR_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+DEFAULT_MAX_PENDING = int(os.environ.get("OCR_MAX_PENDING", "0")) or 4 * DEFAULT_WORKERS
+DEFAULT_JOB_TIMEOUT_S = float(os.environ.get("OCR_JOB_TIMEOUT_S", "60"))
+# Medical report images are OCR'd again with heavier preprocessing while the
+# parser finds fewer parameters than this in the text
+MIN_REPORT_PARAMETERS = int(os.environ.get("OCR_MIN_PARAMETERS", "3"))
+# Timing samples kept for the p50/p99 figures in stats()
+LATENCY_WINDOW = 1024
+
+
+class OCRQueueFull(RuntimeError):
+    """Too many OCR jobs are already queued or running; retry later."""
+
+
+class OCRTimeout(TimeoutError):
+    """An OCR job did not finish within its timeout."""
+
+
+def _report_parameter_count(text: str) -> int:
+    from backend.report_parser import extract_parameters
+    return len(extract_parameters(text))
+
+
+def _ocr_job(source, filename: Optional[str], medical_report_mode: bool, lang: str,
+             timeout: float) -> Tuple[str, float, float]:
+    """Worker entry point: ``(text, started_at, finished_at)`` (wall clock)."""
+    started = time.time()
+    from backend.ocr_scanner import extract_text
+    text = extract_text(
+        source, filename=filename, medical_report_mode=medical_report_mode, lang=lang, timeout=timeout,
+        score=_report_parameter_count if medical_report_mode else None, min_score=MIN_REPORT_PARAMETERS,
+    )
+    return text, started, time.time()
+
+
+def _run_before_deadline(job: Callable[..., Tuple[str, float, float]], deadline: Optional[float],
+                         source, filename: Optional[str], medical_report_mode: bool,
+                         lang: str) -> Tuple[str, float, float]:
+    """
+    Run *job* with the time left until *deadline* (``time.time()``; None
+    means no limit). A job still queued at its deadline has already been
+    given up by its caller, so it is dropped instead of taking a worker.
+    """
+    timeout = 0.0
+    if deadline is not None:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            raise OCRTimeout("OCR job expired in the queue before it started")
+    return job(source, filename, medical_report_mode, lang, timeout)
+
+
+def init_ocr_worker(pool_workers: int):
+    """Pool initializer: Tesseract thread and PDF page-thread limits for this worker."""
+    from backend.ocr_scanner import configure_worker
+    configure_worker(pool_workers)
+
+
+def _mp_context():
+    # fork where available, as in backend.report_batch: forkserver cannot
+    # start once eventlet has patched the socket module, and spawn would
+    # re-import server.py in every worker.
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context("spawn")
+
+
+def _percentile(samples, q: float) -> Optional[float]:
+    if not samples:
+        return None
+    return round(float(np.percentile(np.fromiter(samples, dtype=np.float64), q)), 2)
+
+
+class OCRPool:
+    """
+    Bounded process pool for OCR jobs.
+
+    Workers start with :meth:`start` (or on the first job) and are reused.
+    A worker that dies (e.g. a native crash in OpenCV) fails the jobs it
+    took down with it; the next job starts a fresh pool. *job* is the worker function, replaceable for
+    tests; it must be picklable by reference.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        timeout_s: float = DEFAULT_JOB_TIMEOUT_S,
+        job: Callable[..., Tuple[str, float, float]] = _ocr_job,
+    ):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.timeout_s = timeout_s
+        self._job = job
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "timeouts": 0, "rejected": 0}
+        self._wait_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self._ocr_ms: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context(),
+                                             initializer=init_ocr_worker, initargs=(self.workers,))
+        return self._pool
+
+    def start(self):
+        """Fork the workers now (a fork pool starts all of them on its first task)."""
+        with self._lock:
+            pool = self._get_pool()
+        pool.submit(os.getpid).result()
+
+    def _submit(self, *args):
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise OCRQueueFull(f"OCR queue is full ({self._in_flight} jobs pending)")
+            pool = self._get_pool()
+            future = pool.submit(_run_before_deadline, self._job, *args)
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+        future.add_done_callback(self._job_done)
+        return pool, future
+
+    def _job_done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def extract_text(
+        self,
+        source: Union[str, bytes],
+        *,
+        filename: Optional[str] = None,
+        medical_report_mode: bool = False,
+        lang: str = "eng",
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Same as :func:`backend.ocr_scanner.extract_text`, run in a worker.
+        *source* is a path or the upload's bytes (sent to the worker as is).
+
+        Raises
+        ------
+        OCRQueueFull
+            If ``max_pending`` jobs are already queued or running.
+        OCRTimeout
+            If the job did not finish within *timeout* seconds (default
+            ``timeout_s``) of being submitted.
+        """
+        timeout = self.timeout_s if timeout is None else timeout
+        submitted = time.time()
+        deadline = submitted + timeout if timeout else None
+        pool, future = self._submit(deadline, source, filename, medical_report_mode, lang)
+        try:
+            text, started, finished = future.result(timeout=timeout or None)
+        except (FutureTimeout, TimeoutError):
+            future.cancel()  # never runs; if a worker already took it, it is dropped there
+            self._count("timeouts")
+            raise OCRTimeout(f"OCR did not finish within {timeout:g}s") from None
+        except BrokenProcessPool:
+            self._count("failed")
+            self._discard(pool)
+            raise RuntimeError("OCR worker crashed while processing the report") from None
+        except Exception:
+            self._count("failed")
+            raise
+        with self._lock:
+            self._stats["completed"] += 1
+            self._wait_ms.append(max(0.0, started - submitted) * 1000)
+            self._ocr_ms.append((finished - started) * 1000)
+        return text
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        logger.warning("OCR_POOL | worker pool broke; starting a fresh one for the next job")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        """Stop the worker processes (they are restarted by the next job)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                workers=self.workers,
+                max_pending=self.max_pending,
+                timeout_s=self.timeout_s,
+                in_flight=self._in_flight,
+                queue_depth=max(0, self._in_flight - self.workers),
+                wait_p50_ms=_percentile(self._wait_ms, 50),
+                wait_p99_ms=_percentile(self._wait_ms, 99),
+                ocr_p50_ms=_percentile(self._ocr_ms, 50),
+                ocr_p99_ms=_percentile(self._ocr_ms, 99),
+            )
+
+
+ocr_pool = OCRPool()
@@ -9,6 +9,9 @@ imported from anywhere in the project for any text-extraction use case:
     from backend.ocr_scanner import extract_text_from_pdf
     from backend.ocr_scanner import extract_text
 
+Each accepts a file path, or an in-memory upload (bytes or a binary stream)
+that is decoded without touching the disk.
+
 This module is NOT coupled to any specific feature (diet, report analysis, etc.).
 It provides clean, general-purpose text extraction with optional image
 preprocessing optimized for document scanning (medical reports, receipts,
@@ -18,12 +21,17 @@ Dependencies:
     - pytesseract (+ Tesseract binary installed on the system)
     - Pillow (PIL)
     - opencv-python (cv2) — for advanced preprocessing
-    - pdfplumber / PyPDF2 — for PDF extraction (optional)
+    - pdfplumber / PyPDF2 — for PDF extraction (optional; pdfplumber also
+      rasterizes scanned PDF pages for OCR)
 """
 
+import io
 import os
 import logging
-from typing import Optional
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
 
 import numpy as np
 
@@ -108,13 +116,33 @@ IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif", ".webp"}
 PDF_EXTENSIONS = {".pdf"}
 SUPPORTED_EXTENSIONS = IMAGE_EXTENSIONS | PDF_EXTENSIONS
 
+# What the extractors accept: a file path, or an in-memory upload as bytes or
+# a binary stream (decoded from memory, never written to disk).
+Source = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, BinaryIO]
+
+
+def _resolve(source: Source, kind: str) -> Union[str, bytes]:
+    """The bytes of an in-memory upload, or the path of an existing file."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        return source.read()
+    path = os.fspath(source)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"{kind} not found: {path}")
+    return path
+
+
+def _label(source: Union[str, bytes]) -> str:
+    return source if isinstance(source, str) else f"<{len(source)}-byte upload>"
+
 
 # ===================================================================
 # IMAGE PREPROCESSING
 # ===================================================================
 
 def preprocess_image(
-    image_path: str,
+    image_path: Source,
     *,
     grayscale: bool = True,
     denoise: bool = True,
@@ -132,8 +160,9 @@ def preprocess_image(
 
     Parameters
     ----------
-    image_path : str
-        Absolute or relative path to the image file.
+    image_path : str, bytes or binary stream
+        Path to the image file, or the encoded image itself (decoded in
+        memory with ``cv2.imdecode``).
     grayscale : bool
         Convert to grayscale.
     denoise : bool
@@ -166,13 +195,66 @@ def preprocess_image(
             "Install it with: pip install opencv-python"
         )
 
-    if not os.path.isfile(image_path):
-        raise FileNotFoundError(f"Image not found: {image_path}")
-
-    # Read the image
-    img = cv2.imread(image_path)
+    return _preprocess_array(
+        _read_image(_resolve(image_path, "Image")),
+        grayscale=grayscale,
+        denoise=denoise,
+        threshold=threshold,
+        sharpen=sharpen,
+        resize_factor=resize_factor,
+        medical_report_mode=medical_report_mode,
+    )
+
+
+def _read_image(source: Union[str, bytes]) -> "np.ndarray":
+    """Decode an image file or in-memory upload to a BGR array."""
+    if isinstance(source, bytes):
+        img = cv2.imdecode(np.frombuffer(source, np.uint8), cv2.IMREAD_COLOR)
+    else:
+        img = cv2.imread(source)
     if img is None:
-        raise ValueError(f"Failed to read image (corrupt or unsupported format): {image_path}")
+        raise ValueError(f"Failed to read image (corrupt or unsupported format): {_label(source)}")
+    return img
+
+
+class _StageTimer:
+    """Adds the milliseconds since the previous lap to ``timings[stage]``."""
+
+    def __init__(self, timings: Optional[Dict[str, float]]):
+        self.timings = timings
+        self.last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        if self.timings is not None:
+            self.timings[stage] = self.timings.get(stage, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+
+def _preprocess_array(
+    img: "np.ndarray",
+    *,
+    grayscale: bool = True,
+    denoise: bool = True,
+    threshold: bool = True,
+    sharpen: bool = False,
+    resize_factor: Optional[float] = None,
+    medical_report_mode: bool = False,
+    clahe: Optional[bool] = None,
+    remove_lines: Optional[bool] = None,
+    adaptive_threshold: Optional[bool] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> "np.ndarray":
+    """
+    :func:`preprocess_image` on an already decoded BGR image.
+
+    *clahe*, *remove_lines* and *adaptive_threshold* default to
+    *medical_report_mode*; each stage's duration (ms) is added to *timings*.
+    """
+    clahe = medical_report_mode if clahe is None else clahe
+    remove_lines = medical_report_mode if remove_lines is None else remove_lines
+    adaptive_threshold = medical_report_mode if adaptive_threshold is None else adaptive_threshold
+    timer = _StageTimer(timings)
 
     # --- Resize (upscale small images for better OCR) ---
     h, w = img.shape[:2]
@@ -183,19 +265,23 @@ def preprocess_image(
         scale = 1500.0 / max(h, w)
         img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
         logger.debug("Auto-upscaled small image by factor %.2f", scale)
+    timer.lap("resize")
 
     # --- Grayscale conversion ---
     if grayscale and len(img.shape) == 3:
         img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        timer.lap("grayscale")
 
     # --- Medical report optimisations ---
-    if medical_report_mode:
+    if clahe and len(img.shape) == 2:
         # Boost contrast using CLAHE (useful for scanned documents)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        img = clahe.apply(img)
+        img = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(img)
+        timer.lap("clahe")
 
+    if remove_lines:
         # Remove horizontal and vertical lines (table borders)
         img = _remove_table_lines(img)
+        timer.lap("remove_lines")
 
     # --- Denoising ---
     if denoise:
@@ -204,10 +290,11 @@ def preprocess_image(
             img = cv2.fastNlMeansDenoising(img, h=10, templateWindowSize=7, searchWindowSize=21)
         else:
             img = cv2.fastNlMeansDenoisingColored(img, h=10, hForColorComponents=10)
+        timer.lap("denoise")
 
     # --- Thresholding / Binarisation ---
     if threshold and len(img.shape) == 2:
-        if medical_report_mode:
+        if adaptive_threshold:
             # Adaptive threshold works better for uneven lighting in scans
             img = cv2.adaptiveThreshold(
                 img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 15, 8
@@ -215,6 +302,7 @@ def preprocess_image(
         else:
             # Otsu's threshold for general documents
             _, img = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        timer.lap("threshold")
 
     # --- Sharpening ---
     if sharpen:
@@ -222,6 +310,7 @@ def preprocess_image(
                            [-1,  9, -1],
                            [-1, -1, -1]])
         img = cv2.filter2D(img, -1, kernel)
+        timer.lap("sharpen")
 
     return img
 
@@ -253,25 +342,205 @@ def _remove_table_lines(img: "np.ndarray") -> "np.ndarray":
     return result
 
 
+# ===================================================================
+# ADAPTIVE PREPROCESSING
+# ===================================================================
+
+# Profiles from cheapest to heaviest. Every profile upscales small images
+# and binarises; "standard" adds CLAHE, adaptive thresholding and (for
+# medical reports) table-line removal; "heavy" adds non-local-means
+# denoising, by far the slowest stage on large photos. "full" is the fixed
+# pipeline preprocess_image runs with its defaults.
+PREPROCESS_PROFILES = ("fast", "standard", "heavy")
+_PROFILE_OPTIONS: Dict[str, Dict[str, Any]] = {
+    "fast": dict(denoise=False, clahe=False, remove_lines=False, adaptive_threshold=False),
+    "standard": dict(denoise=False, clahe=True, adaptive_threshold=True),
+    "heavy": dict(denoise=True, clahe=True, adaptive_threshold=True),
+    "full": {},
+}
+
+# Quality thresholds for choose_profile (grey levels, 8-bit)
+NOISE_SIGMA_HEAVY = 6.0   # estimated noise sigma that calls for denoising
+SHARPNESS_SOFT = 0.003    # Laplacian variance / contrast^2 below this: blurry
+CONTRAST_LOW = 100.0      # 2nd-98th percentile spread below this: faint scan
+SHADING_UNEVEN = 60.0     # background brightness spread above this: shadows
+# Sharpness and noise are measured on a full-resolution centre crop of this
+# size, contrast and shading on a strided subsample of the whole image.
+ASSESS_MAX_SIDE = 800
+
+_NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+
+def assess_image(img: "np.ndarray") -> Dict[str, float]:
+    """
+    Cheap quality metrics for a BGR or grayscale image (~20 ms at 300 dpi).
+
+    Returns
+    -------
+    dict
+        ``sharpness`` (variance of the Laplacian over contrast squared; low =
+        blurry), ``noise`` (robust Immerkær estimate of the noise sigma),
+        ``contrast`` (2nd to 98th percentile spread) and ``shading`` (spread
+        of the coarse background brightness; high = shadows / uneven light).
+    """
+    h, w = img.shape[:2]
+    step = max(1, -(-max(h, w) // ASSESS_MAX_SIDE))
+    half = ASSESS_MAX_SIDE // 2
+    views = []
+    for view in (img[::step, ::step], img[max(0, h // 2 - half):h // 2 + half, max(0, w // 2 - half):w // 2 + half]):
+        views.append(cv2.cvtColor(view, cv2.COLOR_BGR2GRAY) if view.ndim == 3 else view)
+    small, crop = views
+
+    lo, hi = np.percentile(small, (2, 98))
+    coarse = cv2.resize(small, (16, 16), interpolation=cv2.INTER_AREA)
+    c_lo, c_hi = np.percentile(coarse, (10, 90))
+    c_range = np.percentile(crop, (2, 98))
+    sharpness = float(cv2.Laplacian(crop, cv2.CV_32F).var()) / max(float(c_range[1] - c_range[0]), 1.0) ** 2
+    # The kernel response to Gaussian noise has sigma 6x the noise; the
+    # median ignores the (sparse) text edges that dominate the mean.
+    response = np.abs(cv2.filter2D(crop.astype(np.float32), -1, _NOISE_KERNEL)[1:-1, 1:-1])
+    noise = float(1.4826 * np.median(response) / 6.0)
+    return {
+        "sharpness": round(sharpness, 4),
+        "noise": round(noise, 2),
+        "contrast": float(hi - lo),
+        "shading": float(c_hi - c_lo),
+    }
+
+
+def choose_profile(metrics: Dict[str, float]) -> str:
+    """Cheapest profile in PREPROCESS_PROFILES likely to give clean text."""
+    if metrics["noise"] >= NOISE_SIGMA_HEAVY:
+        return "heavy"
+    if (
+        metrics["sharpness"] < SHARPNESS_SOFT
+        or metrics["contrast"] < CONTRAST_LOW
+        or metrics["shading"] >= SHADING_UNEVEN
+    ):
+        return "standard"
+    return "fast"
+
+
+def _ocr_array(
+    img: "np.ndarray",
+    *,
+    profile: str,
+    medical_report_mode: bool,
+    lang: str,
+    config: str,
+    timeout: float,
+    source: str,
+    score: Optional[Callable[[str], float]] = None,
+    min_score: float = 0,
+    deadline: Optional[float] = None,
+) -> str:
+    """
+    Preprocess a decoded BGR image with *profile* and OCR it.
+
+    ``profile="auto"`` picks one with :func:`choose_profile`. When *score*
+    is given and the text scores below *min_score*, OCR is retried with each
+    heavier profile while that keeps raising the score; the best-scoring
+    text is returned. *timeout* (0 = none) is one deadline for the whole
+    image: each Tesseract call gets the time left and no retry starts once
+    it is spent. *deadline* (a ``time.monotonic()`` value) replaces it when
+    the image is part of a larger job, such as a page of a scanned PDF.
+    Stage timings are logged once per image.
+    """
+    timings: Dict[str, float] = {}
+    timer = _StageTimer(timings)
+    metrics = None
+    if profile == "auto":
+        metrics = assess_image(img)
+        profile = choose_profile(metrics)
+        timer.lap("assess")
+    if profile not in _PROFILE_OPTIONS:
+        raise ValueError(f"Unknown preprocessing profile '{profile}'")
+
+    candidates = [profile]
+    if score is not None and profile in PREPROCESS_PROFILES:
+        candidates = list(PREPROCESS_PROFILES[PREPROCESS_PROFILES.index(profile):])
+
+    if deadline is None and timeout > 0:
+        deadline = time.monotonic() + timeout
+    best_text, best_score, tried = "", None, []
+    for name in candidates:
+        if tried and deadline is not None and time.monotonic() >= deadline:
+            break  # retry budget spent; keep the best text so far
+        processed = _preprocess_array(
+            img, medical_report_mode=medical_report_mode, timings=timings, **_PROFILE_OPTIONS[name]
+        )
+        call_timeout = timeout
+        if deadline is not None:
+            left = deadline - time.monotonic()
+            if tried and left <= 0:
+                break
+            call_timeout = max(left, 0.01)  # pytesseract treats 0 as "no limit"
+        tried.append(name)
+        timer.last = time.perf_counter()
+        text = _tesseract(Image.fromarray(processed), lang=lang, config=config, timeout=call_timeout, source=source)
+        timer.lap("tesseract")
+        if score is None:
+            best_text = text
+            break
+        value = score(text)
+        timer.lap("score")
+        improved = best_score is None or value > best_score
+        if improved:
+            best_text, best_score = text, value
+        if value >= min_score or not improved:
+            break  # good enough, or the heavier profile did not help
+
+    logger.info(
+        "OCR | %s: profile %s%s in %.0f ms (%s)",
+        source,
+        " -> ".join(tried),
+        f" {metrics}" if metrics else "",
+        sum(timings.values()),
+        ", ".join(f"{stage} {ms:.0f}" for stage, ms in timings.items()),
+    )
+    return best_text
+
+
 # ===================================================================
 # TEXT EXTRACTION — IMAGES
 # ===================================================================
 
+def _tesseract(pil_img, *, lang: str, config: str, timeout: float, source: str) -> str:
+    """Run Tesseract on a PIL image; raises TimeoutError past *timeout*."""
+    try:
+        text = pytesseract.image_to_string(pil_img, lang=lang, config=config, timeout=timeout)
+    except RuntimeError as e:
+        # pytesseract kills the subprocess and raises this on timeout
+        if str(e) == "Tesseract process timeout":
+            raise TimeoutError(f"OCR timed out after {timeout:g}s: {source}") from e
+        raise
+    return text.strip()
+
+
 def extract_text_from_image(
-    image_path: str,
+    image_path: Source,
     *,
     preprocess: bool = True,
     medical_report_mode: bool = False,
     lang: str = "eng",
     config: str = "",
+    timeout: float = 0,
+    profile: str = "auto",
+    score: Optional[Callable[[str], float]] = None,
+    min_score: float = 0,
 ) -> str:
     """
     Extract text from an image file using Tesseract OCR.
 
+    Preprocessing is chosen per image: a quick quality estimate (blur,
+    noise, contrast, shading) picks the cheapest profile likely to give
+    clean text, see :func:`choose_profile`.
+
     Parameters
     ----------
-    image_path : str
-        Path to the image file (.jpg, .png, .bmp, .tiff, etc.).
+    image_path : str, bytes or binary stream
+        Path to the image file (.jpg, .png, .bmp, .tiff, etc.), or the
+        encoded image itself.
     preprocess : bool
         Whether to apply image preprocessing before OCR.
     medical_report_mode : bool
@@ -280,6 +549,18 @@ def extract_text_from_image(
         Tesseract language code (default: ``eng``).
     config : str
         Additional Tesseract config flags (e.g. ``--psm 6`` for table mode).
+    timeout : float
+        Seconds before the Tesseract subprocess is killed (0 = no limit).
+        With *score*, one budget for the first attempt and its retries.
+    profile : str
+        ``"auto"``, one of ``PREPROCESS_PROFILES``, or ``"full"`` (every
+        stage, as :func:`preprocess_image`).
+    score : callable or None
+        Rates the OCR text (e.g. number of parameters parsed from it). If
+        the text scores below *min_score*, OCR is retried with heavier
+        profiles and the best-scoring text is kept.
+    min_score : float
+        Score at which no retry is needed.
 
     Returns
     -------
@@ -292,14 +573,15 @@ def extract_text_from_image(
         If the image file does not exist.
     RuntimeError
         If pytesseract or Pillow is not available.
+    TimeoutError
+        If Tesseract ran longer than *timeout*.
     """
     if pytesseract is None:
         raise RuntimeError("pytesseract is required for OCR. pip install pytesseract")
     if Image is None:
         raise RuntimeError("Pillow is required for OCR. pip install Pillow")
 
-    if not os.path.isfile(image_path):
-        raise FileNotFoundError(f"Image not found: {image_path}")
+    source = _resolve(image_path, "Image")
 
     # Build Tesseract config — use PSM 6 (block of text) for medical reports
     ocr_config = config
@@ -309,15 +591,20 @@ def extract_text_from_image(
     try:
         if preprocess and cv2 is not None:
             # Use OpenCV preprocessing pipeline
-            processed = preprocess_image(
-                image_path,
+            return _ocr_array(
+                _read_image(source),
+                profile=profile,
                 medical_report_mode=medical_report_mode,
+                lang=lang,
+                config=ocr_config,
+                timeout=timeout,
+                source=_label(source),
+                score=score,
+                min_score=min_score,
             )
-            # Convert NumPy array to PIL Image for pytesseract
-            pil_img = Image.fromarray(processed)
         else:
             # Direct PIL open (basic fallback)
-            pil_img = Image.open(image_path)
+            pil_img = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
             # Basic Pillow preprocessing if OpenCV not available
             if preprocess:
                 pil_img = pil_img.convert("L")  # grayscale
@@ -325,11 +612,12 @@ def extract_text_from_image(
                 pil_img = enhancer.enhance(2.0)
                 pil_img = pil_img.filter(ImageFilter.SHARPEN)
 
-        text = pytesseract.image_to_string(pil_img, lang=lang, config=ocr_config)
-        return text.strip()
+        return _tesseract(pil_img, lang=lang, config=ocr_config, timeout=timeout, source=_label(source))
 
+    except TimeoutError:
+        raise
     except Exception as e:
-        logger.error("OCR extraction failed for '%s': %s", image_path, e)
+        logger.error("OCR extraction failed for '%s': %s", _label(source), e)
         return ""
 
 
@@ -337,57 +625,237 @@ def extract_text_from_image(
 # TEXT EXTRACTION — PDFs
 # ===================================================================
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """
-    Extract text from a PDF file.
+# A page whose text layer has fewer letters/digits than this is treated as
+# scanned (blank, or only a stamp / page number) and rasterized for OCR.
+MIN_TEXT_LAYER_CHARS = 20
+# Resolution scanned pages are rendered at for Tesseract
+PDF_OCR_DPI = 300
+# Scanned pages OCR'd at once. Tesseract runs as a subprocess and OpenCV
+# releases the GIL, so threads spread the pages over cores.
+PDF_OCR_WORKERS = int(os.environ.get("PDF_OCR_WORKERS", "0")) or min(4, os.cpu_count() or 1)
 
-    Uses pdfplumber as the primary extractor with PyPDF2 as fallback.
 
-    Parameters
-    ----------
-    pdf_path : str
-        Path to the PDF file.
+def worker_page_threads(page_threads: int, pool_workers: int, cpus: int) -> int:
+    """
+    PDF page threads for one of *pool_workers* OCR processes on *cpus* cores.
 
-    Returns
-    -------
-    str
-        Extracted text. Empty string on failure.
+    Inside a worker each Tesseract run is limited to one OpenMP thread,
+    where it would otherwise start one per core (up to 4). Two page threads
+    per core share of the pool therefore keep fewer Tesseract threads busy
+    than the unlimited runs did, and a scanned PDF still has at least two
+    pages in flight.
+    """
+    return max(1, min(page_threads, max(2, 2 * cpus // max(1, pool_workers))))
 
-    Raises
-    ------
-    FileNotFoundError
-        If the PDF file does not exist.
+
+def configure_worker(pool_workers: int):
     """
-    if not os.path.isfile(pdf_path):
-        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+    Limits for a process that OCRs side by side with *pool_workers* - 1
+    others (the ocr_pool and report_batch workers call this once at start):
+    one OpenMP thread per Tesseract run, and PDF page threads sized by
+    :func:`worker_page_threads`.
+    """
+    global PDF_OCR_WORKERS
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    PDF_OCR_WORKERS = worker_page_threads(PDF_OCR_WORKERS, pool_workers, os.cpu_count() or 1)
+
+
+def _has_text_layer(text: str) -> bool:
+    return sum(c.isalnum() for c in text) >= MIN_TEXT_LAYER_CHARS
 
+
+def _open_pdf(source: Union[str, bytes]):
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _pdf_text_layer(source: Union[str, bytes]) -> List[str]:
+    """Embedded text of every page (pdfplumber, else PyPDF2); [] if unreadable."""
+    pages: List[str] = []
     # --- Strategy 1: pdfplumber (best for tables / medical reports) ---
     if pdfplumber is not None:
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            with _open_pdf(source) as pdf:
                 pages = [page.extract_text() or "" for page in pdf.pages]
-                text = "\n".join(pages).strip()
-                if text:
-                    return text
+            if any(_has_text_layer(page) for page in pages):
+                return pages
         except Exception as e:
-            logger.warning("pdfplumber failed for '%s': %s", pdf_path, e)
+            logger.warning("pdfplumber failed for '%s': %s", _label(source), e)
 
     # --- Strategy 2: PyPDF2 fallback ---
     try:
         import PyPDF2  # type: ignore
-        with open(pdf_path, "rb") as f:
+        with (io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")) as f:
             reader = PyPDF2.PdfReader(f)
-            pages = [page.extract_text() or "" for page in reader.pages]
-            text = "\n".join(pages).strip()
-            if text:
-                return text
+            fallback = [page.extract_text() or "" for page in reader.pages]
+        if any(_has_text_layer(page) for page in fallback) or not pages:
+            return fallback
     except ImportError:
         logger.warning("PyPDF2 not installed; cannot extract text from PDF.")
     except Exception as e:
-        logger.warning("PyPDF2 failed for '%s': %s", pdf_path, e)
+        logger.warning("PyPDF2 failed for '%s': %s", _label(source), e)
+    return pages
+
+
+def _ocr_page(pil_img, *, profile: str, medical_report_mode: bool, lang: str, deadline: Optional[float],
+              source: str) -> str:
+    """OCR one rendered PDF page (same preprocessing as image uploads) by *deadline*."""
+    timeout = 0.0
+    if deadline is not None:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            logger.warning("OCR | %s: skipped, the scan's deadline has passed", source)
+            return ""
+    try:
+        config = "--psm 6" if medical_report_mode else ""
+        if cv2 is not None:
+            bgr = cv2.cvtColor(np.asarray(pil_img.convert("RGB")), cv2.COLOR_RGB2BGR)
+            return _ocr_array(
+                bgr, profile=profile, medical_report_mode=medical_report_mode,
+                lang=lang, config=config, timeout=timeout, source=source, deadline=deadline,
+            )
+        return _tesseract(pil_img, lang=lang, config=config, timeout=timeout, source=source)
+    except TimeoutError:
+        raise
+    except Exception as e:
+        logger.error("OCR extraction failed for '%s': %s", source, e)
+        return ""
+
+
+def _ocr_pdf_pages(
+    source: Union[str, bytes],
+    page_numbers: List[int],
+    *,
+    profile: str,
+    medical_report_mode: bool,
+    lang: str,
+    deadline: Optional[float],
+    max_workers: int,
+) -> Dict[int, str]:
+    """
+    Rasterize the given pages and OCR them concurrently, all by *deadline*
+    (``time.monotonic()``; None = no limit). Pages not started by then are
+    skipped.
+
+    Pages are rendered one at a time in the calling thread (the PDF renderer
+    is not thread-safe), and at most ``max_workers + 1`` rendered pages are
+    held in memory.
+    """
+    if pdfplumber is None:
+        logger.warning("pdfplumber not installed; cannot rasterize scanned PDF pages for OCR.")
+        return {}
+    results: Dict[int, str] = {}
+    pending: Dict[Any, int] = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-ocr")
 
-    logger.error("All PDF extraction strategies failed for '%s'", pdf_path)
-    return ""
+    def collect(done):
+        for future in done:
+            results[pending.pop(future)] = future.result()
+
+    try:
+        with _open_pdf(source) as pdf:
+            for number in page_numbers:
+                if len(pending) > max_workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED)[0])
+                if deadline is not None and time.monotonic() >= deadline:
+                    logger.warning("OCR | %s: deadline passed, %d page(s) not OCR'd", _label(source),
+                                   len(page_numbers) - page_numbers.index(number))
+                    break
+                label = f"{_label(source)} (page {number + 1})"
+                try:
+                    image = pdf.pages[number].to_image(resolution=PDF_OCR_DPI).original
+                except Exception as e:
+                    logger.error("Failed to rasterize '%s': %s", label, e)
+                    continue
+                pending[executor.submit(
+                    _ocr_page, image, profile=profile, medical_report_mode=medical_report_mode,
+                    lang=lang, deadline=deadline, source=label,
+                )] = number
+        collect(wait(pending)[0])
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def _ocr_available() -> bool:
+    return (
+        pytesseract is not None
+        and Image is not None
+        and shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+    )
+
+
+def extract_text_from_pdf(
+    pdf_path: Source,
+    *,
+    medical_report_mode: bool = False,
+    lang: str = "eng",
+    timeout: float = 0,
+    max_workers: Optional[int] = None,
+    profile: str = "auto",
+) -> str:
+    """
+    Extract text from a PDF file, page by page.
+
+    Each page's embedded text layer is used when it has one (pdfplumber,
+    with PyPDF2 as fallback). Pages without usable text (scans) are
+    rasterized and OCR'd in parallel, so a scanned multi-page report takes
+    about as long as its slowest page. Page texts are joined in page order.
+
+    Parameters
+    ----------
+    pdf_path : str, bytes or binary stream
+        Path to the PDF file, or the PDF itself (read from memory).
+    medical_report_mode : bool
+        Enable medical-report optimisations for OCR'd pages.
+    lang : str
+        Tesseract language code.
+    timeout : float
+        Seconds allowed for OCR of the whole PDF (0 = no limit): pages get
+        the time left, and pages not started by then are skipped.
+    max_workers : int or None
+        Pages OCR'd at once (default ``PDF_OCR_WORKERS``).
+    profile : str
+        Preprocessing profile for OCR'd pages (see
+        :func:`extract_text_from_image`).
+
+    Returns
+    -------
+    str
+        Extracted text. Empty string on failure.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the PDF file does not exist.
+    TimeoutError
+        If a page's Tesseract run was cut off at the deadline.
+    """
+    deadline = time.monotonic() + timeout if timeout > 0 else None
+    source = _resolve(pdf_path, "PDF")
+    pages = _pdf_text_layer(source)
+    scanned = [i for i, page in enumerate(pages) if not _has_text_layer(page)]
+    if scanned and _ocr_available():
+        ocr_texts = _ocr_pdf_pages(
+            source,
+            scanned,
+            profile=profile,
+            medical_report_mode=medical_report_mode,
+            lang=lang,
+            deadline=deadline,
+            max_workers=max(1, max_workers or PDF_OCR_WORKERS),
+        )
+        for number, text in ocr_texts.items():
+            if text:
+                pages[number] = text
+    elif scanned:
+        logger.warning("Tesseract unavailable; %d scanned page(s) of '%s' left without OCR", len(scanned), _label(source))
+
+    text = "\n".join(pages).strip()
+    if not text:
+        logger.error("All PDF extraction strategies failed for '%s'", _label(source))
+    else:
+        logger.debug("PDF '%s': %d page(s), %d OCR'd", _label(source), len(pages), len(scanned))
+    return text
 
 
 # ===================================================================
@@ -395,40 +863,67 @@ def extract_text_from_pdf(pdf_path: str) -> str:
 # ===================================================================
 
 def extract_text(
-    file_path: str,
+    file_path: Source,
     *,
+    filename: Optional[str] = None,
     medical_report_mode: bool = False,
     lang: str = "eng",
+    timeout: float = 0,
+    profile: str = "auto",
+    score: Optional[Callable[[str], float]] = None,
+    min_score: float = 0,
 ) -> str:
     """
     Auto-detect file type and extract text using the appropriate method.
 
     Parameters
     ----------
-    file_path : str
-        Path to the file (image or PDF).
+    file_path : str, bytes or binary stream
+        Path to the file (image or PDF), or an in-memory upload. Uploads
+        are decoded from memory; nothing is written to disk.
+    filename : str or None
+        Original name of an in-memory upload; its extension picks the file
+        type. Without it, uploads starting with ``%PDF-`` are read as PDFs
+        and anything else as an image.
     medical_report_mode : bool
         Enable medical-report optimisations for image OCR.
     lang : str
         Tesseract language code.
+    timeout : float
+        Seconds allowed for Tesseract per image / scanned PDF page (0 = no limit).
+    profile, score, min_score
+        Preprocessing profile and retry rule, see
+        :func:`extract_text_from_image`. Retries apply to images only: a
+        single PDF page is no measure of a whole report.
 
     Returns
     -------
     str
         Extracted text.
     """
-    if not os.path.isfile(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+    source = _resolve(file_path, "File")
 
-    ext = os.path.splitext(file_path)[1].lower()
+    ext = os.path.splitext(filename or (source if isinstance(source, str) else ""))[1].lower()
+    if not ext and isinstance(source, bytes):
+        ext = ".pdf" if source.lstrip()[:5] == b"%PDF-" else ".png"
 
     if ext in PDF_EXTENSIONS:
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(
+            source,
+            medical_report_mode=medical_report_mode,
+            lang=lang,
+            timeout=timeout,
+            profile=profile,
+        )
     elif ext in IMAGE_EXTENSIONS:
         return extract_text_from_image(
-            file_path,
+            source,
             medical_report_mode=medical_report_mode,
             lang=lang,
+            timeout=timeout,
+            profile=profile,
+            score=score,
+            min_score=min_score,
         )
     else:
         raise ValueError(
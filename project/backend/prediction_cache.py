@@ -0,0 +1,130 @@
+"""
+Prediction result cache.
+
+Bounded LRU + TTL cache of formatted prediction results. Keys are
+(model type, artifact hash, canonical feature vector), where the canonical
+vector is the exact row the model would see after FeatureSchema mapping, so
+'1', 1 and 'Yes' style variants of the same questionnaire share one entry.
+The artifact hash is the sha256 of the model's source files; it is only
+recomputed when a file's stat signature changes, so replacing a model file
+changes every key for that type and old entries are never served.
+
+Configured with PREDICTION_CACHE_SIZE (entries, default 4096, 0 disables)
+and PREDICTION_CACHE_TTL_SECONDS (default 600).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from backend.model_artifacts import file_sha256
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get('PREDICTION_CACHE_SIZE', '4096'))
+DEFAULT_TTL_SECONDS = float(os.environ.get('PREDICTION_CACHE_TTL_SECONDS', '600'))
+
+
+class ArtifactHashes:
+    """sha256 over a set of files, memoized per (inode, size, mtime) signature."""
+
+    def __init__(self):
+        self._memo: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def _file_hash(self, path: str) -> str:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 'missing'
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        memo = self._memo.get(path)
+        if memo is not None and memo[0] == signature:
+            return memo[1]
+        with self._lock:
+            digest = file_sha256(path)
+            self._memo[path] = (signature, digest)
+        return digest
+
+    def hash(self, paths: Sequence[str]) -> str:
+        return '|'.join(self._file_hash(p) for p in paths)
+
+
+class PredictionCache:
+    """
+    LRU cache with per-entry expiry.
+
+    Entries expire ttl_seconds after they were stored; expired entries are
+    dropped lazily on lookup and count as misses. max_entries <= 0 disables
+    the cache (get always misses, put is a no-op).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = float(ttl_seconds)
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, model_type: Optional[str] = None) -> int:
+        """Drop every entry (or only those whose key starts with model_type)."""
+        with self._lock:
+            if model_type is None:
+                stale = list(self._entries)
+            else:
+                stale = [k for k in self._entries if k[0] == model_type]
+            for k in stale:
+                del self._entries[k]
+            self._invalidations += len(stale)
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else None,
+                'expired': self._expired,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
@@ -0,0 +1,264 @@
+"""
+Batch Report Parsing
+====================
+
+Bulk entry point for the report parsing pipeline
+(``extract_parameters`` → ``detect_important_parameters`` →
+``get_clinical_summary``), used when hospitals send many lab reports at once.
+
+    from backend.report_batch import parse_reports
+
+    for result in parse_reports([{"id": "r1", "text": text}, {"id": "r2", "path": "scan.pdf"}]):
+        ...
+
+Reports are spread over one shared process pool (``REPORT_BATCH_WORKERS``,
+default min(4, CPU count)). It is sized once, by ``start_pool`` or the first
+batch, and never resized while batches use it; each batch's share of it is
+bounded by its own in-flight window. Reports given as a path are OCR'd in
+the worker with the OCR pool's ``OCR_JOB_TIMEOUT_S`` limit. Results are yielded per report **as they finish**, not
+in input order; each carries the input ``index`` and ``id``.
+
+Backpressure: at most ``REPORT_BATCH_MAX_IN_FLIGHT`` reports (default twice
+the worker count) are submitted at a time, and the input iterable is only
+advanced when a result has been handed to the consumer, so a slow reader
+(e.g. a streaming HTTP client) throttles the whole pipeline.
+
+Error isolation: a report that fails to parse (bad file, OCR error, parser
+exception) yields ``{"success": false, "error": ...}`` without affecting the
+others. If a worker process dies, the reports that were in flight are
+resubmitted once to a fresh pool; a report that breaks the pool twice is
+reported as failed.
+"""
+
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from backend.ocr_pool import DEFAULT_JOB_TIMEOUT_S, init_ocr_worker
+from backend.report_parser import (
+    detect_important_parameters,
+    extract_parameters,
+    get_clinical_summary,
+    get_important_parameters,
+    summarize_report,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.environ.get("REPORT_BATCH_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("REPORT_BATCH_MAX_IN_FLIGHT", "0")) or 2 * DEFAULT_WORKERS
+
+
+def parse_report_text(text: str) -> Dict[str, Any]:
+    """
+    Run the parsing pipeline on one report's text (in the calling process).
+
+    Returns
+    -------
+    dict
+        ``all_parameters``, ``important_parameters``, ``clinical_summary``,
+        ``report_summary`` and ``parameter_count``.
+    """
+    all_parameters = extract_parameters(text)
+    detect_important_parameters(all_parameters)
+    return {
+        "all_parameters": all_parameters,
+        "important_parameters": get_important_parameters(all_parameters),
+        "clinical_summary": get_clinical_summary(all_parameters),
+        "report_summary": summarize_report(all_parameters),
+        "parameter_count": len(all_parameters),
+    }
+
+
+def _parse_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker entry point: OCR (for ``path`` items) + parse, never raises."""
+    t0 = time.perf_counter()
+    result: Dict[str, Any] = {"index": item["index"], "id": item["id"]}
+    try:
+        text = item.get("text")
+        if text is None:
+            from backend.ocr_scanner import extract_text
+            text = extract_text(item["path"], medical_report_mode=True, timeout=DEFAULT_JOB_TIMEOUT_S)
+        if not text or not text.strip():
+            result.update(success=False, error="No text could be extracted from the report.")
+        else:
+            result.update(success=True, **parse_report_text(text))
+    except Exception as exc:
+        result.update(success=False, error=f"{type(exc).__name__}: {exc}")
+    result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return result
+
+
+def _normalize_item(index: int, item: Any) -> Dict[str, Any]:
+    if isinstance(item, str):
+        return {"index": index, "id": str(index), "text": item}
+    if isinstance(item, dict) and (isinstance(item.get("text"), str) or item.get("path")):
+        out = {"index": index, "id": str(item.get("id", index))}
+        if isinstance(item.get("text"), str):
+            out["text"] = item["text"]
+        else:
+            out["path"] = str(item["path"])
+        return out
+    raise ValueError("each report must be a string or an object with 'text' or 'path'")
+
+
+# ---------------------------------------------------------------------------
+# Process pool (shared by every batch in this process)
+# ---------------------------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    # fork where available: forkserver cannot start once eventlet has patched
+    # the socket module (the socketio server), and spawn would re-import
+    # server.py in every worker. Workers only run the pure-Python parser.
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context("spawn")
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The shared pool. *workers* only sizes a pool that does not exist yet:
+    other batches may be streaming from the current one, so a different
+    size never replaces it.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = _pool_workers or workers
+            # Reports given as a path are OCR'd in the worker: same limits as the OCR pool
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=_mp_context(),
+                                        initializer=init_ocr_worker, initargs=(_pool_workers,))
+        return _pool
+
+
+def start_pool(workers: Optional[int] = None):
+    """
+    Fork the shared pool's workers now. server.py calls this at startup,
+    before other threads exist; a pool rebuilt after a worker crash keeps
+    the same size and is forked from the calling thread.
+    """
+    workers = max(1, workers or DEFAULT_WORKERS)
+    if workers > 1:  # one worker parses in the calling process
+        _get_pool(workers).submit(os.getpid).result()
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """Stop the worker processes (they are restarted, and sized again, on the next batch)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        pool, _pool = _pool, None
+        _pool_workers = 0
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_reports(
+    reports: Iterable[Any],
+    max_workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parse many reports in a process pool, yielding each result as it finishes.
+
+    Parameters
+    ----------
+    reports : iterable
+        Report texts, or dicts with ``text`` (or ``path`` to an image / PDF
+        to OCR first) and an optional ``id``. Consumed lazily.
+    max_workers : int, optional
+        Workers for this batch (default ``REPORT_BATCH_WORKERS``); sizes the
+        shared pool only if none is running. ``1`` parses in the calling
+        process.
+    max_in_flight : int, optional
+        Reports submitted but not yet yielded (default
+        ``REPORT_BATCH_MAX_IN_FLIGHT``, or twice *max_workers*): this
+        batch's share of the shared pool.
+
+    Yields
+    ------
+    dict
+        ``{"index", "id", "success", "elapsed_ms", ...}`` plus the fields of
+        :func:`parse_report_text` on success or ``error`` on failure.
+    """
+    workers = max(1, max_workers or DEFAULT_WORKERS)
+    limit = max(1, max_in_flight or (DEFAULT_MAX_IN_FLIGHT if max_workers is None else 2 * workers))
+
+    def items():
+        for index, raw in enumerate(reports):
+            try:
+                yield _normalize_item(index, raw)
+            except ValueError as exc:
+                yield {"index": index, "id": str(index), "error": str(exc)}
+
+    if workers == 1:
+        for item in items():
+            yield dict(item, success=False) if "error" in item else _parse_item(item)
+        return
+
+    source = items()
+    pool = _get_pool(workers)
+    in_flight: Dict[Any, Dict[str, Any]] = {}
+    retried = set()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(in_flight) < limit:
+                item = next(source, None)
+                if item is None:
+                    exhausted = True
+                elif "error" in item:
+                    yield dict(item, success=False)
+                else:
+                    in_flight[pool.submit(_parse_item, item)] = item
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = []
+            for future in done:
+                item = in_flight.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    broken.append(item)
+                except Exception as exc:
+                    yield {"index": item["index"], "id": item["id"], "success": False,
+                           "error": f"{type(exc).__name__}: {exc}"}
+
+            if broken:
+                # Everything still in flight died with the worker: start a fresh
+                # pool and give each of those reports one more attempt.
+                logger.warning("REPORT_BATCH | worker pool broke; retrying %d report(s)", len(broken) + len(in_flight))
+                broken += list(in_flight.values())
+                in_flight.clear()
+                _discard_pool(pool)
+                pool = _get_pool(workers)
+                for item in sorted(broken, key=lambda i: i["index"]):
+                    if item["index"] in retried:
+                        yield {"index": item["index"], "id": item["id"], "success": False,
+                               "error": "Report crashed the parsing worker."}
+                    else:
+                        retried.add(item["index"])
+                        in_flight[pool.submit(_parse_item, item)] = item
+    finally:
+        # Consumer went away (e.g. client disconnected): drop queued work
+        for future in in_flight:
+            future.cancel()
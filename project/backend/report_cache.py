@@ -0,0 +1,190 @@
+"""
+Report OCR / parse result cache.
+
+Persistent (SQLite) cache of what an uploaded report turned into: the OCR
+text and the parameters extract_parameters found in it. Keys are the sha256
+of the uploaded bytes plus the OCR options, so re-uploading the same PDF or
+photo skips both OCR and parsing.
+
+Each entry also records the OCR and parser versions it was produced with:
+the sha256 of backend/ocr_scanner.py and backend/ocr_pool.py (which picks the
+OCR retry threshold), and of backend/report_parser.py (memoized per stat
+signature, see prediction_cache.ArtifactHashes). A change to the
+OCR code invalidates the entry; a change to the parser only invalidates the
+stored parameters, and the cached text is re-parsed.
+
+Entries are evicted least recently used first once their total size passes
+REPORT_CACHE_MAX_MB (default 64, 0 disables). The file lives at
+REPORT_CACHE_PATH (default backend/cache/report_cache.sqlite3) and is shared
+by every server process.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from backend.prediction_cache import ArtifactHashes
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.environ.get('REPORT_CACHE_PATH') or os.path.join(_BACKEND_DIR, 'cache', 'report_cache.sqlite3')
+DEFAULT_MAX_BYTES = int(float(os.environ.get('REPORT_CACHE_MAX_MB', '64')) * 1024 * 1024)
+OCR_SOURCES = (os.path.join(_BACKEND_DIR, 'ocr_scanner.py'), os.path.join(_BACKEND_DIR, 'ocr_pool.py'))
+PARSER_SOURCES = (os.path.join(_BACKEND_DIR, 'report_parser.py'),)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    key TEXT PRIMARY KEY,
+    ocr_version TEXT NOT NULL,
+    text TEXT NOT NULL,
+    parser_version TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_last_used ON reports (last_used);
+"""
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ReportCache:
+    """
+    Size-bounded LRU cache of (OCR text, parsed parameters) per upload.
+
+    get() returns (text, parameters) on a full hit, (text, None) when only
+    the parser changed since the entry was stored, and None on a miss.
+    SQLite errors are logged and treated as misses, so a broken cache file
+    never fails an upload. max_bytes <= 0 disables the cache.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ocr_sources: Sequence[str] = OCR_SOURCES, parser_sources: Sequence[str] = PARSER_SOURCES):
+        self.path = path
+        self.max_bytes = int(max_bytes)
+        self._ocr_sources = tuple(ocr_sources)
+        self._parser_sources = tuple(parser_sources)
+        self._hashes = ArtifactHashes()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._text_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(digest: str, **options: Any) -> str:
+        """Cache key for uploaded bytes with this digest OCR'd with these options."""
+        return f"{digest}:{json.dumps(options, sort_keys=True)}"
+
+    def versions(self) -> Tuple[str, str]:
+        """(OCR version, parser version) of the code currently on disk."""
+        return self._hashes.hash(self._ocr_sources), self._hashes.hash(self._parser_sources)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        if not self.enabled:
+            return None
+        ocr_version, parser_version = self.versions()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT ocr_version, text, parser_version, parameters FROM reports WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None or row[0] != ocr_version:
+                    self._misses += 1
+                    return None
+                conn.execute('UPDATE reports SET last_used = ? WHERE key = ?', (time.time(), key))
+            except sqlite3.Error as exc:
+                self._errors += 1
+                logger.warning("REPORT_CACHE | lookup failed: %s", exc)
+                return None
+            if row[2] != parser_version:
+                self._text_hits += 1
+                return row[1], None
+            self._hits += 1
+        return row[1], json.loads(row[3])
+
+    def put(self, key: str, text: str, parameters: Dict[str, Any]):
+        if not self.enabled:
+            return
+        ocr_version, parser_version = self.versions()
+        encoded = json.dumps(parameters)
+        size = len(key) + len(text.encode('utf-8')) + len(encoded)
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, ocr_version, text, parser_version, encoded, size, time.time()),
+                )
+                self._evict(conn)
+            except sqlite3.Error as exc:
+                self._errors += 1
+                logger.warning("REPORT_CACHE | store failed: %s", exc)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM reports').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute('SELECT key, size FROM reports ORDER BY last_used'):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM reports WHERE key = ?', stale)
+        self._evictions += len(stale)
+
+    def clear(self) -> int:
+        """Drop every entry."""
+        with self._lock:
+            return self._connect().execute('DELETE FROM reports').rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = size = None
+            if self.enabled:
+                try:
+                    entries, size = self._connect().execute(
+                        'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM reports').fetchone()
+                except sqlite3.Error as exc:
+                    logger.warning("REPORT_CACHE | stats failed: %s", exc)
+            hits = self._hits + self._text_hits
+            lookups = hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'text_hits': self._text_hits,
+                'misses': self._misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else None,
+                'evictions': self._evictions,
+                'errors': self._errors,
+            }
+
+
+report_cache = ReportCache()
@@ -0,0 +1,240 @@
+"""
+Synthetic lab report corpus for the report parser.
+
+Deterministic (fixed seeds) so the same text is produced on every machine:
+
+  - alias_round_NN: one report per alias "round". Round r puts the r-th alias
+    of every PARAMETER_DB entry on its own line (a canonical is only
+    extracted once per report), so together the rounds cover every alias.
+    Line layouts rotate through tables, colon / pipe separated rows, "to"
+    ranges, name and value split over two lines, unicode dashes, OCR split
+    and comma decimals, and H / L / *H / *L / arrow flags.
+  - ocr_* and layout_*: focused cases for one artefact each.
+  - multipage_N: long multi-page reports for throughput.
+
+Golden outputs (parse_report, i.e. extract_parameters + parse_reference_ranges,
+for every case, stored with the case text) live in
+backend/data/report_parser_goldens.json.
+After an intentional parser change, regenerate them with
+    python -m backend.report_corpus --write-goldens
+and review the diff.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.report_parser import PARAMETER_DB, parse_report
+
+GOLDENS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'report_parser_goldens.json')
+
+_DASHES = ['–', '—', '−', '‒']
+_FLAGS = ['', '', 'H', 'L', 'High', 'Low', '*H', '*L', '↑', '↓']
+_UNITS = ['g/dL', 'mg/dL', 'U/L', 'mIU/L', 'cells/µL', 'million/µL', '%', 'fL', 'pg', 'mmol/L']
+_HEADER = [
+    'Patient Name : Mr. R. Sharma            Age/Sex : 54 Y / Male',
+    'Referred By : Dr. A. Mehta (MD Medicine)  Sample Collected : 12/03/2024 08:40',
+    'Lab No : 240312-0456   Registered : 12/03/2024   Reported : 12/03/2024 17:05',
+    '',
+    'Test Name                     Result      Unit        Bio. Ref. Interval',
+]
+_NOISE = [
+    'Method: Spectrophotometry / Automated cell counter',
+    'Note: Values outside the reference range are flagged. Please correlate clinically.',
+    'This report is electronically verified and does not require a signature.',
+    'Interpretation: elevated levels may be seen in acute inflammation, 40% protein-bound.',
+]
+_FOOTER = '*** End of Report ***   Page {page} of {pages}'
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if v == int(v) else str(v)
+
+
+def _sample(info: dict, rng: random.Random):
+    """(value, lo, hi) strings for a parameter, sometimes outside its range."""
+    lo = float(info.get('ref_min') or 0)
+    hi = float(info.get('ref_max') or lo + 10)
+    if hi >= 999:
+        hi = lo * 1.5 or 10.0
+    span = hi - lo or 1.0
+    value = rng.uniform(lo - 0.3 * span, hi + 0.3 * span)
+    value = max(value, 0.1)
+    digits = 0 if hi >= 100 else 1 if hi >= 5 else 2
+    return _fmt(round(value, digits)), _fmt(lo), _fmt(hi)
+
+
+def _row(name: str, value: str, lo: str, hi: str, unit: str, layout: int, rng: random.Random) -> List[str]:
+    flag = rng.choice(_FLAGS)
+    if layout == 0:
+        return [f"{name:<30}{value:<12}{unit:<12}{lo} - {hi}   {flag}".rstrip()]
+    if layout == 1:
+        return [f"{name}: {value} {unit} ({lo}-{hi}) {flag}".rstrip()]
+    if layout == 2:
+        return [f"{name} | {value} | {unit} | {lo} - {hi}"]
+    if layout == 3:
+        return [name, f"{value} {unit} {lo} - {hi}"]
+    if layout == 4:
+        return [f"{name}   {value} {unit}   {lo} to {hi}"]
+    if layout == 5:
+        return [f"{name}   {value}   {unit}   {lo}{rng.choice(_DASHES)}{hi}"]
+    if layout == 6:
+        return [f"{name}   {value.replace('.', ' . ')}   {unit}   {lo.replace('.', ' . ')} - {hi}"]
+    if layout == 7:
+        return [f"{name}   {value.replace('.', ',')}   {unit}   {lo.replace('.', ',')} - {hi.replace('.', ',')}"]
+    return [f"{name}   {value}{rng.choice(['*H', '*L', ' ↑', ' ↓', ' H', ' L'])}   {unit}   {lo}-{hi}"]
+
+
+_LAYOUTS = 9
+
+
+def _display_name(alias: str, rng: random.Random) -> str:
+    style = rng.random()
+    if len(alias) <= 4 or style < 0.3:
+        return alias.upper()
+    return alias.title() if style < 0.8 else alias
+
+
+def alias_round_reports() -> Dict[str, str]:
+    cases = {}
+    canons = list(PARAMETER_DB)
+    rounds = max(len(info['aliases']) for info in PARAMETER_DB.values())
+    for r in range(rounds):
+        rng = random.Random(1000 + r)
+        lines = list(_HEADER)
+        for i, canon in enumerate(canons):
+            info = PARAMETER_DB[canon]
+            if r >= len(info['aliases']):
+                continue
+            value, lo, hi = _sample(info, rng)
+            lines += _row(_display_name(info['aliases'][r], rng), value, lo, hi,
+                          info['unit'], (i + r) % _LAYOUTS, rng)
+            if rng.random() < 0.1:
+                lines.append(rng.choice(_NOISE))
+        lines += ['', _FOOTER.format(page=1, pages=1)]
+        cases[f'alias_round_{r:02d}'] = '\n'.join(lines)
+    return cases
+
+
+def artefact_reports() -> Dict[str, str]:
+    return {
+        'ocr_split_decimals': '\n'.join([
+            'Calcium Serum  8 . 9  mg/dL  8 . 4 - 10 . 2',
+            'Hemoglobin     11 . 2 g/dL   12 . 0 - 16 . 0  L',
+            'TSH            5 . 62 uIU/mL 0 . 4 - 4 . 0',
+        ]),
+        'ocr_comma_decimals': '\n'.join([
+            'Calcium Serum  8,9  mg/dL  8,4 - 10,2',
+            'Creatinine     1,45 mg/dL  0,6 - 1,2  H',
+            'Potassium      3,1  mEq/L  3,5 - 5,0',
+        ]),
+        'ocr_unicode_dashes': '\n'.join([
+            'Hemoglobin 13.1 g/dL 12.0–16.0',
+            'Glucose 162 mg/dL 70—140',
+            'Sodium 131 mEq/L 136−145',
+            'Urea 44 mg/dL 15‒40',
+            'Albumin 3.1 g/dL 3.5―5.5',
+        ]),
+        'ocr_flags': '\n'.join([
+            'Hemoglobin   10.2*L  g/dL  12.0 - 16.0',
+            'SGPT         88*H    U/L   7 - 56',
+            'Ferritin     410 ↑  ng/mL 12 - 300',
+            'Vitamin D    14 ↓   ng/mL 30 - 100',
+            'TSH          6.1     uIU/mL 0.4 - 4.0  H',
+            'Iron         40      ug/dL  60 - 170   L',
+            'Uric Acid    8.1     mg/dL  3.5 - 7.2  High',
+            'GGT          70 U/L  9 - 64  Abnormal',
+        ]),
+        'layout_multiline_split': '\n'.join([
+            'Fasting Blood Sugar',
+            '126 mg/dL 70 - 100',
+            'HbA1c',
+            '7.2 % 4.0 - 5.7',
+            'Vitamin B12',
+            'Serum Creatinine',
+            '1.1 mg/dL 0.6 - 1.2',
+        ]),
+        'layout_pipes_and_units': '\n'.join([
+            'Calcium Serum | 8.9 | mg/dL | 8.4 - 10.2',
+            'Calcium Serum   8.9  mg / dL   8.4-10.2',
+            'Platelet Count | 250000 | cells/µL | 150000 - 400000',
+            'Total WBC Count | 7.8 | thou/µL | 4.0 - 11.0',
+        ]),
+        'layout_prose_noise': '\n'.join([
+            'Vitamin D deficiency is common; 50% of adults have values below 30 ng/mL.',
+            'Albumin is 40% protein-bound and levels decreased in liver disease.',
+            'Hemoglobin 13.5 g/dL 12.0 - 16.0',
+            'Calcium values noted in range 8.4 to 10.2',
+        ]),
+    }
+
+
+def multipage_report(pages: int, seed: int = 7) -> str:
+    """A long report: `pages` pages of 24 random parameters each, mixed layouts."""
+    rng = random.Random(seed)
+    canons = list(PARAMETER_DB)
+    lines = []
+    for page in range(1, pages + 1):
+        lines += _HEADER
+        for canon in rng.sample(canons, min(len(canons), 24)):
+            info = PARAMETER_DB[canon]
+            value, lo, hi = _sample(info, rng)
+            lines += _row(_display_name(rng.choice(info['aliases']), rng), value, lo, hi,
+                          rng.choice(_UNITS + [info['unit']]), rng.randrange(_LAYOUTS), rng)
+            if rng.random() < 0.15:
+                lines.append(rng.choice(_NOISE))
+        lines += ['', _FOOTER.format(page=page, pages=pages), _NOISE[2], '']
+    return '\n'.join(lines)
+
+
+def corpus() -> Dict[str, str]:
+    """Every regression case, name -> report text."""
+    cases = alias_round_reports()
+    cases.update(artefact_reports())
+    cases['multipage_3'] = multipage_report(3)
+    return cases
+
+
+def parse_case(text: str) -> dict:
+    """Parser output for one case, in the JSON form stored in the goldens."""
+    parameters, ranges = parse_report(text)
+    return {'parameters': parameters, 'ranges': {k: list(v) for k, v in ranges.items()}}
+
+
+def load_goldens(path: str = GOLDENS_PATH) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_goldens(path: str = GOLDENS_PATH) -> dict:
+    goldens = {name: dict(text=text, **parse_case(text)) for name, text in corpus().items()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(goldens, f, indent=1, sort_keys=True, ensure_ascii=False)
+        f.write('\n')
+    return goldens
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--write-goldens', action='store_true', help=f'Regenerate {os.path.relpath(GOLDENS_PATH)}')
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    if args.write_goldens:
+        goldens = write_goldens()
+        print(f"[OK] Wrote {len(goldens)} golden cases to {GOLDENS_PATH}")
+    else:
+        goldens = load_goldens()
+        changed = [name for name, text in corpus().items()
+                   if name not in goldens or goldens[name]['text'] != text
+                   or {k: goldens[name][k] for k in ('parameters', 'ranges')} != parse_case(text)]
+        for name in changed:
+            print(f"[FAIL] {name}")
+        print(f"[{'FAIL' if changed else 'OK'}] {len(goldens) - len(changed)}/{len(goldens)} cases match the goldens")
+        sys.exit(1 if changed else 0)
@@ -0,0 +1,239 @@
+"""
+Asynchronous Report Analysis Jobs
+=================================
+
+Runs the report analysis pipeline outside the HTTP request that submitted
+it, so a slow OCR + diet generation no longer hits proxy timeouts:
+
+    from backend.report_jobs import report_jobs
+
+    job = report_jobs.submit(lambda progress: analyze(..., progress), room="user_42")
+    report_jobs.get(job["job_id"])   # poll: status, stage, progress, result
+
+The job function receives ``progress(stage, percent)``. Every call updates
+the job and emits ``report_job_progress`` over ``backend.extensions.socketio``
+to the job's room (the ``user_<id>`` rooms clients join with
+``join_medication_rooms``); completion emits ``report_job_done``. Events
+carry the job id and state only, never report content.
+
+Limits (environment):
+  - ``REPORT_JOB_WORKERS``: jobs running at once (default 4). Jobs run as
+    socketio background tasks (greenlets under eventlet) and wait on the
+    OCR pool cooperatively.
+  - ``REPORT_JOB_MAX_QUEUED``: jobs waiting for a worker (default 32);
+    beyond that ``JobQueueFull`` is raised.
+  - ``REPORT_JOB_TTL_S``: seconds a finished job's result is kept
+    (default 1800).
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.environ.get("REPORT_JOB_WORKERS", "4"))
+DEFAULT_MAX_QUEUED = int(os.environ.get("REPORT_JOB_MAX_QUEUED", "32"))
+DEFAULT_TTL_S = float(os.environ.get("REPORT_JOB_TTL_S", "1800"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueueFull(RuntimeError):
+    """Too many report jobs are already queued; retry later."""
+
+
+class JobFailed(Exception):
+    """A job failure to report as is: *message* and the HTTP status it maps to."""
+
+    def __init__(self, message: str, status: int = 500, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _socketio_spawn(fn: Callable, *args):
+    from backend.extensions import socketio
+    if socketio.server is not None:
+        socketio.start_background_task(fn, *args)
+    else:  # socketio not attached to an app (scripts, tests)
+        threading.Thread(target=fn, args=args, daemon=True).start()
+
+
+def _socketio_emit(event: str, payload: Dict[str, Any], room: str):
+    from backend.extensions import socketio
+    if socketio.server is not None:
+        socketio.emit(event, payload, to=room)
+
+
+class _Job:
+    __slots__ = ("id", "fn", "room", "status", "stage", "progress", "result", "error",
+                 "http_status", "created_at", "updated_at", "finished_at")
+
+    def __init__(self, fn: Callable, room: Optional[str], now: float):
+        self.id = uuid.uuid4().hex
+        self.fn = fn
+        self.room = room
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.progress = 0
+        self.result = None
+        self.error = None
+        self.http_status = None
+        self.created_at = self.updated_at = now
+        self.finished_at = None
+
+    def view(self, with_result: bool = True) -> Dict[str, Any]:
+        out = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        if self.status == FAILED:
+            out["error"] = self.error
+            out["http_status"] = self.http_status
+        elif self.status == DONE and with_result:
+            out["result"] = self.result
+        return out
+
+
+class ReportJobs:
+    """
+    Bounded job runner with pollable state and progress events.
+
+    At most *workers* jobs run at once; up to *max_queued* more wait in
+    submission order. Finished jobs are dropped *ttl_s* seconds after they
+    finish (lazily, on the next submit / get / stats). *spawn* starts a
+    runner and *emit* publishes an event; both default to socketio.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        ttl_s: float = DEFAULT_TTL_S,
+        spawn: Callable[..., None] = _socketio_spawn,
+        emit: Callable[[str, Dict[str, Any], str], None] = _socketio_emit,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.workers = max(1, workers)
+        self.max_queued = max(0, max_queued)
+        self.ttl_s = ttl_s
+        self._spawn = spawn
+        self._emit = emit
+        self._clock = clock
+        self._jobs: "OrderedDict[str, _Job]" = OrderedDict()
+        self._queue: deque = deque()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "done": 0, "failed": 0, "rejected": 0, "expired": 0}
+
+    def submit(self, fn: Callable[[Callable[[str, int], None]], Any], room: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Queue ``fn(progress)``; its return value becomes the job result.
+
+        Raises
+        ------
+        JobQueueFull
+            If every worker is busy and ``max_queued`` jobs are waiting.
+        """
+        with self._lock:
+            self._expire()
+            start = self._running < self.workers
+            if not start and len(self._queue) >= self.max_queued:
+                self._stats["rejected"] += 1
+                raise JobQueueFull(f"Report job queue is full ({len(self._queue)} jobs waiting)")
+            job = _Job(fn, room, self._clock())
+            self._jobs[job.id] = job
+            self._stats["submitted"] += 1
+            if start:
+                self._running += 1
+            else:
+                self._queue.append(job)
+            view = job.view()
+        if start:
+            self._spawn(self._run, job)
+        return view
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return job.view() if job is not None else None
+
+    def _expire(self):
+        if self.ttl_s <= 0:
+            return
+        cutoff = self._clock() - self.ttl_s
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in stale:
+            del self._jobs[job_id]
+        self._stats["expired"] += len(stale)
+
+    def _update(self, job: _Job, event: str, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = self._clock()
+            payload = job.view(with_result=False)
+        if job.room:
+            try:
+                self._emit(event, payload, job.room)
+            except Exception as exc:
+                logger.warning("REPORT_JOBS | emit %s failed: %s", event, exc)
+
+    def _run(self, job: Optional[_Job]):
+        # One runner per worker slot: after a job it takes the next queued
+        # one, so the number of runners never exceeds `workers`.
+        while job is not None:
+            self._execute(job)
+            with self._lock:
+                job = self._queue.popleft() if self._queue else None
+                if job is None:
+                    self._running -= 1
+
+    def _execute(self, job: _Job):
+        def progress(stage: str, percent: int):
+            self._update(job, "report_job_progress", stage=stage, progress=int(percent))
+
+        self._update(job, "report_job_progress", status=RUNNING, stage="started")
+        t0 = time.perf_counter()
+        try:
+            result = job.fn(progress)
+        except JobFailed as exc:
+            outcome = dict(status=FAILED, error=str(exc), http_status=exc.status)
+        except Exception as exc:
+            logger.exception("REPORT_JOBS | job %s crashed", job.id)
+            outcome = dict(status=FAILED, error=f"Report analysis failed: {exc}", http_status=500)
+        else:
+            outcome = dict(status=DONE, stage=DONE, progress=100, result=result)
+        job.fn = None
+        outcome["finished_at"] = self._clock()
+        with self._lock:
+            self._stats[outcome["status"]] += 1
+        logger.info("REPORT_JOBS | job %s %s in %.0f ms", job.id, outcome["status"], (time.perf_counter() - t0) * 1000)
+        self._update(job, "report_job_done", **outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            return dict(
+                self._stats,
+                workers=self.workers,
+                max_queued=self.max_queued,
+                ttl_s=self.ttl_s,
+                running=self._running,
+                queued=len(self._queue),
+                stored=len(self._jobs),
+            )
+
+
+report_jobs = ReportJobs()
@@ -24,6 +24,7 @@ No ML dependencies — pure regex + rule-based for reliability and speed.
 
 import re
 import logging
+import string
 from typing import Dict, List, Optional, Tuple, Any
 
 logger = logging.getLogger(__name__)
@@ -399,44 +400,124 @@ _SORTED_ALIASES: List[Tuple[str, str]] = sorted(
     _ALIAS_MAP.items(), key=lambda x: len(x[0]), reverse=True
 )
 
-# Status flag patterns found in medical reports
-_FLAG_PATTERNS = [
-    (re.compile(r"\bhigh\b", re.I), "High"),
-    (re.compile(r"\blow\b", re.I), "Low"),
-    (re.compile(r"\babnormal\b", re.I), "Abnormal"),
-    (re.compile(r"\bborderline\b", re.I), "Borderline"),
-    (re.compile(r"\bcritical\b", re.I), "Critical"),
-    # Single H/L at end of line — but NOT when part of a unit like U/L, g/dL, IU/L
-    (re.compile(r"(?<!/)\b[Hh]\s*$"), "High"),
-    (re.compile(r"(?<!/)\b[Ll]\s*$"), "Low"),
-    (re.compile(r"↑|⬆"), "High"),              # arrow up
-    (re.compile(r"↓|⬇"), "Low"),               # arrow down
-    (re.compile(r"\*\s*[Hh]"), "High"),         # *H pattern
-    (re.compile(r"\*\s*[Ll]"), "Low"),          # *L pattern
-]
+# Characters that may surround a short alias for it to count as a whole word
+# (besides whitespace and the start / end of the line)
+_ALIAS_LEFT_BOUNDARY = frozenset(",;:(/")
+_ALIAS_RIGHT_BOUNDARY = frozenset(",;:)/")
+# Aliases shorter than this must match at word boundaries ("hb" in "hba1c"
+# is not haemoglobin); longer ones also match as plain substrings because
+# OCR often glues punctuation to them.
+_ALIAS_MIN_SUBSTRING_LEN = 4
 
-# Regex: reference range pattern.
-# Handles all common dash variants (OCR often produces Unicode dashes):
-#   hyphen-minus -   en-dash –   em-dash —   Unicode minus −   figure dash ‒
-# Also handles "X to Y" text ranges.
-_RANGE_PATTERN = re.compile(
-    r"(\d+[\.,]?\d*)\s*[-\u2013\u2014\u2212\u2012\u2015]\s*(\d+[\.,]?\d*)"
-)
-_RANGE_TO_PATTERN = re.compile(
-    r"(\d+[\.,]?\d*)\s+to\s+(\d+[\.,]?\d*)", re.I
-)
 
-# Detects threshold boundaries like "< 2.50" or "> 10.0"
-_SINGLE_BOUNDARY_PATTERN = re.compile(
-    r"([<>]=?|less than|greater than)\s*(\d+[\.,]?\d*)", re.I
-)
+class _AliasAutomaton:
+    """
+    Aho-Corasick automaton over every alias in *_SORTED_ALIASES*.
+
+    Built once at import time as a complete DFA (failure links folded into
+    the per-state transition dicts), so one scan over a line reports every
+    alias occurrence, overlapping ones included. ``hits`` keeps the ones
+    that count (short aliases only at word boundaries); ``pick`` then takes
+    the earliest in *_SORTED_ALIASES* (longest first) whose canonical has
+    not been extracted yet. A line's hits do not depend on what has been
+    extracted, so they are computed once and re-picked as that changes.
+    """
 
-# Simple number finder
-_VALUE_NUMBER = re.compile(r"(\d+[\.,]?\d*)")
+    def __init__(self, aliases: List[Tuple[str, str]]):
+        self.aliases = aliases
+        self.lengths = [len(alias) for alias, _ in aliases]
+        self.canons = [canon for _, canon in aliases]
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for rank, (alias, _) in enumerate(aliases):
+            state = 0
+            for ch in alias:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(rank)
+
+        # Breadth-first, so a state's failure target is always finished first
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+                queue.append(nxt)
+            delta[state] = {**delta[fail[state]], **goto[state]}
+
+        self.delta = delta
+        self.outputs = [tuple(sorted(out)) if out else None for out in outputs]
+
+    def hits(self, lowered_line: str) -> List[int]:
+        """Ranks of every alias occurring in the line, lowest (longest) first."""
+        delta, outputs, lengths = self.delta, self.outputs, self.lengths
+        last = len(lowered_line) - 1
+        found = set()
+        state = 0
+        for end, ch in enumerate(lowered_line):
+            state = delta[state].get(ch, 0)
+            hits = outputs[state]
+            if hits is None:
+                continue
+            for rank in hits:
+                if rank in found:
+                    continue
+                length = lengths[rank]
+                if length < _ALIAS_MIN_SUBSTRING_LEN:
+                    start = end - length + 1
+                    if start > 0:
+                        before = lowered_line[start - 1]
+                        if not (before.isspace() or before in _ALIAS_LEFT_BOUNDARY):
+                            continue
+                    if end < last:
+                        after = lowered_line[end + 1]
+                        if not (after.isspace() or after in _ALIAS_RIGHT_BOUNDARY):
+                            continue
+                found.add(rank)
+        return sorted(found)
+
+    def pick(self, hits: List[int], already_found: set) -> Optional[Tuple[str, str]]:
+        """The best of *hits* whose canonical has not been extracted yet."""
+        for rank in hits:
+            if self.canons[rank] not in already_found:
+                return self.aliases[rank]
+        return None
 
-# Detects numbers used as prose percentages: "50% of…", "40% protein-bound"
-# → these are NEVER test result values and must be excluded everywhere.
-_PROSE_PCT_RE = re.compile(r"(\d+(?:[\.,]\d+)?)\s*%\s+[a-zA-Z]")
+    def best(self, lowered_line: str, already_found: set) -> Optional[Tuple[str, str]]:
+        return self.pick(self.hits(lowered_line), already_found)
+
+
+_ALIAS_AUTOMATON = _AliasAutomaton(_SORTED_ALIASES)
+_NOTHING_FOUND: frozenset = frozenset()
+
+# Status flags, in priority order: the first rule with a match in the text
+# after the value wins. Whole words (case-insensitive), then a lone H / L at
+# the end of the line (but NOT the L of U/L, g/dL, IU/L), arrows, and *H / *L.
+_FLAG_RULES = [
+    ("word", ("high",), "High"),
+    ("word", ("low",), "Low"),
+    ("word", ("abnormal",), "Abnormal"),
+    ("word", ("borderline",), "Borderline"),
+    ("word", ("critical",), "Critical"),
+    ("end", ("h",), "High"),
+    ("end", ("l",), "Low"),
+    ("arrow", ("↑", "⬆"), "High"),
+    ("arrow", ("↓", "⬇"), "Low"),
+    ("star", ("h",), "High"),
+    ("star", ("l",), "Low"),
+]
+_FLAG_RANKS = {
+    (kind, key): (rank, status)
+    for rank, (kind, keys, status) in enumerate(_FLAG_RULES) for key in keys
+}
 
 # Status flag words that legitimately appear after a unit (e.g. "14 U/L High")
 # These must NOT cause Step 0 to treat the unit as being in prose context.
@@ -449,9 +530,9 @@ _UNIT_FLAG_WORDS = {
 _PROSE_KEYWORDS = {"values", "levels", "noted", "seen", "reference", "noted", "range", "decreased", "increased"}
 
 
-# Unit patterns (covers most common medical units)
-_UNIT_PATTERN = re.compile(
-    r"(g/dL|g/dl|mg/dL|mg/dl|ng/mL|ng/ml|pg/mL|pg/ml|"
+# Unit alternatives (covers most common medical units), matched case-insensitively
+_UNIT_ALTERNATION = (
+    r"g/dL|g/dl|mg/dL|mg/dl|ng/mL|ng/ml|pg/mL|pg/ml|"
     r"µg/dL|µg/dl|ug/dL|ug/dl|"
     r"µIU/mL|µIU/ml|uIU/mL|uIU/ml|mIU/L|mIU/l|"
     r"U/L|u/l|IU/L|iu/l|U/mL|u/ml|"
@@ -462,10 +543,83 @@ _UNIT_PATTERN = re.compile(
     r"thou/µL|thou/ul|10\^3/ul|"
     r"mm/hr|mm/h|"
     r"fL|fl|pg|%"
-    r")",
-    re.IGNORECASE,
 )
 
+
+def _alternation_trie(words: List[str]) -> str:
+    """
+    Regex alternation over *words*, factored by common prefix
+    ("m(?:g/dl|mol/l|...)"), so the engine checks each character once
+    instead of trying every word in turn. Longer words win at the same
+    start, as in a longest-first alternation.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = ("(?:" + body + ")" if len(branches) == 1 else body) + "?"
+        return body
+
+    return build(trie)
+
+
+_UNIT_RE_SOURCE = "(?i:" + _alternation_trie(sorted({
+    unit.lower() for alt in _UNIT_ALTERNATION.split("|")
+    for unit in ((alt.replace("[³3]", "³"), alt.replace("[³3]", "3")) if "[" in alt else (alt.replace("\\^", "^"),))
+})) + ")"
+# Letters a unit can start with: only these need the "is a unit (or a
+# "less than" / "greater than" threshold) starting here?" lookahead while a
+# word is being consumed.
+_UNIT_LETTERS = "".join(sorted({
+    c for alt in _UNIT_ALTERNATION.split("|")
+    for c in (alt[0].lower(), alt[0].upper(), alt[0].casefold()) if c.isalpha()
+}))
+
+# Numbers as they appear in reports: "12", "12.5", "12,5", "12."
+_NUM = r"\d+[\.,]?\d*"
+
+# Line tokenizer. One left-to-right scan splits a line into typed tokens:
+#   range     "12.0 - 16.0" with any OCR dash variant
+#               (hyphen-minus -  en-dash –  em-dash —  minus −  figure dash ‒)
+#   range_to  "12 to 16"
+#   number    (a range / range_to is a number followed by its other end)
+#   bound     the operator of a threshold like "< 2.50" / "greater than 10"
+#   unit      g/dL, U/L, %, ...
+#   word      letters; stops where a unit or threshold starts, so
+#               "FLUID" -> FL + UID and "nitrogenless than 9" -> nitrogen + bound
+#   symbol    any other single character (*, |, arrows, ...)
+_BOUND = r"(?i:[<>]=?|less than|greater than)(?=\s*\d)"
+_TOKEN_RE = re.compile(
+    # (?=\S) first: whitespace between columns fails at once instead of
+    # trying every alternative
+    r"(?=\S)(?:"
+    r"(?P<unit_digit>(?=\d)" + _UNIT_RE_SOURCE + r")"
+    r"|(?P<number>" + _NUM + r")"
+    r"(?:\s*[-\u2013\u2014\u2212\u2012\u2015]\s*(?P<range>" + _NUM + r")|\s+(?i:to)\s+(?P<range_to>" + _NUM + r"))?"
+    r"|(?P<bound>" + _BOUND + r")"
+    r"|(?P<unit>" + _UNIT_RE_SOURCE + r")"
+    r"|(?P<word>(?:[^\W\d_" + _UNIT_LETTERS + r"]|(?!" + _UNIT_RE_SOURCE + "|" + _BOUND + r")["
+    + _UNIT_LETTERS + r"])+)"
+    r"|(?P<symbol>\S)"
+    r")"
+)
+_NUM_RE = re.compile(_NUM)
+# Every range token contains one of these
+_RANGE_DASH_RE = re.compile(r"[-\u2013\u2014\u2212\u2012\u2015]")
+# Where the first token holding a digit can start
+_FIRST_DIGIT_RE = re.compile(r"[xX]?\d")
+_RANGE_GROUPS = frozenset(("range", "range_to"))
+
+
 # Parameters that need special unit-aware value normalisation
 _UNIT_NORM_RULES = {
     # Platelets: labs may report as 250000 cells/µL but ref range is in lakh
@@ -563,28 +717,119 @@ def classify_parameter_status(
     return "Normal"
 
 
-def _detect_flag_in_context(context: str) -> Optional[str]:
-    """Detect a status flag (High/Low/Abnormal) in a text fragment."""
-    for pattern, status in _FLAG_PATTERNS:
-        if pattern.search(context):
-            return status
-    return None
+def _tokenize(text: str, pos: int = 0) -> List[tuple]:
+    """
+    Split ``text[pos:]`` into ``(kind, start, end, text, numbers)`` tokens
+    (positions index into *text*; whitespace is dropped).
+
+    *numbers* are the numeric strings the token carries: the value of a
+    number, both ends of a range, the digits of units like ``10^3/ul``.
+    """
+    tokens = []
+    for m in _TOKEN_RE.finditer(text, pos):
+        kind = m.lastgroup
+        tok = m.group()
+        if kind in _RANGE_GROUPS:
+            numbers = (m.group("number"), m.group(kind))
+        elif kind == "number":
+            numbers = (tok,)
+        elif kind == "unit_digit" or (kind == "unit" and tok[0] in "xX"):
+            kind = "unit"
+            numbers = tuple(_NUM_RE.findall(tok))
+        else:
+            numbers = ()
+        tokens.append((kind, m.start(), m.end(), tok, numbers))
+    return tokens
 
 
-def _build_boundary_re(alias: str) -> re.Pattern:
-    """Build a regex that matches *alias* at word boundaries."""
-    escaped = re.escape(alias)
-    return re.compile(
-        r"(?:^|(?<=[\s,;:(/]))" + escaped + r"(?=$|[\s,;:)/])",
-        re.IGNORECASE,
-    )
+class _ReportLine:
+    """
+    A stripped report line; its alias hits and tokens are computed at most
+    once.
+
+    Tokens are cached from the lowest position asked for. Every non-space
+    character starts a token and the tokenizer never looks behind, so the
+    cached tokens after *pos* are exactly those of ``text[pos:]`` unless one
+    of them straddles *pos*.
+    """
+
+    __slots__ = ("text", "lowered", "_hits", "_tokens", "_tokens_start")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lowered = text.lower()
+        self._hits = None
+        self._tokens = None
+        self._tokens_start = 0
+
+    def alias(self, already_found: set) -> Optional[Tuple[str, str]]:
+        """Same as ``_find_best_alias(self.lowered, already_found)``."""
+        if self._hits is None:
+            self._hits = _ALIAS_AUTOMATON.hits(self.lowered)
+        return _ALIAS_AUTOMATON.pick(self._hits, already_found)
+
+    def tokens_from(self, pos: int) -> List[tuple]:
+        """The tokens of ``text[pos:]``."""
+        tokens = self._tokens
+        if tokens is None or pos < self._tokens_start:
+            self._tokens, self._tokens_start = _tokenize(self.text, pos), pos
+            return self._tokens
+        for i, tok in enumerate(tokens):
+            if tok[2] > pos:
+                return tokens[i:] if tok[1] >= pos else _tokenize(self.text, pos)
+        return []
+
+
+def _report_line(seen: Dict[str, _ReportLine], text: str) -> _ReportLine:
+    line = seen.get(text)
+    if line is None:
+        line = seen[text] = _ReportLine(text)
+    return line
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _detect_flag(text: str, tokens: List[tuple], region_start: int) -> Optional[str]:
+    """
+    Detect a status flag (High/Low/Abnormal...) in ``text[region_start:]``.
+
+    *tokens* cover the end of *text*; those starting before *region_start*
+    are ignored. The highest-priority rule in *_FLAG_RULES* with a match wins.
+    """
+    best = None
+    last = len(tokens) - 1
+    for i, (kind, start, end, tok, _) in enumerate(tokens):
+        if start < region_start:
+            continue
+        if kind == "word":
+            # Whole words only: letters glued to digits or "_" do not count
+            if start > region_start and _is_word_char(text[start - 1]):
+                continue
+            if end < len(text) and _is_word_char(text[end]):
+                continue
+            key = ("word", tok.lower())
+            if i == last and len(tok) == 1 and (start == region_start or text[start - 1] != "/"):
+                key = ("end", tok.lower())
+        elif kind == "symbol" and tok == "*" and i < last:
+            key = ("star", tokens[i + 1][3][0].lower())
+        elif kind == "symbol":
+            key = ("arrow", tok)
+        else:
+            continue
+        found = _FLAG_RANKS.get(key)
+        if found is not None and (best is None or found < best):
+            best = found
+    return best[1] if best else None
 
 
 def _find_best_alias(lowered_line: str, already_found: set) -> Optional[Tuple[str, str]]:
     """
     Find the longest-matching alias in a line of text.
 
-    Iterates *_SORTED_ALIASES* (longest first) so that e.g.
+    Single pass of *_ALIAS_AUTOMATON*; the earliest alias in
+    *_SORTED_ALIASES* (longest first) wins so that e.g.
     "fasting blood sugar" wins over "blood sugar" or "glucose".
 
     Parameters
@@ -598,29 +843,12 @@ def _find_best_alias(lowered_line: str, already_found: set) -> Optional[Tuple[st
     -------
     (alias, canonical_name) or None
     """
-    for alias, canon in _SORTED_ALIASES:
-        if canon in already_found:
-            continue
+    return _ALIAS_AUTOMATON.best(lowered_line, already_found)
 
-        if alias not in lowered_line:
-            continue
-
-        # Enforce word-boundary match for ALL aliases
-        boundary_re = _build_boundary_re(alias)
-        if boundary_re.search(lowered_line):
-            return (alias, canon)
-
-        # For longer aliases (≥4 chars) also accept a simple substring
-        # because OCR may introduce punctuation artefacts
-        if len(alias) >= 4:
-            return (alias, canon)
-
-    return None
 
-
-def _collect_range_numbers(text: str) -> set:
+def _collect_range_numbers(tokens: List[tuple]) -> set:
     """
-    Collect ALL numbers that appear as part of reference ranges in *text*.
+    Collect ALL numbers that are part of reference ranges in *tokens*.
 
     For a range like ``3.5 - 7.2`` we collect:
         {'3.5', '7.2', '3', '7'}   (full decimal + truncated integer)
@@ -629,28 +857,43 @@ def _collect_range_numbers(text: str) -> set:
     value candidates.
     """
     blacklist: set = set()
-    for pattern in (_RANGE_PATTERN, _RANGE_TO_PATTERN):
-        for m in pattern.finditer(text):
-            for grp in (m.group(1), m.group(2)):
-                blacklist.add(grp)
-                # Also add the integer part so '3' from '3.5' is excluded
-                if '.' in grp:
-                    blacklist.add(grp.split('.')[0])
-    
-    # Handle single thresholds (e.g. < 2.50)
-    for m in _SINGLE_BOUNDARY_PATTERN.finditer(text):
-        val = m.group(2)
-        blacklist.add(val)
-        if '.' in val:
-            blacklist.add(val.split('.')[0])
-            
+    after_bound = False
+    for kind, _, _, _, numbers in tokens:
+        if kind in _RANGE_GROUPS:
+            bounds = numbers
+        elif after_bound and numbers:
+            # Single thresholds (e.g. < 2.50)
+            bounds = numbers[:1]
+        else:
+            bounds = ()
+        for grp in bounds:
+            blacklist.add(grp)
+            # Also add the integer part so '3' from '3.5' is excluded
+            if '.' in grp:
+                blacklist.add(grp.split('.')[0])
+        after_bound = kind == "bound"
     return blacklist
 
 
-def _extract_result_value(line: str, alias_end_pos: int) -> Optional[str]:
+def _prose_percentages(text: str, tokens: List[tuple]) -> set:
+    """Numbers used as prose percentages: "50% of…", "40% protein-bound"."""
+    found: set = set()
+    for i in range(1, len(tokens) - 1):
+        kind, _, end, tok, _ = tokens[i]
+        if kind != "unit" or tok != "%":
+            continue
+        before, after = tokens[i - 1], tokens[i + 1]
+        if (before[0] == "number" and before[3][-1].isdigit()
+                and after[1] > end and text[after[1]] in string.ascii_letters):
+            found.add(before[3])
+    return found
+
+
+def _extract_result_value(text: str, tokens: List[tuple], pos: int, is_calcium: bool) -> Optional[str]:
     """
-    Extract the *test result value* from a line, explicitly avoiding both
-    reference-range numbers and prose-percentage values.
+    Extract the *test result value* from ``text[pos:]`` (the part of the
+    line after the parameter name, tokenized as *tokens*), explicitly
+    avoiding both reference-range numbers and prose-percentage values.
 
     Medical report lines look like any of these:
         ``Hemoglobin   10.2   g/dL   12.0 - 16.0   Low``   (standard)
@@ -665,60 +908,60 @@ def _extract_result_value(line: str, alias_end_pos: int) -> Optional[str]:
     --------
     0. (Prose-pct filter) Identify numbers used as prose percentages
        (``50% of…``) — exclude them in every step below.
-    1. (Unit-anchored, highest priority) Iterate every unit match.
+    1. (Unit-anchored, highest priority) Iterate every unit token.
        Skip any unit whose following text starts with a lowercase prose word
        (not a known status flag), because that means this is prose
        (``50% of circulating…``) rather than a real measurement.
        For each valid unit, take the last non-blacklisted, non-prose number
        before it.
     2. Section-header gate: if there is no unit AND no reference-range
-       pattern, it is a label/header line → return None.
-    3. Strip ranges, scan remaining numbers (excluding prose values).
-    4. Fallback among all non-blacklisted, non-prose numbers.
+       token, it is a label/header line → return None.
+    3. First remaining number that is neither a range endpoint nor prose.
     """
-    post_alias = line[alias_end_pos:]
-
     # ── Blacklist: range-endpoint numbers ──────────────────────────────────
-    blacklisted = _collect_range_numbers(post_alias)
+    blacklisted = _collect_range_numbers(tokens)
 
     # ── Prose-percentage filter ─────────────────────────────────────────────
     # Detect numbers that appear as "50% of …" / "40% protein-bound" etc.
     # These are NEVER test result values (they're from interpretation text)
     # and must be excluded from all candidate sets.
-    prose_pcts: set = {m.group(1) for m in _PROSE_PCT_RE.finditer(post_alias)}
+    prose_pcts = _prose_percentages(text, tokens)
 
     # ── Step 0: Unit-anchored extraction (highest priority) ─────────────────
-    # Iterate through ALL unit occurrences in post_alias.
+    # Iterate through ALL unit tokens.
     # For each unit:
     #  - Skip it if the text right after the unit starts with a lowercase
     #    prose word that is NOT a known status flag (High/Low/Normal…).
     #    Example: "50% of circulating calcium" → after "%" = "of …" → SKIP
     #  - Otherwise take the last valid number appearing before that unit.
-    for unit_m in _UNIT_PATTERN.finditer(post_alias):
-        after_unit = post_alias[unit_m.end():].lstrip()
-        if after_unit:
-            first_word = after_unit.split()[0].lower()
+    has_unit = False
+    for i, (kind, _, _, _, _) in enumerate(tokens):
+        if kind != "unit":
+            continue
+        has_unit = True
+        if i + 1 < len(tokens):
+            after = tokens[i + 1][1]
             # Skip if followed by a prose word (not a status flag or digit)
-            if after_unit[0].islower() and first_word not in _UNIT_FLAG_WORDS:
+            if text[after].islower() and text[after:].split(None, 1)[0].lower() not in _UNIT_FLAG_WORDS:
                 continue   # e.g. "50% of …" — not a real measurement unit
-        pre_unit_text = post_alias[:unit_m.start()]
         # Try candidates from last to first (value is closest to unit)
-        for candidate in reversed(_VALUE_NUMBER.findall(pre_unit_text)):
-            if candidate not in blacklisted and candidate not in prose_pcts:
-                # Plausibility check for Calcium: Values > 25 are likely test codes
-                # or page numbers, not serum results (normal is ~9).
-                if "calcium" in line.lower() and float(candidate) > 25:
-                    continue
-                return candidate
-        # Candidate list exhausted for this unit — try the next unit match
+        for j in range(i - 1, -1, -1):
+            for candidate in reversed(tokens[j][4]):
+                if candidate not in blacklisted and candidate not in prose_pcts:
+                    # Plausibility check for Calcium: Values > 25 are likely test codes
+                    # or page numbers, not serum results (normal is ~9).
+                    if is_calcium and float(candidate) > 25:
+                        continue
+                    return candidate
+        # Candidate list exhausted for this unit — try the next unit token
 
     # ── Prose word gate ─────────────────────────────────────────────────────
     # If the line contains prose keywords like "noted in" or "reference range",
     # it's likely a footnote and not a result row.
-    lowered_post = post_alias.lower()
-    if any(word in lowered_post for word in _PROSE_KEYWORDS):
-        # But only if it doesn't look like a real result row (value + unit)
-        if not _UNIT_PATTERN.search(post_alias):
+    # But only if it doesn't look like a real result row (value + unit)
+    if not has_unit:
+        lowered_post = text[pos:].lower()
+        if any(word in lowered_post for word in _PROSE_KEYWORDS):
             return None
 
     # ── Section-header gate ─────────────────────────────────────────────────
@@ -726,158 +969,106 @@ def _extract_result_value(line: str, alias_end_pos: int) -> Optional[str]:
     # or a reference-range pattern.  Section/category headers have neither.
     # Without this gate the fallback steps would pick up incidental numbers
     # (test codes, page numbers, etc.) stored on header lines.
-    has_range = bool(
-        _RANGE_PATTERN.search(post_alias) or
-        _RANGE_TO_PATTERN.search(post_alias)
-    )
-    if not has_range:
+    if not any(tok[0] in _RANGE_GROUPS for tok in tokens):
         return None
 
-    # ── Step 2: strip range patterns, scan remaining numbers ────────────────
-    cleaned = _RANGE_PATTERN.sub("", post_alias)
-    cleaned = _RANGE_TO_PATTERN.sub("", cleaned)
-
-    for c in _VALUE_NUMBER.findall(cleaned):
-        if c not in blacklisted and c not in prose_pcts and c != '':
-            return c
-
-    # ── Step 3: fallback among all non-blacklisted, non-prose numbers ────────
-    for n in _VALUE_NUMBER.findall(post_alias):
-        if n not in blacklisted and n not in prose_pcts:
-            return n
+    # ── Step 2: first number that is not a range endpoint or prose ──────────
+    for tok in tokens:
+        for c in tok[4]:
+            if c not in blacklisted and c not in prose_pcts:
+                return c
 
     return None
 
 
-def parse_reference_ranges(report_text: str) -> Dict[str, Tuple[float, float]]:
-    """
-    Extract reference ranges from report text.
+def _clean_report_text(report_text: str) -> str:
+    """Line endings, unicode dashes and OCR decimals normalised for extraction."""
+    # Pre-clean the text: normalise different dash variants and line endings
+    # so the range patterns work consistently on all OCR outputs
+    clean_text = report_text.replace('\r\n', '\n').replace('\r', '\n')
+    # Normalise Unicode dash variants to plain hyphen for consistency
+    for dash_char in ['\u2013', '\u2014', '\u2212', '\u2012', '\u2015']:
+        clean_text = clean_text.replace(dash_char, '-')
 
-    Looks for patterns like:
-        ``"12.0 - 16.0"``
-        ``"(70-100)"``
-        ``"Ref: 4.0-11.0"``
+    # Fix OCR decimal artifacts (e.g. "8 . 9" -> "8.9")
+    return _normalize_ocr_decimals(clean_text)
 
-    Uses longest-alias-first matching so the correct parameter is identified.
 
-    Returns
-    -------
-    dict
-        Mapping of parameter canonical name → (ref_min, ref_max).
-        Only parameters whose ranges are found in the text are included.
-    """
+def _reference_ranges(report_text: str, seen: Dict[str, _ReportLine]) -> Dict[str, Tuple[float, float]]:
     ranges: Dict[str, Tuple[float, float]] = {}
 
-    for line in report_text.split("\n"):
-        lowered = line.lower().strip()
-        if not lowered:
+    for raw_line in report_text.split("\n"):
+        stripped = raw_line.strip()
+        first_digit = _FIRST_DIGIT_RE.search(stripped)
+        if first_digit is None or not _RANGE_DASH_RE.search(stripped):
             continue
+        line = _report_line(seen, stripped)
 
         # Identify which parameter this line is about (longest alias first)
-        match = _find_best_alias(lowered, set())
+        match = line.alias(_NOTHING_FOUND)
         if match is None:
             continue
         canon = match[1]
 
-        # Search for reference range pattern on this line
-        range_match = _RANGE_PATTERN.search(line)
-        if range_match:
-            try:
-                lo = float(range_match.group(1))
-                hi = float(range_match.group(2))
-                if lo <= hi:
-                    ranges[canon] = (lo, hi)
-            except ValueError:
-                pass
+        # First reference range on this line. Ranges start with a digit, so
+        # the scan can skip the parameter name (from "x" in case of x10³/µL)
+        for kind, _, _, _, numbers in line.tokens_from(first_digit.start()):
+            if kind == "range":
+                try:
+                    lo = float(numbers[0])
+                    hi = float(numbers[1])
+                    if lo <= hi:
+                        ranges[canon] = (lo, hi)
+                except ValueError:
+                    pass
+                break
 
     return ranges
 
 
-def extract_parameters(report_text: str) -> Dict[str, dict]:
-    """
-    Parse OCR-extracted medical report text and extract structured parameters.
-
-    Extraction strategy:
-    1. Split text into lines.
-    2. For each line, find the **longest** matching alias (prevents
-       "blood sugar" from stealing lines meant for "fasting blood sugar").
-    3. Extract the result value — separating it from reference range numbers
-       (``X - Y`` patterns are excluded from value candidates).
-    4. Auto-normalise units (e.g. Platelets 250000 → 2.5 lakh).
-    5. Detect status flags **after** the value, not in the whole line.
-    6. If no flag is found, classify based on reference range.
-
-    Parameters
-    ----------
-    report_text : str
-        The raw text extracted by OCR.
-
-    Returns
-    -------
-    dict
-        Structured parameter data::
-
-            {
-                "Hemoglobin": {
-                    "value": "10.2",
-                    "unit": "g/dL",
-                    "status": "Low",
-                    "ref_range": "12.0-16.0",
-                    "is_important": false
-                },
-                ...
-            }
-    """
+def _extract(report_text: str, seen: Dict[str, _ReportLine]) -> Dict[str, dict]:
     if not report_text or not report_text.strip():
         return {}
 
     results: Dict[str, dict] = {}
     found_canons: set = set()
 
-    # Pre-clean the text: normalise different dash variants and line endings
-    # so the range patterns work consistently on all OCR outputs
-    clean_text = report_text.replace('\r\n', '\n').replace('\r', '\n')
-    # Normalise Unicode dash variants to plain hyphen for consistency
-    for dash_char in ['\u2013', '\u2014', '\u2212', '\u2012', '\u2015']:
-        clean_text = clean_text.replace(dash_char, '-')
-
-    # Fix OCR decimal artifacts (e.g. "8 . 9" -> "8.9")
-    clean_text = _normalize_ocr_decimals(clean_text)
-
-    lines = clean_text.split("\n")
+    lines = _clean_report_text(report_text).split("\n")
 
-    for line_idx, line in enumerate(lines):
-        stripped = line.strip()
+    for line_idx, raw_line in enumerate(lines):
+        stripped = raw_line.strip()
         if not stripped or len(stripped) < 3:
             continue
-
-        lowered = stripped.lower()
+        line = _report_line(seen, stripped)
 
         # --- Find the best (longest) matching alias on this line ---
-        match = _find_best_alias(lowered, found_canons)
+        match = line.alias(found_canons)
         if match is None:
             continue
 
         alias, canon = match
 
         # Locate where the alias ends in the line
-        alias_start = lowered.index(alias)
+        alias_start = line.lowered.index(alias)
         alias_end = alias_start + len(alias)
+        tokens = line.tokens_from(alias_end)
 
         # --- Extract the result value (not a reference range number) ---
-        value_str = _extract_result_value(stripped, alias_end)
+        value_str = _extract_result_value(stripped, tokens, alias_end, "calcium" in line.lowered)
 
         # If no value found on the alias line, try next 1-2 lines.
         # OCR splitting is common: parameter name on one line, numbers below.
         if value_str is None and line_idx + 1 < len(lines):
-            next_line = lines[line_idx + 1].strip()
+            next_text = lines[line_idx + 1].strip()
             # Only use next line if it has no known alias (avoid stealing values)
-            if next_line and _find_best_alias(next_line.lower(), found_canons) is None:
-                value_str = _extract_result_value(next_line, 0)
-                if value_str is not None:
-                    # Merge lines for range & flag extraction below
-                    stripped = stripped + " " + next_line
-                    alias_end = alias_start + len(alias)  # unchanged
+            if next_text:
+                next_line = _report_line(seen, next_text)
+                if next_line.alias(found_canons) is None:
+                    value_str = _extract_result_value(next_text, next_line.tokens_from(0), 0, "calcium" in next_line.lowered)
+                    if value_str is not None:
+                        # Merge lines for range & flag extraction below
+                        stripped = stripped + " " + next_text
+                        tokens = _tokenize(stripped, alias_end)
 
         # DEBUG: log every matched line so OCR issues are visible in the console
         logger.debug("PARSER | canon=%-25s alias=%-20s raw_line=%r  value=%r",
@@ -894,9 +1085,8 @@ def extract_parameters(report_text: str) -> Dict[str, dict]:
             continue
 
         # --- Extract unit from the line ---
-        unit_match = _UNIT_PATTERN.search(stripped[alias_end:])
         db_info = PARAMETER_DB.get(canon, {})
-        unit = unit_match.group(1) if unit_match else db_info.get("unit", "")
+        unit = next((tok[3] for tok in tokens if tok[0] == "unit"), None) or db_info.get("unit", "")
 
         # --- Auto-normalise value if unit scale doesn't match ref range ---
         norm_rule = _UNIT_NORM_RULES.get(canon)
@@ -916,11 +1106,11 @@ def extract_parameters(report_text: str) -> Dict[str, dict]:
         ref_source = "none"
 
         # Strategy 1: Extract range from the current line (most reliable)
-        line_range_match = _RANGE_PATTERN.search(stripped[alias_end:])
-        if line_range_match:
+        line_range = next((tok[4] for tok in tokens if tok[0] == "range"), None)
+        if line_range:
             try:
-                rr_min = float(line_range_match.group(1))
-                rr_max = float(line_range_match.group(2))
+                rr_min = float(line_range[0])
+                rr_max = float(line_range[1])
                 if rr_min <= rr_max:
                     # If we normalised the value, also normalise the ranges
                     if value_was_normalised and norm_rule and norm_rule["check"](rr_min):
@@ -940,14 +1130,10 @@ def extract_parameters(report_text: str) -> Dict[str, dict]:
 
         # --- Detect status flag (only look AFTER the value position) ---
         # Find where the value appears in the post-alias text
-        post_value_text = stripped[alias_end:]
-        value_pos_in_post = post_value_text.find(value_str)
-        if value_pos_in_post >= 0:
-            flag_region = post_value_text[value_pos_in_post + len(value_str):]
-        else:
-            flag_region = post_value_text
+        value_pos = stripped.find(value_str, alias_end)
+        flag_start = value_pos + len(value_str) if value_pos >= 0 else alias_end
 
-        flag = _detect_flag_in_context(flag_region)
+        flag = _detect_flag(stripped, tokens, flag_start)
 
         # If no explicit flag, classify by reference range
         if flag is None:
@@ -974,6 +1160,78 @@ def extract_parameters(report_text: str) -> Dict[str, dict]:
     return results
 
 
+def parse_reference_ranges(report_text: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Extract reference ranges from report text.
+
+    Looks for patterns like:
+        ``"12.0 - 16.0"``
+        ``"(70-100)"``
+        ``"Ref: 4.0-11.0"``
+
+    Uses longest-alias-first matching so the correct parameter is identified.
+
+    Returns
+    -------
+    dict
+        Mapping of parameter canonical name → (ref_min, ref_max).
+        Only parameters whose ranges are found in the text are included.
+    """
+    return _reference_ranges(report_text, {})
+
+
+def extract_parameters(report_text: str) -> Dict[str, dict]:
+    """
+    Parse OCR-extracted medical report text and extract structured parameters.
+
+    Extraction strategy:
+    1. Split text into lines.
+    2. For each line, find the **longest** matching alias (prevents
+       "blood sugar" from stealing lines meant for "fasting blood sugar").
+    3. Tokenize the rest of the line once (numbers, ranges, units, words,
+       symbols) and take the result value from the tokens — separating it
+       from reference range numbers (``X - Y`` is a single range token).
+    4. Auto-normalise units (e.g. Platelets 250000 → 2.5 lakh).
+    5. Detect status flags **after** the value, not in the whole line.
+    6. If no flag is found, classify based on reference range.
+
+    Parameters
+    ----------
+    report_text : str
+        The raw text extracted by OCR.
+
+    Returns
+    -------
+    dict
+        Structured parameter data::
+
+            {
+                "Hemoglobin": {
+                    "value": "10.2",
+                    "unit": "g/dL",
+                    "status": "Low",
+                    "ref_range": "12.0-16.0",
+                    "is_important": false
+                },
+                ...
+            }
+    """
+    return _extract(report_text, {})
+
+
+def parse_report(report_text: str) -> Tuple[Dict[str, dict], Dict[str, Tuple[float, float]]]:
+    """
+    ``(extract_parameters(text), parse_reference_ranges(text))`` in one go.
+
+    Both walks share one alias scan and one tokenization per distinct line
+    (OCR cleanup leaves most lines unchanged, and headers repeat on every
+    page), so this costs little more than either function alone.
+    """
+    seen: Dict[str, _ReportLine] = {}
+    ranges = _reference_ranges(report_text, seen)
+    return _extract(report_text, seen), ranges
+
+
 def detect_important_parameters(
     parameters: Dict[str, dict],
 ) -> Dict[str, dict]:
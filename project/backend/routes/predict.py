@@ -5,16 +5,20 @@ import traceback
 from typing import Tuple, Any, Dict
 from flask import Blueprint, request, jsonify, current_app
 from backend.authorize_roles import authorize_roles
-import joblib
 import numpy as np
-import pandas as pd
 import pickle
 import json
-
-try:
-    import xgboost as xgb
-except ImportError:
-    xgb = None
+import functools
+from backend.inference_batcher import MicroBatcher
+from backend.model_registry import ModelRegistry
+from backend.model_server import ModelServerClient, ModelServerUnavailable
+from backend.prediction_cache import ArtifactHashes, PredictionCache
+from backend.feature_schema import FeatureSchema, FeatureValidationError
+from backend.model_artifacts import (
+    load_diabetes as load_flat_diabetes,
+    load_heart_disease as load_flat_heart_disease,
+    load_lung_cancer as load_flat_lung_cancer,
+)
 
 predict_bp = Blueprint('predict', __name__)
 
@@ -29,16 +33,28 @@ HEART_XGB_PATH = os.path.join(BASE_DIR, 'models', 'saved_models', 'xgb_heart.jso
 HEART_SCALER_PATH = os.path.join(BASE_DIR, 'models', 'saved_models', 'scaler.pkl')
 HEART_CONFIG_PATH = os.path.join(BASE_DIR, 'models', 'saved_models', 'feature_columns.json')
 
-lung_cancer_model = None
-lung_cancer_label_encoder = None
-lung_cancer_feature_names = None  # Store actual feature names from model
-diabetes_model = None
-diabetes_label_encoder = None
+# 'auto' uses memory-mapped flat artifacts (models/flat, see backend/model_artifacts.py)
+# when they exist and match their sources, 'native' always unpickles the originals.
+MODEL_ARTIFACT_MODE = os.environ.get('MODEL_ARTIFACT_MODE', 'auto').lower()
+
+# Resident models live in the registry (LRU under MODEL_RAM_BUDGET_MB) instead
+# of module globals, so mixed traffic no longer reloads pickles on every switch.
+model_registry = ModelRegistry()
+
+# Recent formatted results keyed by (type, artifact hash, canonical row);
+# hits are answered without touching the registry at all.
+prediction_cache = PredictionCache()
+artifact_hashes = ArtifactHashes()
 
-heart_xgb = None
-heart_scaler = None
-heart_threshold = 0.5
-heart_features = []
+# Coalesces concurrent single-row predictions into one thread-pool call
+# (active under the eventlet server, see backend/inference_batcher.py)
+inference_batcher = MicroBatcher()
+
+# Optional out-of-process model server (backend/model_server.py). When set,
+# bundles are thin remote handles and inference happens in the server process;
+# if it is unreachable, predictions fall back to the in-process registry.
+MODEL_SERVER_SOCKET = os.environ.get('MODEL_SERVER_SOCKET', '')
+model_server_client = ModelServerClient(MODEL_SERVER_SOCKET) if MODEL_SERVER_SOCKET else None
 
 # Define expected features for each model (fallback defaults)
 DIABETES_FEATURES = [
@@ -83,6 +99,9 @@ def _safe_joblib_load(path: str):
     """
     Attempt joblib.load(path) with fallback for missing modules.
     """
+    # Imported lazily: flat artifacts are served without unpickling anything
+    import joblib
+
     try:
         return joblib.load(path)
     except ModuleNotFoundError as mnfe:
@@ -99,352 +118,443 @@ def _safe_joblib_load(path: str):
                 pass
         raise
 
+def _load_flat_bundle(label: str, loader):
+    """Map a flat artifact unless MODEL_ARTIFACT_MODE=native; None means use the native model."""
+    if MODEL_ARTIFACT_MODE == 'native':
+        return None
+    try:
+        bundle = loader()
+    except Exception as e:
+        print(f"  [WARN] Could not map flat {label} artifact: {e}")
+        bundle = None
+    if bundle is not None:
+        print(f"  [OK] {label.capitalize()} model mapped from flat artifact")
+    elif MODEL_ARTIFACT_MODE == 'flat':
+        print(f"  [WARN] MODEL_ARTIFACT_MODE=flat but no fresh {label} artifact found; loading native model")
+    return bundle
+
+
+def _load_lung_cancer_bundle():
+    bundle = _load_flat_bundle('lung cancer', load_flat_lung_cancer)
+    if bundle is not None:
+        if not bundle['feature_names']:
+            bundle['feature_names'] = LUNG_CANCER_FEATURES
+        bundle['schema'] = FeatureSchema(bundle['feature_names'], required=True)
+        return bundle
+
+    if not os.path.exists(LUNG_CANCER_MODEL_PATH):
+        print(f"  [WARN] Lung cancer model not found: {LUNG_CANCER_MODEL_PATH}")
+        return None
+    try:
+        print(f"  Loading lung cancer model from {LUNG_CANCER_MODEL_PATH}")
+        model = _safe_joblib_load(LUNG_CANCER_MODEL_PATH)
+
+        if hasattr(model, 'feature_names_in_'):
+            feature_names = list(model.feature_names_in_)
+            # Rows are filled positionally by the compiled schema; drop the fitted
+            # names so sklearn does not warn about ndarray input on every call.
+            del model.feature_names_in_
+        else:
+            feature_names = LUNG_CANCER_FEATURES
+
+        label_encoder = None
+        if os.path.exists(LUNG_CANCER_LABEL_ENCODER_PATH):
+            label_encoder = _safe_joblib_load(LUNG_CANCER_LABEL_ENCODER_PATH)
+
+        print("  [OK] Lung cancer model loaded")
+        return {
+            'model': model,
+            'label_encoder': label_encoder,
+            'feature_names': feature_names,
+            'schema': FeatureSchema(feature_names, required=True),
+        }
+    except Exception as e:
+        print(f"  [FAIL] Failed to load lung cancer model: {e}")
+        return None
+
+
+def _load_diabetes_bundle():
+    bundle = _load_flat_bundle('diabetes', load_flat_diabetes)
+    if bundle is not None:
+        bundle['schema'] = FeatureSchema(DIABETES_FEATURES)
+        return bundle
+
+    if not os.path.exists(DIABETES_MODEL_PATH):
+        print(f"  [FAIL] Diabetes model not found: {DIABETES_MODEL_PATH}")
+        return None
+    try:
+        print(f"  Loading diabetes model from {DIABETES_MODEL_PATH}")
+        model = _safe_joblib_load(DIABETES_MODEL_PATH)
+
+        label_encoder = None
+        if os.path.exists(DIABETES_LABEL_ENCODER_PATH):
+            label_encoder = _safe_joblib_load(DIABETES_LABEL_ENCODER_PATH)
+
+        print("  [OK] Diabetes model loaded")
+        return {
+            'model': model,
+            'label_encoder': label_encoder,
+            'schema': FeatureSchema(DIABETES_FEATURES),
+        }
+    except Exception as e:
+        print(f"  [FAIL] Failed to load diabetes model: {e}")
+        traceback.print_exc()
+        return None
+
+
+def _load_heart_disease_bundle():
+    bundle = _load_flat_bundle('heart disease', load_flat_heart_disease)
+    if bundle is not None:
+        bundle['schema'] = FeatureSchema(bundle['features'])
+        return bundle
+
+    # Imported lazily: the flat artifact path does not need xgboost at all
+    try:
+        import xgboost as xgb
+    except ImportError:
+        print("  [FAIL] xgboost is not installed; heart disease model unavailable")
+        return None
+    required_files = [HEART_XGB_PATH, HEART_SCALER_PATH, HEART_CONFIG_PATH]
+    if not all(os.path.exists(p) for p in required_files):
+        print(f"  [FAIL] Heart disease models not found")
+        return None
+    try:
+        print(f"  Loading heart disease models from {os.path.dirname(HEART_XGB_PATH)}")
+        model = xgb.XGBClassifier()
+        model.load_model(HEART_XGB_PATH)
+        scaler = _safe_joblib_load(HEART_SCALER_PATH)
+
+        with open(HEART_CONFIG_PATH, "r") as f:
+            config = json.load(f)
+
+        print(f"  [OK] Heart disease XGBoost model loaded")
+        features = config.get("features", [])
+        return {
+            'model': model,
+            'scaler': scaler,
+            'threshold': config.get("threshold", 0.5),
+            'features': features,
+            'schema': FeatureSchema(features),
+        }
+    except Exception as e:
+        print(f"  [FAIL] Failed to load heart disease models: {e}")
+        traceback.print_exc()
+        return None
+
+
+model_registry.register('lung_cancer', _load_lung_cancer_bundle)
+model_registry.register('diabetes', _load_diabetes_bundle)
+model_registry.register('heart_disease', _load_heart_disease_bundle)
+
+# Source files that determine each model's outputs (flat artifacts are derived from them)
+_ARTIFACT_SOURCES = {
+    'lung_cancer': (LUNG_CANCER_MODEL_PATH, LUNG_CANCER_LABEL_ENCODER_PATH),
+    'diabetes': (DIABETES_MODEL_PATH, DIABETES_LABEL_ENCODER_PATH),
+    'heart_disease': (HEART_XGB_PATH, HEART_SCALER_PATH, HEART_CONFIG_PATH),
+}
+
+# (artifact hash, schema) of the last bundle loaded per type. The schema is
+# kept after the registry evicts the model so cache keys can still be built.
+_key_schemas: Dict[str, Tuple[str, FeatureSchema]] = {}
+
+
 def load_model_for_type(model_type: str):
     """
-    Load models lazily based on requested type to save RAM on free tier (512MB limit).
-    Unloads other models to prevent Out of Memory errors.
+    Return the loaded bundle for a model type (dict with 'model' and its
+    encoders/scaler), or None if it could not be loaded.
+
+    Models stay resident in the registry until the RAM budget forces the
+    least recently used one out, so switching types no longer reloads from disk.
     """
-    global lung_cancer_model, lung_cancer_label_encoder, lung_cancer_feature_names
-    global diabetes_model, diabetes_label_encoder
-    global heart_xgb, heart_scaler, heart_threshold, heart_features
-    
-    import gc
-    
-    print(f"Loading model for type: {model_type}...")
-    
-    if model_type == 'lung_cancer':
-        # Unload others
-        diabetes_model = None
-        diabetes_label_encoder = None
-        heart_xgb = None
-        heart_scaler = None
-        gc.collect()
-        
-        if lung_cancer_model is None:
-            try:
-                if os.path.exists(LUNG_CANCER_MODEL_PATH):
-                    print(f"  Loading lung cancer model from {LUNG_CANCER_MODEL_PATH}")
-                    lung_cancer_model = _safe_joblib_load(LUNG_CANCER_MODEL_PATH)
-                    
-                    if hasattr(lung_cancer_model, 'feature_names_in_'):
-                        lung_cancer_feature_names = list(lung_cancer_model.feature_names_in_)
-                    else:
-                        lung_cancer_feature_names = LUNG_CANCER_FEATURES
-                    
-                    if lung_cancer_label_encoder is None and os.path.exists(LUNG_CANCER_LABEL_ENCODER_PATH):
-                        lung_cancer_label_encoder = _safe_joblib_load(LUNG_CANCER_LABEL_ENCODER_PATH)
-                        
-                    print("  [OK] Lung cancer model loaded")
-                else:
-                    print(f"  [WARN] Lung cancer model not found: {LUNG_CANCER_MODEL_PATH}")
-            except Exception as e:
-                print(f"  [FAIL] Failed to load lung cancer model: {e}")
-                
-    elif model_type == 'diabetes':
-        # Unload others
-        lung_cancer_model = None
-        lung_cancer_label_encoder = None
-        heart_xgb = None
-        heart_scaler = None
-        gc.collect()
-        
-        if diabetes_model is None:
-            try:
-                if os.path.exists(DIABETES_MODEL_PATH):
-                    print(f"  Loading diabetes model from {DIABETES_MODEL_PATH}")
-                    diabetes_model = _safe_joblib_load(DIABETES_MODEL_PATH)
-                    
-                    if diabetes_label_encoder is None and os.path.exists(DIABETES_LABEL_ENCODER_PATH):
-                        diabetes_label_encoder = _safe_joblib_load(DIABETES_LABEL_ENCODER_PATH)
-                        
-                    print("  [OK] Diabetes model loaded")
-                else:
-                    print(f"  [FAIL] Diabetes model not found: {DIABETES_MODEL_PATH}")
-            except Exception as e:
-                print(f"  [FAIL] Failed to load diabetes model: {e}")
-                traceback.print_exc()
-                
-    elif model_type == 'heart_disease':
-        # Unload others
-        lung_cancer_model = None
-        lung_cancer_label_encoder = None
-        diabetes_model = None
-        diabetes_label_encoder = None
-        gc.collect()
-        
-        if heart_xgb is None and xgb is not None:
-            try:
-                required_files = [HEART_XGB_PATH, HEART_SCALER_PATH, HEART_CONFIG_PATH]
-                if all(os.path.exists(p) for p in required_files):
-                    print(f"  Loading heart disease models from {os.path.dirname(HEART_XGB_PATH)}")
-                    heart_xgb = xgb.XGBClassifier()
-                    heart_xgb.load_model(HEART_XGB_PATH)
-                    heart_scaler = _safe_joblib_load(HEART_SCALER_PATH)
-                    
-                    with open(HEART_CONFIG_PATH, "r") as f:
-                        config = json.load(f)
-                        heart_threshold = config.get("threshold", 0.5)
-                        heart_features = config.get("features", [])
-                    
-                    print(f"  [OK] Heart disease XGBoost model loaded")
-                else:
-                    print(f"  [FAIL] Heart disease models not found")
-            except Exception as e:
-                print(f"  [FAIL] Failed to load heart disease models: {e}")
-                traceback.print_exc()
-
-def _safe_predict(model, data):
-    try:
-        import eventlet
-        from eventlet import tpool
-        return tpool.execute(model.predict, data)
-    except Exception:
-        return model.predict(data)
+    if model_type not in ('lung_cancer', 'diabetes', 'heart_disease'):
+        return None
+    if model_server_client is not None and model_server_client.available():
+        bundle = model_server_client.bundle(model_type)
+        if bundle is not None:
+            return bundle
+    return model_registry.get(model_type)
+
+def _artifact_hash(model_type: str) -> str:
+    """Current hash of a model's sources; a change drops its cached model and results."""
+    digest = artifact_hashes.hash(_ARTIFACT_SOURCES[model_type])
+    known = _key_schemas.get(model_type)
+    if known is not None and known[0] != digest:
+        print(f"[CACHE] {model_type} artifacts changed; dropping cached model and predictions")
+        _key_schemas.pop(model_type, None)
+        prediction_cache.invalidate(model_type)
+        model_registry.evict(model_type)
+        if model_server_client is not None:
+            model_server_client.forget(model_type)
+    return digest
+
+
+def _load_for_prediction(model_type: str, digest, local: bool = False):
+    bundle = model_registry.get(model_type) if local else load_model_for_type(model_type)
+    if bundle is not None and digest is not None:
+        _key_schemas[model_type] = (digest, bundle['schema'])
+    return bundle
 
-def _safe_predict_proba(model, data):
+
+def _cache_key(model_type: str, digest: str, row: np.ndarray) -> tuple:
+    return (model_type, digest, row.tobytes())
+
+
+# Upper bound on rows accepted by /api/predict/batch (one request = one matrix)
+MAX_BATCH_SIZE = int(os.environ.get('PREDICT_MAX_BATCH_SIZE', '1000'))
+
+# Heart disease rows are built as float32 (XGBoost's native input type)
+_MATRIX_DTYPES = {
+    'lung_cancer': np.float64,
+    'diabetes': np.float64,
+    'heart_disease': np.float32,
+}
+
+_UNAVAILABLE_ERRORS = {
+    'lung_cancer': 'Lung cancer model not available',
+    'heart_disease': 'Heart disease model not available',
+    'diabetes': 'Diabetes model not available',
+}
+
+
+def _has_proba(prediction_type: str, bundle: Dict[str, Any]) -> bool:
+    if 'has_proba' in bundle:
+        return bundle['has_proba']
+    return prediction_type == 'heart_disease' or hasattr(bundle['model'], 'predict_proba')
+
+
+def _probability_matrix(prediction_type: str, bundle: Dict[str, Any], X: np.ndarray) -> np.ndarray:
+    """Row-wise model call (runs in the inference thread pool)."""
+    model = bundle['model']
+    if prediction_type == 'heart_disease':
+        if bundle['scaler']:
+            X = bundle['scaler'].transform(X)
+        return np.asarray(model.predict_proba(X))
+
+    if hasattr(model, 'predict_proba'):
+        return np.asarray(model.predict_proba(X))
+
+    # No probabilities available: one-hot the hard predictions so the
+    # formatting below still works (confidence is reported as None).
+    preds = np.asarray(model.predict(X))
+    classes = list(getattr(model, 'classes_', np.unique(preds)))
+    probs = np.zeros((len(preds), len(classes)))
+    for i, p in enumerate(preds):
+        probs[i, classes.index(p)] = 1.0
+    return probs
+
+
+def _predict_matrix(prediction_type: str, bundle: Dict[str, Any], X: np.ndarray):
+    """
+    Run ONE vectorized predict_proba over a prepared feature matrix.
+    Returns (probs, has_proba): an (n_rows, n_classes) probability matrix and
+    whether it holds real probabilities or one-hot hard predictions.
+
+    Concurrent calls for the same loaded bundle are coalesced by the
+    inference batcher into a single thread-pool call (a single round trip
+    for model-server bundles, whose sockets must stay on the hub thread).
+    """
     try:
-        import eventlet
-        from eventlet import tpool
-        return tpool.execute(model.predict_proba, data)
-    except Exception:
-        return model.predict_proba(data)
+        probs = inference_batcher.submit(
+            (prediction_type, id(bundle)),
+            functools.partial(_probability_matrix, prediction_type, bundle),
+            X,
+            offload=not bundle.get('remote', False),
+        )
+    except ModelServerUnavailable as e:
+        print(f"[WARN] {e}; predicting {prediction_type} in-process")
+        bundle = model_registry.get(prediction_type)
+        if bundle is None:
+            raise
+        return _predict_matrix(prediction_type, bundle, X)
+    return probs, _has_proba(prediction_type, bundle)
+
+
+def _format_results(prediction_type: str, bundle: Dict[str, Any], probs, has_proba: bool = True) -> list:
+    """Turn a probability matrix into the per-row response dicts."""
+    results = []
+
+    if prediction_type == 'heart_disease':
+        threshold = float(bundle['threshold'])
+        for prob in probs[:, 1].astype(float):
+            pred_label = "Higher Risk" if prob >= threshold else "Lower Risk"
+            distance = abs(prob - threshold)
+            confidence = min(100.0, distance / max(threshold, 1 - threshold) * 100)
+            results.append({
+                'prediction': pred_label,
+                'confidence': round(float(confidence), 1),
+                'risk_score': round(float(prob) * 100, 1),
+                'threshold': round(threshold * 100, 1)
+            })
+        return results
+
+    classes = np.asarray(getattr(bundle['model'], 'classes_', np.arange(probs.shape[1])))
+    pred_enc = classes[np.argmax(probs, axis=1)]
+    max_probs = np.max(probs, axis=1)
+
+    if prediction_type == 'lung_cancer':
+        labels = None
+        if bundle['label_encoder'] is not None:
+            try:
+                labels = bundle['label_encoder'].inverse_transform(pred_enc)
+            except Exception:
+                labels = None
+        if labels is None:
+            labels = [str(p) for p in pred_enc]
+        for label, p_max in zip(labels, max_probs):
+            confidence = round(float(p_max) * 100, 2) if has_proba else None
+            results.append({'prediction': label, 'confidence': confidence})
+        return results
+
+    for enc, row_probs in zip(pred_enc, probs):
+        pred_label = "Positive" if int(enc) == 1 else "Negative"
+        if has_proba and len(row_probs) > 1:
+            risk_score = round(float(row_probs[1]) * 100, 2)
+            confidence = round(float(np.max(row_probs)) * 100, 2)
+        else:
+            risk_score, confidence = None, None
+        results.append({
+            'prediction': pred_label,
+            'confidence': confidence,
+            'probability': risk_score if risk_score is not None else (100.0 if pred_label == 'Positive' else 0.0)
+        })
+    return results
+
+
+_REQUEST_TITLES = {
+    'lung_cancer': 'LUNG CANCER PREDICTION REQUEST',
+    'heart_disease': 'HEART DISEASE PREDICTION REQUEST',
+    'diabetes': 'DIABETES PREDICTION REQUEST (BRFSS 2015)',
+}
+
 
 def predict_with_type(prediction_type: str, features: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
     """
-    Main prediction function that handles both diabetes and lung cancer predictions.
+    Main prediction function that handles diabetes, lung cancer and heart disease predictions.
     """
-    load_model_for_type(prediction_type)
+    if prediction_type not in _REQUEST_TITLES:
+        return ({'error': f'Invalid prediction type: {prediction_type}'}, 400)
 
-    if prediction_type == 'lung_cancer':
-        if not lung_cancer_model:
-            return ({'error': 'Lung cancer model not available'}, 500)
+    digest = _artifact_hash(prediction_type) if prediction_cache.enabled else None
+    known = _key_schemas.get(prediction_type) if digest is not None else None
+    if known is not None:
         try:
-            print(f"\n{'='*60}")
-            print("LUNG CANCER PREDICTION REQUEST")
-            print(f"{'='*60}")
-            print(f"Received features: {features}")
-            
-            # Use actual feature names from model
-            expected_features = lung_cancer_feature_names or LUNG_CANCER_FEATURES
-            print(f"Expected features: {expected_features}")
-            
-            # Process the features
-            processed = {}
-            
-            # Map received features to expected features (handle case and whitespace)
-            for expected_feat in expected_features:
-                # Try exact match first
-                if expected_feat in features:
-                    val = features[expected_feat]
-                else:
-                    # Try case-insensitive match
-                    found = False
-                    for k, v in features.items():
-                        if k.strip().lower() == expected_feat.strip().lower():
-                            val = v
-                            found = True
-                            break
-                    if not found:
-                        print(f"[WARN] Feature '{expected_feat}' not found in input, skipping")
-                        continue
-                
-                # Convert to numeric
-                if isinstance(val, str):
-                    s = val.strip()
-                    if s != '':
-                        try:
-                            processed[expected_feat] = float(s)
-                        except Exception:
-                            processed[expected_feat] = val
-                else:
-                    processed[expected_feat] = val
-            
-            print(f"Processed features: {processed}")
-            
-            # Create DataFrame with features
-            input_df = pd.DataFrame([processed])
-            
-            # Check for missing features
-            missing_features = [f for f in expected_features if f not in input_df.columns]
-            if missing_features:
-                print(f"[FAIL] Missing features: {missing_features}")
-                return ({'error': f'Missing required features: {missing_features}'}, 400)
-            
-            # Reorder columns to match model training order
-            input_df = input_df[expected_features]
-            print(f"Input DataFrame shape: {input_df.shape}")
-            print(f"Input DataFrame columns: {list(input_df.columns)}")
-            print(f"Input DataFrame:\n{input_df}")
-            
-            # Make prediction
-            pred_enc = _safe_predict(lung_cancer_model, input_df)
-            
-            # Decode prediction if encoder is available
-            if lung_cancer_label_encoder is not None:
-                try:
-                    pred_label = lung_cancer_label_encoder.inverse_transform(pred_enc)[0]
-                except Exception:
-                    pred_label = str(pred_enc[0])
-            else:
-                pred_label = str(pred_enc[0])
-
-            # Get confidence
-            confidence = None
-            if hasattr(lung_cancer_model, 'predict_proba'):
-                try:
-                    probs = _safe_predict_proba(lung_cancer_model, input_df)[0]
-                    confidence = round(float(np.max(probs)) * 100, 2)
-                except Exception as e:
-                    print(f"Warning: Could not get confidence: {e}")
-                    confidence = None
-
-            result = {'prediction': pred_label, 'confidence': confidence}
-            print(f"[OK] Prediction result: {result}")
-            print(f"{'='*60}\n")
-            
-            return (result, 200)
-        except Exception as e:
-            print(f"[FAIL] Prediction error: {str(e)}")
-            traceback.print_exc()
-            return ({'error': f'Prediction error: {str(e)}'}, 500)
+            X = known[1].row(features, dtype=_MATRIX_DTYPES[prediction_type])
+        except FeatureValidationError as e:
+            print(f"[FAIL] {e}")
+            return ({'error': str(e)}, 400)
+        except Exception:
+            X = None  # let the full path below report it
+        cached = prediction_cache.get(_cache_key(prediction_type, digest, X[0])) if X is not None else None
+        if cached is not None:
+            print(f"[CACHE] {prediction_type} prediction served from cache: {cached}")
+            return (dict(cached), 200)
+
+    bundle = _load_for_prediction(prediction_type, digest)
+    if bundle is None:
+        return ({'error': _UNAVAILABLE_ERRORS[prediction_type]}, 500)
+
+    try:
+        print(f"\n{'='*60}")
+        print(_REQUEST_TITLES[prediction_type])
+        print(f"{'='*60}")
+        print(f"Received features: {features}")
 
-    elif prediction_type == 'heart_disease':
-        if not heart_xgb:
-            return ({'error': 'Heart disease model not available'}, 500)
         try:
-            print(f"\n{'='*60}")
-            print("HEART DISEASE PREDICTION REQUEST")
-            print(f"{'='*60}")
-            print(f"Received features: {features}")
-            
-            # 1. Processing and mapping (BRFSS standard)
-            processed = {}
-            for feat in heart_features:
-                val = features.get(feat)
-                if val is None:
-                    # Try case-insensitive mapping
-                    for k, v in features.items():
-                        if k.strip().lower() == feat.lower():
-                            val = v
-                            break
-                
-                if val is not None:
-                    try:
-                        processed[feat] = float(val)
-                    except (ValueError, TypeError):
-                        # Mapping for common string values
-                        mapping = {'Yes': 1.0, 'No': 0.0, 'Male': 1.0, 'Female': 0.0}
-                        processed[feat] = mapping.get(val, 0.0)
-                else:
-                    processed[feat] = 0.0 # Default fallback
-            
-            print(f"Processed features: {processed}")
-            
-            # Create input array in correct order
-            row_data = [processed.get(c, 0.0) for c in heart_features]
-            row = np.array([row_data], dtype=np.float32)
-            
-            # Apply scaling
-            if heart_scaler:
-                row = heart_scaler.transform(row)
-            
-            # 2. Model inference
-            probs = _safe_predict_proba(heart_xgb, row)
-            prob = float(probs[0, 1])
-
-            # 3. Decision
-            pred_label = "Higher Risk" if prob >= heart_threshold else "Lower Risk"
-
-            # Confidence calculation
-            distance = abs(prob - heart_threshold)
-            confidence = min(100.0, distance / max(float(heart_threshold), 1 - float(heart_threshold)) * 100)
-
-            result = {
-                'prediction': pred_label,
-                'confidence': round(float(confidence), 1),
-                'risk_score': round(float(prob) * 100, 1),
-                'threshold': round(float(heart_threshold) * 100, 1)
-            }
-            print(f"[OK] Prediction result: {result}")
-            print(f"{'='*60}\n")
+            X = bundle['schema'].row(features, dtype=_MATRIX_DTYPES[prediction_type])
+        except FeatureValidationError as e:
+            print(f"[FAIL] {e}")
+            return ({'error': str(e)}, 400)
 
-            return (result, 200)
-        except Exception as e:
-            print(f"[FAIL] Prediction error: {str(e)}")
-            traceback.print_exc()
-            return ({'error': f'Prediction error: {str(e)}'}, 500)
+        probs, has_proba = _predict_matrix(prediction_type, bundle, X)
+        result = _format_results(prediction_type, bundle, probs, has_proba)[0]
+        if digest is not None:
+            prediction_cache.put(_cache_key(prediction_type, digest, X[0]), dict(result))
+        print(f"[OK] Prediction result: {result}")
+        print(f"{'='*60}\n")
+
+        return (result, 200)
+    except Exception as e:
+        print(f"[FAIL] Prediction error: {str(e)}")
+        traceback.print_exc()
+        return ({'error': f'Prediction error: {str(e)}'}, 500)
+
+
+def predict_batch_with_type(prediction_type: str, rows: list) -> Tuple[Dict[str, Any], int]:
+    """
+    Vectorized prediction for many feature dicts of the same model type.
 
-    elif prediction_type == 'diabetes':
-        if not diabetes_model:
-            return ({'error': 'Diabetes model not available'}, 500)
+    Every row is validated on its own; the valid ones are stacked into one
+    matrix and sent through a single predict_proba call. Rows that fail
+    validation get an 'error' entry at their index instead of failing the batch.
+    Rows found in the prediction cache are answered from it, and the model is
+    only loaded when at least one row misses.
+    """
+    if prediction_type not in _REQUEST_TITLES:
+        return ({'error': f'Invalid prediction type: {prediction_type}'}, 400)
+    if not isinstance(rows, list) or not rows:
+        return ({'error': 'Missing rows'}, 400)
+    if len(rows) > MAX_BATCH_SIZE:
+        return ({'error': f'Batch too large: {len(rows)} rows (max {MAX_BATCH_SIZE})'}, 413)
+
+    digest = _artifact_hash(prediction_type) if prediction_cache.enabled else None
+    known = _key_schemas.get(prediction_type) if digest is not None else None
+    bundle = None
+    if known is None:
+        bundle = _load_for_prediction(prediction_type, digest)
+        if bundle is None:
+            return ({'error': _UNAVAILABLE_ERRORS[prediction_type]}, 500)
+        schema = bundle['schema']
+    else:
+        schema = known[1]
+
+    results = [None] * len(rows)
+    X, valid_idx, errors = schema.matrix(rows, dtype=_MATRIX_DTYPES[prediction_type])
+    for i, e in errors.items():
+        if isinstance(e, FeatureValidationError):
+            results[i] = {'index': i, 'error': str(e), 'status': 400}
+        else:
+            results[i] = {'index': i, 'error': f'Prediction error: {str(e)}', 'status': 500}
+
+    # Positions into X that still need the model
+    pending = list(range(len(valid_idx)))
+    keys = []
+    if digest is not None:
+        keys = [_cache_key(prediction_type, digest, x) for x in X]
+        pending = []
+        for j, i in enumerate(valid_idx):
+            cached = prediction_cache.get(keys[j])
+            if cached is None:
+                pending.append(j)
+            else:
+                results[i] = dict(cached, index=i)
+
+    if pending:
+        if bundle is None:
+            bundle = _load_for_prediction(prediction_type, digest)
+            if bundle is None:
+                return ({'error': _UNAVAILABLE_ERRORS[prediction_type]}, 500)
         try:
-            print(f"\n{'='*60}")
-            print("DIABETES PREDICTION REQUEST (BRFSS 2015)")
-            print(f"{'='*60}")
-            print(f"Received features: {features}")
-            
-            # Process the features
-            processed = {}
-            for feat in DIABETES_FEATURES:
-                val = features.get(feat)
-                if val is None:
-                    # Try case-insensitive mapping
-                    for k, v in features.items():
-                        if k.strip().lower() == feat.lower():
-                            val = v
-                            break
-                
-                if val is not None:
-                    try:
-                        processed[feat] = float(val)
-                    except (ValueError, TypeError):
-                        # Mapping for common string values if any
-                        mapping = {'Yes': 1.0, 'No': 0.0, 'Male': 1.0, 'Female': 0.0}
-                        processed[feat] = mapping.get(val, 0.0)
-                else:
-                    processed[feat] = 0.0 # Default fallback
-            
-            print(f"Processed features: {processed}")
-            
-            # Create DataFrame
-            input_df = pd.DataFrame([processed])
-            
-            # Reorder columns to match DIABETES_FEATURES
-            input_df = input_df[DIABETES_FEATURES]
-            print(f"Input DataFrame shape: {input_df.shape}")
-            
-            # Make prediction
-            pred_enc = _safe_predict(diabetes_model, input_df)
-            pred_label = "Positive" if int(pred_enc[0]) == 1 else "Negative"
-            
-            # Get probability/confidence
-            confidence = None
-            risk_score = None
-            if hasattr(diabetes_model, 'predict_proba'):
-                try:
-                    probs = _safe_predict_proba(diabetes_model, input_df)[0]
-                    # Index 1 is usually the 'Positive' class in binary classification
-                    risk_score = round(float(probs[1]) * 100, 2)
-                    confidence = round(float(np.max(probs)) * 100, 2)
-                except Exception as e:
-                    print(f"Warning: Could not get probability: {e}")
-            
-            result = {
-                'prediction': pred_label, 
-                'confidence': confidence,
-                'probability': risk_score if risk_score is not None else (100.0 if pred_label == 'Positive' else 0.0)
-            }
-            print(f"[OK] Prediction result: {result}")
-            print(f"{'='*60}\n")
-            
-            return (result, 200)
+            X_pending = X if len(pending) == len(valid_idx) else X[pending]
+            probs, has_proba = _predict_matrix(prediction_type, bundle, X_pending)
+            for j, res in zip(pending, _format_results(prediction_type, bundle, probs, has_proba)):
+                if keys:
+                    prediction_cache.put(keys[j], dict(res))
+                res['index'] = valid_idx[j]
+                results[valid_idx[j]] = res
         except Exception as e:
-            print(f"[FAIL] Prediction error: {str(e)}")
+            print(f"[FAIL] Batch prediction error: {str(e)}")
             traceback.print_exc()
             return ({'error': f'Prediction error: {str(e)}'}, 500)
 
-    else:
-        return ({'error': f'Invalid prediction type: {prediction_type}'}, 400)
+    failed = sum(1 for r in results if 'error' in r)
+    print(f"[OK] Batch {prediction_type}: {len(rows) - failed}/{len(rows)} rows predicted")
+    return ({
+        'type': prediction_type,
+        'count': len(rows),
+        'succeeded': len(rows) - failed,
+        'failed': failed,
+        'results': results
+    }, 200)
 
 
 @predict_bp.route('/predict', methods=['OPTIONS', 'POST'])
@@ -479,14 +589,40 @@ def predict():
         return jsonify({'error': str(e)}), 500
 
 
+@predict_bp.route('/predict/batch', methods=['OPTIONS', 'POST'])
+@authorize_roles('doctor', 'nurse', 'user')
+def predict_batch():
+    """
+    Batch prediction endpoint for screening many patients at once.
+    Expects JSON: {"type": "diabetes" | "lung_cancer" | "heart_disease", "rows": [{...}, ...]}
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+    try:
+        data = request.get_json(silent=True) or {}
+        prediction_type = (data.get('type') or '').lower()
+        rows = data.get('rows')
+
+        if not prediction_type:
+            return jsonify({'error': 'Missing prediction type'}), 400
+
+        resp, status = predict_batch_with_type(prediction_type, rows)
+        return jsonify(resp), status
+    except Exception as e:
+        print(f"[FAIL] Error in batch predict endpoint: {e}")
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @predict_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for the prediction service."""
     return jsonify({
         'status': 'healthy',
-        'lung_cancer_model_loaded': lung_cancer_model is not None,
-        'diabetes_model_loaded': diabetes_model is not None,
-        'heart_disease_model_loaded': heart_xgb is not None
+        'lung_cancer_model_loaded': model_registry.is_resident('lung_cancer'),
+        'diabetes_model_loaded': model_registry.is_resident('diabetes'),
+        'heart_disease_model_loaded': model_registry.is_resident('heart_disease')
     })
 
 
@@ -494,13 +630,25 @@ def health_check():
 def model_info():
     """Returns information about loaded models and their expected features."""
     # Use actual feature names from model if available
-    lc_features = lung_cancer_feature_names if lung_cancer_feature_names else LUNG_CANCER_FEATURES
-    
+    lung_bundle = model_registry.peek('lung_cancer')
+    heart_bundle = model_registry.peek('heart_disease')
+    lc_features = lung_bundle['feature_names'] if lung_bundle else LUNG_CANCER_FEATURES
+
     return jsonify({
-        'lung_cancer_model_loaded': lung_cancer_model is not None,
-        'diabetes_model_loaded': diabetes_model is not None,
-        'heart_disease_model_loaded': heart_xgb is not None,
+        'lung_cancer_model_loaded': lung_bundle is not None,
+        'diabetes_model_loaded': model_registry.is_resident('diabetes'),
+        'heart_disease_model_loaded': heart_bundle is not None,
         'lung_cancer_features': lc_features,
         'diabetes_features': DIABETES_FEATURES,
-        'heart_disease_features': heart_features
-    })
\ No newline at end of file
+        'heart_disease_features': heart_bundle['features'] if heart_bundle else []
+    })
+
+
+@predict_bp.route('/model-stats', methods=['GET'])
+def model_stats():
+    """Registry statistics (RAM budget, resident models, loads, evictions, cold-load latency), prediction cache counters, inference batching latency/throughput and model server client state."""
+    stats = model_registry.stats()
+    stats['prediction_cache'] = prediction_cache.stats()
+    stats['inference_batcher'] = inference_batcher.stats()
+    stats['model_server'] = model_server_client.stats() if model_server_client is not None else None
+    return jsonify(stats)
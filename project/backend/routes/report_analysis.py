@@ -6,7 +6,7 @@ Flask blueprint providing the ``POST /api/analyze-report`` endpoint.
 
 This endpoint orchestrates the full medical-report diet recommendation pipeline:
     1. Accept file upload (image or PDF)
-    2. OCR text extraction  (via ``backend.ocr_scanner``)
+    2. OCR text extraction  (via ``backend.ocr_scanner``, from memory)
     3. Medical parameter parsing (via ``backend.report_parser``)
     4. Importance detection
     5. Diet recommendation  (via ``backend.report_diet_engine``)
@@ -17,20 +17,39 @@ JSON string instead of (or in addition to) the ``report`` file.
 
 This is a NEW endpoint that does NOT conflict with the existing
 ``POST /api/upload-report`` in ``diet.py``.
+
+``POST /api/analyze-reports/batch`` parses many reports at once (no diet
+generation) on the ``backend.report_batch`` process pool and streams one
+NDJSON line per report as it finishes.
+
+OCR for single uploads runs on the ``backend.ocr_pool`` process pool, so a
+scan never blocks the eventlet hub. The OCR text and parsed parameters are
+cached by upload content (``backend.report_cache``), so a re-uploaded report
+skips both. ``GET /api/ocr-stats`` reports the pool queue and cache hit rate.
+
+``POST /api/analyze-report/jobs`` runs the same analysis as a background job
+(``backend.report_jobs``): it answers with a job id at once, progress is
+pushed over Socket.IO and ``GET /api/analyze-report/jobs/<id>`` returns the
+result.
 """
 
 import os
 import tempfile
 import logging
 import json
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, url_for
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 
-from backend.ocr_scanner import extract_text
+from backend.ocr_pool import OCRQueueFull, OCRTimeout, ocr_pool
 from backend.report_diet_engine import (
     generate_report_diet,
     format_diet_plan_text,
 )
 from backend.report_parser import extract_parameters, detect_important_parameters, get_important_parameters, summarize_report, get_clinical_summary
+from backend.report_batch import parse_reports
+from backend.report_cache import content_digest, report_cache
+from backend.report_jobs import JobFailed, JobQueueFull, report_jobs
+from backend.inference_batcher import run_in_threadpool
 from backend.gemini_diet_planner import generate_diet_plan_with_gemini
 from backend.clinical_context_builder import build_context
 from backend.nutrient_pipeline import calculate_diet_plan_confidence
@@ -42,6 +61,8 @@ report_analysis_bp = Blueprint("report_analysis", __name__)
 
 ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg", "bmp", "tiff", "tif", "webp"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_BATCH_REPORTS = int(os.environ.get("REPORT_BATCH_MAX_REPORTS", "200"))
+MAX_BATCH_TEXT_CHARS = 200_000  # per report text
 
 
 def _allowed_file(filename: str) -> bool:
@@ -50,25 +71,12 @@ def _allowed_file(filename: str) -> bool:
     return ext in ALLOWED_EXTENSIONS
 
 
-@report_analysis_bp.route("/analyze-report", methods=["POST"])
-def analyze_report():
+def _read_analysis_request() -> dict:
     """
-    POST /api/analyze-report
+    Validate an analyze-report request and collect everything the pipeline
+    needs from it, so the analysis itself can run after the request ended.
 
-    Accepts a multipart/form-data request with a ``report`` file field.
-
-    Returns JSON::
-
-        {
-            "success": true,
-            "extracted_text": "...",
-            "all_parameters": { ... },
-            "important_parameters": { ... },
-            "report_summary": "...",
-            "diet_recommendation": { ... },
-            "diet_plan_text": "...",
-            "mode": "file" | "manual"
-        }
+    Raises ``JobFailed`` (status 400) for a bad request.
     """
     # ----------------------------------------------------------------
     # 1. Check for manual data vs file upload
@@ -81,74 +89,99 @@ def analyze_report():
         except Exception:
             health_data = None
 
+    inputs = {
+        "data": None,
+        "filename": "",
+        "health_data": health_data,
+        "diet_preference": request.form.get("diet_preference") or (health_data.get("dietaryPreference") if health_data else "balanced"),
+        "non_veg_prefs": request.form.getlist("non_veg_preferences") or (health_data.get("nonVegPreferences") if health_data else []),
+        "allergies": request.form.getlist("allergies") or (health_data.get("allergies") if health_data else []),
+        "cuisine_pref": request.form.get("cuisine_preference", "Indian"),
+        "extra_context": request.form.get("extra_context", ""),
+    }
+
     if "report" not in request.files:
         if health_data:
             # Manual Mode: Proceed without OCR
-            return _handle_manual_analysis(health_data)
-        return jsonify({"success": False, "error": 'No file or health data provided.'}), 400
+            return inputs
+        raise JobFailed("No file or health data provided.", 400)
 
     file = request.files["report"]
     filename = getattr(file, "filename", "") or ""
 
     if filename == "":
-        return jsonify({"success": False, "error": "Empty filename."}), 400
+        raise JobFailed("Empty filename.", 400)
 
     if not _allowed_file(filename):
-        return jsonify({
-            "success": False,
-            "error": f"Unsupported file type. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
-        }), 400
+        raise JobFailed(f"Unsupported file type. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}", 400)
 
     # Check size
     file.seek(0, os.SEEK_END)
     size = file.tell()
     file.seek(0)
     if size > MAX_FILE_SIZE:
-        return jsonify({"success": False, "error": "File too large (max 10 MB)."}), 400
+        raise JobFailed("File too large (max 10 MB).", 400)
+
+    inputs["data"] = file.read()
+    inputs["filename"] = filename
+    return inputs
 
-    # ----------------------------------------------------------------
-    # 2. Save to temp file
-    # ----------------------------------------------------------------
-    tmpdir = tempfile.gettempdir()
-    save_path = os.path.join(str(tmpdir), str(filename))
-    try:
-        file.save(save_path)
-    except Exception as exc:
-        logger.error("Failed to save uploaded file: %s", exc)
-        return jsonify({"success": False, "error": "Failed to save uploaded file."}), 500
+
+def _run_analysis(inputs: dict, progress=lambda stage, percent: None) -> dict:
+    """
+    The report analysis pipeline: OCR → parse → clinical context → diet.
+
+    *progress* is called with ``(stage, percent)`` as each stage starts.
+    Raises ``JobFailed`` with the HTTP status to answer with.
+    """
+    health_data = inputs["health_data"]
+    if inputs["data"] is None:
+        progress("diet", 30)
+        return _manual_analysis(health_data)
 
     # ----------------------------------------------------------------
-    # 3. OCR text extraction
+    # 2. Reuse the OCR / parse of an identical earlier upload
     # ----------------------------------------------------------------
-    try:
-        extracted_text = extract_text(save_path, medical_report_mode=True)
-    except Exception as exc:
-        logger.error("OCR extraction failed: %s", exc)
-        return jsonify({
-            "success": False,
-            "error": f"OCR extraction failed: {str(exc)}",
-        }), 500
-    finally:
-        # Clean up temp file (best-effort)
+    cache_key = report_cache.key(content_digest(inputs["data"]), medical_report_mode=True, lang="eng")
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        extracted_text, all_parameters = cached
+    else:
+        # ------------------------------------------------------------
+        # 3. OCR text extraction (from memory, no temp file)
+        # ------------------------------------------------------------
+        progress("ocr", 10)
         try:
-            os.remove(save_path)
-        except OSError:
-            pass
+            # The pool wait blocks: keep it off the eventlet hub
+            extracted_text = run_in_threadpool(
+                ocr_pool.extract_text, inputs["data"], filename=inputs["filename"], medical_report_mode=True,
+            )
+        except OCRQueueFull as exc:
+            logger.warning("OCR rejected: %s", exc)
+            raise JobFailed("The report scanner is busy. Please try again shortly.", 503, {"Retry-After": "5"})
+        except OCRTimeout as exc:
+            logger.error("OCR timed out: %s", exc)
+            raise JobFailed(f"OCR extraction timed out: {exc}", 504)
+        except Exception as exc:
+            logger.error("OCR extraction failed: %s", exc)
+            raise JobFailed(f"OCR extraction failed: {str(exc)}", 500)
+        all_parameters = None
 
     if not extracted_text.strip():
-        return jsonify({
-            "success": False,
-            "error": (
-                "No text could be extracted from the report. "
-                "Please ensure the image is clear, well-lit, and contains "
-                "readable text. Supported formats: JPG, PNG, PDF."
-            ),
-        }), 422
+        raise JobFailed(
+            "No text could be extracted from the report. "
+            "Please ensure the image is clear, well-lit, and contains "
+            "readable text. Supported formats: JPG, PNG, PDF.",
+            422,
+        )
 
     # ----------------------------------------------------------------
-    # 4. Parse medical parameters
+    # 4. Parse medical parameters (cached with the text)
     # ----------------------------------------------------------------
-    all_parameters = extract_parameters(extracted_text)
+    progress("parsing", 40)
+    if all_parameters is None:
+        all_parameters = extract_parameters(extracted_text)
+        report_cache.put(cache_key, extracted_text, all_parameters)
 
     # ----------------------------------------------------------------
     # 5. Detect important / abnormal parameters
@@ -159,17 +192,15 @@ def analyze_report():
     # 6. [NEW] Clinical Context Pipeline
     # ----------------------------------------------------------------
     # A. Build Clinical Summary (Standards Step 1)
+    progress("clinical", 50)
     clinical_analysis = get_clinical_summary(all_parameters)
     
     # B. Build Scoring Context (Standards Step 2)
     clinical_context = build_context(clinical_analysis, health_data=health_data)
     
     # C. Generate Diet (Gemini Primary, Advanced Engine Fallback)
-    diet_preference  = request.form.get("diet_preference") or (health_data.get("dietaryPreference") if health_data else "balanced")
-    non_veg_prefs    = request.form.getlist("non_veg_preferences") or (health_data.get("nonVegPreferences") if health_data else [])
-    allergies        = request.form.getlist("allergies") or (health_data.get("allergies") if health_data else [])
-    cuisine_pref     = request.form.get("cuisine_preference", "Indian")
-    extra_context    = request.form.get("extra_context", "")
+    progress("diet", 60)
+    extra_context = inputs["extra_context"]
 
     # If we have health data, enrich the context for Gemini
     if health_data:
@@ -182,10 +213,10 @@ def analyze_report():
 
     gemini_result = generate_diet_plan_with_gemini(
         all_parameters,
-        diet_preference=diet_preference,
-        non_veg_preferences=non_veg_prefs,
-        allergies=allergies,
-        cuisine_preference=cuisine_pref,
+        diet_preference=inputs["diet_preference"],
+        non_veg_preferences=inputs["non_veg_prefs"],
+        allergies=inputs["allergies"],
+        cuisine_preference=inputs["cuisine_pref"],
         extra_context=extra_context,
         fallback_to_rules=True,
         raw_text=extracted_text,
@@ -200,6 +231,7 @@ def analyze_report():
     # ----------------------------------------------------------------
     # 7. Human-readable report summary
     # ----------------------------------------------------------------
+    progress("summary", 90)
     report_summary = summarize_report(all_parameters, health_data=health_data)
 
     # ----------------------------------------------------------------
@@ -226,11 +258,201 @@ def analyze_report():
         len(all_parameters),
         len(important_params),
     )
+    return response
+
+
+@report_analysis_bp.route("/analyze-report", methods=["POST"])
+def analyze_report():
+    """
+    POST /api/analyze-report
 
-    return jsonify(response), 200
+    Accepts a multipart/form-data request with a ``report`` file field.
 
+    Returns JSON::
 
-def _handle_manual_analysis(health_data):
+        {
+            "success": true,
+            "extracted_text": "...",
+            "all_parameters": { ... },
+            "important_parameters": { ... },
+            "report_summary": "...",
+            "diet_recommendation": { ... },
+            "diet_plan_text": "...",
+            "mode": "file" | "manual"
+        }
+    """
+    try:
+        return jsonify(_run_analysis(_read_analysis_request())), 200
+    except JobFailed as exc:
+        return jsonify({"success": False, "error": str(exc)}), exc.status, exc.headers
+
+
+def _job_room():
+    """Socket.IO room of the submitting user (JWT identity, else ``user_id`` form field)."""
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+    user_id = user_id or request.form.get("user_id")
+    return f"user_{user_id}" if user_id else None
+
+
+@report_analysis_bp.route("/analyze-report/jobs", methods=["POST"])
+def submit_report_job():
+    """
+    POST /api/analyze-report/jobs
+
+    Same form fields as ``/api/analyze-report``, but answers ``202`` at once::
+
+        {"success": true, "job_id": "...", "status": "queued", "status_url": "/api/analyze-report/jobs/<id>"}
+
+    The analysis runs on ``backend.report_jobs``. Progress is emitted as
+    ``report_job_progress`` / ``report_job_done`` Socket.IO events to the
+    ``user_<id>`` room; the result is fetched from ``status_url``.
+    """
+    try:
+        inputs = _read_analysis_request()
+    except JobFailed as exc:
+        return jsonify({"success": False, "error": str(exc)}), exc.status
+
+    app = current_app._get_current_object()
+
+    def job(progress):
+        with app.app_context():
+            return _run_analysis(inputs, progress)
+
+    try:
+        view = report_jobs.submit(job, room=_job_room())
+    except JobQueueFull as exc:
+        logger.warning("Report job rejected: %s", exc)
+        response = jsonify({"success": False, "error": "Too many reports are being analyzed. Please try again shortly."})
+        return response, 503, {"Retry-After": "10"}
+    return jsonify(dict(view, success=True, status_url=url_for(".report_job_status", job_id=view["job_id"]))), 202
+
+
+@report_analysis_bp.route("/analyze-report/jobs/<job_id>", methods=["GET"])
+def report_job_status(job_id):
+    """
+    GET /api/analyze-report/jobs/<job_id>
+
+    ``{"success": true, "job_id", "status": queued|running|done|failed,
+    "stage", "progress", ...}`` with the analysis ``result`` once done, or
+    ``error`` and ``http_status`` if it failed. 404 once the job expired.
+    """
+    view = report_jobs.get(job_id)
+    if view is None:
+        return jsonify({"success": False, "error": "Unknown or expired job."}), 404
+    return jsonify(dict(view, success=True)), 200
+
+
+@report_analysis_bp.route("/analyze-reports/batch", methods=["POST"])
+def analyze_reports_batch():
+    """
+    POST /api/analyze-reports/batch
+
+    Accepts either JSON ``{"reports": ["text", {"id": "r1", "text": "..."}, ...]}``
+    or multipart/form-data with repeated ``reports`` file fields.
+
+    Streams ``application/x-ndjson``: one line per report in completion
+    order, then a final summary line::
+
+        {"index": 0, "id": "r1", "success": true, "all_parameters": {...},
+         "important_parameters": {...}, "clinical_summary": {...},
+         "report_summary": "...", "parameter_count": 12, "elapsed_ms": 3.1}
+        {"index": 1, "id": "scan.png", "success": false, "error": "..."}
+        {"done": true, "total": 2, "succeeded": 1, "failed": 1}
+
+    A report that cannot be read or parsed only fails its own line.
+    """
+    rejected = []   # (position, id, error) for uploads refused before parsing
+    items = []      # what goes to the pool
+    positions = []  # items[i] is report number positions[i] in the request
+    temp_paths = []
+
+    uploads = request.files.getlist("reports")
+    body = {} if uploads else (request.get_json(silent=True) or {})
+    reports = uploads or body.get("reports")
+    if not isinstance(reports, list) or not reports:
+        return jsonify({"success": False, "error": "Provide a non-empty 'reports' list or 'reports' files."}), 400
+    if len(reports) > MAX_BATCH_REPORTS:
+        return jsonify({"success": False, "error": f"Too many reports (max {MAX_BATCH_REPORTS})."}), 400
+
+    if uploads:
+        for pos, file in enumerate(uploads):
+            filename = getattr(file, "filename", "") or ""
+            if not _allowed_file(filename):
+                rejected.append((pos, filename, "Unsupported file type."))
+                continue
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            file.seek(0)
+            if size > MAX_FILE_SIZE:
+                rejected.append((pos, filename, "File too large (max 10 MB)."))
+                continue
+            fd, path = tempfile.mkstemp(suffix="." + filename.rsplit(".", 1)[-1].lower())
+            with os.fdopen(fd, "wb") as out:
+                file.save(out)
+            temp_paths.append(path)
+            items.append({"id": filename, "path": path})
+            positions.append(pos)
+    else:
+        for pos, report in enumerate(reports):
+            text = report.get("text") if isinstance(report, dict) else report
+            report_id = str(report.get("id", pos)) if isinstance(report, dict) else str(pos)
+            if not isinstance(text, str) or not text.strip():
+                rejected.append((pos, report_id, "Report text is missing or empty."))
+            elif len(text) > MAX_BATCH_TEXT_CHARS:
+                rejected.append((pos, report_id, f"Report text too long (max {MAX_BATCH_TEXT_CHARS} characters)."))
+            else:
+                items.append({"id": report_id, "text": text})
+                positions.append(pos)
+    total = len(reports)
+
+    def stream():
+        succeeded = 0
+        results = parse_reports(items)
+        try:
+            for pos, report_id, error in rejected:
+                yield json.dumps({"index": pos, "id": report_id, "success": False, "error": error}) + "\n"
+            while True:
+                # The pool wait blocks: keep it off the eventlet hub
+                result = run_in_threadpool(next, results, None)
+                if result is None:
+                    break
+                item = items[result["index"]]
+                if "path" in item:
+                    try:
+                        os.remove(item["path"])
+                    except OSError:
+                        pass
+                result["index"] = positions[result["index"]]
+                succeeded += bool(result["success"])
+                yield json.dumps(result) + "\n"
+            logger.info("Batch analyzed: %d reports, %d succeeded", total, succeeded)
+            yield json.dumps({"done": True, "total": total, "succeeded": succeeded,
+                              "failed": total - succeeded}) + "\n"
+        finally:
+            results.close()  # cancels queued reports if the client went away
+            for path in temp_paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    return Response(stream(), mimetype="application/x-ndjson")
+
+
+@report_analysis_bp.route("/ocr-stats", methods=["GET"])
+def ocr_stats():
+    """OCR pool queue depth, in-flight jobs, totals and wait / scan latency, plus report cache hit rate and job queue."""
+    stats = ocr_pool.stats()
+    stats["report_cache"] = report_cache.stats()
+    stats["report_jobs"] = report_jobs.stats()
+    return jsonify(stats)
+
+
+def _manual_analysis(health_data):
     """Internal helper to process manual health entry using the Gemini engine."""
     diet_preference = health_data.get("dietaryPreference", "balanced")
     
@@ -280,4 +502,4 @@ def _handle_manual_analysis(health_data):
     if gemini_result["error"]:
         response["diet_warning"] = gemini_result["error"]
 
-    return jsonify(response), 200
+    return response
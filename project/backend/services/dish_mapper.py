@@ -1,13 +1,12 @@
 import os
-import json
-import logging
 import time
-from typing import Dict, List, Any, Set, Tuple
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from backend.nutrient_cache import CACHE_DIR, nutrient_cache
 
 # --- CONFIGURATION (Senior Architect Standards) ---
 MAX_CACHE_SIZE = 500
 CACHE_TTL = 30 * 24 * 60 * 60  # 30 days in seconds
-CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
 CACHE_FILE = os.path.join(CACHE_DIR, "spoonacular_cache.json")
 
 # Confidence Scoring Matrix
@@ -31,50 +30,20 @@ LOCKED_REQUESTS: Set[str] = set()
 
 # --- PERSISTENCE LAYER ---
 
-def _load_persistence() -> dict:
-    """Loads cache with backward compatibility and migration logic."""
-    if not os.path.exists(CACHE_FILE):
-        return {}
-    try:
-        with open(CACHE_FILE, "r") as f:
-            data = json.load(f)
-            
-            # Migration logic: Convert old List format to new Dict format with timestamp
-            migrated_count = 0
-            for key in list(data.keys()):
-                if isinstance(data[key], list):
-                    # Wrap legacy list in new structure
-                    data[key] = {
-                        "ingredients": data[key],
-                        "timestamp": time.time(),
-                        "confidence": CONFIDENCE["cache"]
-                    }
-                    migrated_count += 1
-            
-            if migrated_count > 0:
-                print(f"📦 [DISH_MAPPER] Migrated {migrated_count} legacy cache entries.")
-            
-            return data
-    except Exception:
-        return {}
-
-def _enforce_cache_limit(cache: dict):
-    while len(cache) > MAX_CACHE_SIZE:
-        oldest_key = next(iter(cache))
-        cache.pop(oldest_key)
-
-def _save_persistence(cache_data: dict):
-    try:
-        if not os.path.exists(CACHE_DIR):
-            os.makedirs(CACHE_DIR)
-        _enforce_cache_limit(cache_data)
-        with open(CACHE_FILE, "w") as f:
-            json.dump(cache_data, f, indent=4)
-    except Exception as e:
-        logging.error(f"DISH_MAPPER | Save failed: {e}")
-
-# Global In-Memory Cache
-SPOON_CACHE = _load_persistence()
+def _migrate_legacy_entry(name: str, entry) -> Optional[Tuple[dict, float]]:
+    """Legacy spoonacular_cache.json entry -> (cache value, stored_at); None to skip it."""
+    if isinstance(entry, list):
+        # Oldest format: a bare ingredient list without timestamp
+        entry = {"ingredients": entry, "timestamp": time.time(), "confidence": CONFIDENCE["cache"]}
+    if not isinstance(entry, dict):
+        return None
+    return entry, entry.get("timestamp")
+
+# Shared nutrient cache namespace (entries expire after CACHE_TTL, LRU beyond MAX_CACHE_SIZE)
+SPOON_CACHE = nutrient_cache.namespace(
+    "dish_ingredients", ttl_s=CACHE_TTL, max_entries=MAX_CACHE_SIZE,
+    legacy_json=CACHE_FILE, convert=_migrate_legacy_entry,
+)
 
 # --- LOGIC & UTILITIES ---
 
@@ -149,8 +118,8 @@ def get_ingredients(food_name: str) -> MapperResult:
         return _finalize(DISH_MAP[food_name], source)
 
     # 2. Persistent Cache Check with TTL
-    if food_name in SPOON_CACHE:
-        cached = SPOON_CACHE[food_name]
+    cached = SPOON_CACHE.get(food_name)
+    if cached is not None:
         current_time = time.time()
         
         # Check if entry is still valid (TTL check)
@@ -164,7 +133,7 @@ def get_ingredients(food_name: str) -> MapperResult:
             return _finalize(cached["ingredients"], source, decayed_confidence)
         else:
             print(f"⏳ [DISH_MAPPER] Cache expired for {food_name}, refreshing...")
-            del SPOON_CACHE[food_name] # Trigger refresh
+            SPOON_CACHE.delete(food_name) # Trigger refresh
 
     # 3. Duplicate Call Prevention
     if food_name in LOCKED_REQUESTS:
@@ -205,12 +174,11 @@ def get_ingredients(food_name: str) -> MapperResult:
 
 def _cache_and_save(name: str, ingredients: list, source: str):
     """Internal helper with timestamp and confidence tracking."""
-    SPOON_CACHE[name] = {
+    SPOON_CACHE.put(name, {
         "ingredients": ingredients,
         "timestamp": time.time(),
         "confidence": CONFIDENCE.get(source, 0.5)
-    }
-    _save_persistence(SPOON_CACHE)
+    })
 
 def _finalize(ingredients: list, source: str, confidence_override: float = None) -> MapperResult:
     final_ingredients = list(set(ingredients))
@@ -1,10 +1,11 @@
 
 import os
-import requests
-import json
 import logging
 from typing import Dict, List, Any, Optional
 
+from backend.nutrient_cache import CACHE_DIR, nutrient_cache
+from backend.usda_client import usda_client
+
 logger = logging.getLogger(__name__)
 
 class USDAApiService:
@@ -12,8 +13,6 @@ class USDAApiService:
     Handles communication with the USDA FoodData Central API.
     Provides search and details with local caching.
     """
-    BASE_URL = "https://api.nal.usda.gov/fdc/v1"
-    
     # Map USDA Nutrient IDs to our internal keys
     # IDs can be found via: https://fdc.nal.usda.gov/portal-data/external/nutrient_definition
     NUTRIENT_ID_MAP = {
@@ -36,32 +35,9 @@ class USDAApiService:
         self.api_key = os.getenv("USDA_API_KEY")
         self.enabled = os.getenv("USDA_API_ENABLED", "False").lower() == "true"
         
-        # Cache setup
-        self.cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
-        self.cache_file = os.path.join(self.cache_dir, "usda_api_cache.json")
-        self._ensure_cache()
-        self.cache = self._load_cache()
-
-    def _ensure_cache(self):
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-        if not os.path.exists(self.cache_file):
-            with open(self.cache_file, "w") as f:
-                json.dump({}, f)
-
-    def _load_cache(self) -> Dict[str, Any]:
-        try:
-            with open(self.cache_file, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-
-    def _save_cache(self):
-        try:
-            with open(self.cache_file, "w") as f:
-                json.dump(self.cache, f)
-        except Exception as e:
-            logger.error(f"Failed to save USDA cache: {e}")
+        # Cache setup (shared nutrient cache; usda_api_cache.json is imported once)
+        self.cache_file = os.path.join(CACHE_DIR, "usda_api_cache.json")
+        self.cache = nutrient_cache.namespace("usda_api", legacy_json=self.cache_file)
 
     def fetch_food_data(self, query: str) -> Optional[Dict[str, Any]]:
         """
@@ -72,22 +48,16 @@ class USDAApiService:
             return None
             
         query_clean = query.strip().lower()
-        if query_clean in self.cache:
-            return self.cache[query_clean]
+        cached = self.cache.get(query_clean)
+        if cached is not None:
+            return cached
 
         logger.info(f"USDA_API | Searching for: {query_clean}")
         try:
             # 1. Search for the food
-            search_url = f"{self.BASE_URL}/foods/search?api_key={self.api_key}"
-            payload = {
-                "query": query_clean,
-                "pageSize": 5,
-                "dataType": ["Foundation", "SR Legacy", "Survey (FNDDS)"]
-            }
-            
-            response = requests.post(search_url, json=payload, timeout=10)
-            response.raise_for_status()
-            results = response.json()
+            results = usda_client.search(query_clean, page_size=5,
+                                         data_types=["Foundation", "SR Legacy", "Survey (FNDDS)"],
+                                         timeout=10, api_key=self.api_key)
             
             foods = results.get("foods", [])
             if not foods:
@@ -128,8 +98,7 @@ class USDAApiService:
             }
             
             # Save to cache
-            self.cache[query_clean] = normalized_data
-            self._save_cache()
+            self.cache.put(query_clean, normalized_data)
             
             return normalized_data
 
@@ -137,5 +106,15 @@ class USDAApiService:
             logger.error(f"USDA_API | Request failed for '{query}': {e}")
             return None
 
+    def prefetch(self, queries: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Fetch the uncached queries concurrently (usda_client pool) and cache
+        them. Returns {query_clean: data or None} for the queries fetched.
+        """
+        if not self.enabled or not self.api_key:
+            return {}
+        misses = [q for q in dict.fromkeys(q.strip().lower() for q in queries) if self.cache.get(q) is None]
+        return dict(zip(misses, usda_client.map(self.fetch_food_data, misses)))
+
 # Singleton instance
 usda_api_service = USDAApiService()
@@ -1,10 +1,11 @@
 
 import os
-import requests
-import json
 import logging
 from typing import Dict, List, Any, Optional
 
+from backend.nutrient_cache import CACHE_DIR, nutrient_cache
+from backend.usda_client import usda_client
+
 logger = logging.getLogger(__name__)
 
 class USDAService:
@@ -12,8 +13,6 @@ class USDAService:
     Handles communication with the USDA FoodData Central API.
     Provides searching and detail extraction with local fallback.
     """
-    BASE_URL = "https://api.nal.usda.gov/fdc/v1"
-    
     # Map USDA Nutrient IDs to our internal keys
     NUTRIENT_ID_MAP = {
         "protein": 1003,
@@ -28,97 +27,70 @@ class USDAService:
         self.api_key = os.getenv("USDA_API_KEY")
         self.enabled = os.getenv("USDA_API_ENABLED", "False").lower() == "true"
         
-        # Cache setup
-        self.cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
-        self.cache_file = os.path.join(self.cache_dir, "usda_api_cache_v2.json")
-        self._ensure_cache()
-        self.cache = self._load_cache()
-
-    def _ensure_cache(self):
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-        if not os.path.exists(self.cache_file):
-            with open(self.cache_file, "w") as f:
-                json.dump({}, f)
-
-    def _load_cache(self) -> Dict[str, Any]:
-        try:
-            with open(self.cache_file, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-
-    def _save_cache(self):
-        try:
-            with open(self.cache_file, "w") as f:
-                json.dump(self.cache, f)
-        except Exception as e:
-            logger.error(f"Failed to save USDA cache: {e}")
+        # Cache setup (shared nutrient cache; usda_api_cache_v2.json is imported once)
+        self.cache_file = os.path.join(CACHE_DIR, "usda_api_cache_v2.json")
+        self.cache = nutrient_cache.namespace("usda_search", legacy_json=self.cache_file)
 
     def search_foods(self, query_string: str) -> List[Dict[str, Any]]:
         """
         Search for foods by keyword and return structured nutrient data.
         Requirement: protein, fiber, sugar, carbohydrates, calories, sodium.
+        Uncached queries are fetched concurrently; results keep query order.
         """
-        queries = [q.strip() for q in query_string.split(",")]
-        all_results = []
-
-        for query in queries:
-            query_clean = query.lower()
-            
-            # 1. Check Cache
-            if query_clean in self.cache:
-                all_results.append(self.cache[query_clean])
-                continue
-
-            # 2. API Call
-            if self.enabled and self.api_key:
-                try:
-                    search_url = f"{self.BASE_URL}/foods/search?api_key={self.api_key}"
-                    payload = {
-                        "query": query_clean,
-                        "pageSize": 5,
-                        "dataType": ["Foundation", "SR Legacy", "Survey (FNDDS)"]
-                    }
-                    response = requests.post(search_url, json=payload, timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    foods = data.get("foods", [])
-                    if foods:
-                        # Best match
-                        best = sorted(foods, key=lambda x: len(x.get("description", "")))[0]
-                        
-                        mapped = {
-                            "name": best.get("description"),
-                            "fdc_id": best.get("fdcId"),
-                            "protein": 0.0,
-                            "fiber": 0.0,
-                            "sugar": 0.0,
-                            "carbohydrates": 0.0,
-                            "calories": 0.0,
-                            "sodium": 0.0
-                        }
-
-                        for nut in best.get("foodNutrients", []):
-                            n_id = nut.get("nutrientId")
-                            val = nut.get("value", 0.0)
-                            
-                            for key, target_id in self.NUTRIENT_ID_MAP.items():
-                                if n_id == target_id:
-                                    mapped[key] = val
-                            
-                            # Fallback check by name for calories
-                            if not mapped["calories"] and nut.get("nutrientName", "").lower() == "energy":
-                                mapped["calories"] = val
-
-                        self.cache[query_clean] = mapped
-                        self._save_cache()
-                        all_results.append(mapped)
-                except Exception as e:
-                    logger.error(f"USDA API Search failed for {query_clean}: {e}")
-            
-        return all_results
+        queries = [q.strip().lower() for q in query_string.split(",")]
+
+        # 1. Check Cache
+        results = {query: self.cache.get(query) for query in dict.fromkeys(queries)}
+
+        # 2. API Call (misses only)
+        misses = [query for query, cached in results.items() if cached is None]
+        if misses and self.enabled and self.api_key:
+            results.update(zip(misses, usda_client.map(self._fetch_food, misses)))
+
+        return [results[query] for query in queries if results[query] is not None]
+
+    def _fetch_food(self, query_clean: str) -> Optional[Dict[str, Any]]:
+        """Best live match for one query, cached; None if there is none or the call fails."""
+        try:
+            data = usda_client.search(query_clean, page_size=5,
+                                      data_types=["Foundation", "SR Legacy", "Survey (FNDDS)"],
+                                      timeout=10, api_key=self.api_key)
+
+            foods = data.get("foods", [])
+            if not foods:
+                return None
+
+            # Best match
+            best = sorted(foods, key=lambda x: len(x.get("description", "")))[0]
+
+            mapped = {
+                "name": best.get("description"),
+                "fdc_id": best.get("fdcId"),
+                "protein": 0.0,
+                "fiber": 0.0,
+                "sugar": 0.0,
+                "carbohydrates": 0.0,
+                "calories": 0.0,
+                "sodium": 0.0
+            }
+
+            for nut in best.get("foodNutrients", []):
+                n_id = nut.get("nutrientId")
+                val = nut.get("value", 0.0)
+
+                for key, target_id in self.NUTRIENT_ID_MAP.items():
+                    if n_id == target_id:
+                        mapped[key] = val
+
+                # Fallback check by name for calories
+                if not mapped["calories"] and nut.get("nutrientName", "").lower() == "energy":
+                    mapped["calories"] = val
+
+            self.cache.put(query_clean, mapped)
+            return mapped
+        except Exception as e:
+            logger.error(f"USDA API Search failed for {query_clean}: {e}")
+            return None
 
 # Singleton instance
 usda_service = USDAService()
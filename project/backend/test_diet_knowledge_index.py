@@ -0,0 +1,111 @@
+import sys
+import os
+import json
+import pickle
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import diet_knowledge_index
+from backend.fallback_diet_engine import KNOWLEDGE_PATH, DietKnowledgeManager
+from backend.food_score_matrix import FoodScoreMatrix
+
+
+def _legacy(data):
+    """The dict scans DietKnowledgeManager did before the compiled index."""
+    def nutrients(conditions):
+        return {n for c in conditions for n in data['condition_nutrients'].get(c, [])}
+
+    def foods(nutrients):
+        return {f for n in nutrients for f in data['nutrient_foods'].get(n, [])}
+
+    def avoid(conditions):
+        out = {}
+        for c in conditions:
+            entry = data['condition_avoid'].get(c)
+            if entry:
+                for f in entry.get('foods', []):
+                    out[f.lower()] = entry.get('reason', 'Aggravates detected metabolic markers.')
+        return out
+    return nutrients, foods, avoid
+
+
+def test_index_matches_dict_scans():
+    with tempfile.TemporaryDirectory() as tmp:
+        kb = DietKnowledgeManager(KNOWLEDGE_PATH, os.path.join(tmp, 'kb.idx'))
+    with open(KNOWLEDGE_PATH) as f:
+        data = json.load(f)
+    nutrients, foods, avoid = _legacy(data)
+    conditions = list(data['condition_nutrients']) + ['unknown_condition']
+    for i in range(len(conditions)):
+        group = conditions[i:i + 3]
+        assert set(kb.get_nutrients_for_conditions(group)) == nutrients(group)
+        assert kb.get_avoid_data(group) == avoid(group)
+        targets = sorted(nutrients(group))
+        postings = kb.get_foods_for_nutrients(targets)
+        assert postings == sorted(foods(targets))
+    assert kb.get_food_details('Jowar Roti') == data['food_details']['jowar roti']
+    assert kb.get_food_details('no such food') == {}
+    assert kb.data['synergies'] == data['synergies']
+
+
+def test_snapshot_reuse_and_rebuild_on_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path, snapshot = os.path.join(tmp, 'kb.json'), os.path.join(tmp, 'kb.idx')
+        data = {'condition_nutrients': {'anemia': ['iron']}, 'nutrient_foods': {'iron': ['spinach', 'dates']},
+                'food_details': {'spinach': {'tags': ['iron']}}, 'condition_avoid': {}}
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+        kb = DietKnowledgeManager(path, snapshot)
+        assert kb.loaded_from == 'json' and os.path.exists(snapshot)
+        again = DietKnowledgeManager(path, snapshot)
+        assert again.loaded_from == 'snapshot' and again.get_foods_for_nutrients(['iron']) == ['dates', 'spinach']
+
+        matrix = FoodScoreMatrix(kb, lambda name: None)
+        assert matrix.score(['Spinach'], ['iron'], {})[0].tolist() == [2.0]
+
+        data['nutrient_foods']['iron'].append('jaggery')
+        data['food_details']['spinach']['tags'].append('indian_staple')
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        kb.RELOAD_CHECK_S = 0
+        assert kb.get_foods_for_nutrients(['iron']) == ['dates', 'jaggery', 'spinach'] and kb.loaded_from == 'json'
+        assert matrix.score(['Spinach'], ['iron'], {})[0].tolist() == [7.0]  # rows rebuilt with the new tags
+        assert DietKnowledgeManager(path, snapshot).loaded_from == 'snapshot'
+
+        # Snapshots from another format version or that do not unpickle are ignored and rewritten
+        real = diet_knowledge_index.FORMAT_VERSION
+        diet_knowledge_index.FORMAT_VERSION = real + 1
+        try:
+            assert DietKnowledgeManager(path, snapshot).loaded_from == 'json'
+        finally:
+            diet_knowledge_index.FORMAT_VERSION = real
+        real = diet_knowledge_index._module_hash()
+        diet_knowledge_index._code_hash = 'other code'  # index code changed since the snapshot
+        try:
+            assert DietKnowledgeManager(path, snapshot).loaded_from == 'json'
+        finally:
+            diet_knowledge_index._code_hash = real
+        with open(snapshot, 'wb') as f:
+            f.write(b'DKIDX\ngarbage')
+        assert DietKnowledgeManager(path, snapshot).loaded_from == 'json'
+        assert DietKnowledgeManager(path, snapshot).loaded_from == 'snapshot'
+
+        # Only plain data is unpickled: a snapshot referencing any class is rejected
+        kb = DietKnowledgeManager(path, snapshot)
+        with open(snapshot, 'wb') as f:
+            f.write(b'DKIDX\n')
+            pickle.dump(diet_knowledge_index._header(path, kb.version), f)
+            pickle.dump(kb.index, f)
+        assert DietKnowledgeManager(path, snapshot).loaded_from == 'json'
+
+        missing = DietKnowledgeManager(os.path.join(tmp, 'missing.json'), snapshot)
+        assert missing.loaded_from == 'empty' and missing.get_food_details('spinach') == {}
+
+
+if __name__ == "__main__":
+    test_index_matches_dict_scans()
+    test_snapshot_reuse_and_rebuild_on_change()
+    print("PASSED: diet knowledge index (matches dict scans, snapshot reuse, rebuild on change).")
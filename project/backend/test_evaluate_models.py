@@ -0,0 +1,45 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from backend.evaluate_models import calibration, confusion, default_targets, evaluate, fold_assignments
+
+
+def test_metrics_and_cached_folds():
+    y = np.array([0, 0, 1, 1, 2, 2, 0, 1, 2, 0])
+    assert confusion(y, y, 3) == [[4, 0, 0], [0, 3, 0], [0, 0, 3]]
+
+    perfect = np.eye(3)[y]
+    cal = calibration(y, perfect)
+    assert cal['ece'] == 0.0 and cal['brier'] == 0.0
+    uniform = calibration(y, np.full((len(y), 3), 1 / 3))
+    assert uniform['brier'] > 0.6 and len(uniform['reliability']) == 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        y = np.repeat([0, 1], 50)
+        fold, holdout, cached = fold_assignments(y, 'ab' * 32, 5, 42, tmp)
+        assert not cached and sorted(np.bincount(fold)) == [20] * 5 and holdout.sum() == 20
+        fold2, holdout2, cached = fold_assignments(y, 'ab' * 32, 5, 42, tmp)
+        assert cached and (fold2 == fold).all() and (holdout2 == holdout).all()
+
+
+def test_lung_cancer_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        targets = default_targets()
+        targets['diabetes']['data'] = None
+        report = evaluate(targets, k=3, jobs=2, cache_dir=tmp)
+    lung = report['targets']['lung_cancer']
+    assert lung['status'] == 'ok', lung
+    assert lung['dataset']['rows'] == 100 and lung['dataset']['classes'] == ['High', 'Low', 'Medium']
+    assert sum(map(sum, lung['artifact']['confusion_matrix'])) == lung['artifact']['test_rows'] == 20
+    assert len(lung['cross_validation']['folds']) == 3
+    assert 0.0 <= lung['cross_validation']['calibration']['ece'] <= 1.0
+    assert report['targets']['diabetes']['status'] == 'skipped'
+
+
+if __name__ == "__main__":
+    test_metrics_and_cached_folds()
+    test_lung_cancer_report()
+    print("PASSED: model evaluation metrics, fold cache and lung cancer report.")
@@ -0,0 +1,68 @@
+import sys
+import os
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.fallback_diet_engine import expert_kb, score_food_hierarchical
+from backend.food_score_matrix import FoodScoreMatrix
+from backend.usda_manager import usda_manager
+
+
+class _KB:
+    def __init__(self, details):
+        self.details = details
+
+    def get_food_details(self, name):
+        return self.details.get(name, {})
+
+
+def _assert_same(matrix, foods, targets, avoid_map, context):
+    scores, reasons = matrix.score(foods, targets, avoid_map, context)
+    for food, score, reason in zip(foods, scores.tolist(), reasons):
+        assert (score, reason) == score_food_hierarchical(food, targets, avoid_map, context=context), food
+
+
+def test_matches_per_food_scoring_over_knowledge_base():
+    matrix = FoodScoreMatrix(expert_kb, usda_manager.get_food_nutrients_local)
+    foods = [name.title() for name in expert_kb.data['food_details']]
+    foods += ['Brown Rice', 'roti with ghee', 'Poha', 'fried food', 'Unknown Dish']
+    nutrients = sorted(set(expert_kb.data['nutrient_foods']) | {'hypertension', 'kidney_strain', 'prediabetes', 'sodium', 'sugar'})
+    conditions = list(expert_kb.data['condition_avoid'])
+    rng = random.Random(7)
+    for _ in range(40):
+        targets = rng.sample(nutrients, rng.randint(0, 6))
+        avoid_map = expert_kb.get_avoid_data(rng.sample(conditions, rng.randint(0, 3)))
+        context = rng.choice([None, {}, {
+            'boost': rng.sample(['dal', 'roti', 'rice', 'spinach', 'nut'], 2),
+            'avoid': rng.sample(['fried', 'sugar', 'pickle', 'mutton'], rng.randint(0, 2)),
+            'goals': {'iron': rng.choice(['high', None]), 'sugar': 'low', 'sodium': rng.choice(['low', None])},
+            'derived_ingredients': rng.sample(['moong', 'oats', 'paneer', 'ragi', 'curd'], 2),
+        }])
+        _assert_same(matrix, rng.sample(foods, 60), targets, avoid_map, context)
+    assert len(matrix) == len(set(f.lower() for f in foods))
+
+
+def test_gates_precedence_and_late_rows():
+    kb = _KB({'salted chips': {'tags': ['potassium']}, 'jaggery': {'tags': ['iron', 'indian_staple']}})
+    lookup = {'salted chips': {'nutrients': {'sodium': 500, 'potassium': 3.0}},
+              'jaggery': {'nutrients': {'sugar': 80.0, 'iron': 11}},
+              'plain water': {'nutrients': {}}}.get
+    matrix = FoodScoreMatrix(kb, lookup)
+    scores, reasons = matrix.score(['Salted Chips', 'Jaggery', 'Plain Water'], ['potassium', 'hypertension', 'iron'],
+                                   {'salted chips': 'expert avoid'}, {'avoid': ['chip']})
+    assert scores.tolist() == [-100.0, 2.0 + 5.0 + 5.0, 0.0]
+    assert reasons == ['Contraindicated by clinical report findings.', None, None]
+
+    scores, reasons = matrix.score(['salted chips', 'jaggery'], ['hypertension', 'prediabetes'], {})
+    assert reasons == ['High sodium (500mg) is contraindicated for renal/vascular stress markers.',
+                       'High glycemic load (80.0g sugar) aggravates detected insulin resistance.']
+
+    kb.details['kale'] = {'tags': ['iron', 'antioxidants']}  # a tag the matrix has not seen yet
+    scores, _ = matrix.score(['Kale', 'Jaggery'], ['antioxidants'], {})
+    assert scores.tolist() == [2.0, 5.0] and len(matrix) == 4
+
+
+if __name__ == "__main__":
+    test_matches_per_food_scoring_over_knowledge_base()
+    test_gates_precedence_and_late_rows()
+    print("PASSED: food score matrix (identical to per-food scoring, safety gates, new rows and tags).")
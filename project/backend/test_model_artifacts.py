@@ -0,0 +1,90 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from backend.model_artifacts import (
+    FlatTreeEnsemble, export_sklearn_ensemble, export_xgboost_binary, read_artifact, write_artifact,
+)
+
+
+def _roundtrip(model, out_dir):
+    manifest, arrays = export_sklearn_ensemble(model)
+    write_artifact(out_dir, manifest, arrays, sources=())
+    manifest, arrays = read_artifact(out_dir, mmap=True)
+    return FlatTreeEnsemble(manifest, arrays)
+
+
+def test_flat_sklearn_ensembles_match_predict_proba():
+    rng = np.random.RandomState(0)
+    X = rng.randint(0, 4, size=(300, 6)).astype(np.float64)
+    y3 = (X[:, 0] + X[:, 1] + rng.randint(0, 2, 300)) % 3
+    X_test = np.vstack([X[:50], rng.rand(50, 6) * 4])
+
+    models = [
+        GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=0).fit(X, y3),
+        GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=0).fit(X, y3 > 0),
+        RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y3),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, model in enumerate(models):
+            flat = _roundtrip(model, os.path.join(tmp, str(i)))
+            # Raw scores are exact; the NumPy sigmoid may differ from scipy's expit by an ulp
+            assert np.allclose(flat.predict_proba(X_test), model.predict_proba(X_test), rtol=0, atol=1e-15)
+            assert np.allclose(flat.predict_proba(X_test[:1]), model.predict_proba(X_test[:1]), rtol=0, atol=1e-15)
+            labels = flat.classes_[flat.predict_proba(X_test).argmax(axis=1)]
+            assert np.array_equal(labels, model.predict(X_test))
+
+
+def test_flat_xgboost_matches_predict_proba():
+    from xgboost import XGBClassifier
+
+    rng = np.random.RandomState(1)
+    X = rng.rand(400, 5).astype(np.float32)
+    y = ((X[:, 0] + 0.5 * X[:, 1] > 0.8) ^ (rng.rand(400) < 0.1)).astype(int)
+    X[rng.rand(*X.shape) < 0.15] = np.nan  # learned default directions
+    X_test = np.vstack([X[:60], rng.rand(60, 5).astype(np.float32)])
+    X_test[rng.rand(*X_test.shape) < 0.2] = np.nan
+    X_test[0] = np.nan  # every split takes its default branch
+
+    models = [
+        XGBClassifier(n_estimators=30, max_depth=4, learning_rate=0.3, base_score=0.3).fit(X, y),
+        # best_iteration from early stopping: predict_proba only sums the trees up to it
+        XGBClassifier(n_estimators=200, max_depth=3, learning_rate=0.5, early_stopping_rounds=3)
+        .fit(X[:300], y[:300], eval_set=[(X[300:], y[300:])], verbose=False),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, model in enumerate(models):
+            path = os.path.join(tmp, f'model{i}.json')
+            model.save_model(path)
+            manifest, arrays = export_xgboost_binary(path)
+            write_artifact(os.path.join(tmp, str(i)), manifest, arrays, sources=())
+            flat = FlatTreeEnsemble(*read_artifact(os.path.join(tmp, str(i)), mmap=True))
+            assert manifest['n_trees'] > 1
+            native = model.predict_proba(X_test)
+            assert np.abs(flat.predict_proba(X_test) - native).max() < 1e-6
+            assert np.abs(flat.predict_proba(X_test[:1]) - native[:1]).max() < 1e-6
+        assert models[1].best_iteration + 1 == manifest['n_trees'] < 200
+
+
+def test_stale_artifact_is_ignored():
+    model = RandomForestClassifier(n_estimators=2, random_state=0).fit(np.eye(4), [0, 1, 0, 1])
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'model.pkl')
+        with open(source, 'wb') as f:
+            f.write(b'v1')
+        manifest, arrays = export_sklearn_ensemble(model)
+        write_artifact(os.path.join(tmp, 'flat'), manifest, arrays, sources=(source,))
+        assert read_artifact(os.path.join(tmp, 'flat')) is not None
+        with open(source, 'wb') as f:
+            f.write(b'v2')
+        assert read_artifact(os.path.join(tmp, 'flat')) is None
+
+
+if __name__ == "__main__":
+    test_flat_sklearn_ensembles_match_predict_proba()
+    test_flat_xgboost_matches_predict_proba()
+    test_stale_artifact_is_ignored()
+    print("PASSED: flat sklearn and XGBoost ensembles match predict_proba.")
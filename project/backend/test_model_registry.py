@@ -0,0 +1,92 @@
+import sys
+import os
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from backend.model_registry import ModelRegistry, estimate_object_size
+
+
+def _loader(n_bytes, calls):
+    def load():
+        calls.append(n_bytes)
+        return {'model': np.zeros(n_bytes, dtype=np.uint8)}
+    return load
+
+
+def test_registry_keeps_models_until_budget_exceeded():
+    calls = []
+    registry = ModelRegistry(budget_mb=3)
+    registry.register('a', _loader(1024 * 1024, calls))
+    registry.register('b', _loader(1024 * 1024, calls))
+    registry.register('c', _loader(1024 * 1024, calls))
+
+    # Alternating traffic within budget loads each model exactly once
+    for _ in range(5):
+        assert registry.get('a') is not None
+        assert registry.get('b') is not None
+    assert len(calls) == 2
+
+    # Touch 'a' so 'b' is least recently used, then overflow the budget
+    registry.get('a')
+    registry.budget_bytes = int(2.5 * 1024 * 1024)
+    registry.get('c')
+    stats = registry.stats()
+    assert stats['lru_order'] == ['a', 'c']
+    assert stats['models']['b']['evictions'] == 1
+    assert stats['models']['a']['loads'] == 1 and stats['models']['a']['hits'] == 5
+    assert stats['models']['c']['last_cold_load_ms'] is not None
+
+
+def test_failed_loads_are_not_cached():
+    registry = ModelRegistry()
+    registry.register('missing', lambda: None)
+    assert registry.get('missing') is None
+    assert registry.get('missing') is None
+    assert registry.stats()['models']['missing']['failed_loads'] == 2
+    assert not registry.is_resident('missing')
+
+
+def test_concurrent_cold_loads_are_single_flight():
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    def slow_load():
+        calls.append('slow')
+        started.set()
+        release.wait(5)
+        return {'model': np.zeros(16, dtype=np.uint8)}
+
+    registry = ModelRegistry()
+    registry.register('slow', slow_load)
+    registry.register('fast', _loader(16, calls))
+    bundles = []
+    threads = [threading.Thread(target=lambda: bundles.append(registry.get('slow'))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    started.wait(5)
+    # Another model is not held up by the load in progress
+    t0 = time.perf_counter()
+    assert registry.get('fast') is not None and time.perf_counter() - t0 < 1
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert calls == ['slow', 16]
+    assert len(bundles) == 4 and all(b is bundles[0] for b in bundles)
+    stats = registry.stats()['models']['slow']
+    assert stats['loads'] == 1 and stats['hits'] == 3
+
+
+def test_estimate_object_size_counts_array_buffers():
+    arr = np.ones((1000, 100))
+    assert estimate_object_size({'x': arr, 'y': [arr, arr]}) >= arr.nbytes
+    assert estimate_object_size({'x': arr}) < 2 * arr.nbytes
+
+
+if __name__ == "__main__":
+    test_registry_keeps_models_until_budget_exceeded()
+    test_failed_loads_are_not_cached()
+    test_concurrent_cold_loads_are_single_flight()
+    test_estimate_object_size_counts_array_buffers()
+    print("PASSED: model registry LRU/budget behaviour and single-flight loads.")
@@ -0,0 +1,118 @@
+import sys
+import os
+import socket
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from backend import model_server
+from backend.model_server import ModelServer, ModelServerClient, ModelServerUnavailable
+from backend.routes import predict
+from backend.test_predict_batch import HEART_ROW, _lung_row
+
+
+def _predict_uncached(prediction_type, features):
+    max_entries = predict.prediction_cache.max_entries
+    predict.prediction_cache.max_entries = 0
+    try:
+        return predict.predict_with_type(prediction_type, features)
+    finally:
+        predict.prediction_cache.max_entries = max_entries
+
+
+def test_remote_predictions_match_in_process_and_fall_back():
+    local = {
+        'heart_disease': [_predict_uncached('heart_disease', dict(HEART_ROW, BMI=b)) for b in (18.5, 27.0, 41.0)],
+        'lung_cancer': [_predict_uncached('lung_cancer', _lung_row(i)) for i in (1, 4, 7)],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'models.sock')
+        with open(path, 'w') as f:
+            f.write('not a socket')
+        try:
+            ModelServer(path)
+            assert False, 'a regular file at the socket path must not be removed'
+        except FileExistsError:
+            assert os.path.isfile(path)
+        os.remove(path)
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)  # left behind by a crashed server: replaced
+        stale.close()
+        server = ModelServer(path)
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = ModelServerClient(path, pool_size=2)
+        predict.model_server_client = client
+        try:
+            assert client.ping()
+            X = np.random.RandomState(0).rand(5, 18).astype(np.float32)
+            probs = client.predict_proba('heart_disease', X)
+            assert probs.shape == (5, 2) and probs.dtype == np.float32
+
+            remote = {
+                'heart_disease': [_predict_uncached('heart_disease', dict(HEART_ROW, BMI=b)) for b in (18.5, 27.0, 41.0)],
+                'lung_cancer': [_predict_uncached('lung_cancer', _lung_row(i)) for i in (1, 4, 7)],
+            }
+            assert remote == local
+            assert client.bundle('heart_disease')['remote'] is True
+            assert client.stats()['connects'] == 1  # every request reused the pooled connection
+
+            # Validation errors still come from the (remote) schema
+            resp, status = _predict_uncached('lung_cancer', {'Age': '40'})
+            assert status == 400 and 'Missing required features' in resp['error']
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        try:
+            try:
+                client.predict_proba('heart_disease', X)
+                assert False, 'expected ModelServerUnavailable'
+            except ModelServerUnavailable:
+                pass
+            assert not client.available()
+            assert _predict_uncached('heart_disease', dict(HEART_ROW, BMI=27.0)) == local['heart_disease'][1]
+        finally:
+            predict.model_server_client = None
+
+
+def test_malformed_frames_and_timeouts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'models.sock')
+        server = ModelServer(path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(5)
+            sock.connect(path)
+            # dtype code 9 does not exist: an error frame, then the server hangs up
+            sock.sendall(model_server._HEADER.pack(model_server.OP_PREDICT, 0, 9, 0, 1, 1, 8) + b'\0' * 8)
+            status, _, _, _, payload = model_server._recv_message(sock)
+            assert status == model_server.STATUS_ERROR and b'Malformed' in bytes(payload)
+            assert model_server._recv_message(sock) is None
+            sock.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # A server that accepts but never answers: the pooled request times out
+        # once and is not resent on a fresh connection
+        silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        silent.bind(path)
+        silent.listen(4)
+        client = ModelServerClient(path, timeout=0.2)
+        client._idle.append(client._connect())
+        try:
+            assert not client.ping()
+        finally:
+            silent.close()
+        assert client.stats()['connects'] == 1 and client.stats()['failures'] == 1
+
+
+if __name__ == "__main__":
+    test_remote_predictions_match_in_process_and_fall_back()
+    test_malformed_frames_and_timeouts()
+    print("PASSED: model server round trip, malformed frames, timeouts and in-process fallback.")
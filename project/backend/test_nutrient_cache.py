@@ -0,0 +1,90 @@
+import sys
+import os
+import json
+import multiprocessing
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.nutrient_cache import NutrientCache
+from backend.services.dish_mapper import _migrate_legacy_entry
+
+
+def _writer(path, worker):
+    cache = NutrientCache(path).namespace('usda_api')
+    for i in range(50):
+        cache.put(f'food-{worker}-{i}', {'worker': worker, 'i': i})
+
+
+def test_ttl_lru_and_namespaces():
+    now = [1000.0]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = NutrientCache(os.path.join(tmp, 'nutrients.sqlite3'), max_bytes=4000, clock=lambda: now[0])
+        usda = store.namespace('usda_manager')
+        dishes = store.namespace('dish_ingredients', ttl_s=60, max_entries=3)
+
+        usda.put('oats', {'name': 'Oats', 'nutrients': {'fiber': 10.6}})
+        dishes.put('oats', {'ingredients': ['oats']})
+        dishes.put('dal', {'ingredients': ['lentils']}, ttl_s=600)  # per-entry TTL beats the default
+        assert usda.get('oats')['name'] == 'Oats' and dishes.get('oats') == {'ingredients': ['oats']}
+        assert 'oats' in usda and 'rice' not in usda
+
+        now[0] += 61
+        assert dishes.get('oats') is None and dishes.get('dal') is not None
+        assert usda.get('oats') is not None  # no TTL in this namespace
+
+        for name in ('a', 'b', 'c'):
+            now[0] += 1
+            dishes.put(name, {'ingredients': [name]})
+        now[0] += 1
+        assert dishes.get('dal') is None and len(dishes) == 3  # least recently used beyond max_entries
+
+        for i in range(40):
+            now[0] += 1
+            usda.put(f'food-{i}', {'name': 'x' * 100})
+        stats = store.stats()
+        assert stats['bytes'] <= 4000 and usda.get('food-39') is not None and usda.get('food-0') is None
+        assert stats['namespaces']['dish_ingredients']['expired'] == 1
+        assert stats['namespaces']['usda_manager']['evictions'] > 0
+
+        disabled = NutrientCache(os.path.join(tmp, 'off.sqlite3'), max_bytes=0).namespace('usda_manager')
+        disabled.put('oats', {})
+        assert disabled.get('oats') is None
+
+
+def test_legacy_import_once_and_concurrent_writers():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'nutrients.sqlite3')
+        legacy = os.path.join(tmp, 'spoonacular_cache.json')
+        now = 2_000_000.0
+        with open(legacy, 'w') as f:
+            json.dump({'khichdi': ['rice', 'lentils'],
+                       'upma': {'ingredients': ['oats'], 'timestamp': now - 10, 'confidence': 0.7},
+                       'stale': {'ingredients': ['x'], 'timestamp': now - 1000, 'confidence': 0.7},
+                       'dal': 'oops', 'bad_time': {'ingredients': ['x'], 'timestamp': 'yesterday'}}, f)
+        store = NutrientCache(path, clock=lambda: now)
+        ns = store.namespace('dish_ingredients', ttl_s=100, legacy_json=legacy, convert=_migrate_legacy_entry)
+        assert ns.get('upma')['ingredients'] == ['oats'] and ns.get('khichdi')['ingredients'] == ['rice', 'lentils']
+        assert ns.get('stale') is None and len(ns) == 2  # malformed entries are skipped, not fatal
+
+        ns.put('upma', {'ingredients': ['oats', 'onion'], 'timestamp': now, 'confidence': 0.9})
+        assert store.import_json(ns, legacy, _migrate_legacy_entry) == 0  # same file: not re-read
+        with open(legacy, 'w') as f:
+            json.dump({'upma': {'ingredients': ['stale copy'], 'timestamp': now}, 'poha': ['rice']}, f)
+        os.utime(legacy, ns=(0, 10 ** 18))
+        assert store.import_json(ns, legacy, _migrate_legacy_entry) == 1  # changed file: only new keys
+        assert ns.get('upma')['ingredients'] == ['oats', 'onion'] and ns.get('poha') is not None
+
+        ctx = multiprocessing.get_context('fork')
+        workers = [ctx.Process(target=_writer, args=(path, w)) for w in range(4)]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join(30)
+        assert all(p.exitcode == 0 for p in workers)
+        assert len(NutrientCache(path).namespace('usda_api')) == 200
+
+
+if __name__ == "__main__":
+    test_ttl_lru_and_namespaces()
+    test_legacy_import_once_and_concurrent_writers()
+    print("PASSED: nutrient cache (TTL, LRU limits, namespaces, legacy import, concurrent writers).")
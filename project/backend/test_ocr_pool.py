@@ -0,0 +1,176 @@
+import io
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from backend.ocr_pool import OCRPool, OCRQueueFull, OCRTimeout
+from backend.report_cache import ReportCache
+
+
+# Stand-ins for the Tesseract job (the binary is not needed to test the pool)
+
+def _echo_job(path, filename, medical_report_mode, lang, timeout):
+    started = time.time()
+    if path.startswith('sleep:'):
+        time.sleep(float(path.split(':', 1)[1]))
+    if path == 'boom':
+        raise ValueError('unreadable image')
+    if path == 'crash':
+        os._exit(1)
+    if path.startswith('mark:'):
+        open(path.split(':', 1)[1], 'w').close()
+    return f'{path}|{medical_report_mode}|{lang}', started, time.time()
+
+
+def _limits_job(path, filename, medical_report_mode, lang, timeout):
+    from backend import ocr_scanner
+    return f"{os.environ.get('OMP_THREAD_LIMIT')}|{ocr_scanner.PDF_OCR_WORKERS}", time.time(), time.time()
+
+
+def test_workers_limit_tesseract_threads():
+    from backend import ocr_scanner
+    parent = os.environ.get('OMP_THREAD_LIMIT'), ocr_scanner.PDF_OCR_WORKERS
+    pool = OCRPool(workers=2, job=_limits_job)
+    try:
+        omp, pages = pool.extract_text('x').split('|')
+    finally:
+        pool.shutdown()
+    assert omp == (parent[0] or '1')
+    assert int(pages) == ocr_scanner.worker_page_threads(parent[1], 2, os.cpu_count() or 1)
+    # Only the workers are limited: OCR in this process keeps its settings
+    assert (os.environ.get('OMP_THREAD_LIMIT'), ocr_scanner.PDF_OCR_WORKERS) == parent
+
+
+def test_results_errors_and_stats():
+    pool = OCRPool(workers=2, max_pending=4, timeout_s=10, job=_echo_job)
+    try:
+        pool.start()  # forks every worker up front, from this thread
+        workers = set(pool._pool._processes)
+        assert len(workers) == 2
+        assert pool.extract_text('a.png', medical_report_mode=True) == 'a.png|True|eng'
+        assert set(pool._pool._processes) == workers  # jobs reuse them, nothing forked later
+        assert pool.extract_text('b.png', lang='hin') == 'b.png|False|hin'
+        try:
+            pool.extract_text('boom')
+            assert False, 'job error should propagate'
+        except ValueError as exc:
+            assert 'unreadable' in str(exc)
+        try:
+            pool.extract_text('crash')
+            assert False, 'dead worker should fail the job'
+        except RuntimeError as exc:
+            assert 'crashed' in str(exc)
+        assert pool.extract_text('c.png') == 'c.png|False|eng'  # fresh pool after the crash
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+    assert stats['submitted'] == 5 and stats['completed'] == 3 and stats['failed'] == 2
+    assert stats['in_flight'] == 0 and stats['queue_depth'] == 0
+    assert stats['ocr_p50_ms'] is not None and stats['wait_p99_ms'] is not None
+
+
+def test_queue_full_and_timeout():
+    pool = OCRPool(workers=1, max_pending=2, timeout_s=10, job=_echo_job)
+    try:
+        pool.extract_text('warm')  # start the worker outside the timed part
+        threads = [threading.Thread(target=pool.extract_text, args=('sleep:0.5',)) for _ in range(2)]
+        for t in threads:
+            t.start()
+        deadline = time.time() + 5
+        while pool.stats()['in_flight'] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.stats()['queue_depth'] == 1
+        try:
+            pool.extract_text('x.png')
+            assert False, 'third job should be rejected'
+        except OCRQueueFull:
+            pass
+        for t in threads:
+            t.join()
+
+        try:
+            pool.extract_text('sleep:1', timeout=0.1)
+            assert False, 'slow job should time out'
+        except OCRTimeout:
+            pass
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+    assert stats['rejected'] == 1 and stats['timeouts'] == 1 and stats['completed'] == 3
+
+
+def test_jobs_past_their_deadline_are_dropped():
+    pool = OCRPool(workers=1, max_pending=5, timeout_s=10, job=_echo_job)
+    with tempfile.TemporaryDirectory() as tmp:
+        marks = [os.path.join(tmp, f'{i}.ran') for i in range(3)]
+        try:
+            pool.extract_text('warm')
+            busy = threading.Thread(target=pool.extract_text, args=('sleep:0.6',))
+            busy.start()
+            time.sleep(0.1)
+            # Saturate the worker: these callers give up while their jobs
+            # are queued, including the one already handed to the worker
+            results, errors = [None] * 3, [None] * 3
+
+            def late(i):
+                try:
+                    results[i] = pool.extract_text(f'mark:{marks[i]}', timeout=0.2)
+                except Exception as exc:
+                    errors[i] = exc
+
+            waiters = [threading.Thread(target=late, args=(i,)) for i in range(3)]
+            for t in waiters:
+                t.start()
+            for t in waiters + [busy]:
+                t.join()
+            assert all(isinstance(e, OCRTimeout) for e in errors), errors
+            assert pool.extract_text('after.png') == 'after.png|False|eng'  # the worker is free again
+            assert not any(os.path.exists(m) for m in marks), 'expired jobs must not be scanned'
+            stats = pool.stats()
+        finally:
+            pool.shutdown()
+    assert stats['timeouts'] == 3 and stats['in_flight'] == 0
+
+
+def test_analyze_report_maps_pool_errors():
+    from backend.routes import report_analysis
+
+    class _Busy:
+        def __init__(self, exc):
+            self.exc = exc
+
+        def extract_text(self, *args, **kwargs):
+            raise self.exc
+
+        def stats(self):
+            return {'in_flight': 0}
+
+    app = Flask(__name__)
+    app.register_blueprint(report_analysis.report_analysis_bp, url_prefix='/api')
+    client = app.test_client()
+    real = report_analysis.ocr_pool, report_analysis.report_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        report_analysis.report_cache = ReportCache(os.path.join(tmp, 'reports.sqlite3'))
+        try:
+            for exc, status in ((OCRQueueFull('full'), 503), (OCRTimeout('slow'), 504)):
+                report_analysis.ocr_pool = _Busy(exc)
+                resp = client.post('/api/analyze-report', data={'report': (io.BytesIO(b'img'), 'scan.png')},
+                                   content_type='multipart/form-data')
+                assert resp.status_code == status and resp.get_json()['success'] is False
+                assert ('Retry-After' in resp.headers) == (status == 503)
+            assert client.get('/api/ocr-stats').get_json()['in_flight'] == 0
+        finally:
+            report_analysis.ocr_pool, report_analysis.report_cache = real
+
+if __name__ == "__main__":
+    test_workers_limit_tesseract_threads()
+    test_results_errors_and_stats()
+    test_queue_full_and_timeout()
+    test_jobs_past_their_deadline_are_dropped()
+    test_analyze_report_maps_pool_errors()
+    print("PASSED: OCR pool (results, errors, crash recovery, queue limit, timeout, expired jobs, route status codes).")
@@ -0,0 +1,261 @@
+import io
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import logging
+
+import cv2
+import numpy as np
+import PyPDF2
+from PIL import Image
+
+from backend import ocr_scanner
+
+
+def _text_page_pdf(line: str) -> bytes:
+    """A one-page PDF whose text layer is `line`."""
+    stream = f"BT /F1 14 Tf 72 720 Td ({line}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _scanned_page_pdf(height: int) -> bytes:
+    """A one-page image-only PDF (no text layer); the page height tags it."""
+    out = io.BytesIO()
+    Image.new("RGB", (200, height), "white").save(out, format="PDF", resolution=72)
+    return out.getvalue()
+
+
+def _build_pdf(pages) -> str:
+    writer = PyPDF2.PdfWriter()
+    for page in pages:
+        writer.add_page(PyPDF2.PdfReader(io.BytesIO(page)).pages[0])
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def test_pdf_text_layer_first_and_parallel_ocr():
+    layout = ["text", 300, "text", 310, 320, 330]
+    path = _build_pdf([
+        _text_page_pdf(f"Hemoglobin 13.{i} g/dL 12.0 - 16.0 page {i}") if kind == "text" else _scanned_page_pdf(kind)
+        for i, kind in enumerate(layout)
+    ])
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def fake_ocr(image, *, profile, medical_report_mode, lang, deadline, source):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.3)
+        with lock:
+            active[0] -= 1
+        # Rendered at PDF_OCR_DPI: points * dpi / 72
+        return f"scanned {round(image.height * 72 / ocr_scanner.PDF_OCR_DPI)}"
+
+    real = ocr_scanner._ocr_page, ocr_scanner._ocr_available
+    ocr_scanner._ocr_page, ocr_scanner._ocr_available = fake_ocr, lambda: True
+    try:
+        t0 = time.perf_counter()
+        text = ocr_scanner.extract_text_from_pdf(path, medical_report_mode=True, max_workers=4)
+        elapsed = time.perf_counter() - t0
+        default = ocr_scanner.extract_text(path, medical_report_mode=True)  # PDF_OCR_WORKERS
+    finally:
+        ocr_scanner._ocr_page, ocr_scanner._ocr_available = real
+        os.remove(path)
+
+    lines = text.splitlines()
+    assert len(lines) == 6 and lines == default.splitlines()
+    assert lines[0].startswith("Hemoglobin 13.0") and lines[2].startswith("Hemoglobin 13.2")
+    assert lines[1] == "scanned 300" and lines[3:] == ["scanned 310", "scanned 320", "scanned 330"]
+    assert peak[0] > 1 and elapsed < 4 * 0.3
+
+
+def test_pdf_ocr_has_one_deadline_for_all_pages():
+    path = _build_pdf([_scanned_page_pdf(300 + i) for i in range(6)])
+    timeouts, lock = [], threading.Lock()
+
+    def fake_tesseract(pil_img, *, lang, config, timeout, source):
+        with lock:
+            timeouts.append(timeout)
+        time.sleep(min(0.3, timeout))
+        if timeout < 0.3:
+            raise TimeoutError(f"OCR timed out after {timeout:g}s: {source}")
+        return "Hb 13"
+
+    real = ocr_scanner._tesseract, ocr_scanner._ocr_available
+    ocr_scanner._tesseract, ocr_scanner._ocr_available = fake_tesseract, lambda: True
+    try:
+        t0 = time.perf_counter()
+        try:
+            ocr_scanner.extract_text_from_pdf(path, timeout=0.5, max_workers=2)
+            assert False, "a page cut off at the deadline should time the scan out"
+        except TimeoutError:
+            pass
+        elapsed = time.perf_counter() - t0
+    finally:
+        ocr_scanner._tesseract, ocr_scanner._ocr_available = real
+        os.remove(path)
+    # Pages only get the time left; the rest are skipped instead of each getting 0.5 s
+    assert all(t <= 0.5 for t in timeouts) and len(timeouts) < 6 and elapsed < 1.0, (timeouts, elapsed)
+
+
+def test_worker_page_threads_keep_pages_in_flight():
+    # Default OCR_WORKERS on small hosts: still two pages per scanned PDF
+    assert ocr_scanner.worker_page_threads(4, 4, 4) == 2
+    assert ocr_scanner.worker_page_threads(4, 2, 8) == 4
+    assert ocr_scanner.worker_page_threads(1, 4, 4) == 1  # an explicit PDF_OCR_WORKERS=1 is kept
+
+
+def test_pdf_without_ocr_keeps_text_layer():
+    path = _build_pdf([_text_page_pdf("Glucose 98 mg/dL 70 - 100 fasting"), _scanned_page_pdf(300)])
+    real = ocr_scanner._ocr_available
+    ocr_scanner._ocr_available = lambda: False
+    try:
+        assert ocr_scanner.extract_text_from_pdf(path) == "Glucose 98 mg/dL 70 - 100 fasting"
+    finally:
+        ocr_scanner._ocr_available = real
+        os.remove(path)
+
+
+def test_in_memory_uploads_match_files():
+    path = _build_pdf([_text_page_pdf("Glucose 98 mg/dL 70 - 100 fasting"), _text_page_pdf("Urea 30 mg/dL 15 - 40 serum fasting")])
+    fd, image_path = tempfile.mkstemp(suffix=".png")
+    os.close(fd)
+    image = Image.new("RGB", (640, 240), "white")
+    image.paste((0, 0, 0), (40, 40, 600, 60))
+    image.save(image_path)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        expected = ocr_scanner.extract_text(path)
+        assert expected.splitlines() == ["Glucose 98 mg/dL 70 - 100 fasting", "Urea 30 mg/dL 15 - 40 serum fasting"]
+        assert ocr_scanner.extract_text(data) == expected  # sniffed as PDF
+        assert ocr_scanner.extract_text(io.BytesIO(data), filename="report.PDF") == expected
+
+        with open(image_path, "rb") as f:
+            png = f.read()
+        from_disk = ocr_scanner.preprocess_image(image_path, medical_report_mode=True)
+        assert (ocr_scanner.preprocess_image(png, medical_report_mode=True) == from_disk).all()
+        assert (ocr_scanner.preprocess_image(io.BytesIO(png), medical_report_mode=True) == from_disk).all()
+        try:
+            ocr_scanner.extract_text(b"not a report", filename="notes.txt")
+            assert False, "unsupported extension should be rejected"
+        except ValueError:
+            pass
+    finally:
+        os.remove(path)
+        os.remove(image_path)
+
+
+def _report_page(h=1400, w=1100):
+    img = np.full((h, w), 245, np.uint8)
+    for y in range(80, h - 40, 50):
+        cv2.putText(img, "Hemoglobin  13.5  g/dL  12.0 - 16.0", (60, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 20, 2)
+    return img
+
+
+def test_assess_image_picks_cheapest_profile():
+    clean = _report_page()
+    rng = np.random.default_rng(0)
+    cases = {
+        "fast": clean,
+        "heavy": np.clip(clean + rng.normal(0, 18, clean.shape), 0, 255).astype(np.uint8),
+        "standard": [
+            (clean * 0.25 + 160).astype(np.uint8),                                         # faint
+            (clean * np.linspace(0.45, 1.0, clean.shape[1])[None, :]).astype(np.uint8),   # shadow
+            cv2.GaussianBlur(clean, (0, 0), 2),                                            # blurred
+        ],
+    }
+    for expected, images in cases.items():
+        for gray in images if isinstance(images, list) else [images]:
+            metrics = ocr_scanner.assess_image(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+            assert ocr_scanner.choose_profile(metrics) == expected, (expected, metrics)
+
+
+def test_retry_with_heavier_profile_only_when_score_is_low():
+    png = cv2.imencode(".png", _report_page(600, 500))[1].tobytes()
+    outputs, calls = {}, []
+
+    def fake_tesseract(pil_img, *, lang, config, timeout, source):
+        calls.append(pil_img.size)
+        return outputs[len(calls)]
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    level = ocr_scanner.logger.level
+    ocr_scanner.logger.addHandler(handler)
+    ocr_scanner.logger.setLevel(logging.INFO)
+    real = ocr_scanner._tesseract
+    ocr_scanner._tesseract = fake_tesseract
+    try:
+        score = lambda text: len(text.split())
+        outputs.update({1: "Hb 13", 2: "Hb 13 TSH 2.1 Urea", 3: "unused"})
+        text = ocr_scanner.extract_text(png, medical_report_mode=True, score=score, min_score=4)
+        assert text == "Hb 13 TSH 2.1 Urea" and len(calls) == 2  # fast, then standard; never heavy
+        assert "fast -> standard" in records[-1].getMessage() and "tesseract" in records[-1].getMessage()
+
+        calls.clear()
+        outputs.update({1: "Hb 13 TSH 2.1 Urea"})
+        assert ocr_scanner.extract_text(png, medical_report_mode=True, score=score, min_score=4) == outputs[1]
+        assert len(calls) == 1
+
+        calls.clear()
+        outputs.update({1: "a b", 2: "a b c", 3: "a b c d"})
+        assert ocr_scanner.extract_text(png, medical_report_mode=True, score=score, min_score=9) == "a b c d"
+        assert len(calls) == 3 and "fast -> standard -> heavy" in records[-1].getMessage()
+
+        # A heavier profile that does not raise the score ends the escalation
+        calls.clear()
+        outputs.update({1: "a b c", 2: "a", 3: "a b c d"})
+        assert ocr_scanner.extract_text(png, medical_report_mode=True, score=score, min_score=9) == "a b c"
+        assert len(calls) == 2
+
+        # The timeout is one deadline for the image: no retry once it is spent
+        timeouts = []
+
+        def slow_tesseract(pil_img, *, lang, config, timeout, source):
+            timeouts.append(timeout)
+            time.sleep(0.25)
+            return "a" * len(timeouts)
+
+        ocr_scanner._tesseract = slow_tesseract
+        assert ocr_scanner.extract_text(png, medical_report_mode=True, score=score, min_score=9, timeout=0.2) == "a"
+        assert len(timeouts) == 1 and 0 < timeouts[0] <= 0.2
+    finally:
+        ocr_scanner._tesseract = real
+        ocr_scanner.logger.removeHandler(handler)
+        ocr_scanner.logger.setLevel(level)
+
+
+if __name__ == "__main__":
+    test_pdf_text_layer_first_and_parallel_ocr()
+    test_pdf_ocr_has_one_deadline_for_all_pages()
+    test_worker_page_threads_keep_pages_in_flight()
+    test_pdf_without_ocr_keeps_text_layer()
+    test_in_memory_uploads_match_files()
+    test_assess_image_picks_cheapest_profile()
+    test_retry_with_heavier_profile_only_when_score_is_low()
+    print("PASSED: OCR scanner (PDF text layer first, parallel page OCR, in-memory uploads, adaptive preprocessing).")
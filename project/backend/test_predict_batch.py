@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from backend.routes.predict import (
+    predict_with_type, predict_batch_with_type, LUNG_CANCER_FEATURES, _format_results, _predict_matrix,
+)
+
+HEART_ROW = {
+    "HighBP": 1, "HighChol": "Yes", "CholCheck": 1, "BMI": 31.5, "Smoker": "No",
+    "Stroke": 0, "Diabetes": 1, "PhysActivity": 0, "Fruits": 1, "Veggies": 1,
+    "HvyAlcoholConsump": 0, "AnyHealthcare": 1, "GenHlth": 4, "MentHlth": 5,
+    "PhysHlth": 10, "DiffWalk": 1, "sex": "Male", "age": 11
+}
+
+
+def _lung_row(level):
+    return {feat: str(level) for feat in LUNG_CANCER_FEATURES}
+
+
+def test_batch_matches_single_predictions():
+    for prediction_type, rows in [
+        ("lung_cancer", [_lung_row(i) for i in range(1, 8)]),
+        ("heart_disease", [HEART_ROW, dict(HEART_ROW, BMI=22.0, GenHlth=1), {"HighBP": 0}]),
+    ]:
+        batch, status = predict_batch_with_type(prediction_type, rows)
+        assert status == 200
+        assert batch["failed"] == 0
+        for i, row in enumerate(rows):
+            single, single_status = predict_with_type(prediction_type, row)
+            assert single_status == 200
+            result = dict(batch["results"][i])
+            assert result.pop("index") == i
+            assert result == single
+
+
+def test_batch_reports_per_row_errors():
+    rows = [_lung_row(3), {"Age": "40"}, dict(_lung_row(2), Smoking="heavy"), _lung_row(6)]
+    batch, status = predict_batch_with_type("lung_cancer", rows)
+    assert status == 200
+    assert batch["succeeded"] == 2 and batch["failed"] == 2
+    assert "Missing required features" in batch["results"][1]["error"]
+    assert batch["results"][1]["status"] == 400
+    assert batch["results"][2]["status"] == 500
+    assert "prediction" in batch["results"][3]
+
+
+def test_non_numeric_field_keeps_baseline_error():
+    row = dict(_lung_row(2), Smoking=" heavy ")
+    assert predict_with_type("lung_cancer", row) == (
+        {"error": "Prediction error: could not convert string to float: ' heavy '"}, 500)
+    assert predict_with_type("lung_cancer", dict(row, Smoking=None))[1] == 500
+    result = predict_batch_with_type("lung_cancer", [row])[0]["results"][0]
+    assert result["status"] == 500 and result["error"] == "Prediction error: could not convert string to float: ' heavy '"
+
+
+def test_batch_rejects_bad_requests():
+    assert predict_batch_with_type("unknown", [{}])[1] == 400
+    assert predict_batch_with_type("lung_cancer", [])[1] == 400
+
+
+class _HardLabelsOnly:
+    """A classifier without predict_proba (e.g. an SVM trained without probability=True)."""
+    classes_ = np.array([0, 1])
+
+    def predict(self, X):
+        return (X[:, 0] > 0.5).astype(int)
+
+
+def test_models_without_proba_report_no_confidence():
+    X = np.array([[0.9, 0.0], [0.1, 0.0]])
+    bundle = {'model': _HardLabelsOnly(), 'label_encoder': None}
+    probs, has_proba = _predict_matrix('diabetes', bundle, X)
+    assert not has_proba and probs.tolist() == [[0.0, 1.0], [1.0, 0.0]]
+    assert _format_results('diabetes', bundle, probs, has_proba) == [
+        {'prediction': 'Positive', 'confidence': None, 'probability': 100.0},
+        {'prediction': 'Negative', 'confidence': None, 'probability': 0.0},
+    ]
+    assert [r['confidence'] for r in _format_results('lung_cancer', bundle, probs, has_proba)] == [None, None]
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_predictions()
+    test_batch_reports_per_row_errors()
+    test_non_numeric_field_keeps_baseline_error()
+    test_batch_rejects_bad_requests()
+    test_models_without_proba_report_no_confidence()
+    print("PASSED: batch predictions match single predictions.")
@@ -0,0 +1,88 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.prediction_cache import ArtifactHashes, PredictionCache
+from backend.routes import predict
+from backend.test_predict_batch import HEART_ROW
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_and_ttl():
+    clock = _Clock()
+    cache = PredictionCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put(('a', 'h', b'1'), {'prediction': 'Low'})
+    cache.put(('a', 'h', b'2'), {'prediction': 'High'})
+    assert cache.get(('a', 'h', b'1')) == {'prediction': 'Low'}
+    cache.put(('b', 'h', b'3'), {'prediction': 'Medium'})  # evicts b'2', the LRU entry
+    assert cache.get(('a', 'h', b'2')) is None
+
+    clock.now = 11
+    assert cache.get(('a', 'h', b'1')) is None
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
+    assert stats['evictions'] == 1 and stats['expired'] == 1
+    assert cache.invalidate('b') == 1 and cache.stats()['entries'] == 0
+
+
+def test_artifact_hash_follows_file_content():
+    hashes = ArtifactHashes()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.json')
+        with open(path, 'w') as f:
+            f.write('v1')
+        first = hashes.hash([path])
+        assert hashes.hash([path]) == first
+        with open(path, 'w') as f:
+            f.write('version 2')
+        assert hashes.hash([path]) != first
+        assert hashes.hash([os.path.join(tmp, 'absent')]) == 'missing'
+
+
+def test_cached_predictions_skip_model_loading():
+    first, status = predict.predict_with_type('heart_disease', HEART_ROW)
+    assert status == 200
+
+    # Same questionnaire with differently spelled values maps to the same row
+    variant = dict(HEART_ROW, HighBP='1', BMI='31.5')
+    predict.model_registry.evict('heart_disease')
+    hits = predict.prediction_cache.stats()['hits']
+    assert predict.predict_with_type('heart_disease', variant) == (first, 200)
+    assert predict.prediction_cache.stats()['hits'] == hits + 1
+    assert not predict.model_registry.is_resident('heart_disease')
+
+
+def test_artifact_change_invalidates_cached_predictions():
+    with tempfile.TemporaryDirectory() as tmp:
+        extra = os.path.join(tmp, 'notes.txt')
+        with open(extra, 'w') as f:
+            f.write('v1')
+        sources = predict._ARTIFACT_SOURCES['heart_disease']
+        predict._ARTIFACT_SOURCES['heart_disease'] = sources + (extra,)
+        try:
+            assert predict.predict_with_type('heart_disease', HEART_ROW)[1] == 200
+            assert predict.predict_with_type('heart_disease', HEART_ROW)[1] == 200
+            loads = predict.model_registry.stats()['models']['heart_disease']['loads']
+
+            with open(extra, 'w') as f:
+                f.write('version 2')
+            assert predict.predict_with_type('heart_disease', HEART_ROW)[1] == 200
+            assert predict.model_registry.stats()['models']['heart_disease']['loads'] == loads + 1
+        finally:
+            predict._ARTIFACT_SOURCES['heart_disease'] = sources
+
+
+if __name__ == "__main__":
+    test_lru_and_ttl()
+    test_artifact_hash_follows_file_content()
+    test_cached_predictions_skip_model_loading()
+    test_artifact_change_invalidates_cached_predictions()
+    print("PASSED: prediction cache hits, expiry and invalidation.")
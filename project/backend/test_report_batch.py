@@ -0,0 +1,93 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from backend.report_corpus import multipage_report
+from backend.report_batch import parse_report_text, parse_reports, shutdown_pool
+
+
+def test_parse_reports_pool_matches_serial_and_isolates_errors():
+    texts = [multipage_report(1, seed=i) for i in range(12)]
+    try:
+        results = list(parse_reports(texts + [None, {'id': 'scan', 'path': '/nonexistent/scan.png'}], max_workers=2))
+    finally:
+        shutdown_pool()
+    assert sorted(r['index'] for r in results) == list(range(14))
+    by_index = {r['index']: r for r in results}
+    for i, text in enumerate(texts):
+        assert by_index[i]['success'] is True
+        assert by_index[i]['all_parameters'] == parse_report_text(text)['all_parameters']
+    assert by_index[12]['success'] is False and 'text' in by_index[12]['error']
+    assert by_index[13]['success'] is False and by_index[13]['id'] == 'scan'
+    json.dumps(results)
+
+
+def test_parse_reports_backpressure():
+    pulled = []
+
+    def source():
+        for i in range(50):
+            pulled.append(i)
+            yield multipage_report(1, seed=i)
+
+    try:
+        results = parse_reports(source(), max_workers=2, max_in_flight=3)
+        first = next(results)
+        assert first['success'] and len(pulled) <= 4  # never more than max_in_flight ahead
+        results.close()
+    finally:
+        shutdown_pool()
+    assert len(pulled) < 50
+
+
+def test_batches_of_other_sizes_share_the_running_pool():
+    from backend import report_batch
+
+    texts = [multipage_report(1, seed=i) for i in range(8)]
+    try:
+        streaming = parse_reports(texts, max_workers=2, max_in_flight=2)
+        first = next(streaming)
+        pool = report_batch._pool
+        # A batch asking for another size must not tear down the pool the
+        # first batch is still streaming from
+        other = list(parse_reports(texts[:4], max_workers=3))
+        assert report_batch._pool is pool and len(pool._processes) == 2
+        rest = [first] + list(streaming)
+    finally:
+        shutdown_pool()
+    assert sorted(r['index'] for r in rest) == list(range(8)) and all(r['success'] for r in rest)
+    assert sorted(r['index'] for r in other) == list(range(4)) and all(r['success'] for r in other)
+
+
+def test_batch_endpoint_streams_ndjson():
+    from backend.routes.report_analysis import report_analysis_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(report_analysis_bp, url_prefix='/api')
+    client = app.test_client()
+    try:
+        resp = client.post('/api/analyze-reports/batch', json={
+            'reports': [{'id': 'a', 'text': multipage_report(1, seed=1)}, '', multipage_report(1, seed=2)],
+        })
+        assert resp.status_code == 200 and resp.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    finally:
+        shutdown_pool()
+    assert lines[-1] == {'done': True, 'total': 3, 'succeeded': 2, 'failed': 1}
+    by_index = {line['index']: line for line in lines[:-1]}
+    assert by_index[0]['id'] == 'a' and by_index[0]['success'] and by_index[0]['parameter_count'] > 0
+    assert by_index[1]['success'] is False
+    assert by_index[2]['id'] == '2' and by_index[2]['success']
+
+    assert client.post('/api/analyze-reports/batch', json={'reports': []}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_parse_reports_pool_matches_serial_and_isolates_errors()
+    test_parse_reports_backpressure()
+    test_batches_of_other_sizes_share_the_running_pool()
+    test_batch_endpoint_streams_ndjson()
+    print("PASSED: batch report parsing (pool, backpressure, NDJSON endpoint).")
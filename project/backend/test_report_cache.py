@@ -0,0 +1,93 @@
+import io
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from backend.report_cache import ReportCache, content_digest
+from backend.report_corpus import multipage_report
+
+
+def _sources(tmp, name, body):
+    path = os.path.join(tmp, name)
+    with open(path, 'w') as f:
+        f.write(body)
+    return path
+
+
+def test_hits_versions_eviction_and_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        ocr_src, parser_src = _sources(tmp, 'ocr.py', 'v1'), _sources(tmp, 'parser.py', 'v1')
+        path = os.path.join(tmp, 'reports.sqlite3')
+        cache = ReportCache(path, max_bytes=10_000, ocr_sources=[ocr_src], parser_sources=[parser_src])
+        key = cache.key(content_digest(b'scan-1'), medical_report_mode=True)
+        assert key != cache.key(content_digest(b'scan-1'), medical_report_mode=False)
+
+        assert cache.get(key) is None
+        cache.put(key, 'Hemoglobin 13.5', {'Hemoglobin': {'value': 13.5}})
+        assert cache.get(key) == ('Hemoglobin 13.5', {'Hemoglobin': {'value': 13.5}})
+
+        # Another process (new instance, same file) sees the entry
+        other = ReportCache(path, max_bytes=10_000, ocr_sources=[ocr_src], parser_sources=[parser_src])
+        assert other.get(key)[0] == 'Hemoglobin 13.5'
+
+        _sources(tmp, 'parser.py', 'v2 (parser change)')
+        assert cache.get(key) == ('Hemoglobin 13.5', None)  # text reusable, re-parse
+        cache.put(key, 'Hemoglobin 13.5', {})
+        assert cache.get(key) == ('Hemoglobin 13.5', {})
+        _sources(tmp, 'ocr.py', 'v2 (ocr change)')
+        assert cache.get(key) is None
+
+        for i in range(40):
+            cache.put(cache.key(f'report-{i}'), 'x' * 1000, {})
+        stats = cache.stats()
+        assert stats['bytes'] <= 10_000 and stats['evictions'] > 0
+        assert cache.get(cache.key('report-39')) is not None and cache.get(cache.key('report-0')) is None
+        assert stats['hits'] == 2 and stats['text_hits'] == 1 and stats['misses'] == 2
+        assert stats['hit_rate'] == 0.6
+
+        assert ReportCache(path, max_bytes=0).get(key) is None  # disabled
+
+
+def test_duplicate_upload_skips_ocr():
+    from backend.routes import report_analysis
+
+    class _CountingPool:
+        calls = 0
+
+        def extract_text(self, path, **kwargs):
+            self.calls += 1
+            return multipage_report(1, seed=3)
+
+        def stats(self):
+            return {}
+
+    app = Flask(__name__)
+    app.register_blueprint(report_analysis.report_analysis_bp, url_prefix='/api')
+    client = app.test_client()
+    real = report_analysis.ocr_pool, report_analysis.report_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _CountingPool()
+        report_analysis.ocr_pool = pool
+        report_analysis.report_cache = ReportCache(os.path.join(tmp, 'reports.sqlite3'))
+        try:
+            bodies = []
+            for upload in (b'same scan', b'same scan', b'another scan'):
+                resp = client.post('/api/analyze-report', data={'report': (io.BytesIO(upload), 'scan.png')},
+                                   content_type='multipart/form-data')
+                assert resp.status_code == 200
+                bodies.append(resp.get_json())
+            stats = client.get('/api/ocr-stats').get_json()['report_cache']
+        finally:
+            report_analysis.ocr_pool, report_analysis.report_cache = real
+    assert pool.calls == 2
+    assert bodies[0]['all_parameters'] == bodies[1]['all_parameters'] and bodies[0]['all_parameters']
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['entries'] == 2
+
+
+if __name__ == "__main__":
+    test_hits_versions_eviction_and_persistence()
+    test_duplicate_upload_skips_ocr()
+    print("PASSED: report cache (hits, version invalidation, eviction, duplicate uploads).")
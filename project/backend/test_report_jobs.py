@@ -0,0 +1,113 @@
+import io
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from backend.report_cache import ReportCache
+from backend.report_corpus import multipage_report
+from backend.report_jobs import DONE, FAILED, JobFailed, JobQueueFull, ReportJobs
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def _thread_spawn(fn, *args):
+    threading.Thread(target=fn, args=args, daemon=True).start()
+
+
+def test_bounded_workers_queue_progress_and_ttl():
+    events = []
+    now = [1000.0]
+    jobs = ReportJobs(workers=2, max_queued=1, ttl_s=60, emit=lambda *e: events.append(e),
+                      spawn=_thread_spawn, clock=lambda: now[0])
+    gate = threading.Event()
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def work(progress, value):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        progress('ocr', 10)
+        gate.wait(5)
+        with lock:
+            active[0] -= 1
+        if value == 'bad':
+            raise JobFailed('No text could be extracted', 422)
+        return {'value': value}
+
+    submitted = [jobs.submit(lambda p, v=v: work(p, v), room='user_7') for v in ('a', 'bad', 'c')]
+    try:
+        jobs.submit(lambda p: None)
+        assert False, 'fourth job should not fit'
+    except JobQueueFull:
+        pass
+    _wait_for(lambda: jobs.stats()['running'] == 2 and active[0] == 2)
+    assert jobs.get(submitted[2]['job_id'])['status'] == 'queued'
+    gate.set()
+    _wait_for(lambda: jobs.stats()['done'] + jobs.stats()['failed'] == 3)
+
+    a, bad, c = (jobs.get(job['job_id']) for job in submitted)
+    assert a['status'] == DONE and a['result'] == {'value': 'a'} and a['progress'] == 100
+    assert bad['status'] == FAILED and bad['http_status'] == 422 and 'No text' in bad['error']
+    assert c['status'] == DONE and peak[0] == 2
+    stats = jobs.stats()
+    assert stats['running'] == 0 and stats['queued'] == 0 and stats['rejected'] == 1
+
+    mine = [e for e in events if e[1]['job_id'] == submitted[0]['job_id']]
+    assert [e[0] for e in mine][-1] == 'report_job_done' and all(e[2] == 'user_7' for e in mine)
+    assert any(e[1]['stage'] == 'ocr' for e in mine) and 'result' not in mine[-1][1]
+
+    now[0] += 61
+    assert jobs.get(submitted[0]['job_id']) is None and jobs.stats()['expired'] == 3
+
+
+def test_job_endpoint_matches_sync_analysis():
+    from backend.routes import report_analysis
+
+    class _Pool:
+        def extract_text(self, data, **kwargs):
+            return multipage_report(1, seed=5)
+
+    app = Flask(__name__)
+    app.register_blueprint(report_analysis.report_analysis_bp, url_prefix='/api')
+    client = app.test_client()
+    real = report_analysis.ocr_pool, report_analysis.report_cache, report_analysis.report_jobs
+    events = []
+    with tempfile.TemporaryDirectory() as tmp:
+        report_analysis.ocr_pool = _Pool()
+        report_analysis.report_cache = ReportCache(os.path.join(tmp, 'reports.sqlite3'))
+        report_analysis.report_jobs = ReportJobs(workers=1, spawn=_thread_spawn, emit=lambda *e: events.append(e))
+        try:
+            upload = lambda: {'report': (io.BytesIO(b'scan bytes'), 'scan.png'), 'user_id': '42'}
+            resp = client.post('/api/analyze-report/jobs', data=upload(), content_type='multipart/form-data')
+            assert resp.status_code == 202
+            status_url = resp.get_json()['status_url']
+            _wait_for(lambda: client.get(status_url).get_json()['status'] in (DONE, FAILED))
+            job = client.get(status_url).get_json()
+            sync = client.post('/api/analyze-report', data=upload(), content_type='multipart/form-data').get_json()
+
+            bad = client.post('/api/analyze-report/jobs', data={}, content_type='multipart/form-data')
+            assert bad.status_code == 400 and bad.get_json()['success'] is False
+            assert client.get('/api/analyze-report/jobs/nope').status_code == 404
+        finally:
+            report_analysis.ocr_pool, report_analysis.report_cache, report_analysis.report_jobs = real
+    assert job['status'] == DONE and job['result']['success']
+    assert job['result']['all_parameters'] == sync['all_parameters'] and sync['all_parameters']
+    stages = [e[1]['stage'] for e in events]
+    assert stages[-1] == DONE and {'ocr', 'parsing', 'diet'} <= set(stages)
+    assert {e[2] for e in events} == {'user_42'}
+
+
+if __name__ == "__main__":
+    test_bounded_workers_queue_progress_and_ttl()
+    test_job_endpoint_matches_sync_analysis()
+    print("PASSED: report jobs (bounded workers, queue limit, progress events, TTL, job endpoints).")
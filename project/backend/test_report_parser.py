@@ -0,0 +1,96 @@
+import sys
+import os
+import re
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import report_parser
+from backend.report_corpus import corpus, load_goldens, multipage_report, parse_case
+from backend.report_parser import (
+    _find_best_alias, _tokenize, extract_parameters, parse_reference_ranges, parse_report,
+)
+
+
+def _legacy_find_best_alias(lowered_line, already_found):
+    """The pre-automaton lookup: every alias, longest first, one regex per hit."""
+    for alias, canon in report_parser._SORTED_ALIASES:
+        if canon in already_found:
+            continue
+        if alias not in lowered_line:
+            continue
+        boundary_re = re.compile(r"(?:^|(?<=[\s,;:(/]))" + re.escape(alias) + r"(?=$|[\s,;:)/])", re.IGNORECASE)
+        if boundary_re.search(lowered_line):
+            return (alias, canon)
+        if len(alias) >= 4:
+            return (alias, canon)
+    return None
+
+
+def test_alias_automaton_rules():
+    # Longest alias wins; already extracted canonicals fall through to the next one
+    assert _find_best_alias('fasting blood sugar 110 mg/dl', set()) == ('fasting blood sugar', 'Fasting Blood Sugar')
+    canon = _find_best_alias('fasting blood sugar 110 mg/dl', set())[1]
+    fallback = _find_best_alias('fasting blood sugar 110 mg/dl', {canon})
+    assert fallback is not None and fallback[1] != canon
+    # Short aliases only at word boundaries, longer ones also inside words
+    assert _find_best_alias('hb: 13.2 g/dl', set()) == ('hb', 'Hemoglobin')
+    assert _find_best_alias('(hb)', set()) == ('hb', 'Hemoglobin')
+    assert _find_best_alias('thbx 13.2', set()) is None
+    assert _find_best_alias('xhemoglobinx 13.2', set()) == ('hemoglobin', 'Hemoglobin')
+    assert _find_best_alias('', set()) is None
+
+
+def test_matches_legacy_scan():
+    lines = multipage_report(6).lower().split('\n')
+    canons = sorted(set(report_parser._ALIAS_MAP.values()))
+    for found in (set(), set(canons[::2]), set(canons[1::3])):
+        for line in lines:
+            line = line.strip()
+            assert _find_best_alias(line, found) == _legacy_find_best_alias(line, found), line
+
+
+def test_tokenizer():
+    kinds = lambda text: [(kind, tok) for kind, _, _, tok, _ in _tokenize(text)]
+    assert kinds('10.2 g/dL 12.0 – 16.0 *L') == [
+        ('number', '10.2'), ('unit', 'g/dL'), ('range', '12.0 – 16.0'), ('symbol', '*'), ('word', 'L')]
+    assert kinds('< 2.50 or 12 to 64 U/L') == [
+        ('bound', '<'), ('number', '2.50'), ('word', 'or'), ('range_to', '12 to 64'), ('unit', 'U/L')]
+    # Words stop where a unit or threshold starts, as a regex search would find them
+    assert kinds('FLUID nitrogenless than 9') == [
+        ('unit', 'FL'), ('word', 'UID'), ('word', 'nitrogen'), ('bound', 'less than'), ('number', '9')]
+    assert _tokenize('4.0-11.0 x10³/µL')[0][4] == ('4.0', '11.0')
+    assert _tokenize('4.0-11.0 x10³/µL')[1][4] == ('10',)
+
+
+def test_parse_report_matches_separate_calls():
+    for text in [multipage_report(3, seed=11)] + list(corpus().values())[-8:]:
+        expected = extract_parameters(text), parse_reference_ranges(text)
+        assert parse_report(text) == expected
+    assert len(parse_report(multipage_report(3, seed=11))[0]) > 20
+
+
+def test_corpus_matches_goldens():
+    goldens = load_goldens()
+    assert set(goldens) == set(corpus())
+    regressions = [name for name, case in goldens.items()
+                   if parse_case(case['text']) != {'parameters': case['parameters'], 'ranges': case['ranges']}]
+    assert not regressions, f"parser output changed for {regressions}; if intended run python -m backend.report_corpus --write-goldens"
+
+
+def test_corpus_covers_every_alias():
+    matched = set()
+    for text in corpus().values():
+        for line in text.split('\n'):
+            match = _find_best_alias(line.strip().lower(), set())
+            if match:
+                matched.add(match[0])
+    assert matched == set(report_parser._ALIAS_MAP)
+
+
+if __name__ == "__main__":
+    test_alias_automaton_rules()
+    test_matches_legacy_scan()
+    test_tokenizer()
+    test_parse_report_matches_separate_calls()
+    test_corpus_matches_goldens()
+    test_corpus_covers_every_alias()
+    print("PASSED: alias automaton, legacy parity, tokenizer and parser goldens.")
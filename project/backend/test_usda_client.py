@@ -0,0 +1,96 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import requests
+
+from backend.nutrient_cache import NutrientCache
+from backend.services.usda_service import USDAService
+from backend.usda_client import USDAClient, usda_client
+from backend.usda_loader import usda_loader
+from backend.usda_manager import USDAManager
+from backend.usda_stub import USDAStubServer
+
+
+def _concurrently(fn, n):
+    results, errors = [None] * n, [None] * n
+
+    def run(i):
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results, errors
+
+
+def test_single_flight():
+    with USDAStubServer(latency_ms=200, failing={'broken'}) as stub:
+        client = USDAClient(base_url=stub.url)
+        search = lambda q: client.search(q, page_size=1, data_types=['Foundation'], timeout=5, api_key='k')
+
+        results, errors = _concurrently(lambda: search('lentils'), 8)
+        assert errors == [None] * 8 and stub.hits['lentils'] == 1
+        assert all(r == results[0] for r in results) and results[0]['foods'][0]['description'] == 'Lentils'
+        assert client.stats()['coalesced'] == 7 and client.stats()['in_flight'] == 0
+
+        # Followers get the leader's exception; the next call goes out again
+        _, errors = _concurrently(lambda: search('broken'), 4)
+        assert stub.hits['broken'] == 1 and all(isinstance(e, requests.HTTPError) for e in errors)
+        search('lentils')
+        assert stub.hits['lentils'] == 2 and stub.api_keys['k'] == 3
+
+
+def test_search_foods_fetches_misses_concurrently():
+    queries = [f'food {i}' for i in range(12)]
+    with USDAStubServer(latency_ms=100, missing={'food 5'}) as stub, tempfile.TemporaryDirectory() as tmp:
+        service = USDAService()
+        service.enabled, service.api_key = True, 'k'
+        service.cache = NutrientCache(os.path.join(tmp, 'nutrients.sqlite3')).namespace('usda_search')
+        original, usda_client.base_url = usda_client.base_url, stub.url
+        try:
+            t0 = time.perf_counter()
+            foods = service.search_foods(', '.join(queries + ['food 0']))
+            elapsed = time.perf_counter() - t0
+            assert [f['name'] for f in foods] == [q.title() for q in queries if q != 'food 5'] + ['Food 0']
+            # Bounded by the pool (serially this is 13 x 100 ms)
+            assert stub.max_concurrent == usda_client.max_workers < 12 and elapsed < 0.8, (stub.max_concurrent, elapsed)
+            assert all(stub.hits[q] == 1 for q in queries)
+
+            assert service.search_foods('food 3, food 5')[0]['name'] == 'Food 3'
+            assert stub.hits['food 3'] == 1 and stub.hits['food 5'] == 2  # misses are not cached
+        finally:
+            usda_client.base_url = original
+
+
+def test_manager_batch_keeps_confidence_meta():
+    with USDAStubServer(latency_ms=50, missing={'mystery'}) as stub, tempfile.TemporaryDirectory() as tmp:
+        manager = USDAManager()
+        manager.api_cache = NutrientCache(os.path.join(tmp, 'nutrients.sqlite3')).namespace('usda_manager')
+        manager.save_to_local_cache('rice', {'name': 'Rice', 'nutrients': {}})
+        original = usda_loader.enabled, usda_loader.api_key, usda_client.base_url
+        usda_loader.enabled, usda_loader.api_key, usda_client.base_url = True, 'k', stub.url
+        try:
+            results = manager.get_many_with_meta(['Spinach', 'lentils', 'rice', 'spinach', 'mystery'])
+        finally:
+            usda_loader.enabled, usda_loader.api_key, usda_client.base_url = original
+        sources = [meta['source'] for _, meta in results]
+        assert sources[:4] == ['usda_api', 'usda_api', 'usda_cache', 'usda_cache'], sources
+        assert sources[4] in ('usda_local', 'default')
+        assert results[0][0]['name'] == 'Spinach' and results[3][0] == results[0][0]
+        assert dict(stub.hits) == {'spinach': 1, 'lentils': 1, 'mystery': 1}
+
+
+if __name__ == "__main__":
+    test_single_flight()
+    test_search_foods_fetches_misses_concurrently()
+    test_manager_batch_keeps_confidence_meta()
+    print("PASSED: USDA client (single-flight, bounded concurrent prefetch, cache and confidence meta).")
@@ -0,0 +1,91 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from backend.bench_usda_index import synthetic_foundation_json
+from backend.usda_loader import USDALoader
+from backend.usda_snapshot import NUTRIENT_NAMES, build_snapshot, load_snapshot
+
+
+def _legacy_index(data):
+    """The dict index and rankings USDALoader built before the snapshot."""
+    index, rankings = {}, {}
+    for f in data['FoundationFoods']:
+        food = {'name': f['description'], 'nutrients': {}, 'calories': 0.0}
+        for entry in f['foodNutrients']:
+            key = NUTRIENT_NAMES.get(entry['nutrient']['name'])
+            if key:
+                food['nutrients'][key] = entry['amount']
+                rankings.setdefault(key, []).append((f['fdcId'], entry['amount']))
+            if entry['nutrient']['name'] == 'Energy' and entry['nutrient'].get('unitName') == 'kcal':
+                food['calories'] = entry['amount']
+        index[f['fdcId']] = food
+    for key in rankings:
+        rankings[key].sort(key=lambda x: x[1], reverse=True)
+    return index, rankings
+
+
+def _loader(json_path, snapshot_dir):
+    loader = USDALoader()
+    loader.json_path, loader.snapshot_dir = json_path, snapshot_dir
+    return loader
+
+
+def test_snapshot_matches_json_index():
+    data = synthetic_foundation_json(foods=60, nutrients=30, seed=4)
+    data['FoundationFoods'][5]['foodNutrients'] = [
+        e for e in data['FoundationFoods'][5]['foodNutrients'] if e['nutrient']['name'] != 'Iron, Fe']
+    legacy, rankings = _legacy_index(data)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, snapshot_dir = os.path.join(tmp, 'foundation.json'), os.path.join(tmp, 'snapshot')
+        with open(json_path, 'w') as f:
+            json.dump(data, f)
+        from_json = _loader(json_path, os.path.join(tmp, 'none'))
+        build_snapshot(json_path, snapshot_dir)
+        from_snapshot = _loader(json_path, snapshot_dir)
+
+        for loader in (from_json, from_snapshot):
+            for key, ranked in rankings.items():
+                expected = [(fid, amount) for fid, amount in ranked if amount > 0][:7]
+                assert [(r['fdc_id'], r['amount']) for r in loader.get_top_foods(key, 7)] == expected, key
+            assert loader.get_top_foods('phosphorus', 5) == [] and loader.get_top_foods('iron', 0) == []
+            for query in ('food 12, raw', 'food 3', 'roti', 'no such food'):
+                hit = loader.fetch_from_local_json(query)
+                if query == 'roti':
+                    assert hit is USDALoader.INDIAN_OVERRIDES['roti']
+                elif query == 'no such food':
+                    assert hit is None
+                else:
+                    fid = next(fid for fid, food in legacy.items() if query in food['name'].lower())
+                    assert hit['name'] == legacy[fid]['name'] and hit['nutrients'] == legacy[fid]['nutrients']
+                    assert hit['calories'] == legacy[fid]['calories']
+            assert 'iron' not in loader.fetch_from_local_json('food 5, raw')['nutrients']
+        assert from_json.foundation_index().source == 'json'
+        index = from_snapshot.foundation_index()
+        assert index.source == 'snapshot' and isinstance(index.nutrients, np.memmap)
+
+        # A changed JSON invalidates the snapshot; a snapshot without its JSON is still used
+        with open(json_path, 'a') as f:
+            f.write(' ')
+        assert load_snapshot(json_path, snapshot_dir) is None
+        os.remove(json_path)
+        assert len(load_snapshot(json_path, snapshot_dir)) == 60
+
+
+def test_missing_json_loads_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = _loader(os.path.join(tmp, 'missing.json'), os.path.join(tmp, 'none'))
+        assert loader.fetch_from_local_json('spinach') is None and loader.get_top_foods('iron') == []
+        first = loader.foundation_index()
+        loader.fetch_from_local_json('kale')
+        assert loader.foundation_index() is first and first.source == 'empty'
+
+
+if __name__ == "__main__":
+    test_snapshot_matches_json_index()
+    test_missing_json_loads_once()
+    print("PASSED: USDA snapshot (matches the JSON index, rankings, staleness, missing JSON).")
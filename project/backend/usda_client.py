@@ -0,0 +1,173 @@
+"""
+Shared HTTP client for the USDA FoodData Central search API.
+
+USDALoader, USDAApiService and USDAService each called requests.post once
+per food, with a fresh connection and a 5-10 s timeout, so every cache miss
+in a diet plan was paid one after the other. They now go through one
+USDAClient:
+
+    usda_client.search("lentils", page_size=1, data_types=[...], timeout=5, api_key=key)
+    usda_client.map(fetch_one, names)    # results in order, bounded concurrency
+
+- one requests.Session with a keep-alive pool of USDA_HTTP_POOL_SIZE
+  connections (default 8);
+- single-flight: identical searches (same query, page size and data types)
+  that are already in flight wait for that request instead of sending their
+  own, and all get its response (or its exception);
+- map() runs a function over several items at most USDA_PREFETCH_WORKERS
+  (default 6) at a time. The services build their bulk prefetch on it and
+  only hand it their cache misses.
+
+Under the eventlet server the concurrency comes from a GreenPool on the hub
+(sockets are green there); everywhere else from a thread pool. Requests go
+to USDA_API_BASE_URL, which tests point at backend.usda_stub.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = os.environ.get("USDA_API_BASE_URL") or "https://api.nal.usda.gov/fdc/v1"
+DEFAULT_POOL_SIZE = int(os.environ.get("USDA_HTTP_POOL_SIZE", "8"))
+DEFAULT_MAX_WORKERS = int(os.environ.get("USDA_PREFETCH_WORKERS", "6"))
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self, done):
+        self.done = done
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class USDAClient:
+    """
+    Pooled, de-duplicating FoodData Central client.
+
+    green=None means "use greenlets only under the eventlet server"; tests
+    leave it alone and get the thread pool.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_size: int = DEFAULT_POOL_SIZE,
+                 max_workers: int = DEFAULT_MAX_WORKERS, green: Optional[bool] = None):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = max(1, int(pool_size))
+        self.max_workers = max(1, int(max_workers))
+        self._green = green
+        self._session: Optional[requests.Session] = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._stats = {"requests": 0, "coalesced": 0, "errors": 0, "total_ms": 0.0,
+                       "map_calls": 0, "map_items": 0}
+
+    @property
+    def green(self) -> bool:
+        if self._green is None:
+            from backend.inference_batcher import _eventlet_server_running
+            self._green = _eventlet_server_running()
+        return self._green
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+    def _event(self):
+        if self.green:
+            from eventlet.green import threading as green_threading
+            return green_threading.Event()
+        return threading.Event()
+
+    def search(self, query: str, *, page_size: int, data_types: Sequence[str], timeout: float,
+               api_key: Optional[str]) -> Dict[str, Any]:
+        """
+        POST /foods/search and return the decoded JSON. Raises like
+        requests does (HTTP errors included); callers keep their own handling.
+        """
+        key = (query, int(page_size), tuple(data_types))
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight(self._event())
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        t0 = time.perf_counter()
+        try:
+            response = self.session.post(f"{self.base_url}/foods/search", params={"api_key": api_key},
+                                         json={"query": query, "pageSize": page_size, "dataType": list(data_types)},
+                                         timeout=timeout)
+            response.raise_for_status()
+            flight.result = response.json()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                self._stats["requests"] += 1
+                self._stats["total_ms"] += (time.perf_counter() - t0) * 1000
+            flight.done.set()
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """fn(item) for every item, at most max_workers at a time; results in input order."""
+        items = list(items)
+        with self._lock:
+            self._stats["map_calls"] += 1
+            self._stats["map_items"] += len(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        if self.green:
+            if self._pool is None:
+                from eventlet import GreenPool
+                self._pool = GreenPool(self.max_workers)
+            return list(self._pool.imap(fn, items))
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="usda-fetch")
+        return list(self._pool.map(fn, items))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            in_flight = len(self._inflight)
+        return {
+            "base_url": self.base_url,
+            "green": self.green,
+            "pool_size": self.pool_size,
+            "max_workers": self.max_workers,
+            "requests": s["requests"],
+            "coalesced": s["coalesced"],
+            "errors": s["errors"],
+            "in_flight": in_flight,
+            "avg_request_ms": round(s["total_ms"] / s["requests"], 2) if s["requests"] else None,
+            "map_calls": s["map_calls"],
+            "map_items": s["map_items"],
+        }
+
+
+usda_client = USDAClient()
@@ -2,9 +2,10 @@
 import os
 import json
 import logging
-import requests
 from typing import Dict, List, Any, Optional
 
+from backend.usda_client import usda_client
+
 logger = logging.getLogger(__name__)
 
 class USDALoader:
@@ -54,8 +55,9 @@ class USDALoader:
         # Local JSON path
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.json_path = os.path.join(os.path.dirname(base_dir), "FoodData_Central_foundation_food_json_2025-12-18.json")
-        self.local_index = None # fdcId -> data
-        self.nutrient_rankings = {} # nutrient_key -> list of (fdcId, amount)
+        # Prebuilt columnar index (backend.usda_snapshot); None keeps the default location
+        self.snapshot_dir = None
+        self._foundation = None
 
     def fetch_from_usda_api(self, food_name: str) -> Optional[dict]:
         """
@@ -66,16 +68,9 @@ class USDALoader:
             return None
 
         try:
-            url = f"https://api.nal.usda.gov/fdc/v1/foods/search?api_key={self.api_key}"
-            payload = {
-                "query": food_name.lower(),
-                "pageSize": 1,
-                "dataType": ["Foundation", "SR Legacy"]
-            }
             # Requirement: 5s timeout
-            response = requests.post(url, json=payload, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+            data = usda_client.search(food_name.lower(), page_size=1, data_types=["Foundation", "SR Legacy"],
+                                      timeout=5, api_key=self.api_key)
             
             # --- VERBOSE TERMINAL DEBUGGING ---
             print(f"\n[LIVE_API] Raw Response for: {food_name.upper()}")
@@ -140,102 +135,56 @@ class USDALoader:
             if key in name_clean:
                 return val
 
-        # 2. Check USDA Foundation Dataset
-        if not self.local_index:
-            self._load_local_index()
-            
-        for fid, food in self.local_index.items():
-            # Match strictly first, then fuzzy
-            if food["name"].lower() == name_clean or name_clean in food["name"].lower():
-                return {
-                    "name": food["name"],
-                    "protein": food["nutrients"].get("protein", 0.0),
-                    "fiber": food["nutrients"].get("fiber", 0.0),
-                    "carbs": food["nutrients"].get("carbohydrates", 0.0),
-                    "sugar": food["nutrients"].get("sugar", 0.0),
-                    "calories": food.get("calories", 0.0),
-                    "nutrients": food["nutrients"]
-                }
-        return None
+        # 2. Check USDA Foundation Dataset (first name that equals or contains the query)
+        index = self.foundation_index()
+        row = index.find(name_clean)
+        if row is None:
+            return None
+        food = index.food(row)
+        return {
+            "name": food["name"],
+            "protein": food["nutrients"].get("protein", 0.0),
+            "fiber": food["nutrients"].get("fiber", 0.0),
+            "carbs": food["nutrients"].get("carbohydrates", 0.0),
+            "sugar": food["nutrients"].get("sugar", 0.0),
+            "calories": food.get("calories", 0.0),
+            "nutrients": food["nutrients"]
+        }
 
     def get_top_foods(self, nutrient_key: str, limit: int = 15) -> List[Dict[str, Any]]:
         """Returns top sources for a given nutrient from the indexed Foundation dataset."""
-        if not self.local_index:
-            self._load_local_index()
-            
-        if nutrient_key not in self.nutrient_rankings:
-            return []
-            
-        rankings = self.nutrient_rankings[nutrient_key]
-        results = []
-        for fdc_id, amount in rankings:
-            if len(results) >= limit: break
-            
-            food = self.local_index[fdc_id]
-            if amount > 0:
-                results.append({
-                    "name": food["name"],
-                    "amount": amount,
-                    "calories": food["calories"],
-                    "fdc_id": fdc_id
-                })
-        return results
-
-    def _load_local_index(self):
-        """Loads and indexes foundations foods with rankings support."""
-        self.local_index = {}
-        self.nutrient_rankings = {k: [] for k in self.NUTRIENT_IDS.keys()}
-        
+        return self.foundation_index().top(nutrient_key, limit)
+
+    def foundation_index(self) -> "FoundationIndex":
+        """The Foundation Foods index, loaded on first use (snapshot first, then the JSON)."""
+        if self._foundation is None:
+            self._foundation = self._load_local_index()
+        return self._foundation
+
+    def _load_local_index(self) -> "FoundationIndex":
+        """Maps the prebuilt snapshot (backend.usda_snapshot) or parses the Foundation JSON."""
+        # Imported here so importing this module does not pull in NumPy
+        from backend.usda_snapshot import DEFAULT_SNAPSHOT_DIR, FoundationIndex, load_snapshot
+
+        snapshot_dir = self.snapshot_dir or DEFAULT_SNAPSHOT_DIR
+        index = load_snapshot(self.json_path, snapshot_dir)
+        if index is not None:
+            logger.info(f"USDA_LOADER | Mapped snapshot of {len(index)} foods from {snapshot_dir}.")
+            return index
+
         if not os.path.exists(self.json_path):
             logger.error(f"USDA_LOADER | Local JSON not found at {self.json_path}")
-            return
+            return FoundationIndex.empty()
 
         try:
             with open(self.json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            foods = data.get("FoundationFoods", [])
-            for f in foods:
-                fdc_id = f.get("fdcId")
-                desc = f.get("description", "Unknown")
-                nuts = f.get("foodNutrients", [])
-                
-                food_data = {"name": desc, "nutrients": {}, "calories": 0.0}
-                for n_entry in nuts:
-                    nut_obj = n_entry.get("nutrient", {})
-                    name = nut_obj.get("name")
-                    amount = n_entry.get("amount", 0.0)
-                    
-                    # Mapping logic matching internal keys
-                    internal_key = None
-                    if name == "Protein": internal_key = "protein"
-                    elif name == "Fiber, total dietary": internal_key = "fiber"
-                    elif name == "Sugars, Total": internal_key = "sugar"
-                    elif name == "Carbohydrate, by difference": internal_key = "carbohydrates"
-                    elif name == "Iron, Fe": internal_key = "iron"
-                    elif name == "Potassium, K": internal_key = "potassium"
-                    elif name == "Sodium, Na": internal_key = "sodium"
-                    elif name == "Calcium, Ca": internal_key = "calcium"
-                    elif name == "Magnesium, Mg": internal_key = "magnesium"
-                    elif name == "Zinc, Zn": internal_key = "zinc"
-                    elif name == "Vitamin C, total ascorbic acid": internal_key = "vitamin_c"
-                    elif name == "Vitamin B-12": internal_key = "vitamin_b12"
-                    
-                    if internal_key:
-                        food_data["nutrients"][internal_key] = amount
-                        self.nutrient_rankings[internal_key].append((fdc_id, amount))
-                        
-                    if name == "Energy" and nut_obj.get("unitName") == "kcal": 
-                        food_data["calories"] = amount
-                
-                self.local_index[fdc_id] = food_data
-
-            # Sort rankings
-            for key in self.nutrient_rankings:
-                self.nutrient_rankings[key].sort(key=lambda x: x[1], reverse=True)
-                
-            logger.info(f"USDA_LOADER | Successfully indexed {len(self.local_index)} foods and rankings.")
+                index = FoundationIndex.from_foundation_json(json.load(f))
+            logger.info(f"USDA_LOADER | Successfully indexed {len(index)} foods and rankings "
+                        f"(run `python -m backend.usda_snapshot build` to skip this at startup).")
+            return index
         except Exception as e:
             logger.error(f"USDA_LOADER | Failed to index local JSON: {e}")
+            return FoundationIndex.empty()
 
 # Singleton instance
 usda_loader = USDALoader()
@@ -1,9 +1,10 @@
 
 import os
-import json
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from backend.usda_loader import usda_loader
+from backend.usda_client import usda_client
+from backend.nutrient_cache import CACHE_DIR, nutrient_cache
 
 logger = logging.getLogger(__name__)
 
@@ -14,34 +15,13 @@ class USDAManager:
     """
     
     def __init__(self):
-        # Cache setup for API hits
-        self.cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
-        self.cache_file = os.path.join(self.cache_dir, "usda_manager_cache.json")
-        self._ensure_cache()
-        self.api_cache = self._load_cache()
-
-    def _ensure_cache(self):
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-        if not os.path.exists(self.cache_file):
-            with open(self.cache_file, "w") as f:
-                json.dump({}, f)
-
-    def _load_cache(self) -> dict:
-        try:
-            with open(self.cache_file, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
+        # Cache for API hits (shared nutrient cache; usda_manager_cache.json is imported once)
+        self.cache_file = os.path.join(CACHE_DIR, "usda_manager_cache.json")
+        self.api_cache = nutrient_cache.namespace("usda_manager", legacy_json=self.cache_file)
 
     def save_to_local_cache(self, food_name: str, data: dict):
         """Saves successful API results to disk for offline persistence."""
-        try:
-            self.api_cache[food_name.lower()] = data
-            with open(self.cache_file, "w") as f:
-                json.dump(self.api_cache, f)
-        except Exception as e:
-            logger.error(f"USDA_MANAGER | Cache save failed: {e}")
+        self.api_cache.put(food_name.lower(), data)
 
     def get_food_nutrients(self, food_name: str) -> dict:
         """
@@ -51,9 +31,10 @@ class USDAManager:
         food_name_clean = food_name.lower()
         
         # 0. Check API Cache (Crucial to avoid 120s timeout)
-        if food_name_clean in self.api_cache:
+        cached = self.api_cache.get(food_name_clean)
+        if cached is not None:
             print(f"[SMART CACHE] Loaded data for '{food_name}' instantly.")
-            return self.api_cache[food_name_clean]
+            return cached
 
         # 1. Live API Path (Shows logs in terminal)
         try:
@@ -109,8 +90,9 @@ class USDAManager:
         food_name_clean = food_name.lower()
         
         # 0. Check API Cache
-        if food_name_clean in self.api_cache:
-            return self.api_cache[food_name_clean], {"source": "usda_cache", "confidence": 0.95}
+        cached = self.api_cache.get(food_name_clean)
+        if cached is not None:
+            return cached, {"source": "usda_cache", "confidence": 0.95}
 
         # 1. Live API Path
         try:
@@ -121,6 +103,9 @@ class USDAManager:
         except Exception:
             pass
 
+        return self._local_with_meta(food_name)
+
+    def _local_with_meta(self, food_name: str) -> Tuple[dict, dict]:
         # 2. Fallback to Local
         try:
             data = usda_loader.fetch_from_local_json(food_name)
@@ -132,5 +117,42 @@ class USDAManager:
         # 3. Default
         return self._get_default_nutrient_profile(food_name), {"source": "default", "confidence": 0.5}
 
+    def prefetch(self, food_names: List[str]) -> Dict[str, Optional[dict]]:
+        """
+        Fetch the uncached foods from the live API concurrently (at most
+        usda_client.max_workers at a time) and cache the hits. Returns
+        {food_name_clean: data or None} for the foods it tried.
+        """
+        if not usda_loader.enabled or not usda_loader.api_key:
+            return {}
+        misses = [name for name in dict.fromkeys(n.lower() for n in food_names) if self.api_cache.get(name) is None]
+        if not misses:
+            return {}
+        fetched = {}
+        for name, data in zip(misses, usda_client.map(usda_loader.fetch_from_usda_api, misses)):
+            fetched[name] = data
+            if data:
+                self.save_to_local_cache(name, data)
+        return fetched
+
+    def get_many_with_meta(self, food_names: List[str]) -> List[Tuple[dict, dict]]:
+        """
+        get_food_nutrients_with_meta for several foods, with the live API
+        misses fetched concurrently instead of one after the other.
+        """
+        fetched = self.prefetch(food_names)
+        results = []
+        for food_name in food_names:
+            name = food_name.lower()
+            if name not in fetched:  # cached, API off, or a repeat (served from the cache like before)
+                results.append(self.get_food_nutrients_with_meta(food_name))
+                continue
+            data = fetched.pop(name)
+            if data:
+                results.append((data, {"source": "usda_api", "confidence": 0.9}))
+            else:
+                results.append(self._local_with_meta(food_name))
+        return results
+
 # Singleton instance
 usda_manager = USDAManager()
@@ -0,0 +1,211 @@
+"""
+Columnar, memory-mappable snapshot of the USDA Foundation Foods index.
+
+USDALoader used to parse the whole FoundationFoods JSON in every worker the
+first time a food was looked up: json.load of the full file, an if/elif
+chain per nutrient entry and a Python sort per nutrient ranking, all kept as
+per-food dicts in private heap memory. The index is now a FoundationIndex
+over a handful of arrays:
+
+    fdc_ids      int64 (n,)
+    names        str   (n,)     description as in the JSON
+    names_lower  str   (n,)     for the substring lookups
+    nutrients    float64 (n, k) NaN where the food has no value
+    calories     float64 (n,)
+    rank_<key>   intp  (m,)     rows with that nutrient, highest amount first
+
+An offline build step writes them with model_artifacts.write_artifact
+(one .npy per array plus manifest.json). The loader maps them read-only on
+first use, so workers share the pages and skip the JSON entirely:
+
+    python -m backend.usda_snapshot build [--json PATH] [--out DIR]
+
+The snapshot is used while the JSON it was built from is unchanged (size and
+mtime recorded in the manifest) or absent; otherwise the loader falls back
+to parsing the JSON into the same arrays. USDA_SNAPSHOT_DIR overrides the
+default location (backend/cache/usda_foundation).
+"""
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.model_artifacts import read_artifact, write_artifact
+
+logger = logging.getLogger(__name__)
+
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SNAPSHOT_DIR = os.environ.get("USDA_SNAPSHOT_DIR") or os.path.join(_BACKEND_DIR, "cache", "usda_foundation")
+
+# FoodData Central nutrient name -> internal key
+NUTRIENT_NAMES = {
+    "Protein": "protein",
+    "Fiber, total dietary": "fiber",
+    "Sugars, Total": "sugar",
+    "Carbohydrate, by difference": "carbohydrates",
+    "Iron, Fe": "iron",
+    "Potassium, K": "potassium",
+    "Sodium, Na": "sodium",
+    "Calcium, Ca": "calcium",
+    "Magnesium, Mg": "magnesium",
+    "Zinc, Zn": "zinc",
+    "Vitamin C, total ascorbic acid": "vitamin_c",
+    "Vitamin B-12": "vitamin_b12",
+}
+NUTRIENT_KEYS = tuple(sorted(set(NUTRIENT_NAMES.values())))
+_COLUMNS = {key: col for col, key in enumerate(NUTRIENT_KEYS)}
+
+
+def source_signature(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class FoundationIndex:
+    """Foundation Foods as arrays: lookups by name and per-nutrient rankings."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], source: str = "json"):
+        self.fdc_ids = arrays["fdc_ids"]
+        self.names = arrays["names"]
+        self.names_lower = arrays["names_lower"]
+        self.nutrients = arrays["nutrients"]
+        self.calories = arrays["calories"]
+        self.rankings = {key: arrays[f"rank_{key}"] for key in NUTRIENT_KEYS if f"rank_{key}" in arrays}
+        self.source = source
+
+    @classmethod
+    def empty(cls) -> "FoundationIndex":
+        return cls.from_foods([], source="empty")
+
+    @classmethod
+    def from_foundation_json(cls, data: Dict[str, Any]) -> "FoundationIndex":
+        return cls.from_foods(data.get("FoundationFoods", []))
+
+    @classmethod
+    def from_foods(cls, foods: List[Dict[str, Any]], source: str = "json") -> "FoundationIndex":
+        n = len(foods)
+        fdc_ids = np.zeros(n, dtype=np.int64)
+        nutrients = np.full((n, len(NUTRIENT_KEYS)), np.nan)
+        calories = np.zeros(n)
+        names = []
+        for row, food in enumerate(foods):
+            fdc_ids[row] = food.get("fdcId") or 0
+            names.append(food.get("description", "Unknown"))
+            for entry in food.get("foodNutrients", []):
+                nutrient = entry.get("nutrient", {})
+                name = nutrient.get("name")
+                amount = entry.get("amount", 0.0)
+                key = NUTRIENT_NAMES.get(name)
+                if key is not None and amount is not None:
+                    nutrients[row, _COLUMNS[key]] = amount
+                if name == "Energy" and nutrient.get("unitName") == "kcal" and amount is not None:
+                    calories[row] = amount
+        arrays = {
+            "fdc_ids": fdc_ids,
+            "names": np.array(names, dtype=str),
+            "names_lower": np.array([name.lower() for name in names], dtype=str),
+            "nutrients": nutrients,
+            "calories": calories,
+        }
+        for key, col in _COLUMNS.items():
+            column = nutrients[:, col]
+            rows = np.flatnonzero(~np.isnan(column))
+            # Stable, so equal amounts keep file order (as the old list.sort(reverse=True) did)
+            arrays[f"rank_{key}"] = rows[np.argsort(-column[rows], kind="stable")].astype(np.intp)
+        return cls(arrays, source=source)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        out = {"fdc_ids": self.fdc_ids, "names": self.names, "names_lower": self.names_lower,
+               "nutrients": self.nutrients, "calories": self.calories}
+        out.update({f"rank_{key}": rows for key, rows in self.rankings.items()})
+        return out
+
+    def __len__(self) -> int:
+        return len(self.fdc_ids)
+
+    def find(self, name_clean: str) -> Optional[int]:
+        """First row whose lowercased name equals or contains *name_clean*."""
+        if not len(self):
+            return None
+        hits = np.flatnonzero(np.char.find(self.names_lower, name_clean) >= 0)
+        return int(hits[0]) if len(hits) else None
+
+    def food(self, row: int) -> Dict[str, Any]:
+        values = self.nutrients[row]
+        return {
+            "name": str(self.names[row]),
+            "nutrients": {key: float(values[col]) for key, col in _COLUMNS.items() if not np.isnan(values[col])},
+            "calories": float(self.calories[row]),
+        }
+
+    def top(self, nutrient_key: str, limit: int) -> List[Dict[str, Any]]:
+        rows = self.rankings.get(nutrient_key)
+        if rows is None:
+            return []
+        col = _COLUMNS[nutrient_key]
+        results = []
+        for row in rows:
+            amount = float(self.nutrients[row, col])
+            if len(results) >= limit or amount <= 0:
+                break  # rankings are sorted, the rest are <= 0 too
+            results.append({"name": str(self.names[row]), "amount": amount,
+                            "calories": float(self.calories[row]), "fdc_id": int(self.fdc_ids[row])})
+        return results
+
+
+def build_snapshot(json_path: str, out_dir: str = DEFAULT_SNAPSHOT_DIR) -> str:
+    """Parse the Foundation JSON once and write the index arrays to *out_dir*."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        index = FoundationIndex.from_foundation_json(json.load(f))
+    manifest = {
+        "kind": "usda_foundation_index",
+        "foods": len(index),
+        "nutrient_keys": list(NUTRIENT_KEYS),
+        "source_path": os.path.abspath(json_path),
+        "source_signature": source_signature(json_path),
+    }
+    write_artifact(out_dir, manifest, index.arrays())
+    return out_dir
+
+
+def load_snapshot(json_path: str, out_dir: str = DEFAULT_SNAPSHOT_DIR, mmap: bool = True) -> Optional[FoundationIndex]:
+    """
+    The mapped index, or None when there is no snapshot or the JSON it was
+    built from has changed since (a snapshot without its JSON is used as is).
+    """
+    loaded = read_artifact(out_dir, mmap=mmap, verify_sources=False)
+    if loaded is None:
+        return None
+    manifest, arrays = loaded
+    if manifest.get("kind") != "usda_foundation_index" or manifest.get("nutrient_keys") != list(NUTRIENT_KEYS):
+        return None
+    current = source_signature(json_path)
+    if current is not None and current != manifest.get("source_signature"):
+        logger.warning("USDA_SNAPSHOT | %s is stale (%s changed); ignoring", out_dir, os.path.basename(json_path))
+        return None
+    return FoundationIndex(arrays, source="snapshot")
+
+
+if __name__ == "__main__":
+    import argparse
+    from backend.usda_loader import usda_loader
+
+    parser = argparse.ArgumentParser(description="Build the memory-mappable USDA Foundation Foods index.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--json", default=usda_loader.json_path)
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    try:
+        print(f"[OK] Built USDA index snapshot -> {build_snapshot(args.json, args.out)}")
+    except FileNotFoundError as e:
+        print(f"[WARN] Skipping USDA index snapshot: Foundation JSON not found ({e})")
+    except Exception as e:
+        print(f"[FAIL] Could not build USDA index snapshot: {e}")
+        sys.exit(1)
@@ -0,0 +1,121 @@
+"""
+Local stand-in for the FoodData Central search endpoint, for tests and
+benchmarks of the USDA client (no API key, no network).
+
+    with USDAStubServer(latency_ms=50) as stub:
+        client = USDAClient(base_url=stub.url)
+        ...
+        stub.hits["lentils"], stub.max_concurrent
+
+POST /foods/search answers every query with one Foundation-style food whose
+nutrient values are derived from the query, after latency_ms. Queries in
+*missing* get an empty result and queries in *failing* a 500.
+"""
+import json
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable
+
+# nutrientId -> (nutrientName, unitName), a subset of the real ids
+STUB_NUTRIENTS = {
+    1003: ("Protein", "G"),
+    1005: ("Carbohydrate, by difference", "G"),
+    1008: ("Energy", "KCAL"),
+    1079: ("Fiber, total dietary", "G"),
+    1089: ("Iron, Fe", "MG"),
+    1092: ("Potassium, K", "MG"),
+    1093: ("Sodium, Na", "MG"),
+    2000: ("Sugars, total including NLEA", "G"),
+}
+
+
+def stub_food(query: str) -> dict:
+    """The food the stub returns for *query* (deterministic)."""
+    seed = zlib.crc32(query.encode())
+    return {
+        "fdcId": 100000 + seed % 900000,
+        "description": query.title(),
+        "dataType": "Foundation",
+        "foodNutrients": [
+            {"nutrientId": n_id, "nutrientName": name, "unitName": unit,
+             "value": round((seed >> (i * 3)) % 400 / 10.0, 1)}
+            for i, (n_id, (name, unit)) in enumerate(STUB_NUTRIENTS.items())
+        ],
+    }
+
+
+class USDAStubServer:
+    def __init__(self, latency_ms: float = 0.0, missing: Iterable[str] = (), failing: Iterable[str] = ()):
+        self.latency_s = latency_ms / 1000.0
+        self.missing = set(missing)
+        self.failing = set(failing)
+        self.hits: Counter = Counter()
+        self.api_keys: Counter = Counter()
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                query = body.get("query", "")
+                with stub._lock:
+                    stub.hits[query] += 1
+                    stub.api_keys[self.path.partition("api_key=")[2]] += 1
+                    stub._active += 1
+                    stub.max_concurrent = max(stub.max_concurrent, stub._active)
+                try:
+                    time.sleep(stub.latency_s)
+                finally:
+                    with stub._lock:
+                        stub._active -= 1
+                if not self.path.startswith("/foods/search"):
+                    return self._reply(404, {"error": "not found"})
+                if query in stub.failing:
+                    return self._reply(500, {"error": "stub failure"})
+                foods = [] if query in stub.missing else [stub_food(query)][:body.get("pageSize", 1)]
+                self._reply(200, {"totalHits": len(foods), "foods": foods})
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "USDAStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "USDAStubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
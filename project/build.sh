@@ -6,6 +6,12 @@ echo "📦 Installing Python dependencies..."
 pip install --upgrade pip
 pip install -r requirements.txt
 
+echo "🧠 Exporting memory-mapped model artifacts..."
+python -m backend.model_artifacts export || echo "⚠️ Flat model export failed; workers will load the native models."
+
+echo "🥦 Building the memory-mapped USDA Foundation Foods index..."
+python -m backend.usda_snapshot build || echo "⚠️ USDA index snapshot failed; workers will parse the Foundation JSON."
+
 echo "🔧 Installing native system dependencies (libgl1, libglib2.0-0)..."
 mkdir -p lib
 cd lib
@@ -326,6 +326,17 @@ def run_scheduler(app):
             time.sleep(10)
 
 if __name__ == '__main__':
+    # Fork the OCR and batch-parsing workers before any other thread starts
+    # (pymongo monitors, the scheduler, eventlet's tpool, the model server)
+    try:
+        from backend.ocr_pool import ocr_pool
+        from backend.report_batch import start_pool
+        ocr_pool.start()
+        start_pool()
+        print(f"[OK] Worker pools started (OCR: {ocr_pool.workers})")
+    except Exception as e:
+        print(f"[WARN] Could not pre-start worker pools, they will start on first use: {e}")
+
     app = create_app()
     
     # Start scheduler thread
@@ -341,6 +352,7 @@ if __name__ == '__main__':
     print("")
     print("Prediction endpoints:")
     print("   - POST /api/predict")
+    print("   - POST /api/predict/batch")
     print("   - POST /predict_diabetes (legacy)")
     print("   - POST /predict_lung_cancer (legacy)")
     print("")
@@ -365,6 +377,8 @@ if __name__ == '__main__':
     print("")
     print("Report Analysis endpoints:")
     print("   - POST /api/analyze-report")
+    print("   - POST /api/analyze-report/jobs")
+    print("   - GET /api/analyze-report/jobs/<id>")
     print("")
     print("Auth endpoints:")
     print("   - POST /auth/register")
@@ -374,6 +388,9 @@ if __name__ == '__main__':
     print("   - GET /api/meal-plan")
     print("   - POST /api/export-report")
     print("=" * 70)
+    if os.environ.get('MODEL_SERVER_SOCKET') and os.environ.get('MODEL_SERVER_SPAWN', 'False').lower() in ['true', '1', 't']:
+        from backend.model_server import spawn_model_server
+        spawn_model_server(os.environ['MODEL_SERVER_SOCKET'])
     port = int(os.environ.get('PORT', 5000))
     is_debug = os.environ.get('FLASK_ENV') == 'development' or os.environ.get('FLASK_DEBUG', 'False').lower() in ['true', '1', 't']
     socketio.run(app, host='0.0.0.0', port=port, debug=is_debug, use_reloader=False)